@@ -0,0 +1,55 @@
+"""Хранилище событий: добавление, запросы по диапазону дат и сохранение.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_events.py [--size 30000] [--events 1000000]
+
+Печатает время генерации и add_bulk для events записей за год, запросов
+«визиты питомца за III квартал», «рецепты за 30 дней», «визиты
+ветеринара за месяц» и сохранения/загрузки событий в JSON и XML.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import VetVisit, Prescription
+from events import EventStore
+from storage import save_events_to_json, load_events_from_json, save_events_to_xml, load_events_from_xml
+from generator import generate_registry, generate_events, pet_name
+
+
+def timed(label: str, action, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = action()
+    elapsed = (time.perf_counter() - start) / repeat
+    unit = f"{elapsed * 1e6:>10.1f} мкс" if elapsed < 0.01 else f"{elapsed:>10.3f} с  "
+    print(f"{label:<40} {unit}")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=30_000, help="число записей реестра (владельцы + питомцы)")
+    parser.add_argument("--events", type=int, default=1_000_000, help="число записей хранилища событий")
+    args = parser.parse_args()
+
+    registry = generate_registry(args.size)
+    store = timed(f"генерация + add_bulk ({args.events})", lambda: generate_events(EventStore(registry), args.events))
+    store.between(VetVisit)  # первая сортировка разделов не входит в замеры запросов
+    timed("визиты питомца за III квартал", lambda: store.for_pet(pet_name(7), VetVisit, "2024-07-01", "2024-10-01"), 1000)
+    timed("рецепты за 30 дней", lambda: store.last_days(Prescription, 30, now="2024-12-31 23:59"), 10)
+    timed("визиты ветеринара за июль", lambda: store.for_veterinarian(3, "2024-07-01", "2024-08-01"), 100)
+    timed("все визиты за 15-20 июля", lambda: store.between(VetVisit, "2024-07-15", "2024-07-21"), 100)
+    with tempfile.TemporaryDirectory() as directory:
+        for name, save, load in (("json", save_events_to_json, load_events_from_json), ("xml", save_events_to_xml, load_events_from_xml)):
+            filename = os.path.join(directory, f"events.{name}")
+            timed(f"save_events_to_{name}", lambda: save(store, filename))
+            timed(f"load_events_from_{name}", lambda: load(EventStore(registry), filename))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Время до первого запроса: полная загрузка против ленивого реестра.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_lazy.py [--sizes 10000 100000 1000000]
+
+Для каждого размера печатает время load_from_json/load_from_snapshot
+до первого get_pet и то же для open_lazy: первого и последнего
+питомца файла (для JSON последний требует дочитать индекс до конца).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from registry import PetRegistry
+from storage import save_to_json, load_from_json, save_to_snapshot, load_from_snapshot
+from lazy import open_lazy
+from generator import generate_registry, pet_name, split
+
+
+def first_query(load, filename: str, name: str) -> float:
+    start = time.perf_counter()
+    registry = PetRegistry()
+    load(registry, filename)
+    registry.get_pet(name)
+    return time.perf_counter() - start
+
+
+def lazy_query(filename: str, name: str) -> float:
+    start = time.perf_counter()
+    with open_lazy(filename) as lazy:
+        lazy.get_pet(name)
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="числа записей")
+    args = parser.parse_args()
+
+    print(f"{'размер':>9} {'формат':>9} {'загрузка':>10} {'лениво, первый':>15} {'лениво, последний':>18}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            registry = generate_registry(size)
+            first, last = pet_name(0), pet_name(split(size)[1] - 1)
+            for fmt, save, load in (("json", save_to_json, load_from_json), ("snapshot", save_to_snapshot, load_from_snapshot)):
+                filename = os.path.join(directory, f"registry-{size}.{fmt}")
+                save(registry, filename)
+                print(f"{size:>9} {fmt:>9} {first_query(load, filename, first):>9.3f}с "
+                      f"{lazy_query(filename, first):>14.4f}с {lazy_query(filename, last):>17.4f}с")
+            del registry
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Замер загрузки больших файлов JSON и XML в PetRegistry.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_load.py [--size 500000]
+
+Скрипт строит реестр заданного размера, сохраняет его во временные
+файлы и печатает время и пиковую память (tracemalloc) загрузки
+в пустой реестр для каждого загрузчика.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from registry import PetRegistry
+from storage import save_to_json, load_from_json, load_from_json_stream, save_to_xml, load_from_xml, load_from_xml_stream
+from storage import save_to_snapshot, load_from_snapshot, save_to_sqlite, load_from_sqlite
+from snapshot import SnapshotReader
+from generator import generate_registry, pet_name, split
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=500_000, help="число записей (владельцы + питомцы)")
+    args = parser.parse_args()
+
+    registry = generate_registry(args.size)
+    loaders = (
+        ("JSON", save_to_json, load_from_json, "json"),
+        ("JSON (поток)", save_to_json, load_from_json_stream, "json"),
+        ("XML", save_to_xml, load_from_xml, "xml"),
+        ("XML (поток)", save_to_xml, load_from_xml_stream, "xml"),
+        ("Снимок", save_to_snapshot, load_from_snapshot, "snap"),
+        ("SQLite", save_to_sqlite, load_from_sqlite, "db"),
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for title, save, load, ext in loaders:
+            filename = os.path.join(directory, f"registry.{ext}")
+            save(registry, filename)
+            tracemalloc.start()
+            start = time.perf_counter()
+            loaded = PetRegistry()
+            load(loaded, filename)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            size_mb = os.path.getsize(filename) / 2 ** 20
+            print(f"{title}: {args.size} записей, {size_mb:.1f} МБ, загрузка {elapsed:.2f} с, пик памяти {peak / 2 ** 20:.1f} МБ")
+            del loaded
+
+        # Время до первого запроса без загрузки: открыть снимок и найти питомца
+        filename = os.path.join(directory, "registry.snap")
+        start = time.perf_counter()
+        with SnapshotReader(filename) as reader:
+            reader.get_pet(pet_name(split(args.size)[1] // 2))
+        elapsed = time.perf_counter() - start
+        print(f"Снимок через mmap: открытие и первый get_pet {elapsed * 1e3:.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Память на одного питомца: прежние модели на __dict__ против __slots__ и пула значений.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_memory.py [--size 1000000]
+
+«До» — классы без __slots__ и новые Breed/PetHouse на каждого питомца,
+как делали загрузчики раньше. «После» — модели из models.py и значения
+из ModelInterner. Память считается через tracemalloc.
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Owner, Pet
+from interning import ModelInterner
+from generator import BREEDS, HOUSES, pet_name
+
+
+class DictAddress:
+    def __init__(self, street, city, postal_code):
+        self.street = street
+        self.city = city
+        self.postal_code = postal_code
+
+
+class DictOwner:
+    def __init__(self, owner_id, name, phone, address):
+        self.owner_id = owner_id
+        self.name = name
+        self.phone = phone
+        self.address = address
+
+
+class DictBreed:
+    def __init__(self, name, species):
+        self.name = name
+        self.species = species
+
+
+class DictPetHouse:
+    def __init__(self, house_type, house_size):
+        self.house_type = house_type
+        self.house_size = house_size
+
+
+class DictPet:
+    def __init__(self, name, age, breed, house, owner):
+        self.name = name
+        self.age = age
+        self.breed = breed
+        self.house = house
+        self.owner = owner
+
+
+def build_before(size: int, names):
+    owners = [DictOwner(i, "Владелец", "+7", DictAddress("Ленина, 10", "Москва", "101000")) for i in range(size // 10 or 1)]
+    return [
+        DictPet(names[i], i % 20, DictBreed(*BREEDS[i % len(BREEDS)]), DictPetHouse(*HOUSES[i % len(HOUSES)]), owners[i % len(owners)])
+        for i in range(size)
+    ]
+
+
+def build_after(size: int, names):
+    interner = ModelInterner()
+    owners = [Owner(i, "Владелец", "+7", interner.address("Ленина, 10", "Москва", "101000")) for i in range(size // 10 or 1)]
+    return [
+        Pet(names[i], i % 20, interner.breed(*BREEDS[i % len(BREEDS)]), interner.house(*HOUSES[i % len(HOUSES)]), owners[i % len(owners)])
+        for i in range(size)
+    ]
+
+
+def measure(build, size: int, names) -> int:
+    tracemalloc.start()
+    pets = build(size, names)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del pets
+    return used
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1_000_000, help="число питомцев")
+    args = parser.parse_args()
+
+    # Имена создаются заранее: их стоимость одинакова в обоих вариантах
+    names = [pet_name(i) for i in range(args.size)]
+    before = measure(build_before, args.size, names)
+    after = measure(build_after, args.size, names)
+    print(f"{args.size} питомцев (без учета строк имен)")
+    print(f"до:    {before / args.size:>6.0f} байт на питомца")
+    print(f"после: {after / args.size:>6.0f} байт на питомца")
+
+
+if __name__ == "__main__":
+    main()
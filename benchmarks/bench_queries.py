@@ -0,0 +1,65 @@
+"""Сравнение PetRegistry.find_pets с полным перебором registry.pets.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_queries.py [--size 200000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from registry import PetRegistry
+from generator import generate_registry
+
+QUERIES = [
+    ("кошки в Москве 2–5 лет", dict(species="Кошка", city="Москва", age_between=(2, 5))),
+    ("порода Корги", dict(breed="Корги")),
+    ("Хомяки в Перми", dict(species="Хомяк", city="Пермь")),
+    ("возраст 18–19", dict(age_between=(18, 19))),
+]
+
+
+def full_scan(registry: PetRegistry, species=None, breed=None, city=None, age_between=None):
+    result = []
+    for pet in registry.pets:
+        if species is not None and pet.breed.species != species:
+            continue
+        if breed is not None and pet.breed.name != breed:
+            continue
+        if city is not None and pet.owner.address.city != city:
+            continue
+        if age_between is not None and not (age_between[0] <= pet.age <= age_between[1]):
+            continue
+        result.append(pet)
+    result.sort(key=lambda pet: pet.name)
+    return result
+
+
+def best_of(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=300_000, help="число записей (владельцы + питомцы)")
+    args = parser.parse_args()
+
+    registry = generate_registry(args.size)
+    print(f"{'запрос':<24} {'найдено':>8} {'перебор, мс':>12} {'find_pets, мс':>14}")
+    for title, query in QUERIES:
+        expected = full_scan(registry, **query)
+        assert registry.find_pets(**query) == expected
+        scan = best_of(lambda: full_scan(registry, **query)) * 1e3
+        indexed = best_of(lambda: registry.find_pets(**query)) * 1e3
+        print(f"{title:<24} {len(expected):>8} {scan:>12.2f} {indexed:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Замер стоимости поиска в PetRegistry при росте числа записей.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_registry.py [--max 1000000]
+
+Для каждого размера реестра печатается среднее время get_owner/get_pet
+на один вызов. При хеш-индексах время не должно заметно расти
+от 1k до 1M записей.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generator import generate_registry, pet_name, split
+
+
+def time_per_call(func, keys) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        func(key)
+    return (time.perf_counter() - start) / len(keys)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max", type=int, default=1_000_000, help="максимальный размер реестра")
+    parser.add_argument("--lookups", type=int, default=100_000, help="число обращений на замер")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    size = 1_000
+    print(f"{'записей':>10} {'get_owner, нс':>15} {'get_pet, нс':>13}")
+    while size <= args.max:
+        registry = generate_registry(size)
+        owners, pets = split(size)
+        ids = [rng.randrange(owners) for _ in range(args.lookups)]
+        names = [pet_name(rng.randrange(pets)) for _ in range(args.lookups)]
+        owner_ns = time_per_call(registry.get_owner, ids) * 1e9
+        pet_ns = time_per_call(registry.get_pet, names) * 1e9
+        print(f"{size:>10} {owner_ns:>15.0f} {pet_ns:>13.0f}")
+        size *= 10
+
+
+if __name__ == "__main__":
+    main()
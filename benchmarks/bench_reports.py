@@ -0,0 +1,70 @@
+"""Отчеты о выручке по записям на услуги: колоночная группировка против прохода по записям.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_reports.py [--size 30000] [--events 1000000]
+
+Печатает время построения RevenueReports для записей generate_events
+(записи на услуги — треть всех записей), каждого отчета без кэша и из
+кэша, того же отчета простым проходом по записям хранилища и отчета
+после добавления одной записи (сброс кэша). Путь numpy или array/цикл
+выбирается по наличию numpy.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import PetServiceBooking
+from events import EventStore
+from reports import GROUPS, RevenueReports, np
+from generator import generate_registry, generate_events, pet_name
+
+
+def timed(label: str, action, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = action()
+    elapsed = (time.perf_counter() - start) / repeat
+    unit = f"{elapsed * 1e6:>10.1f} мкс" if elapsed < 0.01 else f"{elapsed:>10.3f} с  "
+    print(f"{label:<40} {unit}")
+    return result
+
+
+def naive_revenue(store: EventStore, group_by: str) -> dict:
+    """Выручка по группам одним проходом по объектам записей."""
+    key = {
+        "service": lambda booking: booking.service.service_name,
+        "owner": lambda booking: booking.pet.owner.owner_id,
+        "city": lambda booking: booking.pet.owner.address.city,
+        "month": lambda booking: booking.date[:7],
+    }[group_by]
+    result: dict = {}
+    for booking in store.iter_records(PetServiceBooking):
+        group = key(booking)
+        result[group] = result.get(group, 0.0) + booking.service.price
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=30_000, help="число записей реестра (владельцы + питомцы)")
+    parser.add_argument("--events", type=int, default=1_000_000, help="число записей хранилища событий")
+    args = parser.parse_args()
+
+    registry = generate_registry(args.size)
+    store = generate_events(EventStore(registry), args.events)
+    print(f"записей на услуги: {store.count(PetServiceBooking)}, numpy: {'да' if np is not None else 'нет'}")
+    reports = timed("построение RevenueReports", lambda: RevenueReports(store))
+    for group_by in GROUPS:
+        timed(f"по полю {group_by}: без кэша", lambda: (reports.invalidate(), reports.revenue_by(group_by)), 5)
+        timed(f"по полю {group_by}: из кэша", lambda: reports.revenue_by(group_by), 1000)
+        timed(f"по полю {group_by}: проход по записям", lambda: naive_revenue(store, group_by))
+    timed("по городам за III квартал", lambda: (reports.invalidate(), reports.revenue_by("city", "2024-07-01", "2024-10-01")), 5)
+    booking = PetServiceBooking(registry.get_pet(pet_name(0)), store.service("Стрижка", 1500.0), "2024-07-01 10:00")
+    timed("добавление записи + отчет по месяцам", lambda: (store.add(booking), reports.revenue_by("month"), store.remove(booking)), 5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Сравнение потоковых save_to_xml/save_to_json с прежними реализациями.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_save.py [--size 100000]
+
+Для каждого способа печатается время записи и пиковая память (tracemalloc).
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.dom.minidom
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from registry import PetRegistry
+from storage import save_to_xml, save_to_json
+from generator import generate_registry
+
+
+def save_to_xml_minidom(registry: PetRegistry, filename: str) -> None:
+    """Прежняя реализация: дерево ElementTree -> строка -> minidom -> строки."""
+    root = ET.Element("PetRegistry")
+    for owner in registry.owners:
+        owner_elem = ET.SubElement(root, "Owner")
+        owner_elem.set("id", str(owner.owner_id))
+        owner_elem.set("name", owner.name)
+        owner_elem.set("phone", owner.phone)
+        address_elem = ET.SubElement(owner_elem, "Address")
+        address_elem.set("street", owner.address.street)
+        address_elem.set("city", owner.address.city)
+        address_elem.set("postal_code", owner.address.postal_code)
+    for pet in registry.pets:
+        pet_elem = ET.SubElement(root, "Pet")
+        pet_elem.set("name", pet.name)
+        pet_elem.set("age", str(pet.age))
+        breed_elem = ET.SubElement(pet_elem, "Breed")
+        breed_elem.set("name", pet.breed.name)
+        breed_elem.set("species", pet.breed.species)
+        house_elem = ET.SubElement(pet_elem, "House")
+        house_elem.set("house_type", pet.house.house_type)
+        house_elem.set("house_size", pet.house.house_size)
+        owner_id_elem = ET.SubElement(pet_elem, "OwnerID")
+        owner_id_elem.text = str(pet.owner.owner_id)
+    rough_string = ET.tostring(root, encoding='utf-8')
+    reparsed = xml.dom.minidom.parseString(rough_string)
+    pretty_xml = reparsed.toprettyxml(indent="  ", encoding='utf-8')
+    lines = [line for line in pretty_xml.decode('utf-8').split('\n') if line.strip()]
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+
+def save_to_json_dump(registry: PetRegistry, filename: str) -> None:
+    """Прежняя реализация: словарь со всеми записями -> json.dump(indent=4)."""
+    data = {
+        "owners": [
+            {
+                "owner_id": owner.owner_id,
+                "name": owner.name,
+                "phone": owner.phone,
+                "address": {
+                    "street": owner.address.street,
+                    "city": owner.address.city,
+                    "postal_code": owner.address.postal_code
+                }
+            } for owner in registry.owners
+        ],
+        "pets": [
+            {
+                "name": pet.name,
+                "age": pet.age,
+                "breed": {"name": pet.breed.name, "species": pet.breed.species},
+                "house": {"house_type": pet.house.house_type, "house_size": pet.house.house_size},
+                "owner_id": pet.owner.owner_id
+            } for pet in registry.pets
+        ]
+    }
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+
+
+def measure(save, registry: PetRegistry, filename: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    save(registry, filename)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000, help="число записей (владельцы + питомцы)")
+    args = parser.parse_args()
+
+    registry = generate_registry(args.size)
+    groups = (
+        ("xml", (
+            ("ElementTree + minidom", save_to_xml_minidom),
+            ("поток, pretty=True", save_to_xml),
+            ("поток, pretty=False", lambda registry, filename: save_to_xml(registry, filename, pretty=False)),
+        )),
+        ("json", (
+            ("json.dump(indent=4)", save_to_json_dump),
+            ("поток, indent=4", save_to_json),
+            ("поток, indent=None", lambda registry, filename: save_to_json(registry, filename, indent=None)),
+        )),
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for ext, writers in groups:
+            # Первый способ в группе — прежний, с ним сравнивается вывод второго
+            reference = os.path.join(directory, f"reference.{ext}")
+            for position, (title, save) in enumerate(writers):
+                filename = reference if position == 0 else os.path.join(directory, f"registry.{ext}")
+                elapsed, peak = measure(save, registry, filename)
+                print(f"{title:<24} {elapsed:>7.2f} с, пик памяти {peak / 2 ** 20:>7.1f} МБ")
+                if position == 1:
+                    with open(reference, encoding='utf-8') as a, open(filename, encoding='utf-8') as b:
+                        print(f"{'':<24} вывод совпадает с прежним: {a.read() == b.read()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Расписание ветеринаров: запись визитов пачкой, проверка занятости и поиск свободных окон.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_scheduling.py [--size 30000] [--visits 1000000] [--vets 1000]
+
+Печатает время book_bulk для visits визитов (и число отклоненных из-за
+пересечений), проверки «свободен ли ветеринар с 14:00 до 14:30», поиска
+ближайшего окна у одного ветеринара и у любого из всех ветеринаров.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from events import EventStore
+from scheduling import Scheduler
+from generator import generate_registry, generate_visits
+
+
+def timed(label: str, action, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = action()
+    elapsed = (time.perf_counter() - start) / repeat
+    unit = f"{elapsed * 1e6:>10.1f} мкс" if elapsed < 0.01 else f"{elapsed:>10.3f} с  "
+    print(f"{label:<40} {unit}")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=30_000, help="число записей реестра (владельцы + питомцы)")
+    parser.add_argument("--visits", type=int, default=1_000_000, help="число визитов для записи")
+    parser.add_argument("--vets", type=int, default=1000, help="число ветеринаров")
+    args = parser.parse_args()
+
+    store = EventStore(generate_registry(args.size))
+    visits = generate_visits(store, args.visits, args.vets)
+    scheduler = Scheduler(store)
+    conflicts = timed(f"book_bulk ({args.visits})", lambda: scheduler.book_bulk(visits))
+    print(f"записано {args.visits - len(conflicts)}, отклонено из-за пересечений {len(conflicts)}")
+
+    rng = random.Random(1)
+    days = [f"2024-{month:02d}-{day:02d}" for month in range(1, 13) for day in range(1, 29)]
+    queries = [(rng.randrange(args.vets), rng.choice(days)) for _ in range(1000)]
+    timed("свободен ли с 14:00 до 14:30, 1000 раз", lambda: [scheduler.is_free(vet_id, f"{day} 14:00", f"{day} 14:30")
+                                                              for vet_id, day in queries])
+    timed("ближайшее окно у ветеринара, 1000 раз", lambda: [scheduler.next_free_slot(vet_id, 60, f"{day} 09:00")
+                                                             for vet_id, day in queries])
+    timed("ближайшее окно у любого ветеринара", lambda: scheduler.next_free_slot_any(60, "2024-07-01 09:00"), 100)
+    everyone_busy = [vet_id for vet_id in range(args.vets) if not scheduler.is_free(vet_id, "2024-07-01 09:00", "2024-07-01 10:00")]
+    timed(f"то же среди {len(everyone_busy)} занятых в 9:00", lambda: scheduler.next_free_slot_any(60, "2024-07-01 09:00", everyone_busy), 10)
+
+
+if __name__ == "__main__":
+    main()
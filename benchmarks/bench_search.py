@@ -0,0 +1,73 @@
+"""Поиск по именам и телефонам: префиксные и нечеткие запросы по миллиону имен.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_search.py [--size 1500000] [--queries 1000]
+
+Печатает время построения RegistrySearch (размер по умолчанию дает
+миллион питомцев), среднее время префиксного и нечеткого запроса по
+кличкам питомцев с одной опечаткой, поиска владельцев по имени и
+телефону и переименования питомца с последующим запросом.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search import RegistrySearch
+from generator import generate_registry, pet_name, split
+
+LETTERS = "абвгдежзиклмнопрстуфхцчшыэюя"
+
+
+def typo(rng: random.Random, name: str) -> str:
+    """Имя с одной замененной буквой в кличке."""
+    position = rng.randrange(name.index(" "))
+    return name[:position] + rng.choice(LETTERS) + name[position + 1:]
+
+
+def timed_each(label: str, action, items) -> None:
+    start = time.perf_counter()
+    for item in items:
+        action(item)
+    elapsed = (time.perf_counter() - start) / len(items)
+    print(f"{label:<45} {elapsed * 1e6:>10.1f} мкс")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1_500_000, help="число записей реестра (владельцы + питомцы)")
+    parser.add_argument("--queries", type=int, default=1000, help="число запросов каждого вида")
+    args = parser.parse_args()
+
+    registry = generate_registry(args.size)
+    owners, pets = split(args.size)
+    start = time.perf_counter()
+    search = RegistrySearch(registry)
+    search.pets.prefix("а")
+    search.owner_names.prefix("а")
+    search.phones.prefix("7")
+    print(f"{'построение индексов (' + str(pets) + ' питомцев)':<45} {time.perf_counter() - start:>10.3f} с")
+
+    rng = random.Random(1)
+    names = [pet_name(rng.randrange(pets)) for _ in range(args.queries)]
+    typos = [typo(rng, name) for name in names]
+    owner_names = [registry.get_owner(rng.randrange(owners)).name for _ in range(args.queries)]
+    phones = [registry.get_owner(rng.randrange(owners)).phone[:9] for _ in range(args.queries)]
+    timed_each("префикс клички", lambda name: search.pets.prefix(name[:4]), names)
+    timed_each("префикс имени с номером", lambda name: search.pets.prefix(name[:-1]), names)
+    # Первый проход читает списки триграмм и ключи из памяти впервые, второй показывает обычное время
+    timed_each("нечеткий поиск с опечаткой, первый проход", search.pets.fuzzy, typos)
+    timed_each("нечеткий поиск клички с опечаткой", search.pets.fuzzy, typos)
+    timed_each("подсказка для имени с опечаткой", search.suggest_pets, typos)
+    timed_each("владелец по имени с опечаткой", lambda name: search.find_owners(typo(rng, name)), owner_names)
+    timed_each("владелец по началу телефона", search.find_owners, phones)
+    renamed = [pet_name(i) for i in rng.sample(range(pets), 100)]
+    timed_each("переименование + префиксный запрос",
+               lambda name: (registry.update_pet(name, new_name=name + " новый"), search.pets.prefix(name + " новый")), renamed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Полное и инкрементальное сохранение сегментированного хранилища.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_segments.py [--size 500000] [--segment-size 1024]
+
+Печатает время save_to_json всего реестра, первого сохранения
+SegmentedStore и сохранения после 1, 10 и 100 вызовов update_owner.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import save_to_json
+from segments import SegmentedStore
+from generator import generate_registry
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=500_000, help="число записей (владельцы + питомцы)")
+    parser.add_argument("--segment-size", type=int, default=1024, help="записей в сегменте")
+    args = parser.parse_args()
+
+    registry = generate_registry(args.size)
+    owner_ids = list(registry.owner_map())
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        save_to_json(registry, os.path.join(directory, "registry.json"))
+        print(f"save_to_json:              {time.perf_counter() - start:>8.3f} с")
+
+        store = SegmentedStore(os.path.join(directory, "segments"), args.segment_size, registry)
+        store.open()
+        start = time.perf_counter()
+        written = store.save()
+        print(f"первое сохранение:         {time.perf_counter() - start:>8.3f} с, сегментов {written}")
+
+        for changes in (1, 10, 100):
+            step = max(len(owner_ids) // changes, 1)
+            for owner_id in owner_ids[::step][:changes]:
+                registry.update_owner(owner_id, new_phone="+7-000")
+            start = time.perf_counter()
+            written = store.save()
+            print(f"после {changes:>3} изменений:      {time.perf_counter() - start:>8.3f} с, сегментов {written}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
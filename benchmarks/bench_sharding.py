@@ -0,0 +1,60 @@
+"""Масштабирование шардированной загрузки и сохранения по числу процессов.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_sharding.py [--size 500000] [--shards 16] [--format json]
+
+Для 1, 2, 4, 8 и 16 процессов печатается время save_sharded и
+load_sharded и ускорение относительно одного процесса. Для сравнения
+печатается время монолитных save_to_json/load_from_json. Ускорение
+ограничено числом ядер машины и последовательным объединением шардов.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from registry import PetRegistry
+from storage import save_to_json, load_from_json, save_to_xml, load_from_xml
+from sharding import save_sharded, load_sharded
+from generator import generate_registry
+
+WORKERS = (1, 2, 4, 8, 16)
+
+
+def timed(function, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=500_000, help="число записей (владельцы + питомцы)")
+    parser.add_argument("--shards", type=int, default=16, help="число шардов")
+    parser.add_argument("--format", choices=("json", "xml"), default="json", help="формат шардов")
+    args = parser.parse_args()
+
+    registry = generate_registry(args.size)
+    save, load = (save_to_json, load_from_json) if args.format == "json" else (save_to_xml, load_from_xml)
+    print(f"процессоров: {os.cpu_count()}, шардов: {args.shards}")
+    with tempfile.TemporaryDirectory() as directory:
+        single = os.path.join(directory, f"registry.{args.format}")
+        print(f"{'один файл':<12} сохранение {timed(save, registry, single):>7.2f} с, "
+              f"загрузка {timed(load, PetRegistry(), single):>7.2f} с")
+
+        base_save = base_load = None
+        for workers in WORKERS:
+            target = os.path.join(directory, f"shards-{workers}")
+            save_time = timed(save_sharded, registry, target, args.shards, args.format, workers)
+            load_time = timed(load_sharded, PetRegistry(), target, workers)
+            base_save = base_save or save_time
+            base_load = base_load or load_time
+            print(f"{workers:>2} процессов  сохранение {save_time:>7.2f} с (x{base_save / save_time:.2f}), "
+                  f"загрузка {load_time:>7.2f} с (x{base_load / load_time:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Детерминированный генератор синтетического реестра для бенчмарков.
+
+Один и тот же seed и размер всегда дают одинаковые записи. Размер —
+общее число записей: треть владельцев и две трети питомцев, у каждого
+владельца в среднем два питомца. Строки — кириллические имена, улицы,
+города, породы и клички; значения пород, домов и адресов повторяются,
+как в настоящих данных.
+
+Имя питомца с номером i — pet_name(i), ID владельцев — 0 .. owners-1,
+поэтому клиент бенчмарка может обращаться к записям, не храня их.
+
+generate_events добавляет в EventStore ветеринаров и случайные записи
+всех видов с датами в пределах одного года. generate_visits готовит
+визиты разной длительности для записи через Scheduler.
+"""
+import os
+import random
+import sys
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Owner, Pet, PetEvent, VetVisit, PetServiceBooking, Prescription, Veterinarian
+from registry import PetRegistry
+from events import EventStore
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+FIRST_NAMES = ["Александр", "Мария", "Иван", "Анна", "Дмитрий", "Елена", "Сергей", "Ольга", "Андрей", "Наталья",
+               "Алексей", "Татьяна", "Михаил", "Ирина", "Николай", "Светлана", "Павел", "Юлия", "Артём", "Ксения"]
+LAST_NAMES = ["Иванов", "Смирнов", "Кузнецов", "Попов", "Васильев", "Петров", "Соколов", "Михайлов", "Новиков",
+              "Фёдоров", "Морозов", "Волков", "Алексеев", "Лебедев", "Семёнов", "Егоров", "Павлов", "Козлов"]
+STREETS = ["Ленина", "Пушкина", "Гагарина", "Мира", "Советская", "Садовая", "Центральная", "Лесная",
+           "Школьная", "Молодёжная", "Набережная", "Заречная", "Невский проспект", "Тверская"]
+CITIES = ["Москва", "Санкт-Петербург", "Новосибирск", "Екатеринбург", "Казань", "Нижний Новгород", "Челябинск",
+          "Самара", "Омск", "Ростов-на-Дону", "Уфа", "Красноярск", "Пермь", "Воронеж", "Волгоград"]
+BREEDS = [("Корги", "Собака"), ("Бульдог", "Собака"), ("Хаски", "Собака"), ("Лабрадор", "Собака"),
+          ("Такса", "Собака"), ("Овчарка", "Собака"), ("Британская", "Кошка"), ("Сиамская", "Кошка"),
+          ("Мейн-кун", "Кошка"), ("Сфинкс", "Кошка"), ("Беспородная", "Кошка"), ("Волнистый", "Попугай"),
+          ("Корелла", "Попугай"), ("Джунгарский", "Хомяк"), ("Сирийский", "Хомяк"), ("Декоративный", "Кролик")]
+HOUSES = [("Квартира", "Средний"), ("Дом", "Большой"), ("Клетка", "Маленький"), ("Вольер", "Большой"),
+          ("Аквариум", "Маленький"), ("Будка", "Средний")]
+EVENT_TYPES = ["Кормление", "Прогулка", "Купание", "Дрессировка", "Взвешивание"]
+VISIT_REASONS = ["Осмотр", "Прививка", "Травма", "Контроль", "Стерилизация", "Анализы"]
+SERVICES = [("Стрижка", 1500.0), ("Груминг", 2500.0), ("Гостиница", 1200.0), ("Чистка зубов", 3000.0),
+            ("Вакцинация", 900.0), ("Дрессировка", 2000.0)]
+MEDICATIONS = [("Амоксициллин", "2 раза в день"), ("Витамины", "1 раз в день"), ("Празиквантел", "однократно"),
+               ("Мелоксикам", "1 раз в день")]
+NICKNAMES = ["Барсик", "Мурка", "Шарик", "Бобик", "Рекс", "Пушок", "Снежок", "Рыжик", "Кеша", "Тузик",
+             "Дымка", "Жучка", "Лорд", "Персик", "Умка", "Соня", "Граф", "Бусинка", "Чарли", "Ёжик"]
+
+OwnerFields = Tuple[int, str, str, str, str, str]
+PetFields = Tuple[str, int, str, str, str, str, int]
+
+
+def scale_size(scale: str) -> int:
+    """Число записей для обозначения масштаба (1k, 10k, 100k, 1m) или числа."""
+    return SCALES[scale.lower()] if scale.lower() in SCALES else int(scale)
+
+
+def split(size: int) -> Tuple[int, int]:
+    """Число владельцев и питомцев для size записей."""
+    owners = max(size // 3, 1)
+    return owners, max(size - owners, 0)
+
+
+def pet_name(i: int) -> str:
+    return f"{NICKNAMES[i % len(NICKNAMES)]} {i}"
+
+
+def generate_records(size: int, seed: int = 42) -> Tuple[List[OwnerFields], List[PetFields]]:
+    """Поля владельцев и питомцев в виде кортежей, как в sharding.py."""
+    rng = random.Random(seed)
+    owner_count, pet_count = split(size)
+    owners = []
+    for owner_id in range(owner_count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        phone = f"+7-9{rng.randrange(100):02d}-{rng.randrange(1000):03d}-{rng.randrange(100):02d}-{rng.randrange(100):02d}"
+        street = f"{rng.choice(STREETS)}, {rng.randrange(1, 120)}"
+        owners.append((owner_id, name, phone, street, rng.choice(CITIES), f"{rng.randrange(100000, 700000)}"))
+    pets = []
+    for i in range(pet_count):
+        breed, species = rng.choice(BREEDS)
+        house_type, house_size = rng.choice(HOUSES)
+        pets.append((pet_name(i), rng.randrange(20), breed, species, house_type, house_size, rng.randrange(owner_count)))
+    return owners, pets
+
+
+def fill_registry(registry: PetRegistry, owners: List[OwnerFields], pets: List[PetFields]) -> PetRegistry:
+    """Заполняет реестр записями generate_records через bulk-методы."""
+    interner = registry.interner
+    registry.add_owners_bulk(Owner(owner_id, name, phone, interner.address(street, city, postal_code))
+                             for owner_id, name, phone, street, city, postal_code in owners)
+    owner_map = registry.owner_map()
+    registry.add_pets_bulk([Pet(name, age, interner.breed(breed, species), interner.house(house_type, house_size), owner_map[owner_id])
+                            for name, age, breed, species, house_type, house_size, owner_id in pets])
+    return registry
+
+
+def generate_registry(size: int, seed: int = 42, registry: Optional[PetRegistry] = None) -> PetRegistry:
+    """Реестр из size записей (пустой registry или новый PetRegistry)."""
+    owners, pets = generate_records(size, seed)
+    return fill_registry(registry if registry is not None else PetRegistry(), owners, pets)
+
+
+def generate_events(store: EventStore, count: int, year: int = 2024, vets: int = 50, seed: int = 42) -> EventStore:
+    """Добавляет vets ветеринаров и count записей всех видов за год year к питомцам реестра хранилища.
+
+    Записи добавляются не по порядку дат. Доли: визиты и записи на
+    услуги — по трети, события и рецепты — по шестой части.
+    """
+    rng = random.Random(seed)
+    for vet_id in range(vets):
+        store.add_veterinarian(Veterinarian(vet_id, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"+7-900-{vet_id:04d}"))
+    veterinarians = store.veterinarians
+    pets = store.registry.pets
+    start = date(year, 1, 1)
+    dates = [f"{(start + timedelta(days=day)).isoformat()} {hour:02d}:{minute:02d}"
+             for day in range(365) for hour in range(9, 21) for minute in (0, 30)]
+    services = [store.service(name, price) for name, price in SERVICES]
+    batch = []
+    for i in range(count):
+        pet = rng.choice(pets)
+        moment = rng.choice(dates)
+        kind = rng.randrange(6)
+        if kind < 2:
+            batch.append(VetVisit(pet, rng.choice(veterinarians), moment, rng.choice(VISIT_REASONS)))
+        elif kind < 3:
+            batch.append(PetEvent(pet, rng.choice(EVENT_TYPES), moment))
+        elif kind < 5:
+            batch.append(PetServiceBooking(pet, rng.choice(services), moment))
+        else:
+            medication, dosage = rng.choice(MEDICATIONS)
+            batch.append(Prescription(pet, medication, dosage, moment))
+        if len(batch) >= 10_000:
+            store.add_bulk(batch)
+            batch = []
+    store.add_bulk(batch)
+    return store
+
+
+def generate_visits(store: EventStore, count: int, vets: int = 1000, year: int = 2024, seed: int = 42) -> List[VetVisit]:
+    """Регистрирует vets ветеринаров и возвращает count визитов к ним за год year, еще не записанных.
+
+    Визиты начинаются в часы приема с шагом 15 минут и длятся 15-60
+    минут, поэтому часть из них пересекается.
+    """
+    rng = random.Random(seed)
+    store.add_veterinarians_bulk(Veterinarian(vet_id, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"+7-900-{vet_id:04d}")
+                                 for vet_id in range(vets))
+    veterinarians = [store.get_veterinarian(vet_id) for vet_id in range(vets)]
+    pets = store.registry.pets
+    start = date(year, 1, 1)
+    dates = [f"{(start + timedelta(days=day)).isoformat()} {hour:02d}:{minute:02d}"
+             for day in range(365) for hour in range(9, 21) for minute in (0, 15, 30, 45)]
+    return [VetVisit(rng.choice(pets), rng.choice(veterinarians), rng.choice(dates), rng.choice(VISIT_REASONS),
+                     rng.choice((15, 30, 45, 60)))
+            for _ in range(count)]
@@ -0,0 +1,121 @@
+"""Нагрузочный тест HTTP-сервиса реестра (server.py) на localhost.
+
+Запуск из корня репозитория:
+    python benchmarks/load_test.py [--size 100000] [--clients 64] [--duration 10]
+    python benchmarks/load_test.py --port 8080      # уже запущенный сервер
+
+Без --port скрипт строит реестр, сохраняет его во временный JSON и
+запускает server.py отдельным процессом. Клиенты держат keep-alive
+соединения и отправляют смесь запросов: чтение питомца и владельца,
+страницу списка, поиск по виду и изменение возраста. Печатаются
+запросы в секунду и задержки p50/p99.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from storage import save_to_json
+from generator import generate_registry, pet_name, split
+
+
+def make_request(rng: random.Random, pets: int, owners: int) -> bytes:
+    kind = rng.random()
+    body = b""
+    if kind < 0.5:
+        method, path = "GET", "/pets/" + quote(pet_name(rng.randrange(pets)))
+    elif kind < 0.7:
+        method, path = "GET", f"/owners/{rng.randrange(owners)}"
+    elif kind < 0.8:
+        method, path = "GET", f"/pets?offset={rng.randrange(pets)}&limit=20"
+    elif kind < 0.9:
+        method, path = "GET", f"/pets?species=%D0%A1%D0%BE%D0%B1%D0%B0%D0%BA%D0%B0&age_from={rng.randrange(20)}&age_to=19&limit=20"
+    else:
+        method, path = "PATCH", "/pets/" + quote(pet_name(rng.randrange(pets)))
+        body = json.dumps({"age": rng.randrange(20)}).encode("utf-8")
+    return f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+
+
+async def client(port: int, deadline: float, seed: int, pets: int, owners: int, latencies: list, errors: list) -> None:
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        writer.write(make_request(rng, pets, owners))
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line == b"\r\n":
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+        if status >= 500:
+            errors.append(status)
+    writer.close()
+
+
+def percentile(values: list, fraction: float) -> float:
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+async def run(port: int, clients: int, duration: float, pets: int, owners: int) -> None:
+    latencies: list = []
+    errors: list = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, start + duration, seed, pets, owners, latencies, errors) for seed in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"клиентов: {clients}, запросов: {len(latencies)}, ошибок 5xx: {len(errors)}")
+    print(f"{len(latencies) / elapsed:,.0f} запросов/с")
+    print(f"задержка p50 {percentile(latencies, 0.50) * 1000:.2f} мс, p99 {percentile(latencies, 0.99) * 1000:.2f} мс")
+
+
+def wait_for_server(process: subprocess.Popen) -> int:
+    """Ждет строку о запуске сервера и возвращает его порт."""
+    line = process.stdout.readline()
+    if not line:
+        raise RuntimeError("Сервер не запустился.")
+    return int(line.rsplit(":", 1)[1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000, help="число записей (владельцы + питомцы)")
+    parser.add_argument("--clients", type=int, default=64, help="число одновременных соединений")
+    parser.add_argument("--duration", type=float, default=10.0, help="длительность теста, с")
+    parser.add_argument("--port", type=int, help="порт уже запущенного сервера с данными generate_registry(size)")
+    args = parser.parse_args()
+
+    owners, pets = split(args.size)
+    if args.port is not None:
+        asyncio.run(run(args.port, args.clients, args.duration, pets, owners))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "registry.json")
+        save_to_json(generate_registry(args.size), filename, indent=None)
+        process = subprocess.Popen([sys.executable, os.path.join(ROOT, "server.py"), "--port", "0", "--load", filename],
+                                   stdout=subprocess.PIPE, text=True)
+        try:
+            port = wait_for_server(process)
+            asyncio.run(run(port, args.clients, args.duration, pets, owners))
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
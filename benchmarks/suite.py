@@ -0,0 +1,326 @@
+"""Набор бенчмарков PetRegistry и функций сохранения с записью результатов в JSON.
+
+Запуск из корня репозитория:
+    python benchmarks/suite.py run [--scales 1k,10k,100k] [--output results.json] [--only get_]
+    python benchmarks/suite.py compare baseline.json results.json [--threshold 0.1]
+
+run строит реестры генератором (generator.py) для каждого масштаба и
+замеряет каждую операцию PetRegistry и сохранение/загрузку во всех
+форматах: время (лучшее из --repeat запусков), пропускную способность
+и пиковую память (tracemalloc, отдельным запуском). compare сравнивает
+два файла результатов и завершается с кодом 1, если какая-то операция
+стала медленнее или требует больше памяти, чем допускает --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Owner, Pet, Address, Breed, PetHouse
+from registry import PetRegistry
+from storage import (save_to_json, load_from_json, load_from_json_stream, save_to_xml, load_from_xml,
+                     load_from_xml_stream, save_to_snapshot, load_from_snapshot, save_to_sqlite, load_from_sqlite)
+from generator import BREEDS, CITIES, HOUSES, SCALES, generate_records, fill_registry, scale_size
+
+RESULTS_VERSION = 1
+# Изменение памяти меньше этого порога считается шумом
+MEMORY_NOISE = 256 * 1024
+
+QUERIES = [
+    dict(species="Кошка", city="Москва", age_between=(2, 5)),
+    dict(breed="Корги"),
+    dict(species="Хомяк", city="Пермь"),
+    dict(age_between=(18, 19)),
+]
+
+
+class Context:
+    """Данные одного масштаба: записи, общий реестр и временный каталог."""
+
+    def __init__(self, size: int, seed: int, directory: str) -> None:
+        self.size = size
+        self.directory = directory
+        self.owner_fields, self.pet_fields = generate_records(size, seed)
+        self.registry = fill_registry(PetRegistry(), self.owner_fields, self.pet_fields)
+        self.rng = random.Random(seed)
+        # Удаляемые записи не повторяются между запусками
+        self._deletable_owners = [fields[0] for fields in self.owner_fields]
+        self._deletable_pets = [fields[0] for fields in self.pet_fields]
+        self.rng.shuffle(self._deletable_owners)
+        self.rng.shuffle(self._deletable_pets)
+
+    @property
+    def lookups(self) -> int:
+        return min(100_000, max(self.size, 1000))
+
+    @property
+    def changes(self) -> int:
+        return max(1, min(10_000, len(self.pet_fields) // 20, len(self.owner_fields) // 20))
+
+    def owner_ids(self, count: int) -> List[int]:
+        return [self.rng.randrange(len(self.owner_fields)) for _ in range(count)]
+
+    def pet_names(self, count: int) -> List[str]:
+        return [self.pet_fields[self.rng.randrange(len(self.pet_fields))][0] for _ in range(count)]
+
+    def take_owners(self, count: int) -> List[int]:
+        taken, self._deletable_owners = self._deletable_owners[:count], self._deletable_owners[count:]
+        return taken
+
+    def take_pets(self, count: int) -> List[str]:
+        taken, self._deletable_pets = self._deletable_pets[:count], self._deletable_pets[count:]
+        return taken
+
+    def new_owners(self) -> List[Owner]:
+        return [Owner(owner_id, name, phone, Address(street, city, postal_code))
+                for owner_id, name, phone, street, city, postal_code in self.owner_fields]
+
+    def new_pets(self, registry: PetRegistry) -> List[Pet]:
+        owners = registry.owner_map()
+        return [Pet(name, age, Breed(breed, species), PetHouse(house_type, house_size), owners[owner_id])
+                for name, age, breed, species, house_type, house_size, owner_id in self.pet_fields]
+
+    def filename(self, ext: str) -> str:
+        return os.path.join(self.directory, f"registry.{ext}")
+
+
+class Case(NamedTuple):
+    """Бенчмарк: setup(ctx) готовит состояние вне замера, run(state) возвращает число операций."""
+    name: str
+    group: str
+    setup: Callable[[Context], object]
+    run: Callable[[object], int]
+    repeatable: bool = True
+
+
+def _calls(function, keys) -> int:
+    for key in keys:
+        function(key)
+    return len(keys)
+
+
+def _registry_cases() -> List[Case]:
+    def with_owners(ctx: Context) -> PetRegistry:
+        registry = PetRegistry()
+        registry.add_owners_bulk(ctx.new_owners())
+        return registry
+
+    def add_pets_setup(ctx: Context):
+        registry = with_owners(ctx)
+        return registry, ctx.new_pets(registry)
+
+    def update_owner(state) -> int:
+        registry, ids = state
+        for i, owner_id in enumerate(ids):
+            registry.update_owner(owner_id, new_phone="+7-900-000-00-00", new_address=Address("Лесная, 1", CITIES[i % len(CITIES)], "100000"))
+        return len(ids)
+
+    def update_pet(state) -> int:
+        registry, names = state
+        for i, name in enumerate(names):
+            registry.update_pet(name, new_breed=Breed(*BREEDS[i % len(BREEDS)]), new_house=PetHouse(*HOUSES[i % len(HOUSES)]))
+        return len(names)
+
+    def update_pet_age(state) -> int:
+        registry, names = state
+        for i, name in enumerate(names):
+            registry.update_pet_age(name, i % 20)
+        return len(names)
+
+    def find_pets(registry: PetRegistry) -> int:
+        for query in QUERIES:
+            registry.find_pets(**query)
+        return len(QUERIES)
+
+    return [
+        Case("add_owner", "registry", lambda ctx: (PetRegistry(), ctx.new_owners()),
+             lambda state: _calls(state[0].add_owner, state[1])),
+        Case("add_pet", "registry", add_pets_setup, lambda state: _calls(state[0].add_pet, state[1])),
+        Case("add_owners_bulk", "registry", lambda ctx: (PetRegistry(), ctx.new_owners()),
+             lambda state: state[0].add_owners_bulk(state[1])),
+        Case("add_pets_bulk", "registry", add_pets_setup, lambda state: state[0].add_pets_bulk(state[1])),
+        Case("get_owner", "registry", lambda ctx: (ctx.registry, ctx.owner_ids(ctx.lookups)),
+             lambda state: _calls(state[0].get_owner, state[1])),
+        Case("get_pet", "registry", lambda ctx: (ctx.registry, ctx.pet_names(ctx.lookups)),
+             lambda state: _calls(state[0].get_pet, state[1])),
+        Case("pets_of", "registry", lambda ctx: (ctx.registry, ctx.owner_ids(ctx.lookups)),
+             lambda state: _calls(state[0].pets_of, state[1])),
+        Case("find_pets", "registry", lambda ctx: ctx.registry, find_pets),
+        Case("owners", "registry", lambda ctx: ctx.registry, lambda registry: len(registry.owners) and 1),
+        Case("pets", "registry", lambda ctx: ctx.registry, lambda registry: len(registry.pets) and 1),
+        Case("update_owner", "registry", lambda ctx: (ctx.registry, ctx.owner_ids(ctx.changes)), update_owner),
+        Case("update_pet", "registry", lambda ctx: (ctx.registry, ctx.pet_names(ctx.changes)), update_pet),
+        Case("update_pet_age", "registry", lambda ctx: (ctx.registry, ctx.pet_names(ctx.changes)), update_pet_age),
+    ]
+
+
+def _deletion_cases() -> List[Case]:
+    # Выполняются последними: удаления меняют общий реестр
+    return [
+        Case("delete_pet", "registry", lambda ctx: (ctx.registry, ctx.take_pets(ctx.changes)),
+             lambda state: _calls(state[0].delete_pet, state[1]), repeatable=False),
+        Case("delete_owner", "registry", lambda ctx: (ctx.registry, ctx.take_owners(ctx.changes)),
+             lambda state: _calls(state[0].delete_owner, state[1]), repeatable=False),
+    ]
+
+
+STORAGES = [
+    ("json", "json", save_to_json, load_from_json),
+    ("json_stream", "json", None, load_from_json_stream),
+    ("xml", "xml", save_to_xml, load_from_xml),
+    ("xml_stream", "xml", None, load_from_xml_stream),
+    ("snapshot", "snap", save_to_snapshot, load_from_snapshot),
+    ("sqlite", "db", save_to_sqlite, load_from_sqlite),
+]
+
+
+SAVERS = {ext: save for _, ext, save, _ in STORAGES if save is not None}
+
+
+def _storage_cases() -> List[Case]:
+    cases = []
+    for title, ext, save, load in STORAGES:
+        if save is not None:
+            cases.append(Case(f"save_{title}", "storage", lambda ctx, ext=ext: (ctx.registry, ctx.filename(ext)),
+                              lambda state, save=save: save(*state) or state[0].owner_count + state[0].pet_count))
+
+        def load_setup(ctx: Context, ext=ext):
+            filename = ctx.filename(ext)
+            if not os.path.exists(filename):
+                # Потоковые загрузчики читают файл обычного сохранения того же формата
+                SAVERS[ext](ctx.registry, filename)
+            return PetRegistry(), filename
+
+        cases.append(Case(f"load_{title}", "storage", load_setup,
+                          lambda state, load=load: load(*state) or state[0].owner_count + state[0].pet_count))
+    return cases
+
+
+def all_cases() -> List[Case]:
+    return _registry_cases() + _storage_cases() + _deletion_cases()
+
+
+def measure(case: Case, ctx: Context, repeat: int, memory: bool) -> dict:
+    best = None
+    ops = 0
+    for _ in range(repeat if case.repeatable else 1):
+        state = case.setup(ctx)
+        start = time.perf_counter()
+        ops = case.run(state)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        del state
+    result = {"name": case.name, "group": case.group, "ops": ops, "seconds": best,
+              "ops_per_sec": ops / best if best else None, "ns_per_op": best / ops * 1e9 if ops else None,
+              "peak_bytes": None}
+    if memory:
+        state = case.setup(ctx)
+        tracemalloc.start()
+        case.run(state)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_bytes"] = peak
+    return result
+
+
+def run(args) -> None:
+    only = args.only
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in scales:
+            size = scale_size(scale)
+            start = time.perf_counter()
+            ctx = Context(size, args.seed, directory)
+            print(f"== {scale}: {size} записей (генерация {time.perf_counter() - start:.1f} с)", flush=True)
+            for case in all_cases():
+                if only and only not in case.name:
+                    continue
+                result = measure(case, ctx, args.repeat, not args.no_memory)
+                result.update(scale=scale, records=size)
+                results.append(result)
+                peak = "" if result["peak_bytes"] is None else f", пик {result['peak_bytes'] / 2 ** 20:.1f} МБ"
+                print(f"  {case.name:<18} {result['seconds'] * 1e3:>10.2f} мс, {result['ops_per_sec']:>14,.0f} оп/с{peak}", flush=True)
+            for ext in {ext for _, ext, _, _ in STORAGES}:
+                if os.path.exists(ctx.filename(ext)):
+                    os.remove(ctx.filename(ext))
+            del ctx
+
+    data = {
+        "version": RESULTS_VERSION,
+        "meta": {"created": datetime.now(timezone.utc).isoformat(timespec="seconds"), "seed": args.seed,
+                 "repeat": args.repeat, "python": platform.python_version(), "platform": platform.platform()},
+        "results": results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"Результаты записаны в {args.output}")
+
+
+def compare(args) -> int:
+    """Печатает сравнение и возвращает число регрессий."""
+    def load(filename: str) -> Dict[tuple, dict]:
+        with open(filename, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != RESULTS_VERSION:
+            raise SystemExit(f"Файл '{filename}' не является результатом suite.py версии {RESULTS_VERSION}.")
+        return {(row["scale"], row["name"]): row for row in data["results"]}
+
+    baseline = load(args.baseline)
+    current = load(args.current)
+    regressions = 0
+    print(f"{'масштаб':<7} {'операция':<18} {'было, нс/оп':>14} {'стало, нс/оп':>14} {'время':>8} {'память':>8}")
+    for key, row in current.items():
+        base = baseline.get(key)
+        if base is None or not row["ops"] or not base["ops"]:
+            continue
+        time_change = row["ns_per_op"] / base["ns_per_op"] - 1
+        flags = []
+        if time_change > args.threshold:
+            flags.append("медленнее")
+        memory_change: Optional[float] = None
+        if row["peak_bytes"] is not None and base["peak_bytes"]:
+            memory_change = row["peak_bytes"] / base["peak_bytes"] - 1
+            if memory_change > args.threshold and row["peak_bytes"] - base["peak_bytes"] > MEMORY_NOISE:
+                flags.append("больше памяти")
+        regressions += bool(flags)
+        memory = "" if memory_change is None else f"{memory_change:+.0%}"
+        print(f"{key[0]:<7} {key[1]:<18} {base['ns_per_op']:>14,.0f} {row['ns_per_op']:>14,.0f} "
+              f"{time_change:>+8.0%} {memory:>8}  {'РЕГРЕССИЯ: ' + ', '.join(flags) if flags else ''}")
+    print(f"Регрессий: {regressions} (порог {args.threshold:.0%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="выполнить бенчмарки")
+    run_parser.add_argument("--scales", default="1k,10k,100k", help=f"масштабы через запятую: {', '.join(SCALES)} или число записей")
+    run_parser.add_argument("--output", default="bench-results.json", help="файл результатов")
+    run_parser.add_argument("--repeat", type=int, default=3, help="число запусков для замера времени")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--only", help="выполнять только операции, в имени которых есть эта строка")
+    run_parser.add_argument("--no-memory", action="store_true", help="не замерять пиковую память")
+    compare_parser = commands.add_parser("compare", help="сравнить результаты с базовыми")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="допустимое ухудшение (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(1 if compare(args) else 0)
+
+
+if __name__ == "__main__":
+    main()
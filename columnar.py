@@ -0,0 +1,259 @@
+from array import array
+from collections import Counter
+from itertools import compress
+from typing import Any, Dict, List, Mapping, Optional
+from models import Pet, Owner, Breed, PetHouse
+from registry import PetRegistry
+from interning import ModelInterner, DictionaryEncoder
+from exceptions import InvalidDataError, PetNotFoundError
+
+try:
+    import numpy as np
+except ImportError:  # numpy необязателен: без него агрегаты считаются через array/Counter
+    np = None
+
+# Столбцы, закодированные словарем, и столбцы с числами как есть
+_CODED_FIELDS = ("species", "breed", "house_type", "house_size")
+_NUMERIC_FIELDS = ("age", "owner_id")
+
+
+class PetColumns:
+    """Колоночное хранилище питомцев на типизированных массивах.
+
+    Возраст и ID владельца хранятся в array как числа, вид, порода, тип и
+    размер дома — как коды словарей. Освобожденные строки помечаются в
+    alive и переиспользуются при следующих добавлениях; номер поколения
+    строки растет при каждом освобождении, поэтому представления PetRow
+    удаленного питомца не читают и не меняют данные нового.
+    """
+
+    def __init__(self, owners: Mapping[int, Owner], interner: ModelInterner) -> None:
+        self._owners = owners
+        self._interner = interner
+        self.names: List[Optional[str]] = []
+        self.ages = array('i')
+        self.owner_ids = array('q')
+        self.codes: Dict[str, array] = {field: array('i') for field in _CODED_FIELDS}
+        self.dictionaries: Dict[str, DictionaryEncoder] = {field: DictionaryEncoder() for field in _CODED_FIELDS}
+        self.alive = bytearray()
+        self.generations = array('q')
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.names) - len(self._free)
+
+    def append(self, pet: Pet) -> 'PetRow':
+        """Копирует питомца в столбцы и возвращает представление его строки."""
+        if self._free:
+            row = self._free.pop()
+            self.names[row] = pet.name
+            self.ages[row] = pet.age
+            self.owner_ids[row] = pet.owner.owner_id
+            self.alive[row] = 1
+        else:
+            row = len(self.names)
+            self.names.append(pet.name)
+            self.ages.append(pet.age)
+            self.owner_ids.append(pet.owner.owner_id)
+            for column in self.codes.values():
+                column.append(0)
+            self.alive.append(1)
+            self.generations.append(0)
+        self.set_breed(row, pet.breed)
+        self.set_house(row, pet.house)
+        return PetRow(self, row, self.generations[row])
+
+    def release(self, row: int) -> None:
+        """Освобождает строку удаленного питомца."""
+        self.names[row] = None
+        self.alive[row] = 0
+        self.generations[row] += 1
+        self._free.append(row)
+
+    def set_breed(self, row: int, breed: Breed) -> None:
+        self.codes["breed"][row] = self.dictionaries["breed"].encode(breed.name)
+        self.codes["species"][row] = self.dictionaries["species"].encode(breed.species)
+
+    def set_house(self, row: int, house: PetHouse) -> None:
+        self.codes["house_type"][row] = self.dictionaries["house_type"].encode(house.house_type)
+        self.codes["house_size"][row] = self.dictionaries["house_size"].encode(house.house_size)
+
+    def breed(self, row: int) -> Breed:
+        return self._interner.breed(self._decode("breed", row), self._decode("species", row))
+
+    def house(self, row: int) -> PetHouse:
+        return self._interner.house(self._decode("house_type", row), self._decode("house_size", row))
+
+    def owner(self, row: int) -> Owner:
+        return self._owners[self.owner_ids[row]]
+
+    def _decode(self, field: str, row: int) -> str:
+        return self.dictionaries[field].values[self.codes[field][row]]
+
+    # --- Векторные агрегаты (учитываются только живые строки) ---
+
+    def count_by(self, field: str) -> Dict[Any, int]:
+        """Число питомцев для каждого значения поля."""
+        if field in _CODED_FIELDS:
+            values = self.dictionaries[field].values
+            if np is not None:
+                codes = self._np_column(field)
+                counts = np.bincount(codes, minlength=len(values))
+                return {values[code]: int(count) for code, count in enumerate(counts) if count}
+            return {values[code]: count for code, count in Counter(compress(self.codes[field], self.alive)).items()}
+        column = self._numeric_column(field)
+        if np is not None:
+            keys, counts = np.unique(self._np_column(field), return_counts=True)
+            return dict(zip(keys.tolist(), counts.tolist()))
+        return dict(Counter(compress(column, self.alive)))
+
+    def mean_age_by(self, field: str) -> Dict[Any, float]:
+        """Средний возраст питомцев для каждого значения поля."""
+        if np is not None:
+            ages = self._np_column("age").astype(np.float64)
+            if field in _CODED_FIELDS:
+                values = self.dictionaries[field].values
+                codes = self._np_column(field)
+                counts = np.bincount(codes, minlength=len(values))
+                sums = np.bincount(codes, weights=ages, minlength=len(values))
+                return {values[code]: float(sums[code] / counts[code]) for code in np.nonzero(counts)[0]}
+            keys, inverse, counts = np.unique(self._np_column(field), return_inverse=True, return_counts=True)
+            sums = np.bincount(inverse, weights=ages)
+            return dict(zip(keys.tolist(), (sums / counts).tolist()))
+        sums: Dict[Any, int] = {}
+        counts: Dict[Any, int] = {}
+        keys = self.codes[field] if field in _CODED_FIELDS else self._numeric_column(field)
+        for key, age in compress(zip(keys, self.ages), self.alive):
+            sums[key] = sums.get(key, 0) + age
+            counts[key] = counts.get(key, 0) + 1
+        if field in _CODED_FIELDS:
+            values = self.dictionaries[field].values
+            return {values[key]: sums[key] / counts[key] for key in sums}
+        return {key: sums[key] / counts[key] for key in sums}
+
+    def age_histogram(self, bin_width: int = 1) -> Dict[int, int]:
+        """Гистограмма возраста: начало интервала -> число питомцев."""
+        if bin_width < 1:
+            raise InvalidDataError("Ширина интервала гистограммы должна быть положительной.")
+        if np is not None:
+            bins = self._np_column("age") // bin_width * bin_width
+            keys, counts = np.unique(bins, return_counts=True)
+            return dict(zip(keys.tolist(), counts.tolist()))
+        return dict(sorted(Counter(age // bin_width * bin_width for age in compress(self.ages, self.alive)).items()))
+
+    def _numeric_column(self, field: str) -> array:
+        if field not in _NUMERIC_FIELDS:
+            raise InvalidDataError(f"Неизвестное поле для агрегации: {field}.")
+        return self.ages if field == "age" else self.owner_ids
+
+    def _np_column(self, field: str):
+        column = self.codes[field] if field in _CODED_FIELDS else self._numeric_column(field)
+        if not column:
+            return np.zeros(0, dtype=np.int64)
+        # frombuffer не копирует данные array; копия появляется только при отборе живых строк
+        values = np.frombuffer(column, dtype=np.int32 if column.typecode == 'i' else np.int64)
+        return values[np.frombuffer(self.alive, dtype=np.bool_)]
+
+
+class PetRow:
+    """Легкое представление строки PetColumns с интерфейсом Pet.
+
+    Чтение и запись атрибутов идут прямо в столбцы хранилища. После
+    удаления питомца представление недействительно: обращение к нему
+    вызывает PetNotFoundError, даже если строку уже занял другой питомец.
+    """
+
+    __slots__ = ("_columns", "_row", "_generation")
+
+    def __init__(self, columns: PetColumns, row: int, generation: int = 0) -> None:
+        self._columns = columns
+        self._row = row
+        self._generation = generation
+
+    def _live(self) -> int:
+        """Номер строки, если она еще принадлежит этому питомцу."""
+        if self._columns.generations[self._row] != self._generation:
+            raise PetNotFoundError("Питомец удален из реестра.")
+        return self._row
+
+    @property
+    def name(self) -> str:
+        return self._columns.names[self._live()]
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self._columns.names[self._live()] = value
+
+    @property
+    def age(self) -> int:
+        return self._columns.ages[self._live()]
+
+    @age.setter
+    def age(self, value: int) -> None:
+        self._columns.ages[self._live()] = value
+
+    @property
+    def breed(self) -> Breed:
+        return self._columns.breed(self._live())
+
+    @breed.setter
+    def breed(self, value: Breed) -> None:
+        self._columns.set_breed(self._live(), value)
+
+    @property
+    def house(self) -> PetHouse:
+        return self._columns.house(self._live())
+
+    @house.setter
+    def house(self, value: PetHouse) -> None:
+        self._columns.set_house(self._live(), value)
+
+    @property
+    def owner(self) -> Owner:
+        return self._columns.owner(self._live())
+
+    @owner.setter
+    def owner(self, value: Owner) -> None:
+        self._columns.owner_ids[self._live()] = value.owner_id
+
+
+class ColumnarPetRegistry(PetRegistry):
+    """PetRegistry, хранящий питомцев в колоночном виде (PetColumns).
+
+    add_pet/get_pet/update_pet и остальные методы работают как в PetRegistry,
+    но реестр хранит копию данных питомца: get_pet и pets возвращают
+    представления PetRow, а не исходные объекты Pet.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.columns = PetColumns(self._owners, self.interner)
+
+    def delete_owner(self, owner_id: int) -> None:
+        rows = [pet._row for pet in self._pets_by_owner.get(owner_id, {}).values()]
+        super().delete_owner(owner_id)
+        for row in rows:
+            self.columns.release(row)
+
+    def delete_pet(self, pet_name: str) -> None:
+        pet = self.get_pet(pet_name)
+        super().delete_pet(pet_name)
+        self.columns.release(pet._row)
+
+    def count_by(self, field: str) -> Dict[Any, int]:
+        """Число питомцев по значениям поля: species, breed, house_type, house_size, age, owner_id."""
+        return self.columns.count_by(field)
+
+    def mean_age_by(self, field: str) -> Dict[Any, float]:
+        """Средний возраст питомцев по значениям поля."""
+        return self.columns.mean_age_by(field)
+
+    def age_histogram(self, bin_width: int = 1) -> Dict[int, int]:
+        """Гистограмма возраста питомцев с интервалами ширины bin_width."""
+        return self.columns.age_histogram(bin_width)
+
+    def _index_pet(self, pet: Pet) -> None:
+        # Новые питомцы копируются в столбцы; при переиндексации приходит уже PetRow
+        if not isinstance(pet, PetRow):
+            pet = self.columns.append(pet)
+        super()._index_pet(pet)
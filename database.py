@@ -0,0 +1,220 @@
+import os
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+from models import Owner, Pet
+from interning import ModelInterner
+from exceptions import InvalidFileFormatError
+
+if TYPE_CHECKING:
+    from registry import PetRegistry
+
+# Схема базы SQLite. Породы и дома вынесены в отдельные таблицы, поэтому
+# повторяющиеся значения хранятся один раз. Порядок добавления записей —
+# порядок rowid. Версия схемы хранится в PRAGMA user_version.
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS breeds (
+    breed_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    species TEXT NOT NULL,
+    UNIQUE (name, species)
+);
+CREATE TABLE IF NOT EXISTS houses (
+    house_id INTEGER PRIMARY KEY,
+    house_type TEXT NOT NULL,
+    house_size TEXT NOT NULL,
+    UNIQUE (house_type, house_size)
+);
+CREATE TABLE IF NOT EXISTS owners (
+    owner_id INTEGER NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    street TEXT NOT NULL,
+    city TEXT NOT NULL,
+    postal_code TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pets (
+    name TEXT NOT NULL UNIQUE,
+    age INTEGER NOT NULL,
+    breed_id INTEGER NOT NULL REFERENCES breeds (breed_id),
+    house_id INTEGER NOT NULL REFERENCES houses (house_id),
+    owner_id INTEGER NOT NULL REFERENCES owners (owner_id)
+);
+CREATE INDEX IF NOT EXISTS owners_city ON owners (city);
+CREATE INDEX IF NOT EXISTS breeds_species ON breeds (species);
+CREATE INDEX IF NOT EXISTS pets_owner ON pets (owner_id);
+CREATE INDEX IF NOT EXISTS pets_breed ON pets (breed_id);
+"""
+
+_OWNER_COLUMNS = "owners.owner_id, owners.name, owners.phone, owners.street, owners.city, owners.postal_code"
+_PET_QUERY = """
+SELECT pets.name, pets.age, breeds.name, breeds.species, houses.house_type, houses.house_size, pets.owner_id
+FROM pets
+JOIN breeds ON breeds.breed_id = pets.breed_id
+JOIN houses ON houses.house_id = pets.house_id
+"""
+
+
+def connect(filename: str, create: bool = False) -> sqlite3.Connection:
+    """Открывает базу реестра в режиме WAL; create=True создает схему."""
+    if not create and not os.path.exists(filename):
+        raise FileNotFoundError(f"Файл '{filename}' не найден.")
+    connection = sqlite3.connect(filename)
+    try:
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("PRAGMA foreign_keys = ON")
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0 and create:
+            with connection:
+                connection.executescript(_SCHEMA)
+                connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        elif version != SCHEMA_VERSION:
+            raise InvalidFileFormatError(f"Файл '{filename}' не является базой реестра версии {SCHEMA_VERSION}.")
+    except sqlite3.DatabaseError as e:
+        connection.close()
+        raise InvalidFileFormatError(f"Файл '{filename}' не является базой SQLite: {e}")
+    except Exception:
+        connection.close()
+        raise
+    return connection
+
+
+def write_database(registry: 'PetRegistry', connection: sqlite3.Connection) -> None:
+    """Заменяет содержимое базы записями реестра в одной транзакции."""
+    owners = registry.owners
+    pets = registry.pets
+    with connection:
+        connection.execute("DELETE FROM pets")
+        connection.execute("DELETE FROM owners")
+        connection.execute("DELETE FROM breeds")
+        connection.execute("DELETE FROM houses")
+
+        # Породы и дома реестра общие (ModelInterner), поэтому ключ по значению дает мало различных строк
+        breeds: Dict[Tuple[str, str], int] = {}
+        houses: Dict[Tuple[str, str], int] = {}
+        for pet in pets:
+            breeds.setdefault((pet.breed.name, pet.breed.species), len(breeds) + 1)
+            houses.setdefault((pet.house.house_type, pet.house.house_size), len(houses) + 1)
+        connection.executemany("INSERT INTO breeds VALUES (?, ?, ?)", ((i, *key) for key, i in breeds.items()))
+        connection.executemany("INSERT INTO houses VALUES (?, ?, ?)", ((i, *key) for key, i in houses.items()))
+
+        connection.executemany(
+            "INSERT INTO owners VALUES (?, ?, ?, ?, ?, ?)",
+            ((o.owner_id, o.name, o.phone, o.address.street, o.address.city, o.address.postal_code) for o in owners),
+        )
+        connection.executemany(
+            "INSERT INTO pets VALUES (?, ?, ?, ?, ?)",
+            ((p.name, p.age, breeds[p.breed.name, p.breed.species], houses[p.house.house_type, p.house.house_size],
+              p.owner.owner_id) for p in pets),
+        )
+
+
+class PetDatabase:
+    """Запросы к базе реестра без загрузки всех записей в память.
+
+    Поиск владельца по ID, питомца по имени, питомцев владельца и
+    find_pets по виду и городу идут через индексы базы. Методы
+    возвращают новые объекты при каждом вызове; get_owner/get_pet
+    возвращают None, если записи нет.
+    """
+
+    def __init__(self, filename: str, interner: Optional[ModelInterner] = None) -> None:
+        self._interner = interner if interner is not None else ModelInterner()
+        self._connection = connect(filename)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> 'PetDatabase':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def owner_count(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM owners").fetchone()[0]
+
+    @property
+    def pet_count(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM pets").fetchone()[0]
+
+    def get_owner(self, owner_id: int) -> Optional[Owner]:
+        row = self._connection.execute(f"SELECT {_OWNER_COLUMNS} FROM owners WHERE owner_id = ?", (owner_id,)).fetchone()
+        return None if row is None else self._owner(row)
+
+    def get_pet(self, name: str) -> Optional[Pet]:
+        """Питомец вместе с владельцем."""
+        row = self._connection.execute(_PET_QUERY + "WHERE pets.name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        owner = self.get_owner(row[6])
+        if owner is None:
+            raise InvalidFileFormatError(f"База повреждена: владелец питомца {name} отсутствует.")
+        return self._pet(row, owner)
+
+    def pets_of(self, owner_id: int) -> List[Pet]:
+        """Питомцы владельца в порядке добавления (пустой список, если владельца нет)."""
+        owner = self.get_owner(owner_id)
+        if owner is None:
+            return []
+        rows = self._connection.execute(_PET_QUERY + "WHERE pets.owner_id = ? ORDER BY pets.rowid", (owner_id,))
+        return [self._pet(row, owner) for row in rows]
+
+    def find_pets(self, species: Optional[str] = None, breed: Optional[str] = None, city: Optional[str] = None,
+                  age_between: Optional[Tuple[int, int]] = None) -> List[Pet]:
+        """То же, что PetRegistry.find_pets, но запросом к базе. Результат отсортирован по имени."""
+        conditions, parameters = [], []
+        if species is not None:
+            conditions.append("breeds.species = ?")
+            parameters.append(species)
+        if breed is not None:
+            conditions.append("breeds.name = ?")
+            parameters.append(breed)
+        if city is not None:
+            conditions.append("owners.city = ?")
+            parameters.append(city)
+        if age_between is not None:
+            conditions.append("pets.age BETWEEN ? AND ?")
+            parameters.extend(age_between)
+        query = (
+            f"SELECT {_OWNER_COLUMNS}, pets.name, pets.age, breeds.name, breeds.species, houses.house_type, houses.house_size"
+            " FROM pets"
+            " JOIN breeds ON breeds.breed_id = pets.breed_id"
+            " JOIN houses ON houses.house_id = pets.house_id"
+            " JOIN owners ON owners.owner_id = pets.owner_id"
+        )
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        # BINARY-сравнение строк UTF-8 дает тот же порядок, что сортировка строк в Python
+        query += " ORDER BY pets.name"
+
+        owners: Dict[int, Owner] = {}
+        result = []
+        for row in self._connection.execute(query, parameters):
+            owner = owners.get(row[0])
+            if owner is None:
+                owner = owners[row[0]] = self._owner(row[:6])
+            result.append(self._pet(row[6:] + (row[0],), owner))
+        return result
+
+    def iter_owners(self) -> Iterator[Owner]:
+        for row in self._connection.execute(f"SELECT {_OWNER_COLUMNS} FROM owners ORDER BY rowid"):
+            yield self._owner(row)
+
+    def iter_pet_rows(self) -> Iterator[tuple]:
+        """Строки питомцев в порядке добавления: (name, age, breed, species, house_type, house_size, owner_id)."""
+        return self._connection.execute(_PET_QUERY + "ORDER BY pets.rowid")
+
+    def pet_from_row(self, row: tuple, owner: Owner) -> Pet:
+        return self._pet(row, owner)
+
+    def _owner(self, row: tuple) -> Owner:
+        owner_id, name, phone, street, city, postal_code = row
+        return Owner(owner_id, name, phone, self._interner.address(street, city, postal_code))
+
+    def _pet(self, row: tuple, owner: Owner) -> Pet:
+        name, age, breed, species, house_type, house_size, _ = row
+        return Pet(name, age, self._interner.breed(breed, species), self._interner.house(house_type, house_size), owner)
@@ -0,0 +1,398 @@
+import re
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
+from models import PetEvent, VetVisit, PetServiceBooking, Prescription, PetService, Veterinarian
+from registry import PetRegistry
+from exceptions import InvalidDataError, PetNotFoundError, VeterinarianNotFoundError
+
+EventRecord = Union[PetEvent, VetVisit, PetServiceBooking, Prescription]
+# Виды записей, которые хранит EventStore
+KINDS: Tuple[type, ...] = (PetEvent, VetVisit, PetServiceBooking, Prescription)
+
+# Подписчик хранилища вызывается как listener(operation, record, timestamp),
+# где operation — "add" или "remove", timestamp — отметка parse_date записи.
+# Удаление питомца в реестре сообщает "remove" для каждой его записи.
+EventListener = Callable[[str, EventRecord, int], None]
+
+MINUTES_PER_DAY = 24 * 60
+# Границы отметок времени: начало 0001-01-01 и конец 9999-12-31
+MIN_TIMESTAMP = date.min.toordinal() * MINUTES_PER_DAY
+MAX_TIMESTAMP = (date.max.toordinal() + 1) * MINUTES_PER_DAY
+
+# «2024-07-15», «2024-07-15 09:30», «2024-07-15T09:30:00»
+_ISO_DATE = re.compile(r'\s*(\d{4})-(\d{1,2})-(\d{1,2})(?:[T ](\d{1,2}):(\d{2})(?::\d{2}(?:\.\d+)?)?)?\s*$')
+# «15.07.2024», «15.07.2024 09:30»
+_DOTTED_DATE = re.compile(r'\s*(\d{1,2})\.(\d{1,2})\.(\d{4})(?:,?\s+(\d{1,2}):(\d{2})(?::\d{2})?)?\s*$')
+
+
+def parse_date(text: str) -> int:
+    """Отметка времени для строки даты: число минут от 0001-01-01 00:00.
+
+    Понимает ГГГГ-ММ-ДД и ДД.ММ.ГГГГ, по желанию со временем ЧЧ:ММ[:СС]
+    (через пробел или T). Секунды отбрасываются, дата без времени — полночь.
+    """
+    match = _ISO_DATE.match(text)
+    if match is not None:
+        year, month, day, hour, minute = match.groups()
+    else:
+        match = _DOTTED_DATE.match(text)
+        if match is None:
+            raise InvalidDataError(f"Неверный формат даты: '{text}'. Используйте ГГГГ-ММ-ДД или ДД.ММ.ГГГГ.")
+        day, month, year, hour, minute = match.groups()
+    try:
+        ordinal = date(int(year), int(month), int(day)).toordinal()
+    except ValueError:
+        raise InvalidDataError(f"Несуществующая дата: '{text}'.")
+    if hour is None:
+        return ordinal * MINUTES_PER_DAY
+    if int(hour) > 23 or int(minute) > 59:
+        raise InvalidDataError(f"Неверное время в дате: '{text}'.")
+    return ordinal * MINUTES_PER_DAY + int(hour) * 60 + int(minute)
+
+
+def format_timestamp(timestamp: int) -> str:
+    """Отметка parse_date в виде «ГГГГ-ММ-ДД ЧЧ:ММ»."""
+    day, minutes = divmod(timestamp, MINUTES_PER_DAY)
+    return f"{date.fromordinal(day).isoformat()} {minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def month_of(timestamp: int) -> int:
+    """Номер месяца отметки времени: год * 12 + (месяц - 1)."""
+    day = date.fromordinal(timestamp // MINUTES_PER_DAY)
+    return day.year * 12 + day.month - 1
+
+
+def month_start(month: int) -> int:
+    """Отметка времени начала месяца с номером month_of."""
+    if month // 12 > date.max.year:
+        return MAX_TIMESTAMP
+    return date(month // 12, month % 12 + 1, 1).toordinal() * MINUTES_PER_DAY
+
+
+class _Timeline:
+    """Записи с отметками времени, упорядоченные по времени.
+
+    Отметки хранятся в компактном array('q'). Добавление в конец — O(1);
+    запись не по порядку помечает линию неотсортированной, и она
+    сортируется один раз при ближайшем запросе.
+    """
+
+    __slots__ = ("times", "records", "_sorted")
+
+    def __init__(self) -> None:
+        self.times = array('q')
+        self.records: List[EventRecord] = []
+        self._sorted = True
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, timestamp: int, record: EventRecord) -> None:
+        if self.times and timestamp < self.times[-1]:
+            self._sorted = False
+        self.times.append(timestamp)
+        self.records.append(record)
+
+    def remove(self, timestamp: int, record: EventRecord) -> None:
+        self._sort()
+        index = bisect_left(self.times, timestamp)
+        while index < len(self.records) and self.records[index] is not record:
+            index += 1
+        if index == len(self.records):
+            raise ValueError("Запись не найдена.")
+        del self.times[index]
+        del self.records[index]
+
+    def between(self, start: int, end: int) -> List[EventRecord]:
+        """Записи с отметкой в [start, end) по порядку времени."""
+        self._sort()
+        return self.records[bisect_left(self.times, start):bisect_left(self.times, end)]
+
+    def ordered(self) -> List[EventRecord]:
+        self._sort()
+        return self.records
+
+    def _sort(self) -> None:
+        if not self._sorted:
+            # Сортировка устойчивая: записи с одинаковым временем сохраняют порядок добавления
+            order = sorted(range(len(self.times)), key=self.times.__getitem__)
+            self.times = array('q', [self.times[i] for i in order])
+            self.records = [self.records[i] for i in order]
+            self._sorted = True
+
+
+Bound = Union[str, int, None]
+
+
+class EventStore:
+    """Хранилище событий, визитов, записей на услуги и рецептов питомцев.
+
+    Даты записей разбираются один раз при добавлении (parse_date; строки
+    дат кэшируются, поэтому повторяющиеся даты не разбираются заново).
+    Записи каждого вида разбиты по месяцам и проиндексированы по питомцу,
+    визиты — еще и по ветеринару, поэтому запросы по диапазону дат читают
+    только нужные месяцы или записи одного питомца/ветеринара.
+
+    Диапазоны полуоткрытые: start включается, end — нет. Границы — строки
+    дат или отметки parse_date; None означает «без ограничения». Например,
+    визиты питомца за III квартал:
+        store.for_pet("Бобик", VetVisit, "2024-07-01", "2024-10-01")
+
+    Хранилище подписано на изменения реестра: удаление питомца (и его
+    владельца) удаляет его записи, переименование переносит их на новое
+    имя. Если реестр заменяет питомца новым объектом (ThreadSafePetRegistry),
+    записи переходят на новый объект. Питомец записи должен быть
+    зарегистрирован в реестре, а ветеринар визита — в хранилище
+    (add_veterinarian).
+    """
+
+    def __init__(self, registry: PetRegistry) -> None:
+        self.registry = registry
+        self._veterinarians: Dict[int, Veterinarian] = {}
+        # Общие экземпляры услуг: (название, цена) -> услуга
+        self._services: Dict[Tuple[str, float], PetService] = {}
+        # Кэш разобранных дат: строка -> отметка времени
+        self._timestamps: Dict[str, int] = {}
+        # Вид записи -> номер месяца -> записи месяца
+        self._by_month: Dict[type, Dict[int, _Timeline]] = {kind: {} for kind in KINDS}
+        # Вид записи -> имя питомца -> записи питомца
+        self._by_pet: Dict[type, Dict[str, _Timeline]] = {kind: {} for kind in KINDS}
+        # ID ветеринара -> его визиты
+        self._by_vet: Dict[int, _Timeline] = {}
+        self._counts: Dict[type, int] = {kind: 0 for kind in KINDS}
+        self._listeners: List[EventListener] = []
+        registry.subscribe(self._on_change)
+
+    def close(self) -> None:
+        """Отписывает хранилище от изменений реестра."""
+        self.registry.unsubscribe(self._on_change)
+
+    def subscribe(self, listener: EventListener) -> None:
+        """Подписывает listener на добавление и удаление записей (см. EventListener)."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: EventListener) -> None:
+        self._listeners.remove(listener)
+
+    def __len__(self) -> int:
+        return sum(self._counts.values())
+
+    def count(self, kind: Type[EventRecord]) -> int:
+        return self._counts[self._kind(kind)]
+
+    @property
+    def veterinarians(self) -> List[Veterinarian]:
+        return list(self._veterinarians.values())
+
+    def add_veterinarian(self, veterinarian: Veterinarian) -> None:
+        if veterinarian.vet_id in self._veterinarians:
+            raise InvalidDataError(f"Ветеринар с ID {veterinarian.vet_id} уже зарегистрирован.")
+        self._veterinarians[veterinarian.vet_id] = veterinarian
+
+    def add_veterinarians_bulk(self, veterinarians: Iterable[Veterinarian]) -> int:
+        """Добавляет ветеринаров, пропуская занятые ID. Возвращает число добавленных."""
+        added = 0
+        for veterinarian in veterinarians:
+            if veterinarian.vet_id not in self._veterinarians:
+                self._veterinarians[veterinarian.vet_id] = veterinarian
+                added += 1
+        return added
+
+    def get_veterinarian(self, vet_id: int) -> Veterinarian:
+        veterinarian = self._veterinarians.get(vet_id)
+        if veterinarian is None:
+            raise VeterinarianNotFoundError(f"Ветеринар с ID {vet_id} не найден.")
+        return veterinarian
+
+    def service(self, service_name: str, price: float) -> PetService:
+        """Общий экземпляр услуги с данными названием и ценой."""
+        key = (service_name, price)
+        service = self._services.get(key)
+        if service is None:
+            service = self._services[key] = PetService(service_name, price)
+        return service
+
+    def timestamp(self, text: str) -> int:
+        """parse_date с кэшем по строке даты."""
+        timestamp = self._timestamps.get(text)
+        if timestamp is None:
+            timestamp = self._timestamps[text] = parse_date(text)
+        return timestamp
+
+    def bounds(self, start: Bound = None, end: Bound = None) -> Tuple[int, int]:
+        """Границы [start, end) в виде отметок parse_date; None — MIN_TIMESTAMP или MAX_TIMESTAMP."""
+        low = MIN_TIMESTAMP if start is None else self.timestamp(start) if isinstance(start, str) else start
+        high = MAX_TIMESTAMP if end is None else self.timestamp(end) if isinstance(end, str) else end
+        return low, high
+
+    def add(self, record: EventRecord) -> None:
+        self.add_validated(record, self.validate(record))
+
+    def add_bulk(self, records: Iterable[EventRecord]) -> int:
+        """Добавляет записи пачкой. Если хотя бы одна запись неверна, пачка отклоняется целиком.
+
+        Возвращает число добавленных записей.
+        """
+        checked = [(record, self.validate(record)) for record in records]
+        for record, timestamp in checked:
+            self.add_validated(record, timestamp)
+        return len(checked)
+
+    def validate(self, record: EventRecord) -> int:
+        """Проверяет запись перед добавлением и возвращает ее отметку времени.
+
+        Вместе с add_validated позволяет проверить пачку заранее, а
+        добавлять записи по одной (так делает Scheduler.book_bulk).
+        """
+        self._kind(type(record))
+        pet = record.pet
+        if self.registry.get_pet(pet.name) is not pet:
+            raise PetNotFoundError(f"Питомец {pet.name} не зарегистрирован.")
+        if type(record) is VetVisit and self._veterinarians.get(record.veterinarian.vet_id) is not record.veterinarian:
+            raise VeterinarianNotFoundError(f"Ветеринар {record.veterinarian.name} не зарегистрирован.")
+        return self.timestamp(record.date)
+
+    def add_validated(self, record: EventRecord, timestamp: int) -> None:
+        """Добавляет запись, уже проверенную validate; timestamp — результат validate."""
+        kind = type(record)
+        _add_to_timeline(self._by_month[kind], month_of(timestamp), timestamp, record)
+        _add_to_timeline(self._by_pet[kind], record.pet.name, timestamp, record)
+        if kind is VetVisit:
+            _add_to_timeline(self._by_vet, record.veterinarian.vet_id, timestamp, record)
+        self._counts[kind] += 1
+        if self._listeners:
+            self._notify("add", record, timestamp)
+
+    def remove(self, record: EventRecord) -> None:
+        kind = self._kind(type(record))
+        timeline = self._by_pet[kind].get(record.pet.name)
+        timestamp = self.timestamp(record.date)
+        try:
+            if timeline is None:
+                raise ValueError
+            timeline.remove(timestamp, record)
+        except ValueError:
+            raise InvalidDataError("Запись не найдена в хранилище событий.")
+        if not timeline:
+            del self._by_pet[kind][record.pet.name]
+        self._unindex(kind, timestamp, record)
+
+    def between(self, kind: Type[EventRecord], start: Bound = None, end: Bound = None) -> List[EventRecord]:
+        """Записи вида kind с датой в [start, end) по порядку времени."""
+        partitions = self._by_month[self._kind(kind)]
+        if not partitions:
+            return []
+        low, high = self.bounds(start, end)
+        if low >= high or high <= MIN_TIMESTAMP or low >= MAX_TIMESTAMP:
+            return []
+        first, last = month_of(max(low, MIN_TIMESTAMP)), month_of(min(high, MAX_TIMESTAMP) - 1)
+        if last - first + 1 > len(partitions):
+            months = sorted(month for month in partitions if first <= month <= last)
+        else:
+            months = [month for month in range(first, last + 1) if month in partitions]
+        result: List[EventRecord] = []
+        for month in months:
+            timeline = partitions[month]
+            if low <= month_start(month) and month_start(month + 1) <= high:
+                result.extend(timeline.ordered())
+            else:
+                result.extend(timeline.between(low, high))
+        return result
+
+    def for_pet(self, pet_name: str, kind: Type[EventRecord], start: Bound = None, end: Bound = None) -> List[EventRecord]:
+        """Записи вида kind для питомца с датой в [start, end) по порядку времени."""
+        timeline = self._by_pet[self._kind(kind)].get(pet_name)
+        if timeline is None:
+            self.registry.get_pet(pet_name)
+            return []
+        return timeline.between(*self.bounds(start, end))
+
+    def for_veterinarian(self, vet_id: int, start: Bound = None, end: Bound = None) -> List[VetVisit]:
+        """Визиты к ветеринару с датой в [start, end) по порядку времени."""
+        timeline = self._by_vet.get(vet_id)
+        if timeline is None:
+            self.get_veterinarian(vet_id)
+            return []
+        return timeline.between(*self.bounds(start, end))
+
+    def last_days(self, kind: Type[EventRecord], days: int, now: Bound = None) -> List[EventRecord]:
+        """Записи вида kind за последние days суток до now включительно (по умолчанию — текущее время)."""
+        if now is None:
+            current = datetime.now()
+            now = current.toordinal() * MINUTES_PER_DAY + current.hour * 60 + current.minute
+        elif isinstance(now, str):
+            now = self.timestamp(now)
+        return self.between(kind, now - days * MINUTES_PER_DAY, now + 1)
+
+    def iter_records(self, kind: Type[EventRecord]) -> Iterator[EventRecord]:
+        """Записи вида kind по порядку времени."""
+        partitions = self._by_month[self._kind(kind)]
+        for month in sorted(partitions):
+            yield from partitions[month].ordered()
+
+    def _kind(self, kind: type) -> type:
+        if kind not in self._by_month:
+            raise InvalidDataError(f"Хранилище событий не содержит записи вида {getattr(kind, '__name__', kind)}.")
+        return kind
+
+    def _unindex(self, kind: type, timestamp: int, record: EventRecord) -> None:
+        """Убирает запись из индексов по месяцам и ветеринарам."""
+        _remove_from_timeline(self._by_month[kind], month_of(timestamp), timestamp, record)
+        if kind is VetVisit:
+            _remove_from_timeline(self._by_vet, record.veterinarian.vet_id, timestamp, record)
+        self._counts[kind] -= 1
+        if self._listeners:
+            self._notify("remove", record, timestamp)
+
+    def _notify(self, operation: str, record: EventRecord, timestamp: int) -> None:
+        for listener in self._listeners:
+            listener(operation, record, timestamp)
+
+    def _on_change(self, operation: str, record, old_name: Optional[str] = None) -> None:
+        if operation == "delete_pet":
+            for kind in KINDS:
+                timeline = self._by_pet[kind].pop(record.name, None)
+                if timeline is not None:
+                    for timestamp, item in zip(timeline.times, timeline.records):
+                        self._unindex(kind, timestamp, item)
+        elif operation == "update_pet":
+            for kind in KINDS:
+                timeline = self._by_pet[kind].pop(old_name, None)
+                if timeline is not None:
+                    self._by_pet[kind][record.name] = timeline
+                    _relink(timeline, record)
+        elif operation == "update_owner":
+            # ThreadSafePetRegistry заменяет питомцев владельца новыми объектами с тем же именем
+            for pet in self.registry.pets_of(record.owner_id):
+                for kind in KINDS:
+                    timeline = self._by_pet[kind].get(pet.name)
+                    if timeline is not None:
+                        _relink(timeline, pet)
+
+
+def _relink(timeline: _Timeline, pet) -> None:
+    """Направляет записи питомца на его текущий объект.
+
+    ThreadSafePetRegistry не меняет питомца на месте, а заменяет его
+    новым объектом, поэтому записи иначе ссылались бы на прежний.
+    """
+    for record in timeline.records:
+        if record.pet is not pet:
+            record.pet = pet
+
+
+def _add_to_timeline(index: dict, key, timestamp: int, record: EventRecord) -> None:
+    timeline = index.get(key)
+    if timeline is None:
+        index[key] = timeline = _Timeline()
+    timeline.add(timestamp, record)
+
+
+def _remove_from_timeline(index: dict, key, timestamp: int, record: EventRecord) -> None:
+    timeline = index[key]
+    timeline.remove(timestamp, record)
+    # Пустые линии удаляем, как пустые корзины индексов реестра
+    if not timeline:
+        del index[key]
@@ -30,3 +30,10 @@ class InvalidNumberError(PetError):
     """Неверный формат числа - нужно ввести цифры."""
     pass
 
+class VeterinarianNotFoundError(PetError):
+    """Ветеринар не найден."""
+    pass
+
+class ScheduleConflictError(PetError):
+    """Время визита пересекается с другим визитом ветеринара."""
+    pass
@@ -0,0 +1,67 @@
+from typing import Dict, Hashable, List, Optional, Tuple
+from models import Address, Breed, PetHouse
+
+
+class ModelInterner:
+    """Пул общих экземпляров Breed, PetHouse и Address (flyweight).
+
+    Одинаковые по значению породы, дома и адреса хранятся в одном экземпляре
+    на весь реестр. Экземпляры из пула общие, поэтому их нельзя изменять
+    на месте — вместо этого запись получает другой экземпляр из пула.
+    """
+
+    def __init__(self) -> None:
+        self._breeds: Dict[Tuple[str, str], Breed] = {}
+        self._houses: Dict[Tuple[str, str], PetHouse] = {}
+        self._addresses: Dict[Tuple[str, str, str], Address] = {}
+
+    def breed(self, name: str, species: str) -> Breed:
+        key = (name, species)
+        breed = self._breeds.get(key)
+        if breed is None:
+            breed = self._breeds[key] = Breed(name, species)
+        return breed
+
+    def house(self, house_type: str, house_size: str) -> PetHouse:
+        key = (house_type, house_size)
+        house = self._houses.get(key)
+        if house is None:
+            house = self._houses[key] = PetHouse(house_type, house_size)
+        return house
+
+    def address(self, street: str, city: str, postal_code: str) -> Address:
+        key = (street, city, postal_code)
+        address = self._addresses.get(key)
+        if address is None:
+            address = self._addresses[key] = Address(street, city, postal_code)
+        return address
+
+    def __len__(self) -> int:
+        return len(self._breeds) + len(self._houses) + len(self._addresses)
+
+
+class DictionaryEncoder:
+    """Словарное кодирование значений: значение <-> целочисленный код.
+
+    Коды выдаются подряд с нуля в порядке первого появления значения,
+    поэтому values[code] возвращает значение по коду. Используется
+    колоночными хранилищами (columnar.PetColumns, reports.BookingColumns).
+    """
+
+    def __init__(self) -> None:
+        self.values: List[Hashable] = []
+        self._codes: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: Hashable) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def find(self, value: Hashable) -> Optional[int]:
+        """Код значения или None, если значение еще не встречалось."""
+        return self._codes.get(value)
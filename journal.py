@@ -0,0 +1,262 @@
+import json
+import os
+from typing import List, Optional, Tuple, Union
+from models import Owner, Pet, Breed, PetHouse
+from registry import PetRegistry
+from snapshot import SnapshotReader, write_snapshot
+from storage import load_from_snapshot
+from exceptions import FileProcessingError, InvalidFileFormatError
+
+# Журнал изменений — текстовый файл, по одной записи JSON-массивом на строку.
+# Первая строка — заголовок ["journal", версия, поколение]. Остальные:
+#   ["ao", owner_id, name, phone, street, city, postal_code]   добавление владельца
+#   ["uo", owner_id, name, phone, street, city, postal_code]   новое состояние владельца
+#   ["do", owner_id]                                           удаление владельца
+#   ["ap", name, age, breed, species, house_type, house_size, owner_id]
+#   ["up", old_name, name, age, breed, species, house_type, house_size]
+#   ["dp", name]
+# Поколение связывает журнал со снимком: снимок поколения G содержит все
+# изменения журналов поколений меньше G.
+JOURNAL_VERSION = 1
+
+
+def _encode(operation: str, record: Union[Owner, Pet], old_name: Optional[str]) -> list:
+    if operation in ("add_owner", "update_owner"):
+        address = record.address
+        return ["ao" if operation == "add_owner" else "uo", record.owner_id, record.name, record.phone,
+                address.street, address.city, address.postal_code]
+    if operation == "delete_owner":
+        return ["do", record.owner_id]
+    if operation == "add_pet":
+        return ["ap", record.name, record.age, record.breed.name, record.breed.species,
+                record.house.house_type, record.house.house_size, record.owner.owner_id]
+    if operation == "update_pet":
+        return ["up", old_name, record.name, record.age, record.breed.name, record.breed.species,
+                record.house.house_type, record.house.house_size]
+    return ["dp", record.name]
+
+
+def apply_entry(registry: PetRegistry, entry: list) -> None:
+    """Применяет одну запись журнала к реестру."""
+    operation = entry[0]
+    interner = registry.interner
+    if operation == "ao":
+        _, owner_id, name, phone, street, city, postal_code = entry
+        registry.add_owner(Owner(owner_id, name, phone, interner.address(street, city, postal_code)))
+    elif operation == "uo":
+        _, owner_id, name, phone, street, city, postal_code = entry
+        registry.update_owner(owner_id, name, phone, interner.address(street, city, postal_code))
+    elif operation == "do":
+        registry.delete_owner(entry[1])
+    elif operation == "ap":
+        _, name, age, breed, species, house_type, house_size, owner_id = entry
+        registry.add_pet(Pet(name, age, interner.breed(breed, species), interner.house(house_type, house_size),
+                             registry.get_owner(owner_id)))
+    elif operation == "up":
+        _, old_name, name, age, breed, species, house_type, house_size = entry
+        registry.update_pet(old_name, name, age, Breed(breed, species), PetHouse(house_type, house_size))
+    elif operation == "dp":
+        registry.delete_pet(entry[1])
+    else:
+        raise InvalidFileFormatError(f"Неизвестная операция журнала: {operation!r}.")
+
+
+class Journal:
+    """Журнал упреждающей записи (write-ahead log) для PetRegistry.
+
+    Подписывается на реестр и дописывает каждое изменение в конец файла.
+    Записи копятся и пишутся одним вызовом write по group_size штук
+    (group commit); fsync выполняется после каждых fsync_every таких
+    записей (0 — только в sync() и close()).
+    """
+
+    def __init__(self, filename: str, group_size: int = 64, fsync_every: int = 1) -> None:
+        self.filename = filename
+        self.group_size = group_size
+        self.fsync_every = fsync_every
+        self.generation = 0
+        self._pending: List[str] = []
+        self._commits_since_sync = 0
+        self._file = None
+
+    def open(self, generation: int) -> None:
+        """Открывает журнал на дозапись.
+
+        Пустой журнал и журнал другого поколения (его изменения уже в
+        снимке или к этому снимку не относятся) начинаются заново.
+        """
+        if self._header_generation() != generation:
+            self.reset(generation)
+            return
+        self.generation = generation
+        self._file = open(self.filename, 'ab')
+
+    def reset(self, generation: int) -> None:
+        """Очищает журнал и начинает новое поколение."""
+        self._pending = []
+        if self._file is not None:
+            self._file.close()
+        self.generation = generation
+        self._file = open(self.filename, 'wb')
+        self._write_header()
+        self.sync()
+
+    def read(self) -> Tuple[Optional[int], List[list]]:
+        """Читает журнал: (поколение, список записей).
+
+        Недописанная последняя строка (обрыв при сбое) отбрасывается и
+        отрезается от файла; испорченная строка в середине — ошибка формата.
+        """
+        if not os.path.exists(self.filename) or os.path.getsize(self.filename) == 0:
+            return None, []
+        entries = []
+        generation = None
+        valid_size = 0
+        with open(self.filename, 'rb') as f:
+            lines = f.readlines()
+        for number, line in enumerate(lines):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("строка не завершена")
+                entry = json.loads(line)
+            except ValueError as e:
+                if number == len(lines) - 1:
+                    break
+                raise InvalidFileFormatError(f"Журнал '{self.filename}' поврежден в строке {number + 1}: {e}")
+            if number == 0:
+                if not (isinstance(entry, list) and entry[:2] == ["journal", JOURNAL_VERSION]):
+                    raise InvalidFileFormatError(f"Файл '{self.filename}' не является журналом реестра.")
+                generation = entry[2]
+            else:
+                entries.append(entry)
+            valid_size += len(line)
+        if valid_size < sum(len(line) for line in lines):
+            with open(self.filename, 'r+b') as f:
+                f.truncate(valid_size)
+        return generation, entries
+
+    def record(self, operation: str, record: Union[Owner, Pet], old_name: Optional[str] = None) -> None:
+        """Подписчик реестра: добавляет изменение в журнал."""
+        self._pending.append(json.dumps(_encode(operation, record, old_name), ensure_ascii=False, separators=(',', ':')) + "\n")
+        if len(self._pending) >= self.group_size:
+            self.commit()
+
+    def commit(self) -> None:
+        """Записывает накопленные изменения одним блоком."""
+        if not self._pending:
+            return
+        try:
+            self._file.write("".join(self._pending).encode('utf-8'))
+            self._file.flush()
+            self._pending = []
+            self._commits_since_sync += 1
+            if self.fsync_every and self._commits_since_sync >= self.fsync_every:
+                self.sync()
+        except OSError as e:
+            raise FileProcessingError(f"Ошибка при записи журнала: {e}")
+
+    def sync(self) -> None:
+        """Сбрасывает журнал на диск (fsync)."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._commits_since_sync = 0
+
+    def size(self) -> int:
+        return self._file.tell() + sum(len(line) for line in self._pending)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.commit()
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def _header_generation(self) -> Optional[int]:
+        """Поколение из заголовка журнала или None, если журнала нет или он пуст."""
+        if not os.path.exists(self.filename) or os.path.getsize(self.filename) == 0:
+            return None
+        with open(self.filename, 'rb') as f:
+            line = f.readline()
+        try:
+            header = json.loads(line)
+        except ValueError:
+            header = None
+        if not (isinstance(header, list) and header[:2] == ["journal", JOURNAL_VERSION] and len(header) > 2):
+            raise InvalidFileFormatError(f"Файл '{self.filename}' не является журналом реестра.")
+        return header[2]
+
+    def _write_header(self) -> None:
+        self._file.write((json.dumps(["journal", JOURNAL_VERSION, self.generation]) + "\n").encode('utf-8'))
+
+
+class JournaledRegistry:
+    """Реестр, сохраняемый снимком и журналом изменений.
+
+    open() загружает последний снимок и проигрывает журнал, после чего
+    все изменения реестра пишутся в журнал. Когда журнал вырастает больше
+    compact_threshold байт, он сворачивается в новый снимок (compact()).
+    """
+
+    def __init__(self, snapshot_file: str, journal_file: str, group_size: int = 64, fsync_every: int = 1,
+                 compact_threshold: int = 64 * 2 ** 20, registry: Optional[PetRegistry] = None) -> None:
+        self.snapshot_file = snapshot_file
+        self.registry = registry if registry is not None else PetRegistry()
+        self.journal = Journal(journal_file, group_size, fsync_every)
+        self.compact_threshold = compact_threshold
+
+    def open(self) -> PetRegistry:
+        try:
+            generation = 0
+            if os.path.exists(self.snapshot_file):
+                with SnapshotReader(self.snapshot_file) as reader:
+                    generation = reader.generation
+                load_from_snapshot(self.registry, self.snapshot_file)
+
+            journal_generation, entries = self.journal.read()
+            if journal_generation is not None and journal_generation > generation:
+                raise InvalidFileFormatError(f"Журнал поколения {journal_generation} новее снимка поколения {generation}.")
+            if journal_generation == generation:
+                for entry in entries:
+                    apply_entry(self.registry, entry)
+                self.journal.open(generation)
+            else:
+                # Журнал отсутствует или уже свернут в снимок
+                self.journal.reset(generation)
+        except FileProcessingError:
+            raise
+        except Exception as e:
+            raise FileProcessingError(f"Ошибка при восстановлении реестра из журнала: {e}")
+
+        self.registry.subscribe(self._record)
+        return self.registry
+
+    def compact(self) -> None:
+        """Сворачивает журнал в новый снимок и начинает следующее поколение."""
+        self.journal.commit()
+        generation = self.journal.generation + 1
+        temp_filename = self.snapshot_file + ".tmp"
+        try:
+            with open(temp_filename, 'wb') as f:
+                write_snapshot(self.registry, f, generation)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_filename, self.snapshot_file)
+        except Exception as e:
+            raise FileProcessingError(f"Ошибка при сохранении снимка: {e}")
+        # Сбой после замены снимка безопасен: старый журнал меньшего поколения будет отброшен
+        self.journal.reset(generation)
+
+    def close(self) -> None:
+        self.registry.unsubscribe(self._record)
+        self.journal.close()
+
+    def __enter__(self) -> PetRegistry:
+        return self.open()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _record(self, operation: str, record: Union[Owner, Pet], old_name: Optional[str] = None) -> None:
+        self.journal.record(operation, record, old_name)
+        if self.journal.size() > self.compact_threshold:
+            self.compact()
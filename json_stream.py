@@ -0,0 +1,155 @@
+import json
+import re
+from typing import Any, Collection, Iterator, TextIO, Tuple
+from exceptions import InvalidFileFormatError
+
+# Пробельные символы JSON
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Символы, из которых может состоять число JSON
+_NUMBER = re.compile(r'[-+0-9.eE]*')
+
+_decoder = json.JSONDecoder()
+
+
+class JSONStreamReader:
+    """Инкрементальный разбор JSON-документа вида {"ключ": [записи], ...}.
+
+    Файл читается кусками по chunk_size символов; в памяти держится только
+    непрочитанный хвост буфера и текущая запись, а не весь документ.
+
+    При track_bytes=True доступна позиция в байтах UTF-8 (byte_offset);
+    файл тогда нужно открывать с newline='', чтобы символы соответствовали
+    байтам на диске.
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int = 1 << 16, track_bytes: bool = False) -> None:
+        self._file = f
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        # Сколько символов файла уже отброшено из начала буфера
+        self._consumed = 0
+        self._eof = False
+        self._track_bytes = track_bytes
+        # Байтовое смещение символа буфера с номером _mark
+        self._bytes = 0
+        self._mark = 0
+
+    @property
+    def offset(self) -> int:
+        """Позиция разбора в символах от начала файла."""
+        return self._consumed + self._pos
+
+    @property
+    def byte_offset(self) -> int:
+        """Позиция разбора в байтах UTF-8 от начала файла (нужен track_bytes=True)."""
+        self._count_bytes()
+        return self._bytes
+
+    def _count_bytes(self) -> None:
+        # Кодируем только текст после прошлой отметки, поэтому весь файл кодируется один раз
+        self._bytes += len(self._buffer[self._mark:self._pos].encode('utf-8'))
+        self._mark = self._pos
+
+    def iter_arrays(self, keys: Collection[str]) -> Iterator[Tuple[str, int, Any]]:
+        """Выдает (ключ, номер записи, запись) для элементов массивов верхнего уровня.
+
+        Значения остальных ключей разбираются и отбрасываются.
+        """
+        for key, position, record, _, _ in self._iter_arrays(keys, False):
+            yield key, position, record
+
+    def iter_array_spans(self, keys: Collection[str]) -> Iterator[Tuple[str, int, Any, int, int]]:
+        """Как iter_arrays, но добавляет байтовые смещения начала и конца записи.
+
+        Нужен track_bytes=True; json.loads(data[начало:конец]) возвращает запись.
+        """
+        if not self._track_bytes:
+            raise ValueError("Байтовые смещения доступны только при track_bytes=True.")
+        return self._iter_arrays(keys, True)
+
+    def _iter_arrays(self, keys: Collection[str], spans: bool) -> Iterator[Tuple[str, int, Any, int, int]]:
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._decode_value()
+            if not isinstance(key, str):
+                self._fail("ожидался ключ объекта")
+            self._expect(":")
+            if key in keys and self._peek() == "[":
+                self._pos += 1
+                position = 0
+                if self._peek() == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        if spans:
+                            self._peek()
+                            start = self.byte_offset
+                            record = self._decode_value()
+                            yield key, position, record, start, self.byte_offset
+                        else:
+                            yield key, position, self._decode_value(), 0, 0
+                        position += 1
+                        if self._expect(",]") == "]":
+                            break
+            else:
+                self._decode_value()
+            if self._expect(",}") == "}":
+                break
+        if self._peek() != "":
+            self._fail("лишние данные после конца документа")
+
+    def _fill(self) -> bool:
+        """Дочитывает следующий кусок файла. Возвращает False в конце файла."""
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        # Отбрасываем уже разобранную часть, чтобы буфер не рос
+        if self._track_bytes:
+            self._count_bytes()
+            self._mark = 0
+        self._consumed += self._pos
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Пропускает пробелы и возвращает следующий символ ('' в конце файла)."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars: str) -> str:
+        char = self._peek()
+        if not char or char not in chars:
+            self._fail(f"ожидался один из символов {' '.join(chars)}")
+        self._pos += 1
+        return char
+
+    def _decode_value(self) -> Any:
+        self._peek()
+        while True:
+            # Число, упирающееся в конец буфера, могло продолжаться в следующем куске
+            if _NUMBER.match(self._buffer, self._pos).end() == len(self._buffer) and self._fill():
+                continue
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # Значение может быть обрезано границей куска — дочитываем
+                if self._fill():
+                    continue
+                self._fail(e.msg)
+            self._pos = end
+            return value
+
+    def _fail(self, message: str) -> None:
+        raise InvalidFileFormatError(f"Некорректный JSON (символ {self.offset}): {message}.")
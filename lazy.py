@@ -0,0 +1,342 @@
+import json
+import mmap
+import os
+from array import array
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, Iterator, List, Optional, TypeVar, Union
+from models import Owner, Pet
+from registry import PetRegistry
+from interning import ModelInterner
+from json_stream import JSONStreamReader
+from snapshot import MAGIC, SnapshotReader
+from storage import _owner_from_json, _pet_fields_from_json
+from exceptions import InvalidFileFormatError, OwnerNotFoundError, PetNotFoundError
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class JSONIndex:
+    """Индекс смещений записей JSON-файла формата save_to_json.
+
+    Файл читается через JSONStreamReader не целиком, а по мере надобности:
+    поиск записи дочитывает файл, пока она не встретится, и запоминает
+    для каждой записи байтовые смещения, ID владельца и имя питомца.
+    Сами записи разбираются заново из mmap при обращении (owner_at,
+    pet_at). Дубликаты пропускаются, как в load_from_json: в индекс
+    попадает первая запись с данным ключом.
+
+    Интерфейс совпадает с snapshot.SnapshotReader, поэтому оба подходят
+    источником для LazyPetRegistry. Адреса владельцев не попадают в пул
+    interner (как у SnapshotReader с bounded=True), поэтому пул не растет
+    с числом прочитанных владельцев.
+    """
+
+    def __init__(self, filename: str, interner: Optional[ModelInterner] = None, chunk_size: int = 1 << 16) -> None:
+        self._interner = interner if interner is not None else ModelInterner()
+        with open(filename, 'rb') as f:
+            if not os.fstat(f.fileno()).st_size:
+                raise InvalidFileFormatError(f"Файл '{filename}' пуст.")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # newline='' — чтобы символы соответствовали байтам файла
+        self._file = open(filename, 'r', encoding='utf-8', newline='')
+        self._records = JSONStreamReader(self._file, chunk_size, track_bytes=True).iter_array_spans(("owners", "pets"))
+        self.complete = False
+        # Начала и концы записей, номера записей по ключам
+        self._owner_spans = array('Q')
+        self._owner_records: Dict[int, int] = {}
+        self._owner_ids = array('q')
+        self._pet_spans = array('Q')
+        self._pet_records: Dict[str, int] = {}
+        self._pet_owner_ids = array('q')
+        self._pet_names: List[str] = []
+
+    def close(self) -> None:
+        self._file.close()
+        self._map.close()
+
+    def __enter__(self) -> 'JSONIndex':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def owner_count(self) -> int:
+        self.scan()
+        return len(self._owner_records)
+
+    @property
+    def pet_count(self) -> int:
+        self.scan()
+        return len(self._pet_records)
+
+    def scan(self) -> None:
+        """Дочитывает индекс до конца файла."""
+        while self._advance():
+            pass
+
+    def _advance(self) -> bool:
+        """Индексирует следующую запись файла. Возвращает False в конце файла."""
+        if self.complete:
+            return False
+        for key, position, record, start, end in self._records:
+            try:
+                if key == "owners":
+                    owner_id = int(record["owner_id"])
+                    if owner_id not in self._owner_records:
+                        self._owner_records[owner_id] = len(self._owner_records)
+                        self._owner_spans.extend((start, end))
+                        self._owner_ids.append(owner_id)
+                else:
+                    name = record["name"]
+                    if name not in self._pet_records:
+                        self._pet_records[name] = len(self._pet_records)
+                        self._pet_spans.extend((start, end))
+                        self._pet_owner_ids.append(int(record["owner_id"]))
+                        self._pet_names.append(name)
+            except (ValueError, TypeError, KeyError) as e:
+                raise InvalidFileFormatError(f"Ошибка в записи {key}[{position}]: {e}")
+            return True
+        self.complete = True
+        self._file.close()
+        return False
+
+    def find_owner(self, owner_id: int) -> Optional[int]:
+        """Номер записи владельца с данным ID или None; дочитывает индекс до нее."""
+        while owner_id not in self._owner_records and self._advance():
+            pass
+        return self._owner_records.get(owner_id)
+
+    def find_pet(self, name: str) -> Optional[int]:
+        """Номер записи питомца с данным именем или None; дочитывает индекс до нее."""
+        while name not in self._pet_records and self._advance():
+            pass
+        return self._pet_records.get(name)
+
+    def has_owner(self, record: int) -> bool:
+        """Проиндексирована ли запись владельца с номером record (дочитывает индекс при необходимости)."""
+        while record >= len(self._owner_records) and self._advance():
+            pass
+        return record < len(self._owner_records)
+
+    def has_pet(self, record: int) -> bool:
+        """Проиндексирована ли запись питомца с номером record (дочитывает индекс при необходимости)."""
+        while record >= len(self._pet_records) and self._advance():
+            pass
+        return record < len(self._pet_records)
+
+    def _record(self, spans: array, record: int) -> dict:
+        return json.loads(self._map[spans[2 * record]:spans[2 * record + 1]])
+
+    def owner_id_at(self, record: int) -> int:
+        return self._owner_ids[record]
+
+    def owner_at(self, record: int) -> Owner:
+        return _owner_from_json(self._record(self._owner_spans, record), None)
+
+    def pet_owner_id(self, record: int) -> int:
+        return self._pet_owner_ids[record]
+
+    def pet_name(self, record: int) -> str:
+        return self._pet_names[record]
+
+    def pet_at(self, record: int, owner: Owner) -> Pet:
+        """Разбирает питомца с номером записи record; владельца передает вызывающий."""
+        name, age, breed_name, species, house_type, house_size, _ = _pet_fields_from_json(self._record(self._pet_spans, record))
+        return Pet(name, age, self._interner.breed(breed_name, species), self._interner.house(house_type, house_size), owner)
+
+
+Source = Union[JSONIndex, SnapshotReader]
+
+
+class _LRUCache(Generic[K, V]):
+    """Словарь не больше capacity элементов; при переполнении вытесняется давно не использованный."""
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("Размер кэша должен быть положительным.")
+        self.capacity = capacity
+        self._items: 'OrderedDict[K, V]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: K) -> Optional[V]:
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+
+
+class LazyPetRegistry:
+    """Реестр только для чтения, создающий объекты записей при обращении.
+
+    Источник — индекс JSON-файла (JSONIndex) или бинарный снимок
+    (SnapshotReader). Открытие не разбирает записи: get_owner/get_pet
+    находят запись по индексу и создают Owner/Pet, итерация создает их
+    по одной. Созданные объекты хранятся в LRU-кэшах по cache_size
+    владельцев и питомцев, поэтому память под них не зависит от размера
+    файла. Снимок open_lazy открывает с bounded=True — без кэша строк и
+    пула адресов; у источника остается только индекс: для снимка он
+    лежит в файле, а JSONIndex держит в памяти смещения и ключи записей,
+    прочитанных до сих пор.
+
+    Вытесненная запись при следующем обращении создается заново, то есть
+    это может быть другой объект с теми же значениями; питомец из кэша
+    ссылается на объект владельца, созданный вместе с ним. Для изменений
+    перенесите записи в обычный реестр методом materialize().
+    """
+
+    def __init__(self, source: Source, cache_size: int = 1024) -> None:
+        self._source = source
+        self._owners: _LRUCache[int, Owner] = _LRUCache(cache_size)
+        self._pets: _LRUCache[str, Pet] = _LRUCache(cache_size)
+        self._pets_by_owner: Optional[Dict[int, List[int]]] = None
+        self.hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        self._source.close()
+
+    def __enter__(self) -> 'LazyPetRegistry':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def owner_count(self) -> int:
+        return self._source.owner_count
+
+    @property
+    def pet_count(self) -> int:
+        return self._source.pet_count
+
+    @property
+    def hydrated_owners(self) -> int:
+        """Сколько владельцев сейчас в кэше."""
+        return len(self._owners)
+
+    @property
+    def hydrated_pets(self) -> int:
+        """Сколько питомцев сейчас в кэше."""
+        return len(self._pets)
+
+    @property
+    def owners(self) -> List[Owner]:
+        return list(self.iter_owners())
+
+    @property
+    def pets(self) -> List[Pet]:
+        return list(self.iter_pets())
+
+    def get_owner(self, owner_id: int) -> Owner:
+        owner = self._owners.get(owner_id)
+        if owner is not None:
+            self.hits += 1
+            return owner
+        record = self._source.find_owner(owner_id)
+        if record is None:
+            raise OwnerNotFoundError(f"Владелец с ID {owner_id} не найден.")
+        return self._hydrate_owner(record)
+
+    def get_pet(self, pet_name: str) -> Pet:
+        pet = self._pets.get(pet_name)
+        if pet is not None:
+            self.hits += 1
+            return pet
+        record = self._source.find_pet(pet_name)
+        if record is None:
+            raise PetNotFoundError(f"Питомец с именем {pet_name} не найден.")
+        return self._hydrate_pet(record)
+
+    def pets_of(self, owner_id: int) -> List[Pet]:
+        """Питомцы владельца; первый вызов один раз проходит по ID владельцев всех питомцев."""
+        self.get_owner(owner_id)
+        if self._pets_by_owner is None:
+            self._pets_by_owner = {}
+            for record in range(self._source.pet_count):
+                self._pets_by_owner.setdefault(self._source.pet_owner_id(record), []).append(record)
+        return [self._pet(record) for record in self._pets_by_owner.get(owner_id, [])]
+
+    def iter_owners(self) -> Iterator[Owner]:
+        """Владельцы в порядке файла; для JSON индекс дочитывается по ходу итерации."""
+        record = 0
+        while self._has_owner(record):
+            yield self._owner(record)
+            record += 1
+
+    def iter_pets(self) -> Iterator[Pet]:
+        """Питомцы в порядке файла; для JSON индекс дочитывается по ходу итерации."""
+        record = 0
+        while self._has_pet(record):
+            yield self._pet(record)
+            record += 1
+
+    def materialize(self, registry: Optional[PetRegistry] = None) -> PetRegistry:
+        """Создает все записи и добавляет их в registry (или новый PetRegistry) bulk-методами."""
+        if registry is None:
+            registry = PetRegistry()
+        registry.add_owners_bulk(self.iter_owners())
+        owners = registry.owner_map()
+        source = self._source
+        pets = []
+        # Питомцы создаются заново: они должны ссылаться на владельцев реестра
+        for record in range(source.pet_count):
+            owner = owners.get(source.pet_owner_id(record))
+            if owner is None:
+                raise OwnerNotFoundError(f"Владелец с ID {source.pet_owner_id(record)} не найден.")
+            pets.append(source.pet_at(record, owner))
+        registry.add_pets_bulk(pets)
+        return registry
+
+    def _has_owner(self, record: int) -> bool:
+        if isinstance(self._source, JSONIndex):
+            return self._source.has_owner(record)
+        return record < self._source.owner_count
+
+    def _has_pet(self, record: int) -> bool:
+        if isinstance(self._source, JSONIndex):
+            return self._source.has_pet(record)
+        return record < self._source.pet_count
+
+    def _owner(self, record: int) -> Owner:
+        owner = self._owners.get(self._source.owner_id_at(record))
+        if owner is not None:
+            self.hits += 1
+            return owner
+        return self._hydrate_owner(record)
+
+    def _pet(self, record: int) -> Pet:
+        pet = self._pets.get(self._source.pet_name(record))
+        if pet is not None:
+            self.hits += 1
+            return pet
+        return self._hydrate_pet(record)
+
+    def _hydrate_owner(self, record: int) -> Owner:
+        self.misses += 1
+        owner = self._source.owner_at(record)
+        self._owners.put(owner.owner_id, owner)
+        return owner
+
+    def _hydrate_pet(self, record: int) -> Pet:
+        self.misses += 1
+        pet = self._source.pet_at(record, self.get_owner(self._source.pet_owner_id(record)))
+        self._pets.put(pet.name, pet)
+        return pet
+
+
+def open_lazy(filename: str, cache_size: int = 1024, interner: Optional[ModelInterner] = None) -> LazyPetRegistry:
+    """Открывает снимок или JSON-файл как LazyPetRegistry (формат определяется по сигнатуре снимка)."""
+    with open(filename, 'rb') as f:
+        is_snapshot = f.read(len(MAGIC)) == MAGIC
+    source = SnapshotReader(filename, interner, bounded=True) if is_snapshot else JSONIndex(filename, interner)
+    return LazyPetRegistry(source, cache_size)
@@ -1,10 +1,23 @@
+import argparse
+import cProfile
+import pstats
 from models import Owner, Pet, Breed, PetHouse, Address
 from registry import PetRegistry
-from storage import save_to_json, load_from_json, save_to_xml, load_from_xml
+from storage import save_to_json, load_from_json, save_to_xml, load_from_xml, save_to_snapshot, load_from_snapshot
+from storage import save_to_sqlite, load_from_sqlite
+from metrics import metrics
+from search import RegistrySearch
 from exceptions import OwnerNotFoundError, PetNotFoundError, InvalidDataError, FileProcessingError, EmptyInputError, InvalidFileFormatError, InvalidNumberError
 
+def print_suggestions(search, pet_name):
+    """Печатает похожие имена, если питомец с именем pet_name не найден."""
+    names = search.suggest_pets(pet_name)
+    if names:
+        print("Возможно, вы имели в виду: " + ", ".join(names))
+
 def main():
     registry = PetRegistry()
+    search = RegistrySearch(registry)
 
     print("=== Добро пожаловать в систему домашних животных ===")
 
@@ -22,6 +35,13 @@ def main():
         print("10. Обновить информацию о питомце")
         print("11. Удалить владельца")
         print("12. Удалить питомца")
+        print("13. Найти питомцев")
+        print("14. Сохранить снимок")
+        print("15. Загрузить снимок")
+        print("16. Сохранить в SQLite")
+        print("17. Загрузить из SQLite")
+        print("18. Показать метрики")
+        print("19. Поиск по имени или телефону")
         print("0. Выход")
 
         choice = input("Введите номер действия: ")
@@ -40,7 +60,7 @@ def main():
                 address_street = input("Улица: ")
                 address_city = input("Город: ")
                 address_postal_code = input("Почтовый индекс: ")
-                address = Address(address_street, address_city, address_postal_code)
+                address = registry.interner.address(address_street, address_city, address_postal_code)
                 owner = Owner(owner_id, name, phone, address)
                 registry.add_owner(owner)
                 print(f"Владелец {name} добавлен.")
@@ -70,8 +90,8 @@ def main():
                     raise InvalidNumberError("Ошибка: нужно ввести цифры для ID владельца питомца.")
 
                 owner = registry.get_owner(owner_id)
-                breed = Breed(breed_name, species)
-                house = PetHouse(house_type, house_size)
+                breed = registry.interner.breed(breed_name, species)
+                house = registry.interner.house(house_type, house_size)
                 pet = Pet(name, age, breed, house, owner)
                 registry.add_pet(pet)
                 print(f"Питомец {name} добавлен и привязан к владельцу {owner.name}.")
@@ -163,7 +183,12 @@ def main():
                         new_age_int = int(new_age)
                     except ValueError:
                         raise InvalidNumberError("Ошибка: нужно ввести цифры для возраста питомца.")
-                registry.update_pet(pet_name, new_name if new_name else None, new_age_int, breed, house)
+                try:
+                    registry.update_pet(pet_name, new_name if new_name else None, new_age_int, breed, house)
+                except PetNotFoundError as e:
+                    print(f"Ошибка: {e}")
+                    print_suggestions(search, pet_name)
+                    continue
                 print(f"Информация о питомце {pet_name} обновлена.")
 
             elif choice == "11":
@@ -182,9 +207,83 @@ def main():
                 pet_name = input("Имя питомца для удаления: ")
                 if not pet_name:
                     raise EmptyInputError("Имя питомца не может быть пустым.")
-                registry.delete_pet(pet_name)
+                try:
+                    registry.delete_pet(pet_name)
+                except PetNotFoundError as e:
+                    print(f"Ошибка: {e}")
+                    print_suggestions(search, pet_name)
+                    continue
                 print(f"Питомец {pet_name} удален.")
 
+            elif choice == "13":
+                species = input("Вид (оставьте пустым, чтобы не учитывать): ")
+                breed_name = input("Порода (оставьте пустым, чтобы не учитывать): ")
+                city = input("Город владельца (оставьте пустым, чтобы не учитывать): ")
+                age_from = input("Возраст от (оставьте пустым, чтобы не учитывать): ")
+                age_to = input("Возраст до (оставьте пустым, чтобы не учитывать): ")
+                age_between = None
+                if age_from or age_to:
+                    try:
+                        age_between = (int(age_from) if age_from else 0, int(age_to) if age_to else 10 ** 9)
+                    except ValueError:
+                        raise InvalidNumberError("Ошибка: нужно ввести цифры для возраста питомца.")
+                found = registry.find_pets(species or None, breed_name or None, city or None, age_between)
+                if not found:
+                    print("Питомцы не найдены.")
+                for p in found:
+                    print(f"Имя: {p.name}, Возраст: {p.age}, Владелец: {p.owner.name}, Порода: {p.breed.name} ({p.breed.species}), Город: {p.owner.address.city}")
+
+            elif choice == "14":
+                filename = input("Имя файла для сохранения снимка: ")
+                save_to_snapshot(registry, filename)
+                print("Данные сохранены в снимок.")
+
+            elif choice == "15":
+                filename = input("Имя файла для загрузки снимка: ")
+                owners_before = len(registry.owners)
+                pets_before = len(registry.pets)
+                load_from_snapshot(registry, filename)
+                owners_loaded = len(registry.owners) - owners_before
+                pets_loaded = len(registry.pets) - pets_before
+                print(f"Данные загружены из снимка.")
+                print(f"Загружено владельцев: {owners_loaded}, питомцев: {pets_loaded}")
+                print(f"Всего в системе: владельцев - {len(registry.owners)}, питомцев - {len(registry.pets)}")
+
+            elif choice == "16":
+                filename = input("Имя файла базы SQLite для сохранения: ")
+                save_to_sqlite(registry, filename)
+                print("Данные сохранены в SQLite.")
+
+            elif choice == "17":
+                filename = input("Имя файла базы SQLite для загрузки: ")
+                owners_before = len(registry.owners)
+                pets_before = len(registry.pets)
+                load_from_sqlite(registry, filename)
+                owners_loaded = len(registry.owners) - owners_before
+                pets_loaded = len(registry.pets) - pets_before
+                print(f"Данные загружены из SQLite.")
+                print(f"Загружено владельцев: {owners_loaded}, питомцев: {pets_loaded}")
+                print(f"Всего в системе: владельцев - {len(registry.owners)}, питомцев - {len(registry.pets)}")
+
+            elif choice == "18":
+                if not metrics.enabled:
+                    print("Метрики не собираются. Запустите программу с флагом --metrics.")
+                    continue
+                print(metrics.dump_text())
+
+            elif choice == "19":
+                text = input("Начало имени, имя с опечаткой или телефон: ")
+                if not text.strip():
+                    raise EmptyInputError("Строка поиска не может быть пустой.")
+                pets = search.find_pets(text)
+                owners = search.find_owners(text)
+                if not pets and not owners:
+                    print("Ничего не найдено.")
+                for p in pets:
+                    print(f"Питомец: {p.name}, Возраст: {p.age}, Владелец: {p.owner.name}")
+                for o in owners:
+                    print(f"Владелец: ID {o.owner_id}, {o.name}, Телефон: {o.phone}")
+
             elif choice == "0":
                 print("Выход из программы.")
                 break
@@ -195,5 +294,42 @@ def main():
         except (OwnerNotFoundError, PetNotFoundError, InvalidDataError, FileProcessingError, EmptyInputError, InvalidFileFormatError, InvalidNumberError) as e:
             print(f"Ошибка: {e}")
 
+
+def run(argv=None):
+    """Точка входа с режимами профилирования (--profile) и сбора метрик (--metrics)."""
+    parser = argparse.ArgumentParser(description="Система домашних животных")
+    parser.add_argument("--profile", action="store_true", help="выполнить сеанс под cProfile и вывести отчет при выходе")
+    parser.add_argument("--profile-output", help="также сохранить статистику cProfile в файл для pstats")
+    parser.add_argument("--profile-sort", default="cumulative", help="сортировка отчета cProfile (по умолчанию cumulative)")
+    parser.add_argument("--profile-limit", type=int, default=30, help="число строк отчета cProfile")
+    parser.add_argument("--metrics", action="store_true", help="собирать метрики операций и вывести их при выходе")
+    parser.add_argument("--metrics-json", help="записать метрики в JSON файл при выходе")
+    args = parser.parse_args(argv)
+
+    if args.metrics or args.metrics_json:
+        metrics.enable()
+    profiler = cProfile.Profile() if args.profile or args.profile_output else None
+    try:
+        if profiler is not None:
+            profiler.runcall(main)
+        else:
+            main()
+    except (KeyboardInterrupt, EOFError):
+        print("\nВыход из программы.")
+    finally:
+        if profiler is not None:
+            print("\n=== Профиль сеанса ===")
+            pstats.Stats(profiler).sort_stats(args.profile_sort).print_stats(args.profile_limit)
+            if args.profile_output:
+                profiler.dump_stats(args.profile_output)
+                print(f"Статистика cProfile сохранена в {args.profile_output}")
+        if metrics.enabled:
+            print("\n=== Метрики сеанса ===")
+            print(metrics.dump_text())
+            if args.metrics_json:
+                metrics.dump_json(args.metrics_json)
+                print(f"Метрики сохранены в {args.metrics_json}")
+            metrics.disable()
+
 if __name__ == "__main__":
-    main()
+    run()
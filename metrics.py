@@ -0,0 +1,267 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from registry import PetRegistry
+
+# Границы интервалов гистограммы задержек, секунды: 1 мкс ... 10 с по схеме 1-2-5
+BUCKETS: List[float] = [base * 10.0 ** power for power in range(-6, 1) for base in (1, 2, 5)] + [10.0]
+
+_NULL = nullcontext()
+
+
+class Histogram:
+    """Гистограмма задержек с фиксированными границами BUCKETS."""
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        # Последний интервал — все, что дольше BUCKETS[-1]
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        """Оценка перцентиля сверху: граница интервала, в который он попадает."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(BUCKETS[bucket], self.max) if bucket < len(BUCKETS) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.50),
+            "p99": self.percentile(0.99),
+            "buckets": {("inf" if bucket == len(BUCKETS) else f"{BUCKETS[bucket]:g}"): count
+                        for bucket, count in enumerate(self.counts) if count},
+        }
+
+
+class Metrics:
+    """Счетчики, гистограммы задержек и объемы данных для реестра и хранилищ.
+
+    По умолчанию выключено. enable() подменяет методы PetRegistry,
+    переданных классов и их уже импортированных подклассов обертками с
+    замером времени, disable() возвращает исходные методы, поэтому
+    выключенные метрики реестру ничего не стоят. Подклассы оборачиваются
+    отдельно, потому что могут хранить собственные копии методов:
+    ThreadSafePetRegistry строит get_pet и другие методы из функций
+    PetRegistry при определении класса, и подмена в PetRegistry их не
+    затрагивает. Такие методы замеряются под именем подкласса
+    («ThreadSafePetRegistry.get_pet»), унаследованные — под именем
+    базового класса. Подкласс, импортированный после enable(), нужно
+    передать в enable() явно.
+
+    Замеряется только внешний вызов: открытые методы, вызванные из
+    другого замеряемого метода (add_pets_bulk -> add_pet, super() в
+    подклассе), в том же потоке не замеряются и не считаются повторно.
+    Счетчики и гистограммы изменяются под блокировкой, поэтому метрики
+    можно собирать из нескольких потоков.
+
+    Функции storage.py всегда обернуты @instrumented: в выключенном
+    состоянии это одна проверка флага на вызов, а фазы внутри них
+    (phase) возвращают общий пустой контекст.
+
+    Имена метрик: «PetRegistry.get_pet», «load_from_json»,
+    «load_from_json.parse» и т. п. Фазы хранилищ: parse — разбор
+    файла, owners/pets — создание объектов (у питомцев вместе с поиском
+    владельца), index — добавление в реестр, fetch — чтение строк
+    SQLite, write/flush — запись в файл. Потоковые загрузчики
+    замеряются только целиком: фазы в них чередуются по записям.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.bytes: Dict[str, int] = {}
+        self._patched: Dict[type, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+        # Глубина вложенных замеряемых вызовов в текущем потоке
+        self._local = threading.local()
+
+    def enable(self, *classes: type) -> None:
+        """Включает сбор метрик и обертывает методы PetRegistry, классов classes и их подклассов."""
+        self.enabled = True
+        for cls in _with_subclasses((PetRegistry,) + classes):
+            if cls not in self._patched:
+                self._patched[cls] = _instrument_class(self, cls)
+
+    def disable(self) -> None:
+        """Выключает сбор метрик и возвращает исходные методы классов."""
+        self.enabled = False
+        for cls, originals in self._patched.items():
+            for name, original in originals.items():
+                setattr(cls, name, original)
+        self._patched = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.bytes = {}
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.record(seconds)
+
+    def add_bytes(self, name: str, value: int) -> None:
+        with self._lock:
+            self.bytes[name] = self.bytes.get(name, 0) + value
+
+    def phase(self, operation: str, name: str):
+        """Контекст замера фазы operation.name (пустой, если метрики выключены)."""
+        if not self.enabled:
+            return _NULL
+        return self._timed(f"{operation}.{name}")
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(sorted(self.counters.items())),
+                "latency": {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())},
+                "bytes": dict(sorted(self.bytes.items())),
+            }
+
+    def dump_json(self, filename: Optional[str] = None) -> str:
+        """Метрики в JSON; при filename также записываются в файл."""
+        text = json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        if filename is not None:
+            with open(filename, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return text
+
+    def dump_text(self) -> str:
+        """Метрики в виде таблицы для вывода в консоль."""
+        lines = [f"{'операция':<40} {'вызовов':>9} {'ошибок':>7} {'всего, мс':>11} {'сред., мкс':>11} {'p50, мкс':>10} {'p99, мкс':>10} {'байт':>12}"]
+        with self._lock:
+            names = sorted(set(self.histograms) | set(self.bytes) | {name.rsplit(".", 1)[0] for name in self.counters})
+            for name in names:
+                histogram = self.histograms.get(name) or Histogram()
+                lines.append(
+                    f"{name:<40} {histogram.count:>9} {self.counters.get(name + '.errors', 0):>7} "
+                    f"{histogram.total * 1e3:>11.2f} {histogram.total / histogram.count * 1e6 if histogram.count else 0:>11.1f} "
+                    f"{histogram.percentile(0.5) * 1e6:>10.1f} {histogram.percentile(0.99) * 1e6:>10.1f} "
+                    f"{self.bytes.get(name, ''):>12}"
+                )
+        return "\n".join(lines)
+
+
+def _timed_method(metrics: Metrics, name: str, method: Callable) -> Callable:
+    local = metrics._local
+
+    @wraps(method)
+    def timed(*args, **kwargs):
+        if getattr(local, "depth", 0):
+            # Вложенный вызов уже замеряется внешним
+            return method(*args, **kwargs)
+        local.depth = 1
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except Exception:
+            metrics.count(name + ".errors")
+            raise
+        finally:
+            local.depth = 0
+            metrics.record(name, time.perf_counter() - start)
+    return timed
+
+
+def _with_subclasses(classes: Iterable[type]) -> Iterator[type]:
+    """Классы classes и все их подклассы, каждый один раз."""
+    seen = set()
+    stack = list(classes)
+    while stack:
+        cls = stack.pop(0)
+        if cls not in seen:
+            seen.add(cls)
+            yield cls
+            stack.extend(cls.__subclasses__())
+
+
+def _instrument_class(metrics: Metrics, cls: type) -> Dict[str, object]:
+    """Подменяет открытые методы и свойства cls обертками; возвращает исходные атрибуты."""
+    originals: Dict[str, object] = {}
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith("_"):
+            continue
+        metric = f"{cls.__name__}.{name}"
+        if isinstance(attribute, property) and attribute.fget is not None:
+            wrapped = property(_timed_method(metrics, metric, attribute.fget), attribute.fset, attribute.fdel, attribute.__doc__)
+        elif callable(attribute) and not isinstance(attribute, type):
+            wrapped = _timed_method(metrics, metric, attribute)
+        else:
+            continue
+        originals[name] = attribute
+        setattr(cls, name, wrapped)
+    return originals
+
+
+metrics = Metrics()
+
+
+def instrumented(function: Callable) -> Callable:
+    """Декоратор функций сохранения/загрузки function(registry, filename, ...).
+
+    При включенных метриках замеряет время вызова, считает ошибки и
+    добавляет размер файла filename к счетчику байт.
+    """
+    name = function.__name__
+
+    @wraps(function)
+    def wrapper(registry, filename, *args, **kwargs):
+        if not metrics.enabled:
+            return function(registry, filename, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            result = function(registry, filename, *args, **kwargs)
+        except Exception:
+            metrics.count(name + ".errors")
+            raise
+        finally:
+            metrics.record(name, time.perf_counter() - start)
+        if os.path.isfile(filename):
+            metrics.add_bytes(name, os.path.getsize(filename))
+        return result
+    return wrapper
@@ -2,6 +2,8 @@ from typing import Optional
 from datetime import datetime
 
 class Address:
+    __slots__ = ("street", "city", "postal_code")
+
     def __init__(self, street: str, city: str, postal_code: str):
         self.street = street
         self.city = city
@@ -9,6 +11,8 @@ class Address:
 
 # Класс для владельца питомца
 class Owner:
+    __slots__ = ("owner_id", "name", "phone", "address")
+
     def __init__(self, owner_id: int, name: str, phone: str, address: Address):
         self.owner_id: int = owner_id
         self.name: str = name
@@ -17,18 +21,24 @@ class Owner:
 
 # Класс для породы питомца
 class Breed:
+    __slots__ = ("name", "species")
+
     def __init__(self, name: str, species: str):
         self.name: str = name
         self.species: str = species
 
 # Класс для дома питомца
 class PetHouse:
+    __slots__ = ("house_type", "house_size")
+
     def __init__(self, house_type: str, house_size: str):
         self.house_type: str = house_type
         self.house_size: str = house_size
 
 # Класс для питомца
 class Pet:
+    __slots__ = ("name", "age", "breed", "house", "owner")
+
     def __init__(self, name: str, age: int, breed: Breed, house: PetHouse, owner: Owner):
         self.name: str = name
         self.age: int = age
@@ -38,6 +48,8 @@ class Pet:
 
 # Класс для типа события (например, ухода или кормления питомца)
 class PetEvent:
+    __slots__ = ("pet", "event_type", "date")
+
     def __init__(self, pet: Pet, event_type: str, date: str):
         self.pet: Pet = pet
         self.event_type: str = event_type
@@ -45,32 +57,46 @@ class PetEvent:
 
 # Класс для категории питомца (например, терапевтический питомец, спортивный питомец)
 class PetCategory:
+    __slots__ = ("category_name",)
+
     def __init__(self, category_name: str):
         self.category_name: str = category_name
 
 # Класс для ветеринара
 class Veterinarian:
+    __slots__ = ("vet_id", "name", "phone")
+
     def __init__(self, vet_id: int, name: str, phone: str):
         self.vet_id: int = vet_id
         self.name: str = name
         self.phone: str = phone
 
+# Длительность визита к ветеринару по умолчанию, в минутах
+VISIT_DURATION = 30
+
 # Класс для визита питомца к ветеринару
 class VetVisit:
-    def __init__(self, pet: Pet, veterinarian: Veterinarian, date: str, reason: str):
+    __slots__ = ("pet", "veterinarian", "date", "reason", "duration")
+
+    def __init__(self, pet: Pet, veterinarian: Veterinarian, date: str, reason: str, duration: int = VISIT_DURATION):
         self.pet: Pet = pet
         self.veterinarian: Veterinarian = veterinarian
         self.date: str = date  # Опять же, можно использовать datetime
         self.reason: str = reason
+        self.duration: int = duration  # В минутах, начиная с date
 
 # Класс для записи на услуги (например, стрижка, вакцинация)
 class PetService:
+    __slots__ = ("service_name", "price")
+
     def __init__(self, service_name: str, price: float):
         self.service_name: str = service_name
         self.price: float = price
 
 # Класс для записи на услугу питомцу
 class PetServiceBooking:
+    __slots__ = ("pet", "service", "date")
+
     def __init__(self, pet: Pet, service: PetService, date: str):
         self.pet: Pet = pet
         self.service: PetService = service
@@ -78,6 +104,8 @@ class PetServiceBooking:
 
 # Класс для рецепта, выданного ветеринаром
 class Prescription:
+    __slots__ = ("pet", "medication", "dosage", "date")
+
     def __init__(self, pet: Pet, medication: str, dosage: str, date: str):
         self.pet: Pet = pet
         self.medication: str = medication
@@ -1,31 +1,137 @@
-from typing import List, Optional
+from bisect import bisect_left, bisect_right, insort
+from types import MappingProxyType
+from typing import AbstractSet, Callable, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, Union
 from models import Pet, Owner, Address, Breed, PetHouse
-from exceptions import PetNotFoundError  
-from exceptions import OwnerNotFoundError
+from exceptions import PetNotFoundError
+from exceptions import OwnerNotFoundError, InvalidDataError
+from interning import ModelInterner
+
+# Подписчик на изменения реестра: listener(операция, запись, старое имя питомца).
+# Операции: add_owner, update_owner, delete_owner, add_pet, update_pet, delete_pet.
+# Для update_pet третий аргумент — имя питомца до изменения, иначе None.
+# delete_owner сначала сообщает delete_pet для каждого питомца владельца.
+RegistryListener = Callable[[str, Union[Owner, Pet], Optional[str]], None]
+
 
 class PetRegistry:
     def __init__(self) -> None:
-        self.pets: List[Pet] = []
-        self.owners: List[Owner] = []
-        
-        
+        # Хранилища записей: владельцы по ID и питомцы по имени.
+        # dict сохраняет порядок добавления, поэтому списки owners/pets
+        # выдаются в том же порядке, что и раньше.
+        self._owners: Dict[int, Owner] = {}
+        self._pets: Dict[str, Pet] = {}
+        # Обратный индекс: ID владельца -> его питомцы по имени
+        self._pets_by_owner: Dict[int, Dict[str, Pet]] = {}
+        # Вторичные индексы для find_pets: значение поля -> множество питомцев
+        self._pets_by_species: Dict[str, Set[Pet]] = {}
+        self._pets_by_breed: Dict[str, Set[Pet]] = {}
+        self._pets_by_city: Dict[str, Set[Pet]] = {}
+        self._pets_by_age: Dict[int, Set[Pet]] = {}
+        # Отсортированный список различных возрастов для запросов по диапазону
+        self._ages: List[int] = []
+        # Сумма возрастов питомцев для stats()
+        self._age_sum = 0
+        # Общие экземпляры пород, домов и адресов для всех записей реестра
+        self.interner = ModelInterner()
+        self._listeners: List[RegistryListener] = []
+
+    @property
+    def owners(self) -> List[Owner]:
+        """Список всех владельцев в порядке добавления."""
+        return list(self._owners.values())
+
+    @property
+    def pets(self) -> List[Pet]:
+        """Список всех питомцев в порядке добавления."""
+        return list(self._pets.values())
+
+    @property
+    def owner_count(self) -> int:
+        return len(self._owners)
+
+    @property
+    def pet_count(self) -> int:
+        return len(self._pets)
+
+    def iter_owners(self) -> Iterator[Owner]:
+        """Итератор по владельцам в порядке добавления (без копирования списка)."""
+        return iter(self._owners.values())
+
+    def iter_pets(self) -> Iterator[Pet]:
+        """Итератор по питомцам в порядке добавления (без копирования списка)."""
+        return iter(self._pets.values())
+
     def get_owner(self, owner_id: int) -> Owner:
-        for owner in self.owners:
-            if owner.owner_id == owner_id:
-                return owner
-        raise OwnerNotFoundError(f"Владелец с ID {owner_id} не найден.")
-    
+        owner = self._owners.get(owner_id)
+        if owner is None:
+            raise OwnerNotFoundError(f"Владелец с ID {owner_id} не найден.")
+        return owner
+
     def add_owner(self, owner: Owner) -> None:
-        self.owners.append(owner)
+        if owner.owner_id in self._owners:
+            raise InvalidDataError(f"Владелец с ID {owner.owner_id} уже зарегистрирован.")
+        self._owners[owner.owner_id] = owner
+        self._pets_by_owner[owner.owner_id] = {}
+        if self._listeners:
+            self._notify("add_owner", owner)
 
     def add_pet(self, pet: Pet) -> None:
-        if pet.owner not in self.owners:
+        if self._owners.get(pet.owner.owner_id) is not pet.owner:
             raise OwnerNotFoundError(f"Владелец {pet.owner.name} не зарегистрирован.")
-        self.pets.append(pet)
+        if pet.name in self._pets:
+            raise InvalidDataError(f"Питомец с именем {pet.name} уже зарегистрирован.")
+        self._index_pet(pet)
+        if self._listeners:
+            self._notify("add_pet", self._pets[pet.name])
+
+    def add_owners_bulk(self, owners: Iterable[Owner]) -> int:
+        """Добавляет владельцев пачкой за один проход.
+
+        Владельцы с уже занятым ID (в реестре или раньше в той же пачке)
+        пропускаются. Возвращает число добавленных владельцев.
+        """
+        added = 0
+        for owner in owners:
+            if owner.owner_id in self._owners:
+                continue
+            self._owners[owner.owner_id] = owner
+            self._pets_by_owner[owner.owner_id] = {}
+            added += 1
+            if self._listeners:
+                self._notify("add_owner", owner)
+        return added
+
+    def add_pets_bulk(self, pets: Iterable[Pet]) -> int:
+        """Добавляет питомцев пачкой за один проход.
+
+        Питомцы с уже занятым именем (в реестре или раньше в той же пачке)
+        пропускаются. Если владелец хотя бы одного питомца не зарегистрирован,
+        пачка отклоняется целиком. Возвращает число добавленных питомцев.
+        """
+        batch: Dict[str, Pet] = {}
+        for pet in pets:
+            if pet.name in self._pets or pet.name in batch:
+                continue
+            if self._owners.get(pet.owner.owner_id) is not pet.owner:
+                raise OwnerNotFoundError(f"Владелец {pet.owner.name} не зарегистрирован.")
+            batch[pet.name] = pet
+        for pet in batch.values():
+            self._index_pet(pet)
+            if self._listeners:
+                self._notify("add_pet", self._pets[pet.name])
+        return len(batch)
+
+    def owner_map(self) -> Mapping[int, Owner]:
+        """Возвращает словарь ID -> владелец только для чтения (без копирования)."""
+        return MappingProxyType(self._owners)
+
+    def pet_map(self) -> Mapping[str, Pet]:
+        """Возвращает словарь имя -> питомец только для чтения (без копирования)."""
+        return MappingProxyType(self._pets)
 
     def get_pet(self, pet_name: str) -> Pet:
-        pet = next((pet for pet in self.pets if pet.name == pet_name), None)
-        if not pet:
+        pet = self._pets.get(pet_name)
+        if pet is None:
             raise PetNotFoundError(f"Питомец с именем {pet_name} не найден.")
         return pet
 
@@ -36,35 +142,342 @@ class PetRegistry:
         if new_phone:
             owner.phone = new_phone
         if new_address:
-            owner.address = new_address
+            # Питомцы владельца переезжают в индексе городов вместе с ним
+            pets = self._pets_by_owner[owner_id].values()
+            for pet in pets:
+                _remove_from_index(self._pets_by_city, owner.address.city, pet)
+            owner.address = self.interner.address(new_address.street, new_address.city, new_address.postal_code)
+            for pet in pets:
+                _add_to_index(self._pets_by_city, new_address.city, pet)
+        if self._listeners:
+            self._notify("update_owner", owner)
 
     def update_pet(self, pet_name: str, new_name: Optional[str] = None, new_age: Optional[int] = None, new_breed: Optional[Breed] = None, new_house: Optional[PetHouse] = None) -> None:
         pet = self.get_pet(pet_name)
+        if new_name and new_name != pet.name and new_name in self._pets:
+            raise InvalidDataError(f"Питомец с именем {new_name} уже зарегистрирован.")
+        # Изменяемые поля входят в ключи индексов, поэтому переиндексируем питомца
+        old_name = pet.name
+        self._unindex_pet(pet)
         if new_name:
             pet.name = new_name
         if new_age is not None:
             pet.age = new_age
         if new_breed:
-            pet.breed = new_breed
+            pet.breed = self.interner.breed(new_breed.name, new_breed.species)
         if new_house:
-            pet.house = new_house
-        
+            pet.house = self.interner.house(new_house.house_type, new_house.house_size)
+        self._index_pet(pet)
+        if self._listeners:
+            self._notify("update_pet", pet, old_name)
+
     def update_pet_age(self, pet_name: str, new_age: int) -> None:
-        pet = next((pet for pet in self.pets if pet.name == pet_name), None)
-        if pet is None:
-            raise PetNotFoundError(f"Питомец с именем {pet_name} не найден.")
+        pet = self.get_pet(pet_name)
+        self._remove_age(pet)
         pet.age = new_age
-    
+        self._add_age(pet)
+        if self._listeners:
+            self._notify("update_pet", pet, pet.name)
+
     def delete_owner(self, owner_id: int) -> None:
         """Удаляет владельца по ID. Также удаляет всех его питомцев."""
         owner = self.get_owner(owner_id)
         # Удаляем всех питомцев этого владельца
-        self.pets = [pet for pet in self.pets if pet.owner.owner_id != owner_id]
+        for pet in list(self._pets_by_owner[owner_id].values()):
+            self._unindex_pet(pet)
+            if self._listeners:
+                self._notify("delete_pet", pet)
         # Удаляем владельца
-        self.owners.remove(owner)
-    
+        del self._pets_by_owner[owner_id]
+        del self._owners[owner_id]
+        if self._listeners:
+            self._notify("delete_owner", owner)
+
     def delete_pet(self, pet_name: str) -> None:
         """Удаляет питомца по имени."""
         pet = self.get_pet(pet_name)
-        self.pets.remove(pet)
+        self._unindex_pet(pet)
+        if self._listeners:
+            self._notify("delete_pet", pet)
+
+    def pets_of(self, owner_id: int) -> List[Pet]:
+        """Возвращает питомцев владельца в порядке добавления."""
+        self.get_owner(owner_id)
+        return list(self._pets_by_owner[owner_id].values())
+
+    def find_pets(self, species: Optional[str] = None, breed: Optional[str] = None, city: Optional[str] = None, age_between: Optional[Tuple[int, int]] = None) -> List[Pet]:
+        """Ищет питомцев по виду, породе, городу владельца и диапазону возраста.
+
+        Условия объединяются через И, границы age_between включаются.
+        Результат отсортирован по имени питомца.
+        """
+        # Источники кандидатов: (оценка размера, множество); диапазон возраста — без множества
+        sources: List[Tuple[int, Optional[AbstractSet[Pet]]]] = []
+        for index, key in ((self._pets_by_species, species), (self._pets_by_breed, breed), (self._pets_by_city, city)):
+            if key is not None:
+                bucket = index.get(key, _EMPTY)
+                sources.append((len(bucket), bucket))
+
+        age_buckets: List[Set[Pet]] = []
+        if age_between is not None:
+            low, high = age_between
+            ages = self._ages[bisect_left(self._ages, low):bisect_right(self._ages, high)]
+            age_buckets = [self._pets_by_age[age] for age in ages]
+            sources.append((sum(len(bucket) for bucket in age_buckets), None))
+
+        if not sources:
+            return sorted(self._pets.values(), key=_pet_name)
+
+        # Начинаем с самого селективного индекса, остальные проверяем поштучно
+        sources.sort(key=lambda source: source[0])
+        size, driver = sources[0]
+        if size == 0:
+            return []
+        others = [bucket for _, bucket in sources[1:] if bucket is not None]
+        if driver is None:
+            candidates = [pet for bucket in age_buckets for pet in bucket]
+            check_age = False
+        else:
+            candidates = driver
+            check_age = age_between is not None
+
+        result = []
+        for pet in candidates:
+            if check_age and not (low <= pet.age <= high):
+                continue
+            if all(pet in bucket for bucket in others):
+                result.append(pet)
+        result.sort(key=_pet_name)
+        return result
+
+    def stats(self) -> 'RegistryStats':
+        """Сводная статистика реестра за O(1).
+
+        Счетчики — размеры индексов, которые и так поддерживаются при
+        каждом изменении, поэтому отдельного пересчета нет. Словари
+        статистики — живые представления индексов (см. RegistryStats).
+        """
+        return RegistryStats(
+            len(self._owners), len(self._pets), self._age_sum,
+            IndexSizes(self._pets_by_species), IndexSizes(self._pets_by_breed), IndexSizes(self._pets_by_city),
+            IndexSizes(self._pets_by_age), IndexSizes(self._pets_by_owner),
+        )
+
+    def subscribe(self, listener: RegistryListener) -> None:
+        """Подписывает listener на все изменения реестра (см. RegistryListener)."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: RegistryListener) -> None:
+        self._listeners.remove(listener)
+
+    def _notify(self, operation: str, record: Union[Owner, Pet], old_name: Optional[str] = None) -> None:
+        for listener in self._listeners:
+            listener(operation, record, old_name)
+
+    def _index_pet(self, pet: Pet) -> None:
+        """Заносит питомца во все индексы реестра."""
+        self._pets[pet.name] = pet
+        self._pets_by_owner[pet.owner.owner_id][pet.name] = pet
+        _add_to_index(self._pets_by_species, pet.breed.species, pet)
+        _add_to_index(self._pets_by_breed, pet.breed.name, pet)
+        _add_to_index(self._pets_by_city, pet.owner.address.city, pet)
+        self._add_age(pet)
+
+    def _unindex_pet(self, pet: Pet) -> None:
+        """Убирает питомца из всех индексов реестра."""
+        del self._pets[pet.name]
+        del self._pets_by_owner[pet.owner.owner_id][pet.name]
+        _remove_from_index(self._pets_by_species, pet.breed.species, pet)
+        _remove_from_index(self._pets_by_breed, pet.breed.name, pet)
+        _remove_from_index(self._pets_by_city, pet.owner.address.city, pet)
+        self._remove_age(pet)
+
+    def _add_age(self, pet: Pet) -> None:
+        if pet.age not in self._pets_by_age:
+            insort(self._ages, pet.age)
+        _add_to_index(self._pets_by_age, pet.age, pet)
+        self._age_sum += pet.age
+
+    def _remove_age(self, pet: Pet) -> None:
+        _remove_from_index(self._pets_by_age, pet.age, pet)
+        if pet.age not in self._pets_by_age:
+            del self._ages[bisect_left(self._ages, pet.age)]
+        self._age_sum -= pet.age
+
+
+class IndexSizes(Mapping):
+    """Живое представление индекса реестра: значение -> число питомцев, без копирования."""
+
+    __slots__ = ("_index",)
+
+    def __init__(self, index: Mapping) -> None:
+        self._index = index
+
+    def __getitem__(self, key) -> int:
+        return len(self._index[key])
+
+    def __iter__(self) -> Iterator:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class RegistryStats:
+    """Статистика реестра, которую возвращает PetRegistry.stats().
+
+    owner_count, pet_count и age_sum зафиксированы на момент вызова, а
+    by_species, by_breed, by_city, by_age (гистограмма возрастов) и
+    by_owner (число питомцев по ID владельца) — живые представления
+    индексов реестра: они сразу отражают изменения и не должны читаться
+    во время изменения реестра из другого потока. frozen() и to_dict()
+    копируют их.
+    """
+
+    __slots__ = ("owner_count", "pet_count", "age_sum", "by_species", "by_breed", "by_city", "by_age", "by_owner")
+
+    def __init__(self, owner_count: int, pet_count: int, age_sum: int, by_species: Mapping[str, int], by_breed: Mapping[str, int],
+                 by_city: Mapping[str, int], by_age: Mapping[int, int], by_owner: Mapping[int, int]) -> None:
+        self.owner_count = owner_count
+        self.pet_count = pet_count
+        self.age_sum = age_sum
+        self.by_species = by_species
+        self.by_breed = by_breed
+        self.by_city = by_city
+        self.by_age = by_age
+        self.by_owner = by_owner
+
+    @property
+    def mean_age(self) -> float:
+        return self.age_sum / self.pet_count if self.pet_count else 0.0
+
+    def frozen(self) -> 'RegistryStats':
+        """Копия статистики с обычными словарями вместо живых представлений."""
+        return RegistryStats(self.owner_count, self.pet_count, self.age_sum, dict(self.by_species), dict(self.by_breed),
+                             dict(self.by_city), dict(self.by_age), dict(self.by_owner))
+
+    def to_dict(self) -> dict:
+        return {
+            "owner_count": self.owner_count,
+            "pet_count": self.pet_count,
+            "mean_age": self.mean_age,
+            "by_species": dict(self.by_species),
+            "by_breed": dict(self.by_breed),
+            "by_city": dict(self.by_city),
+            "by_age": dict(sorted(self.by_age.items())),
+            "by_owner": dict(self.by_owner),
+        }
+
+
+def recompute_stats(registry: PetRegistry) -> RegistryStats:
+    """Статистика, посчитанная заново полным проходом по записям реестра."""
+    by_species: Dict[str, int] = {}
+    by_breed: Dict[str, int] = {}
+    by_city: Dict[str, int] = {}
+    by_age: Dict[int, int] = {}
+    by_owner = {owner.owner_id: 0 for owner in registry.iter_owners()}
+    age_sum = pet_count = 0
+    for pet in registry.iter_pets():
+        for counts, key in ((by_species, pet.breed.species), (by_breed, pet.breed.name), (by_city, pet.owner.address.city),
+                            (by_age, pet.age), (by_owner, pet.owner.owner_id)):
+            counts[key] = counts.get(key, 0) + 1
+        age_sum += pet.age
+        pet_count += 1
+    return RegistryStats(len(by_owner), pet_count, age_sum, by_species, by_breed, by_city, by_age, by_owner)
+
+
+def check_stats(registry: PetRegistry) -> List[str]:
+    """Сверяет stats() с полным пересчетом; возвращает описания расхождений (пустой список, если их нет)."""
+    maintained = registry.stats().frozen()
+    expected = recompute_stats(registry)
+    problems = []
+    for field in RegistryStats.__slots__:
+        actual_value, expected_value = getattr(maintained, field), getattr(expected, field)
+        if actual_value != expected_value:
+            problems.append(f"{field}: {actual_value!r} != {expected_value!r}")
+    return problems
+
+
+# Состояния записей в ChangeTracker
+ADDED = "added"
+MODIFIED = "modified"
+DELETED = "deleted"
+
+
+class ChangeTracker:
+    """Отслеживает изменения реестра с момента последнего сохранения.
+
+    owners и pets — словари ключ записи (ID владельца или имя питомца) ->
+    ADDED, MODIFIED или DELETED. Несколько изменений одной записи
+    схлопываются: добавленная и затем удаленная запись исчезает из
+    словаря, удаленная и снова добавленная считается измененной.
+    Переименование питомца — удаление старого имени и добавление нового.
+    """
+
+    def __init__(self, registry: PetRegistry) -> None:
+        self._registry = registry
+        self.owners: Dict[int, str] = {}
+        self.pets: Dict[str, str] = {}
+        registry.subscribe(self._record)
+
+    def __bool__(self) -> bool:
+        return bool(self.owners or self.pets)
+
+    def clear(self) -> None:
+        """Забывает накопленные изменения (вызывается после сохранения)."""
+        self.owners = {}
+        self.pets = {}
+
+    def close(self) -> None:
+        self._registry.unsubscribe(self._record)
+
+    def _record(self, operation: str, record: Union[Owner, Pet], old_name: Optional[str] = None) -> None:
+        if operation == "add_owner":
+            _mark(self.owners, record.owner_id, ADDED)
+        elif operation == "update_owner":
+            _mark(self.owners, record.owner_id, MODIFIED)
+        elif operation == "delete_owner":
+            _mark(self.owners, record.owner_id, DELETED)
+        elif operation == "add_pet":
+            _mark(self.pets, record.name, ADDED)
+        elif operation == "update_pet" and old_name != record.name:
+            _mark(self.pets, old_name, DELETED)
+            _mark(self.pets, record.name, ADDED)
+        elif operation == "update_pet":
+            _mark(self.pets, record.name, MODIFIED)
+        elif operation == "delete_pet":
+            _mark(self.pets, record.name, DELETED)
+
+
+def _mark(changes: dict, key, state: str) -> None:
+    previous = changes.get(key)
+    if previous == ADDED:
+        # Запись еще не сохранялась: изменения не важны, удаление отменяет добавление
+        if state == DELETED:
+            del changes[key]
+        return
+    if previous == DELETED and state == ADDED:
+        state = MODIFIED
+    changes[key] = state
+
+
+_EMPTY: FrozenSet[Pet] = frozenset()
+
+
+def _pet_name(pet: Pet) -> str:
+    return pet.name
+
+
+def _add_to_index(index: dict, key, pet: Pet) -> None:
+    bucket = index.get(key)
+    if bucket is None:
+        index[key] = bucket = set()
+    bucket.add(pet)
+
 
+def _remove_from_index(index: dict, key, pet: Pet) -> None:
+    bucket = index[key]
+    bucket.discard(pet)
+    # Пустые корзины удаляем, чтобы индекс не рос от удалённых значений
+    if not bucket:
+        del index[key]
@@ -0,0 +1,248 @@
+from array import array
+from itertools import compress
+from typing import Any, Dict, List, Optional, Tuple
+from models import Owner, PetServiceBooking
+from events import EventStore, EventRecord, Bound, month_of, MIN_TIMESTAMP, MAX_TIMESTAMP
+from interning import DictionaryEncoder
+from exceptions import InvalidDataError
+
+try:
+    import numpy as np
+except ImportError:  # numpy необязателен: без него группировка идет циклом по array
+    np = None
+
+# Поля группировки отчетов: название услуги, ID владельца, город владельца, месяц «ГГГГ-ММ»
+GROUPS = ("service", "owner", "city", "month")
+
+# Строка отчета: выручка и число записей на услуги
+ReportRow = Tuple[float, int]
+
+
+def month_label(month: int) -> str:
+    """Номер месяца month_of в виде «ГГГГ-ММ»."""
+    return f"{month // 12:04d}-{month % 12 + 1:02d}"
+
+
+class BookingColumns:
+    """Записи на услуги в колоночном виде.
+
+    Цена и отметка времени хранятся в array('d')/array('q'), месяц — номером
+    month_of, услуга и владелец — кодами словарей. Город не хранится в
+    строках: у каждого кода владельца есть код его города, поэтому переезд
+    владельца меняет одно значение, а не все его записи. Освобожденные
+    строки помечаются в alive и переиспользуются, как в PetColumns.
+    """
+
+    def __init__(self) -> None:
+        self.prices = array('d')
+        self.times = array('q')
+        self.months = array('i')
+        self.services = array('i')
+        self.owners = array('i')
+        self.alive = bytearray()
+        self.service_names = DictionaryEncoder()
+        # Код владельца -> ID владельца и код его текущего города
+        self.owner_ids = DictionaryEncoder()
+        self.owner_cities = array('i')
+        self.cities = DictionaryEncoder()
+        self._records: List[Optional[PetServiceBooking]] = []
+        # id(записи) -> строка; повторно добавленный тот же объект — в _duplicates
+        self._rows: Dict[int, int] = {}
+        self._duplicates: Dict[int, List[int]] = {}
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._records) - len(self._free)
+
+    def append(self, booking: PetServiceBooking, timestamp: int, month: int) -> None:
+        owner = booking.pet.owner
+        owner_code = self.owner_ids.encode(owner.owner_id)
+        if owner_code == len(self.owner_cities):
+            self.owner_cities.append(self.cities.encode(owner.address.city))
+        service_code = self.service_names.encode(booking.service.service_name)
+        if self._free:
+            row = self._free.pop()
+            self._records[row] = booking
+            self.prices[row] = booking.service.price
+            self.times[row] = timestamp
+            self.months[row] = month
+            self.services[row] = service_code
+            self.owners[row] = owner_code
+            self.alive[row] = 1
+        else:
+            row = len(self._records)
+            self._records.append(booking)
+            self.prices.append(booking.service.price)
+            self.times.append(timestamp)
+            self.months.append(month)
+            self.services.append(service_code)
+            self.owners.append(owner_code)
+            self.alive.append(1)
+        key = id(booking)
+        if key in self._rows:
+            self._duplicates.setdefault(key, []).append(row)
+        else:
+            self._rows[key] = row
+
+    def release(self, booking: PetServiceBooking) -> None:
+        """Освобождает строку удаленной записи."""
+        key = id(booking)
+        duplicates = self._duplicates.get(key)
+        if duplicates:
+            row = duplicates.pop()
+            if not duplicates:
+                del self._duplicates[key]
+        else:
+            row = self._rows.pop(key)
+        self._records[row] = None
+        self.alive[row] = 0
+        self._free.append(row)
+
+    def move_owner(self, owner: Owner) -> bool:
+        """Обновляет город владельца. Возвращает True, если город изменился."""
+        code = self.owner_ids.find(owner.owner_id)
+        if code is None:
+            return False
+        city = self.cities.encode(owner.address.city)
+        if self.owner_cities[code] == city:
+            return False
+        self.owner_cities[code] = city
+        return True
+
+    def aggregate(self, group_by: str, low: int, high: int) -> Dict[Any, ReportRow]:
+        """Выручка и число записей с отметкой в [low, high) по значениям поля group_by."""
+        if not len(self):
+            return {}
+        if np is not None:
+            return self._np_aggregate(group_by, low, high)
+        if group_by == "city":
+            keys = map(self.owner_cities.__getitem__, self.owners)
+        else:
+            keys = self._column(group_by)
+        sums: Dict[int, float] = {}
+        counts: Dict[int, int] = {}
+        rows = compress(zip(keys, self.prices, self.times), self.alive)
+        bounded = low > MIN_TIMESTAMP or high < MAX_TIMESTAMP
+        for key, price, timestamp in rows:
+            if bounded and not low <= timestamp < high:
+                continue
+            sums[key] = sums.get(key, 0.0) + price
+            counts[key] = counts.get(key, 0) + 1
+        if group_by == "month":
+            return {month_label(key): (sums[key], counts[key]) for key in sorted(sums)}
+        values = self._values(group_by)
+        return {values[key]: (sums[key], counts[key]) for key in sorted(sums)}
+
+    def _np_aggregate(self, group_by: str, low: int, high: int) -> Dict[Any, ReportRow]:
+        # frombuffer не копирует данные array; копии появляются только при отборе строк маской
+        mask = np.frombuffer(self.alive, dtype=np.bool_)
+        if low > MIN_TIMESTAMP or high < MAX_TIMESTAMP:
+            times = np.frombuffer(self.times, dtype=np.int64)
+            mask = mask & (times >= low) & (times < high)
+        prices = np.frombuffer(self.prices, dtype=np.float64)[mask]
+        if group_by == "city":
+            codes = np.frombuffer(self.owner_cities, dtype=np.int32)[np.frombuffer(self.owners, dtype=np.int32)[mask]]
+        else:
+            codes = np.frombuffer(self._column(group_by), dtype=np.int32)[mask]
+        if not codes.size:
+            return {}
+        base = 0
+        if group_by == "month":
+            # Номера месяцев велики (год * 12), поэтому считаем от первого месяца выборки
+            base = int(codes.min())
+            codes = codes - base
+        sums = np.bincount(codes, weights=prices)
+        counts = np.bincount(codes)
+        present = np.nonzero(counts)[0].tolist()
+        sums, counts = sums.tolist(), counts.tolist()
+        if group_by == "month":
+            return {month_label(code + base): (sums[code], counts[code]) for code in present}
+        values = self._values(group_by)
+        return {values[code]: (sums[code], counts[code]) for code in present}
+
+    def _column(self, group_by: str) -> array:
+        return {"service": self.services, "owner": self.owners, "month": self.months}[group_by]
+
+    def _values(self, group_by: str) -> list:
+        return {"service": self.service_names, "owner": self.owner_ids, "city": self.cities}[group_by].values
+
+
+class RevenueReports:
+    """Отчеты о выручке и использовании услуг по записям PetServiceBooking хранилища.
+
+    Записи копируются в BookingColumns при создании отчетов и далее
+    поддерживаются подписками: на хранилище (добавление и удаление записей)
+    и на реестр (переезд владельца меняет его город). Группировка идет
+    векторно через numpy.bincount, если numpy установлен.
+
+    Результаты кэшируются по запросу (поле группировки и границы дат) и
+    сбрасываются при любом изменении записей на услуги или городов
+    владельцев. Границы — как в EventStore: строки дат или отметки
+    parse_date, диапазон [start, end), None — без ограничения. Например,
+    выручка по городам за 2024 год:
+        reports.revenue_by("city", "2024-01-01", "2025-01-01")
+    """
+
+    def __init__(self, store: EventStore) -> None:
+        self.store = store
+        self.columns = BookingColumns()
+        self._cache: Dict[Tuple[str, int, int], Dict[Any, ReportRow]] = {}
+        self.hits = 0
+        self.misses = 0
+        for booking in store.iter_records(PetServiceBooking):
+            timestamp = store.timestamp(booking.date)
+            self.columns.append(booking, timestamp, month_of(timestamp))
+        store.subscribe(self._on_booking)
+        store.registry.subscribe(self._on_registry)
+
+    def close(self) -> None:
+        """Отписывает отчеты от изменений хранилища и реестра."""
+        self.store.unsubscribe(self._on_booking)
+        self.store.registry.unsubscribe(self._on_registry)
+
+    def report(self, group_by: str, start: Bound = None, end: Bound = None) -> Dict[Any, ReportRow]:
+        """Выручка и число записей на услуги за [start, end) по значениям поля group_by.
+
+        group_by — одно из GROUPS. Месяцы идут по порядку, остальные
+        ключи — в порядке первого появления.
+        """
+        if group_by not in GROUPS:
+            raise InvalidDataError(f"Неизвестное поле отчета: {group_by}. Допустимые: {', '.join(GROUPS)}.")
+        low, high = self.store.bounds(start, end)
+        key = (group_by, low, high)
+        result = self._cache.get(key)
+        if result is None:
+            self.misses += 1
+            result = self._cache[key] = self.columns.aggregate(group_by, low, high) if low < high else {}
+        else:
+            self.hits += 1
+        return dict(result)
+
+    def revenue_by(self, group_by: str, start: Bound = None, end: Bound = None) -> Dict[Any, float]:
+        """Выручка за [start, end) по значениям поля group_by."""
+        return {key: revenue for key, (revenue, _) in self.report(group_by, start, end).items()}
+
+    def usage_by(self, group_by: str, start: Bound = None, end: Bound = None) -> Dict[Any, int]:
+        """Число записей на услуги за [start, end) по значениям поля group_by."""
+        return {key: count for key, (_, count) in self.report(group_by, start, end).items()}
+
+    def total_revenue(self, start: Bound = None, end: Bound = None) -> float:
+        return sum(revenue for revenue, _ in self.report("service", start, end).values())
+
+    def invalidate(self) -> None:
+        """Сбрасывает кэш отчетов."""
+        self._cache.clear()
+
+    def _on_booking(self, operation: str, record: EventRecord, timestamp: int) -> None:
+        if type(record) is not PetServiceBooking:
+            return
+        if operation == "add":
+            self.columns.append(record, timestamp, month_of(timestamp))
+        else:
+            self.columns.release(record)
+        self._cache.clear()
+
+    def _on_registry(self, operation: str, record, old_name: Optional[str] = None) -> None:
+        # Владелец с тем же ID мог быть удален и добавлен заново с другим адресом
+        if operation in ("add_owner", "update_owner") and self.columns.move_owner(record):
+            self._cache.clear()
@@ -0,0 +1,226 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from models import VetVisit, VISIT_DURATION
+from events import EventStore, EventRecord, Bound, MINUTES_PER_DAY, format_timestamp
+from exceptions import InvalidDataError, ScheduleConflictError
+
+
+class Conflict(NamedTuple):
+    """Визит, отклоненный при записи пачкой, и визиты, с которыми он пересекается."""
+    visit: VetVisit
+    existing: List[VetVisit]
+
+
+class _Intervals:
+    """Визиты одного ветеринара — интервалы [start, end), упорядоченные по началу.
+
+    Начала и концы хранятся в array('q'), поиск идет через bisect.
+    Интервалы могут пересекаться (визит можно добавить в хранилище и в
+    обход Scheduler), поэтому поиск пересечений начинается с интервалов,
+    начавшихся не раньше чем за longest минут до запроса: более ранние
+    закончились раньше него.
+    """
+
+    __slots__ = ("starts", "ends", "visits", "longest")
+
+    def __init__(self) -> None:
+        self.starts = array('q')
+        self.ends = array('q')
+        self.visits: List[VetVisit] = []
+        self.longest = 0
+
+    def __len__(self) -> int:
+        return len(self.visits)
+
+    def add(self, start: int, end: int, visit: VetVisit) -> None:
+        index = bisect_right(self.starts, start)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self.visits.insert(index, visit)
+        if end - start > self.longest:
+            self.longest = end - start
+
+    def remove(self, start: int, visit: VetVisit) -> None:
+        index = bisect_left(self.starts, start)
+        while index < len(self.visits) and self.visits[index] is not visit:
+            index += 1
+        if index == len(self.visits):
+            raise ValueError("Визит не найден.")
+        del self.starts[index]
+        del self.ends[index]
+        del self.visits[index]
+
+    def overlapping(self, start: int, end: int) -> List[int]:
+        """Индексы интервалов, пересекающих [start, end)."""
+        low = bisect_right(self.starts, start - self.longest)
+        high = bisect_left(self.starts, end)
+        ends = self.ends
+        return [index for index in range(low, high) if ends[index] > start]
+
+
+class Scheduler:
+    """Расписание ветеринаров по визитам VetVisit хранилища событий.
+
+    Визит занимает [date, date + duration) минут. У каждого ветеринара
+    свой упорядоченный список интервалов, поэтому проверка «свободен ли
+    ветеринар с 14:00 до 14:30» — это O(log n) поиск плюс число
+    пересечений. Поиск ближайшего свободного окна учитывает часы приема
+    [opening, closing) в минутах от полуночи.
+
+    Расписание подписано на хранилище: визиты, добавленные или удаленные
+    в нем (в том числе при удалении питомца), сразу отражаются в
+    расписании. Проверку пересечений выполняют book и book_bulk; визиты,
+    добавленные в хранилище напрямую, записываются как есть.
+    """
+
+    def __init__(self, store: EventStore, opening: int = 9 * 60, closing: int = 21 * 60) -> None:
+        if not 0 <= opening < closing <= MINUTES_PER_DAY:
+            raise InvalidDataError("Часы приема должны укладываться в сутки и начинаться раньше, чем заканчиваются.")
+        self.store = store
+        self.opening = opening
+        self.closing = closing
+        self._by_vet: Dict[int, _Intervals] = {}
+        for visit in store.iter_records(VetVisit):
+            self._insert(visit, store.timestamp(visit.date))
+        store.subscribe(self._on_change)
+
+    def close(self) -> None:
+        """Отписывает расписание от изменений хранилища."""
+        self.store.unsubscribe(self._on_change)
+
+    def conflicts(self, vet_id: int, start: Bound, end: Bound) -> List[VetVisit]:
+        """Визиты ветеринара, пересекающие [start, end), по порядку начала."""
+        intervals = self._intervals(vet_id)
+        if intervals is None:
+            return []
+        low, high = self.store.bounds(start, end)
+        return [intervals.visits[index] for index in intervals.overlapping(low, high)]
+
+    def is_free(self, vet_id: int, start: Bound, end: Bound) -> bool:
+        """Свободен ли ветеринар весь промежуток [start, end)."""
+        return not self.conflicts(vet_id, start, end)
+
+    def book(self, visit: VetVisit) -> None:
+        """Записывает визит, если ветеринар свободен, иначе — ScheduleConflictError."""
+        start = self._check(visit)
+        existing = self.conflicts(visit.veterinarian.vet_id, start, start + visit.duration)
+        if existing:
+            raise ScheduleConflictError(
+                f"Ветеринар {visit.veterinarian.name} занят с {format_timestamp(start)} по "
+                f"{format_timestamp(start + visit.duration)}: пересечение с визитом в {existing[0].date}.")
+        self.store.add_validated(visit, start)
+
+    def book_bulk(self, visits: Iterable[VetVisit]) -> List[Conflict]:
+        """Записывает визиты пачкой, пропуская пересекающиеся.
+
+        Визиты проверяются по порядку, поэтому визит может конфликтовать
+        и с записанным ранее в той же пачке. Если хотя бы один визит
+        неверен (питомец или ветеринар не зарегистрированы, неверная дата
+        или длительность), пачка отклоняется целиком. Возвращает отчет:
+        пропущенные визиты с визитами, которые им помешали.
+        """
+        checked = [(visit, self._check(visit)) for visit in visits]
+        report: List[Conflict] = []
+        for visit, start in checked:
+            intervals = self._by_vet.get(visit.veterinarian.vet_id)
+            if intervals is not None:
+                found = intervals.overlapping(start, start + visit.duration)
+                if found:
+                    report.append(Conflict(visit, [intervals.visits[index] for index in found]))
+                    continue
+            # Визит уже проверен _check, поэтому добавляем его без повторной проверки store.validate
+            self.store.add_validated(visit, start)
+        return report
+
+    def next_free_slot(self, vet_id: int, duration: int = VISIT_DURATION, after: Bound = None) -> int:
+        """Начало ближайшего окна в duration минут у ветеринара не раньше after (по умолчанию — сейчас).
+
+        Окно целиком лежит в часах приема одного дня. Возвращает отметку
+        parse_date (см. format_timestamp).
+        """
+        self._check_duration(duration)
+        return self._next_free(self._intervals(vet_id), self._after(after), duration, None)
+
+    def next_free_slot_any(self, duration: int = VISIT_DURATION, after: Bound = None,
+                           vet_ids: Optional[Iterable[int]] = None) -> Optional[Tuple[int, int]]:
+        """Самое раннее окно в duration минут у любого из ветеринаров vet_ids (по умолчанию — у всех).
+
+        Возвращает (отметка начала, ID ветеринара) или None, если
+        ветеринаров нет. При равном времени выбирается ветеринар, идущий
+        раньше. Поиск у каждого следующего ветеринара останавливается на
+        лучшем уже найденном времени.
+        """
+        self._check_duration(duration)
+        start = self._after(after)
+        earliest = self._working_time(start, duration)
+        best: Optional[Tuple[int, int]] = None
+        if vet_ids is None:
+            vet_ids = [vet.vet_id for vet in self.store.veterinarians]
+        for vet_id in vet_ids:
+            slot = self._next_free(self._intervals(vet_id), start, duration, best[0] if best else None)
+            if slot is not None:
+                best = (slot, vet_id)
+                if slot == earliest:
+                    break
+        return best
+
+    def _next_free(self, intervals: Optional[_Intervals], start: int, duration: int, limit: Optional[int]) -> Optional[int]:
+        """Первое свободное окно с началом в [start, limit) или None."""
+        slot = self._working_time(start, duration)
+        while limit is None or slot < limit:
+            found = intervals.overlapping(slot, slot + duration) if intervals else None
+            if not found:
+                return slot
+            # Окно не раньше конца самого позднего из мешающих визитов
+            slot = self._working_time(max(intervals.ends[index] for index in found), duration)
+        return None
+
+    def _working_time(self, timestamp: int, duration: int) -> int:
+        """Ближайший к timestamp момент, с которого duration минут помещаются в часы приема."""
+        day, minute = divmod(timestamp, MINUTES_PER_DAY)
+        if minute < self.opening:
+            return day * MINUTES_PER_DAY + self.opening
+        if minute + duration > self.closing:
+            return (day + 1) * MINUTES_PER_DAY + self.opening
+        return timestamp
+
+    def _after(self, after: Bound) -> int:
+        if after is None:
+            current = datetime.now()
+            return current.toordinal() * MINUTES_PER_DAY + current.hour * 60 + current.minute
+        return self.store.timestamp(after) if isinstance(after, str) else after
+
+    def _check_duration(self, duration: int) -> None:
+        if not 0 < duration <= self.closing - self.opening:
+            raise InvalidDataError(f"Длительность визита должна быть от 1 до {self.closing - self.opening} минут.")
+
+    def _check(self, visit: VetVisit) -> int:
+        """Проверяет визит перед записью и возвращает отметку его начала."""
+        if visit.duration <= 0:
+            raise InvalidDataError(f"Длительность визита должна быть положительной: {visit.duration}.")
+        return self.store.validate(visit)
+
+    def _intervals(self, vet_id: int) -> Optional[_Intervals]:
+        intervals = self._by_vet.get(vet_id)
+        if intervals is None:
+            self.store.get_veterinarian(vet_id)
+        return intervals
+
+    def _insert(self, visit: VetVisit, start: int) -> None:
+        intervals = self._by_vet.get(visit.veterinarian.vet_id)
+        if intervals is None:
+            intervals = self._by_vet[visit.veterinarian.vet_id] = _Intervals()
+        intervals.add(start, start + visit.duration, visit)
+
+    def _on_change(self, operation: str, record: EventRecord, timestamp: int) -> None:
+        if type(record) is not VetVisit:
+            return
+        if operation == "add":
+            self._insert(record, timestamp)
+        else:
+            intervals = self._by_vet[record.veterinarian.vet_id]
+            intervals.remove(timestamp, record)
+            if not intervals:
+                del self._by_vet[record.veterinarian.vet_id]
@@ -0,0 +1,264 @@
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from math import ceil
+from typing import Callable, Dict, Hashable, List, Optional, Tuple, Union
+from models import Owner, Pet
+from registry import PetRegistry
+
+# Несортированных записей не больше этого вставляются в сортированный список по одной (insort);
+# больше — список сортируется заново, что быстрее для пачек
+_INSORT_LIMIT = 32
+_EMPTY = array('i')
+
+
+def normalize(text: str) -> str:
+    """Ключ поиска: без учета регистра, ё как е, пробелы схлопнуты."""
+    return " ".join(text.casefold().replace("ё", "е").split())
+
+
+def normalize_phone(text: str) -> str:
+    """Ключ поиска телефона: только цифры, без кода страны у российских номеров (+7 или 8).
+
+    Код отбрасывается и у начала номера («8916» -> «916»), чтобы префиксный
+    поиск по неполному номеру находил полные; номера с другим кодом
+    страны («+44…») остаются как есть.
+    """
+    digits = "".join(ch for ch in text if ch.isdigit())
+    if text.lstrip().startswith("+"):
+        return digits[1:] if text.lstrip().startswith("+7") else digits
+    if 2 <= len(digits) <= 11 and digits[0] in "78":
+        return digits[1:]
+    return digits
+
+
+def trigrams(key: str) -> frozenset:
+    """Триграммы ключа с отступами, как в pg_trgm: два пробела в начале и один в конце."""
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class SearchIndex:
+    """Индекс строк для поиска по префиксу и нечеткого поиска с опечатками.
+
+    Каждое значение (например, имя питомца или ID владельца) индексируется
+    по одной строке. Префиксный поиск идет по отсортированному списку
+    ключей: bisect находит начало диапазона ключей с префиксом, как спуск
+    по trie, но без словаря на каждый узел — на миллионе имен trie из
+    dict занимает сотни мегабайт. Новые ключи копятся в отдельном списке
+    и попадают в сортированный при следующем запросе.
+
+    Нечеткий поиск — по триграммам: для каждой триграммы хранится
+    array('i') номеров записей, сходство — доля триграмм запроса Q,
+    которые есть в ключе (|Q ∩ K| / |Q|, а не коэффициент Жаккара:
+    лишние триграммы ключа сходство не снижают). Кандидатов дают только
+    самые редкие триграммы запроса: у ключа со сходством не ниже
+    threshold общих триграмм не меньше ceil(threshold * |Q|), поэтому он
+    содержит хотя бы одну из
+    |Q| - ceil(threshold * |Q|) + 1 самых редких. Удаленные записи
+    остаются в списках триграмм до сжатия индекса, когда их становится
+    больше, чем живых.
+    """
+
+    def __init__(self, key: Callable[[str], str] = normalize, max_postings: int = 250, max_candidates: int = 200) -> None:
+        self._key = key
+        # Из длинного списка триграммы берутся только первые max_postings записей, а проверяется
+        # не больше max_candidates кандидатов с наибольшим числом общих триграмм
+        self.max_postings = max_postings
+        self.max_candidates = max_candidates
+        # Номер записи -> ключ (None для удаленной) и значение
+        self._texts: List[Optional[str]] = []
+        self._values: List[Hashable] = []
+        self._entry_of: Dict[Hashable, int] = {}
+        self._sorted_keys: List[str] = []
+        self._sorted_entries = array('i')
+        self._pending: List[int] = []
+        self._grams: Dict[str, array] = {}
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._entry_of)
+
+    def __contains__(self, value: Hashable) -> bool:
+        return value in self._entry_of
+
+    def set(self, value: Hashable, text: str) -> None:
+        """Индексирует value по строке text, заменяя прежнюю строку значения."""
+        key = self._key(text)
+        entry = self._entry_of.get(value)
+        if entry is not None:
+            if self._texts[entry] == key:
+                return
+            self.remove(value)
+        entry = len(self._texts)
+        self._texts.append(key)
+        self._values.append(value)
+        self._entry_of[value] = entry
+        self._pending.append(entry)
+        for gram in trigrams(key):
+            postings = self._grams.get(gram)
+            if postings is None:
+                postings = self._grams[gram] = array('i')
+            postings.append(entry)
+
+    def remove(self, value: Hashable) -> None:
+        entry = self._entry_of.pop(value)
+        key = self._texts[entry]
+        index = bisect_left(self._sorted_keys, key)
+        while index < len(self._sorted_keys) and self._sorted_keys[index] == key and self._sorted_entries[index] != entry:
+            index += 1
+        if index < len(self._sorted_keys) and self._sorted_entries[index] == entry:
+            del self._sorted_keys[index]
+            del self._sorted_entries[index]
+        else:
+            self._pending.remove(entry)
+        self._texts[entry] = None
+        self._dead += 1
+        if self._dead > len(self._entry_of):
+            self._compact()
+
+    def prefix(self, text: str, limit: int = 10) -> List[Hashable]:
+        """Значения, ключ которых начинается с text, по порядку ключей."""
+        key = self._key(text)
+        if not key:
+            return []
+        self._merge_pending()
+        keys = self._sorted_keys
+        result = []
+        index = bisect_left(keys, key)
+        while index < len(keys) and len(result) < limit and keys[index].startswith(key):
+            result.append(self._values[self._sorted_entries[index]])
+            index += 1
+        return result
+
+    def fuzzy(self, text: str, limit: int = 10, threshold: float = 0.4) -> List[Tuple[Hashable, float]]:
+        """Значения, похожие на text, со сходством от 0 до 1, по убыванию сходства.
+
+        Сходство — доля триграмм запроса, которые есть в ключе, поэтому
+        «бобек» находит «Бобик 12»; при равном сходстве выше ключ, ближе
+        к запросу по длине.
+        """
+        key = self._key(text)
+        if not key:
+            return []
+        query = trigrams(key)
+        need = max(1, ceil(threshold * len(query)))
+        postings = sorted((self._grams.get(gram, _EMPTY) for gram in query), key=len)
+        counts: Counter = Counter()
+        for entries in postings[:len(query) - need + 1]:
+            counts.update(entries if len(entries) <= self.max_postings else entries[:self.max_postings])
+        if len(counts) > self.max_candidates:
+            # sorted устойчив и на таких размерах быстрее heapq.nlargest
+            candidates = sorted(counts, key=counts.__getitem__, reverse=True)[:self.max_candidates]
+        else:
+            candidates = counts
+        scored = []
+        for entry in candidates:
+            candidate = self._texts[entry]
+            if candidate is None:
+                continue
+            # Триграмма есть в ключе, если она — подстрока ключа с теми же отступами
+            padded = f"  {candidate} "
+            common = len([gram for gram in query if gram in padded])
+            if common >= need:
+                scored.append((-common, abs(len(candidate) - len(key)), candidate, entry))
+        return [(self._values[entry], -common / len(query)) for common, _, _, entry in heapq.nsmallest(limit, scored)]
+
+    def search(self, text: str, limit: int = 10) -> List[Hashable]:
+        """Сначала совпадения по префиксу, затем похожие значения — не больше limit."""
+        result = self.prefix(text, limit)
+        if len(result) < limit:
+            seen = set(result)
+            for value, _ in self.fuzzy(text, limit):
+                if value not in seen and len(result) < limit:
+                    result.append(value)
+        return result
+
+    def _merge_pending(self) -> None:
+        pending = self._pending
+        if not pending:
+            return
+        texts = self._texts
+        if len(pending) <= _INSORT_LIMIT:
+            for entry in pending:
+                index = bisect_right(self._sorted_keys, texts[entry])
+                self._sorted_keys.insert(index, texts[entry])
+                self._sorted_entries.insert(index, entry)
+        else:
+            # Сортированная часть и отсортированные новые записи — две серии, sort сливает их за O(n)
+            entries = list(self._sorted_entries)
+            entries.extend(sorted(pending, key=texts.__getitem__))
+            entries.sort(key=texts.__getitem__)
+            self._sorted_keys = [texts[entry] for entry in entries]
+            self._sorted_entries = array('i', entries)
+        self._pending = []
+
+    def _compact(self) -> None:
+        """Перестраивает индекс без удаленных записей."""
+        live = [(self._values[entry], self._texts[entry]) for entry in sorted(self._entry_of.values())]
+        self._texts, self._values, self._entry_of = [], [], {}
+        self._sorted_keys, self._sorted_entries = [], array('i')
+        self._pending, self._grams, self._dead = [], {}, 0
+        for value, key in live:
+            # Ключи уже нормализованы, нормализация идемпотентна
+            self.set(value, key)
+
+
+class RegistrySearch:
+    """Поиск питомцев по имени и владельцев по имени и телефону.
+
+    Индексы строятся по текущему содержимому реестра и поддерживаются
+    подпиской на его изменения: добавление, переименование и удаление
+    питомцев, изменение имени и телефона и удаление владельцев.
+    """
+
+    def __init__(self, registry: PetRegistry) -> None:
+        self.registry = registry
+        self.pets = SearchIndex()
+        self.owner_names = SearchIndex()
+        self.phones = SearchIndex(normalize_phone)
+        for owner in registry.iter_owners():
+            self._add_owner(owner)
+        for pet in registry.iter_pets():
+            self.pets.set(pet.name, pet.name)
+        registry.subscribe(self._on_change)
+
+    def close(self) -> None:
+        """Отписывает поиск от изменений реестра."""
+        self.registry.unsubscribe(self._on_change)
+
+    def find_pets(self, text: str, limit: int = 10) -> List[Pet]:
+        """Питомцы с именем, начинающимся с text, затем питомцы с похожими именами."""
+        return [self.registry.get_pet(name) for name in self.pets.search(text, limit)]
+
+    def find_owners(self, text: str, limit: int = 10) -> List[Owner]:
+        """Владельцы по имени или, если в text есть цифры, по телефону."""
+        if normalize_phone(text):
+            owner_ids = self.phones.search(text, limit)
+        else:
+            owner_ids = self.owner_names.search(text, limit)
+        return [self.registry.get_owner(owner_id) for owner_id in owner_ids]
+
+    def suggest_pets(self, text: str, limit: int = 5) -> List[str]:
+        """Имена питомцев для подсказки «возможно, вы имели в виду»."""
+        return self.pets.search(text, limit)
+
+    def _add_owner(self, owner: Owner) -> None:
+        self.owner_names.set(owner.owner_id, owner.name)
+        self.phones.set(owner.owner_id, owner.phone)
+
+    def _on_change(self, operation: str, record: Union[Owner, Pet], old_name: Optional[str] = None) -> None:
+        if operation in ("add_owner", "update_owner"):
+            self._add_owner(record)
+        elif operation == "delete_owner":
+            self.owner_names.remove(record.owner_id)
+            self.phones.remove(record.owner_id)
+        elif operation == "add_pet":
+            self.pets.set(record.name, record.name)
+        elif operation == "update_pet":
+            if old_name != record.name:
+                self.pets.remove(old_name)
+                self.pets.set(record.name, record.name)
+        elif operation == "delete_pet":
+            self.pets.remove(record.name)
@@ -0,0 +1,213 @@
+import json
+import os
+from typing import Dict, Generic, List, Optional, Set, TypeVar
+from registry import PetRegistry, ChangeTracker, DELETED
+from storage import _owner_from_json, _owner_to_json, _pet_from_json, _pet_to_json
+from exceptions import FileProcessingError, InvalidFileFormatError
+
+# Сегментированное хранилище реестра — каталог с файлами:
+#
+#   manifest.json         {"version", "segment_size", "owner_segments", "pet_segments"}
+#   owners-000000.json    JSON-массив из segment_size записей владельцев
+#   pets-000000.json      то же для питомцев
+#
+# Каждая запись занимает слот; слот N лежит в сегменте N // segment_size на
+# позиции N % segment_size. Свободные слоты (после удалений) хранятся как null
+# и занимаются новыми записями. Записи в сегментах — те же объекты, что в
+# save_to_json.
+SEGMENTS_VERSION = 1
+MANIFEST = "manifest.json"
+
+Key = TypeVar("Key", int, str)
+
+
+class _SegmentTable(Generic[Key]):
+    """Раскладка записей одного вида по слотам и список грязных сегментов."""
+
+    def __init__(self, prefix: str, segment_size: int) -> None:
+        self.prefix = prefix
+        self.segment_size = segment_size
+        self.slots: Dict[Key, int] = {}
+        self.keys: List[Optional[Key]] = []
+        self.dirty: Set[int] = set()
+        self._free: List[int] = []
+
+    @property
+    def segment_count(self) -> int:
+        return -(-len(self.keys) // self.segment_size)
+
+    def load_segment(self, segment: int, keys: List[Optional[Key]]) -> None:
+        # Короткий сегмент в середине дополняется свободными слотами
+        start = segment * self.segment_size
+        if len(self.keys) < start:
+            self._free.extend(range(len(self.keys), start))
+            self.keys.extend([None] * (start - len(self.keys)))
+        for slot, key in enumerate(keys, start):
+            self.keys.append(key)
+            if key is None:
+                self._free.append(slot)
+            else:
+                self.slots[key] = slot
+
+    def touch(self, key: Key) -> None:
+        """Помечает сегмент записи грязным; новой записи выделяет слот."""
+        slot = self.slots.get(key)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+                self.keys[slot] = key
+            else:
+                slot = len(self.keys)
+                self.keys.append(key)
+            self.slots[key] = slot
+        self.dirty.add(slot // self.segment_size)
+
+    def remove(self, key: Key) -> None:
+        slot = self.slots.pop(key, None)
+        if slot is not None:
+            self.keys[slot] = None
+            self._free.append(slot)
+            self.dirty.add(slot // self.segment_size)
+
+    def segment_keys(self, segment: int) -> List[Optional[Key]]:
+        return self.keys[segment * self.segment_size:(segment + 1) * self.segment_size]
+
+    def filename(self, directory: str, segment: int) -> str:
+        return os.path.join(directory, f"{self.prefix}-{segment:06d}.json")
+
+
+def _write_json(filename: str, data) -> None:
+    """Пишет JSON во временный файл и атомарно заменяет им filename."""
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, 'w', encoding='utf-8') as f:
+        # json.dumps с C-ускорителем заметно быстрее потокового json.dump
+        f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+    os.replace(temp_filename, filename)
+
+
+class SegmentedStore:
+    """Реестр, сохраняемый в каталог сегментов с инкрементальной записью.
+
+    open() загружает все сегменты и начинает отслеживать изменения реестра
+    (ChangeTracker). save() переписывает только сегменты, в которых есть
+    добавленные, измененные или удаленные с прошлого сохранения записи,
+    поэтому его время зависит от числа изменений, а не от размера реестра.
+    Каждый сегмент заменяется атомарно, но сохранение нескольких сегментов
+    не атомарно в целом; для защиты от сбоев используйте journal.py.
+
+    Порядок записей после загрузки — порядок слотов: новые записи могут
+    занять место удаленных.
+    """
+
+    def __init__(self, directory: str, segment_size: int = 1024, registry: Optional[PetRegistry] = None) -> None:
+        self.directory = directory
+        self.segment_size = segment_size
+        self.registry = registry if registry is not None else PetRegistry()
+        self.tracker: Optional[ChangeTracker] = None
+        self._owners: _SegmentTable[int] = _SegmentTable("owners", segment_size)
+        self._pets: _SegmentTable[str] = _SegmentTable("pets", segment_size)
+
+    def open(self) -> PetRegistry:
+        manifest_file = os.path.join(self.directory, MANIFEST)
+        try:
+            if os.path.exists(manifest_file):
+                self._load(manifest_file)
+        except FileProcessingError:
+            raise
+        except Exception as e:
+            raise FileProcessingError(f"Ошибка при загрузке сегментов: {e}")
+
+        # Записи, которых нет в сегментах (реестр был заполнен заранее), попадут в первое сохранение
+        for owner_id in self.registry.owner_map():
+            if owner_id not in self._owners.slots:
+                self._owners.touch(owner_id)
+        for pet in self.registry.pets:
+            if pet.name not in self._pets.slots:
+                self._pets.touch(pet.name)
+        self.tracker = ChangeTracker(self.registry)
+        return self.registry
+
+    def save(self) -> int:
+        """Переписывает грязные сегменты. Возвращает число записанных файлов сегментов."""
+        for owner_id, state in self.tracker.owners.items():
+            if state == DELETED:
+                self._owners.remove(owner_id)
+            else:
+                self._owners.touch(owner_id)
+        for name, state in self.tracker.pets.items():
+            if state == DELETED:
+                self._pets.remove(name)
+            else:
+                self._pets.touch(name)
+
+        owners = self.registry.owner_map()
+        written = 0
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for table, encode, lookup in ((self._owners, _owner_to_json, owners.__getitem__),
+                                          (self._pets, _pet_to_json, self.registry.get_pet)):
+                for segment in sorted(table.dirty):
+                    records = [None if key is None else encode(lookup(key)) for key in table.segment_keys(segment)]
+                    _write_json(table.filename(self.directory, segment), records)
+                    written += 1
+            if written:
+                _write_json(os.path.join(self.directory, MANIFEST), {
+                    "version": SEGMENTS_VERSION,
+                    "segment_size": self.segment_size,
+                    "owner_segments": self._owners.segment_count,
+                    "pet_segments": self._pets.segment_count,
+                })
+        except Exception as e:
+            raise FileProcessingError(f"Ошибка при сохранении сегментов: {e}")
+
+        self._owners.dirty.clear()
+        self._pets.dirty.clear()
+        self.tracker.clear()
+        return written
+
+    def close(self) -> None:
+        if self.tracker is not None:
+            self.tracker.close()
+            self.tracker = None
+
+    def __enter__(self) -> PetRegistry:
+        return self.open()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _load(self, manifest_file: str) -> None:
+        with open(manifest_file, encoding='utf-8') as f:
+            try:
+                manifest = json.load(f)
+            except json.JSONDecodeError as e:
+                raise InvalidFileFormatError(f"Файл '{manifest_file}' не является корректным JSON файлом. Ошибка: {e}")
+        if manifest.get("version") != SEGMENTS_VERSION:
+            raise InvalidFileFormatError(f"Неподдерживаемая версия сегментов {manifest.get('version')}.")
+        # Размер сегмента задается при создании хранилища и дальше не меняется
+        self.segment_size = self._owners.segment_size = self._pets.segment_size = manifest["segment_size"]
+
+        interner = self.registry.interner
+        for segment in range(manifest["owner_segments"]):
+            records = self._read_segment(self._owners.filename(self.directory, segment))
+            owners = [None if data is None else _owner_from_json(data, interner) for data in records]
+            self._owners.load_segment(segment, [None if owner is None else owner.owner_id for owner in owners])
+            self.registry.add_owners_bulk(owner for owner in owners if owner is not None)
+
+        owner_map = self.registry.owner_map()
+        for segment in range(manifest["pet_segments"]):
+            records = self._read_segment(self._pets.filename(self.directory, segment))
+            pets = [None if data is None else _pet_from_json(data, owner_map, interner) for data in records]
+            self._pets.load_segment(segment, [None if pet is None else pet.name for pet in pets])
+            self.registry.add_pets_bulk(pet for pet in pets if pet is not None)
+
+    @staticmethod
+    def _read_segment(filename: str) -> list:
+        with open(filename, encoding='utf-8') as f:
+            try:
+                records = json.load(f)
+            except json.JSONDecodeError as e:
+                raise InvalidFileFormatError(f"Файл '{filename}' не является корректным JSON файлом. Ошибка: {e}")
+        if not isinstance(records, list):
+            raise InvalidFileFormatError(f"Файл '{filename}' не является сегментом реестра.")
+        return records
@@ -0,0 +1,425 @@
+"""HTTP/JSON-сервис для PetRegistry на asyncio.
+
+Запуск:
+    python server.py [--host 127.0.0.1] [--port 8080] [--load example_data.json] [--data-dir .]
+
+Маршруты (тела запросов и ответов — JSON в формате записей save_to_json):
+
+    GET    /owners?offset=0&limit=100     список владельцев с пагинацией
+    POST   /owners                        добавить владельца
+    GET    /owners/{id}                   владелец
+    PATCH  /owners/{id}                   изменить name, phone, address
+    DELETE /owners/{id}                   удалить владельца и его питомцев
+    GET    /owners/{id}/pets              питомцы владельца
+    GET    /pets?offset=0&limit=100       список питомцев; с параметрами species,
+                                          breed, city, age_from, age_to — find_pets
+    POST   /pets                          добавить питомца
+    GET    /pets/{name}                   питомец
+    PATCH  /pets/{name}                   изменить name, age, breed, house
+    DELETE /pets/{name}                   удалить питомца
+    GET    /stats                         статистика реестра (PetRegistry.stats)
+    POST   /save, POST /load              {"format": "json" | "xml" | "snapshot" | "sqlite", "filename": ...}
+
+Файлы /save и /load — только внутри каталога данных (--data-dir, по
+умолчанию текущий): filename задается относительно него, абсолютные
+пути и «..» отклоняются с кодом 400.
+
+Операции с реестром выполняются в потоке цикла событий и поэтому не
+требуют блокировок. Сохранение и загрузка файлов идут в пуле потоков:
+сохранение читает реестр, поэтому на это время изменения ждут. Загрузка
+читает файл в отдельный реестр и там же готовит новые записи, а цикл
+событий только добавляет их в основной реестр пачками по MERGE_BATCH,
+обслуживая между пачками другие запросы.
+"""
+import argparse
+import asyncio
+import json
+import os
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+from models import Owner, Pet
+from registry import PetRegistry
+from storage import save_to_json, load_from_json, save_to_xml, load_from_xml, save_to_snapshot, load_from_snapshot
+from storage import save_to_sqlite, load_from_sqlite, _owner_to_json, _pet_to_json
+from exceptions import (PetNotFoundError, OwnerNotFoundError, InvalidDataError, FileProcessingError,
+                        EmptyInputError, InvalidFileFormatError, InvalidNumberError)
+
+# Способы сохранения и загрузки, доступные через /save и /load
+STORAGES = {
+    "json": (save_to_json, load_from_json),
+    "xml": (save_to_xml, load_from_xml),
+    "snapshot": (save_to_snapshot, load_from_snapshot),
+    "sqlite": (save_to_sqlite, load_from_sqlite),
+}
+# Коды ответа для исключений реестра
+STATUSES = (
+    ((PetNotFoundError, OwnerNotFoundError), 404),
+    ((InvalidDataError, EmptyInputError, InvalidNumberError, InvalidFileFormatError), 400),
+    ((FileProcessingError,), 500),
+)
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+MAX_BODY = 16 * 2 ** 20
+# Записей за один шаг цикла событий при объединении загруженного файла с реестром
+MERGE_BATCH = 5000
+
+
+class HTTPError(Exception):
+    """Ошибка запроса с кодом ответа HTTP."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _int(value, what: str) -> int:
+    if type(value) is int:
+        return value
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        raise InvalidNumberError(f"Ошибка: нужно ввести цифры для {what}.")
+
+
+def _text(data: dict, key: str) -> str:
+    value = data.get(key)
+    if not isinstance(value, str):
+        raise InvalidDataError(f"Поле {key} должно быть строкой.")
+    return value
+
+
+def _optional_text(data: dict, key: str) -> Optional[str]:
+    return None if data.get(key) is None else _text(data, key)
+
+
+def _object(data: dict, key: str) -> Optional[dict]:
+    value = data.get(key)
+    if value is not None and not isinstance(value, dict):
+        raise InvalidDataError(f"Поле {key} должно быть объектом.")
+    return value
+
+
+def _content_length(value: Optional[str]) -> int:
+    """Длина тела из заголовка Content-Length: неотрицательное целое не больше MAX_BODY."""
+    if value is None or value == "":
+        return 0
+    try:
+        # isdecimal отсекает знак, пробелы и «_», которые принимает int()
+        if not value.isdecimal():
+            raise ValueError(value)
+        length = int(value)
+    except ValueError:
+        raise HTTPError(400, f"Неверный заголовок Content-Length: '{value}'.")
+    if length > MAX_BODY:
+        raise HTTPError(413, "Слишком большое тело запроса.")
+    return length
+
+
+def _merge_records(registry: PetRegistry, loaded: PetRegistry) -> Tuple[List[Owner], List[Pet]]:
+    """Новые для registry записи loaded с пропуском дубликатов, как load_from_*.
+
+    Записи пересоздаются на общих экземплярах registry.interner, питомцы
+    ссылаются на владельцев registry или на новых владельцев из loaded.
+    Выполняется в пуле потоков, пока изменения registry ждут _write_lock.
+    """
+    interner = registry.interner
+    existing = registry.owner_map()
+    owners: Dict[int, Owner] = {}
+    for o in loaded.iter_owners():
+        if o.owner_id not in existing:
+            owners[o.owner_id] = Owner(o.owner_id, o.name, o.phone,
+                                       interner.address(o.address.street, o.address.city, o.address.postal_code))
+    known_pets = registry.pet_map()
+    pets = [
+        Pet(p.name, p.age, interner.breed(p.breed.name, p.breed.species),
+            interner.house(p.house.house_type, p.house.house_size),
+            existing.get(p.owner.owner_id) or owners[p.owner.owner_id])
+        for p in loaded.iter_pets() if p.name not in known_pets
+    ]
+    return list(owners.values()), pets
+
+
+async def _add_in_batches(add, records: list) -> int:
+    """Добавляет records пачками по MERGE_BATCH, отдавая управление циклу событий между пачками."""
+    added = 0
+    for start in range(0, len(records), MERGE_BATCH):
+        added += add(records[start:start + MERGE_BATCH])
+        await asyncio.sleep(0)
+    return added
+
+
+class RegistryService:
+    """Обработчики маршрутов поверх одного PetRegistry.
+
+    /save и /load работают только с файлами внутри каталога data_dir.
+    """
+
+    def __init__(self, registry: PetRegistry, data_dir: str = ".") -> None:
+        self.registry = registry
+        self.data_dir = os.path.realpath(data_dir)
+        # Пока файл сохраняется в другом потоке, изменения реестра ждут
+        self._write_lock = asyncio.Lock()
+
+    async def handle(self, method: str, target: str, body: bytes) -> Tuple[int, object]:
+        """Выполняет запрос и возвращает (код ответа, объект для JSON)."""
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        data = None
+        if body:
+            try:
+                data = json.loads(body)
+            except ValueError as e:
+                raise HTTPError(400, f"Тело запроса не является JSON: {e}")
+            if not isinstance(data, dict):
+                raise HTTPError(400, "Тело запроса должно быть объектом JSON.")
+        elif method in ("POST", "PATCH"):
+            data = {}
+
+        if method == "GET":
+            return 200, self._get(parts, query)
+        if parts in (["save"], ["load"]) and method == "POST":
+            return 200, await self._file(parts[0], data)
+        async with self._write_lock:
+            return self._change(method, parts, data)
+
+    def _get(self, parts, query: Dict[str, str]):
+        registry = self.registry
+        if parts == ["owners"]:
+            return self._page(registry.iter_owners(), registry.owner_count, query, _owner_to_json)
+        if parts == ["pets"]:
+            filters = {key: query[key] for key in ("species", "breed", "city") if key in query}
+            if "age_from" in query or "age_to" in query:
+                filters["age_between"] = (_int(query.get("age_from", 0), "возраста питомца"),
+                                          _int(query.get("age_to", 10 ** 9), "возраста питомца"))
+            if filters:
+                found = registry.find_pets(**filters)
+                return self._page(iter(found), len(found), query, _pet_to_json)
+            return self._page(registry.iter_pets(), registry.pet_count, query, _pet_to_json)
+        if len(parts) == 2 and parts[0] == "owners":
+            return _owner_to_json(registry.get_owner(_int(parts[1], "ID владельца")))
+        if len(parts) == 3 and parts[0] == "owners" and parts[2] == "pets":
+            return [_pet_to_json(pet) for pet in registry.pets_of(_int(parts[1], "ID владельца"))]
+        if len(parts) == 2 and parts[0] == "pets":
+            return _pet_to_json(registry.get_pet(parts[1]))
+        if parts == ["stats"]:
+            return registry.stats().to_dict()
+        raise HTTPError(404, f"Маршрут /{'/'.join(parts)} не найден.")
+
+    @staticmethod
+    def _page(records, total: int, query: Dict[str, str], encode) -> dict:
+        offset = max(_int(query.get("offset", 0), "offset"), 0)
+        limit = min(max(_int(query.get("limit", DEFAULT_LIMIT), "limit"), 0), MAX_LIMIT)
+        return {"total": total, "offset": offset, "limit": limit,
+                "items": [encode(record) for record in islice(records, offset, offset + limit)]}
+
+    def _change(self, method: str, parts, data: Optional[dict]) -> Tuple[int, object]:
+        registry = self.registry
+        interner = registry.interner
+        if method == "POST" and parts == ["owners"]:
+            address = _object(data, "address") or {}
+            owner = Owner(_int(data.get("owner_id"), "ID владельца"), _text(data, "name"), _text(data, "phone"),
+                          interner.address(_text(address, "street"), _text(address, "city"), _text(address, "postal_code")))
+            registry.add_owner(owner)
+            return 201, _owner_to_json(owner)
+        if method == "POST" and parts == ["pets"]:
+            breed = _object(data, "breed") or {}
+            house = _object(data, "house") or {}
+            pet = Pet(_text(data, "name"), _int(data.get("age"), "возраста питомца"),
+                      interner.breed(_text(breed, "name"), _text(breed, "species")),
+                      interner.house(_text(house, "house_type"), _text(house, "house_size")),
+                      registry.get_owner(_int(data.get("owner_id"), "ID владельца")))
+            registry.add_pet(pet)
+            return 201, _pet_to_json(registry.get_pet(pet.name))
+        if len(parts) == 2 and parts[0] == "owners":
+            owner_id = _int(parts[1], "ID владельца")
+            if method == "PATCH":
+                address = _object(data, "address")
+                registry.update_owner(
+                    owner_id, _optional_text(data, "name"), _optional_text(data, "phone"),
+                    None if address is None else interner.address(_text(address, "street"), _text(address, "city"), _text(address, "postal_code")),
+                )
+                return 200, _owner_to_json(registry.get_owner(owner_id))
+            if method == "DELETE":
+                registry.delete_owner(owner_id)
+                return 200, {"deleted": owner_id}
+        if len(parts) == 2 and parts[0] == "pets":
+            name = parts[1]
+            if method == "PATCH":
+                breed = _object(data, "breed")
+                house = _object(data, "house")
+                registry.update_pet(
+                    name, _optional_text(data, "name"),
+                    None if data.get("age") is None else _int(data["age"], "возраста питомца"),
+                    None if breed is None else interner.breed(_text(breed, "name"), _text(breed, "species")),
+                    None if house is None else interner.house(_text(house, "house_type"), _text(house, "house_size")),
+                )
+                return 200, _pet_to_json(registry.get_pet(data.get("name") or name))
+            if method == "DELETE":
+                registry.delete_pet(name)
+                return 200, {"deleted": name}
+        if parts and parts[0] in ("owners", "pets", "save", "load"):
+            raise HTTPError(405, f"Метод {method} не поддерживается для /{'/'.join(parts)}.")
+        raise HTTPError(404, f"Маршрут /{'/'.join(parts)} не найден.")
+
+    async def _file(self, action: str, data: dict) -> dict:
+        storage = STORAGES.get(data.get("format", "json"))
+        if storage is None:
+            raise InvalidDataError(f"Неизвестный формат: {data.get('format')}. Доступны: {', '.join(STORAGES)}.")
+        filename = data.get("filename")
+        if not filename or not isinstance(filename, str):
+            raise EmptyInputError("Имя файла не может быть пустым.")
+        path = self._path(filename)
+        save, load = storage
+        loop = asyncio.get_running_loop()
+        if action == "save":
+            async with self._write_lock:
+                await loop.run_in_executor(None, save, self.registry, path)
+            return {"saved": filename, "owners": self.registry.owner_count, "pets": self.registry.pet_count}
+
+        # Файл разбирается в отдельный реестр, и записи для объединения строятся вне цикла
+        # событий; в цикле они только добавляются в реестр пачками
+        loaded = PetRegistry()
+        await loop.run_in_executor(None, load, loaded, path)
+        async with self._write_lock:
+            owners, pets = await loop.run_in_executor(None, _merge_records, self.registry, loaded)
+            owners_added = await _add_in_batches(self.registry.add_owners_bulk, owners)
+            pets_added = await _add_in_batches(self.registry.add_pets_bulk, pets)
+        return {"loaded": filename, "owners_added": owners_added, "pets_added": pets_added}
+
+    def _path(self, filename: str) -> str:
+        """Путь к файлу filename внутри data_dir."""
+        parts = filename.replace("\\", "/").split("/")
+        if os.path.isabs(filename) or os.path.splitdrive(filename)[0] or ".." in parts or "\0" in filename:
+            raise InvalidDataError(f"Имя файла должно быть относительным путем внутри каталога данных без «..»: '{filename}'.")
+        path = os.path.realpath(os.path.join(self.data_dir, filename))
+        # Символические ссылки тоже не должны выводить за пределы каталога данных
+        if os.path.commonpath([self.data_dir, path]) != self.data_dir or path == self.data_dir:
+            raise InvalidDataError(f"Файл '{filename}' находится вне каталога данных.")
+        return path
+
+
+class RegistryServer:
+    """HTTP/1.1-сервер с keep-alive поверх asyncio.start_server."""
+
+    def __init__(self, registry: PetRegistry, host: str = "127.0.0.1", port: int = 8080, data_dir: str = ".") -> None:
+        self.service = RegistryService(registry, data_dir)
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._client, self.host, self.port)
+        # При port=0 система выбирает свободный порт
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        self._server.close()
+        # Закрываем открытые keep-alive соединения: их обработчики завершатся по концу потока
+        for writer in self._clients.values():
+            writer.close()
+        await asyncio.gather(*self._clients, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._clients[task] = writer
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                except ValueError:  # строка длиннее лимита буфера StreamReader
+                    await self._respond(writer, 400, {"error": "Слишком длинная строка запроса."}, False)
+                    break
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("utf-8").split()
+                except ValueError:  # в том числе UnicodeDecodeError
+                    await self._respond(writer, 400, {"error": "Неверная строка запроса."}, False)
+                    break
+                headers = {}
+                try:
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                except ValueError:
+                    await self._respond(writer, 431, {"error": "Слишком длинный заголовок запроса."}, False)
+                    break
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+                try:
+                    length = _content_length(headers.get("content-length"))
+                except HTTPError as e:
+                    # Границу тела определить нельзя, поэтому соединение закрывается
+                    await self._respond(writer, e.status, {"error": str(e)}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    status, payload = await self.service.handle(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    status = next((code for types, code in STATUSES if isinstance(e, types)), 500)
+                    payload = {"error": str(e)}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self._clients[task]
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--load", help="JSON файл, загружаемый при запуске")
+    parser.add_argument("--data-dir", default=".", help="каталог для файлов /save и /load")
+    args = parser.parse_args()
+
+    registry = PetRegistry()
+    if args.load:
+        load_from_json(registry, args.load)
+    server = RegistryServer(registry, args.host, args.port, args.data_dir)
+
+    async def run() -> None:
+        await server.start()
+        print(f"Сервис реестра слушает http://{args.host}:{server.port}", flush=True)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from models import Owner, Pet
+from registry import PetRegistry
+from interning import ModelInterner
+from storage import save_to_json, save_to_xml
+from storage import _owner_from_json, _owner_from_xml, _pet_fields_from_json, _pet_fields_from_xml, _pet_from_fields
+from exceptions import FileProcessingError, InvalidFileFormatError, InvalidDataError
+
+# Шардированное хранилище — каталог с файлами:
+#
+#   manifest.json                 {"version", "format", "generation", "files", "owners", "pets"}
+#   shard-1-000.json (или .xml)   обычный файл save_to_json/save_to_xml
+#
+# Имена шардов содержат номер поколения: каждое сохранение пишет новые
+# файлы, на которые ссылается только новый манифест, и удаляет файлы
+# прежнего поколения лишь после его атомарной замены. Поэтому сбой во
+# время сохранения оставляет целым прежний набор шардов.
+#
+# Владелец попадает в шард owner_id % shards, питомец — в шард своего
+# владельца. Загрузчик при этом не рассчитывает на локальность: ссылки на
+# владельцев разрешаются после объединения всех шардов.
+SHARDS_VERSION = 1
+MANIFEST = "manifest.json"
+FORMATS = ("json", "xml")
+# Файлы шардов любого поколения, в том числе без номера поколения (shard-000.json)
+_SHARD_NAME = re.compile(r"shard-(\d+-)?\d{3}\.(json|xml)")
+
+# Записи передаются между процессами кортежами: их дешевле сериализовать,
+# чем модели, и они не тянут за собой общие объекты Address/Breed/PetHouse.
+OwnerFields = Tuple[int, str, str, str, str, str]
+PetFields = Tuple[str, int, str, str, str, str, int]
+
+
+class _ShardRecords:
+    """Минимальный «реестр» для save_to_json/save_to_xml: только списки owners и pets."""
+
+    def __init__(self, owners: List[Owner], pets: List[Pet]) -> None:
+        self.owners = owners
+        self.pets = pets
+
+
+def _owner_fields(owner: Owner) -> OwnerFields:
+    address = owner.address
+    return (owner.owner_id, owner.name, owner.phone, address.street, address.city, address.postal_code)
+
+
+def _pet_fields(pet: Pet) -> PetFields:
+    return (pet.name, pet.age, pet.breed.name, pet.breed.species, pet.house.house_type, pet.house.house_size, pet.owner.owner_id)
+
+
+def _owners_from_fields(rows: List[OwnerFields], interner: ModelInterner) -> List[Owner]:
+    return [Owner(owner_id, name, phone, interner.address(street, city, postal_code))
+            for owner_id, name, phone, street, city, postal_code in rows]
+
+
+def _write_shard(filename: str, fmt: str, owner_rows: List[OwnerFields], pet_rows: List[PetFields]) -> None:
+    """Пишет один шард (выполняется в процессе пула)."""
+    interner = ModelInterner()
+    owners = _owners_from_fields(owner_rows, interner)
+    by_id = {owner.owner_id: owner for owner in owners}
+    pets = [_pet_from_fields(fields, by_id, interner) for fields in pet_rows]
+    save = save_to_json if fmt == "json" else save_to_xml
+    save(_ShardRecords(owners, pets), filename)
+
+
+def _read_shard(filename: str, fmt: str) -> Tuple[List[OwnerFields], List[PetFields]]:
+    """Разбирает один шард в кортежи полей (выполняется в процессе пула)."""
+    interner = ModelInterner()
+    try:
+        if fmt == "json":
+            with open(filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            owners = [_owner_fields(_owner_from_json(owner_data, interner)) for owner_data in data.get('owners', [])]
+            pets = [_pet_fields_from_json(pet_data) for pet_data in data.get('pets', [])]
+        else:
+            root = ET.parse(filename).getroot()
+            owners = [_owner_fields(_owner_from_xml(owner_elem, interner)) for owner_elem in root.findall("Owner")]
+            pets = [_pet_fields_from_xml(pet_elem) for pet_elem in root.findall("Pet")]
+    except (json.JSONDecodeError, ET.ParseError) as e:
+        raise InvalidFileFormatError(f"Шард '{filename}' поврежден. Ошибка: {e}")
+    return owners, pets
+
+
+def _run(function, arguments: List[tuple], workers: Optional[int]) -> list:
+    """Выполняет function для каждого набора аргументов; при workers=1 — без пула процессов."""
+    if workers == 1 or len(arguments) <= 1:
+        return [function(*args) for args in arguments]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, *zip(*arguments)))
+
+
+def _generation(directory: str) -> int:
+    """Поколение шардов из манифеста directory (0, если манифеста нет или он не читается)."""
+    try:
+        with open(os.path.join(directory, MANIFEST), 'r', encoding='utf-8') as f:
+            generation = json.load(f).get("generation", 0)
+    except (OSError, ValueError, AttributeError):
+        return 0
+    return generation if isinstance(generation, int) and generation >= 0 else 0
+
+
+def save_sharded(registry: PetRegistry, directory: str, shards: int = 8, fmt: str = "json", workers: Optional[int] = None) -> None:
+    """Сохраняет реестр в shards файлов формата fmt ("json" или "xml"), записывая их параллельно.
+
+    workers — число процессов (None — по числу процессоров). Шарды
+    пишутся под именами нового поколения, манифест заменяется атомарно,
+    и только после этого удаляются шарды прежнего поколения.
+    """
+    if fmt not in FORMATS:
+        raise InvalidDataError(f"Неизвестный формат шардов: {fmt}.")
+    if shards < 1:
+        raise InvalidDataError("Число шардов должно быть положительным.")
+    owner_rows: List[List[OwnerFields]] = [[] for _ in range(shards)]
+    pet_rows: List[List[PetFields]] = [[] for _ in range(shards)]
+    for owner in registry.owners:
+        owner_rows[owner.owner_id % shards].append(_owner_fields(owner))
+    for pet in registry.pets:
+        pet_rows[pet.owner.owner_id % shards].append(_pet_fields(pet))
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        generation = _generation(directory) + 1
+        files = [f"shard-{generation}-{shard:03d}.{fmt}" for shard in range(shards)]
+        _run(_write_shard, [(os.path.join(directory, name), fmt, owner_rows[shard], pet_rows[shard])
+                            for shard, name in enumerate(files)], workers)
+        # Манифест пишется последним: до его замены загрузчик видит прежний набор шардов,
+        # а файлы нового поколения ни на что не ссылаются
+        manifest = {"version": SHARDS_VERSION, "format": fmt, "generation": generation, "files": files,
+                    "owners": sum(map(len, owner_rows)), "pets": sum(map(len, pet_rows))}
+        temp_filename = os.path.join(directory, MANIFEST + ".tmp")
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=4)
+        os.replace(temp_filename, os.path.join(directory, MANIFEST))
+        # Шарды прежних поколений и остатки прерванных сохранений больше не нужны
+        current = set(files)
+        for name in os.listdir(directory):
+            if _SHARD_NAME.fullmatch(name) and name not in current:
+                os.remove(os.path.join(directory, name))
+    except FileProcessingError:
+        raise
+    except Exception as e:
+        raise FileProcessingError(f"Ошибка при сохранении шардов: {e}")
+
+
+def load_sharded(registry: PetRegistry, directory: str, workers: Optional[int] = None) -> None:
+    """Загружает шарды параллельно и объединяет их в registry.
+
+    Файлы разбираются в процессах пула, а записи добавляются в реестр в
+    главном процессе: сначала владельцы всех шардов, затем питомцы,
+    поэтому питомец может ссылаться на владельца из другого шарда.
+    Дубликаты пропускаются, как в load_from_json. Порядок записей —
+    порядок шардов, а внутри шарда — порядок файла.
+    """
+    try:
+        with open(os.path.join(directory, MANIFEST), 'r', encoding='utf-8') as f:
+            try:
+                manifest = json.load(f)
+            except json.JSONDecodeError as e:
+                raise InvalidFileFormatError(f"Манифест шардов поврежден. Ошибка: {e}")
+        if manifest.get("version") != SHARDS_VERSION or manifest.get("format") not in FORMATS:
+            raise InvalidFileFormatError(f"Каталог '{directory}' не содержит поддерживаемых шардов реестра.")
+
+        results = _run(_read_shard, [(os.path.join(directory, name), manifest["format"]) for name in manifest["files"]], workers)
+
+        interner = registry.interner
+        for owner_rows, _ in results:
+            registry.add_owners_bulk(_owners_from_fields(owner_rows, interner))
+        owners = registry.owner_map()
+        for _, pet_rows in results:
+            registry.add_pets_bulk([_pet_from_fields(fields, owners, interner) for fields in pet_rows])
+    except Exception as e:
+        raise FileProcessingError(f"Ошибка при загрузке шардов: {e}")
@@ -0,0 +1,225 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Dict, Iterator, List, Optional, TYPE_CHECKING
+from models import Owner, Pet, Address
+from interning import ModelInterner
+from exceptions import InvalidFileFormatError
+
+if TYPE_CHECKING:
+    from registry import PetRegistry
+
+# Формат бинарного снимка реестра (все числа little-endian):
+#
+#   заголовок     MAGIC, версия, число строк/владельцев/питомцев, поколение журнала,
+#                 смещения секций
+#   владельцы     записи фиксированной длины _OWNER в порядке добавления
+#   питомцы       записи фиксированной длины _PET в порядке добавления
+#   строки        (число строк + 1) смещений u32 и общий блок UTF-8
+#   индексы       номера записей u32, отсортированные по owner_id и по имени питомца
+#
+# Все строковые поля записей — номера в общей таблице строк, поэтому
+# повторяющиеся породы, города и т. п. хранятся один раз.
+MAGIC = b"PETSNAP\0"
+VERSION = 1
+
+_HEADER = struct.Struct("<8s5I6Q")
+# owner_id, name, phone, street, city, postal_code
+_OWNER = struct.Struct("<q5I")
+# name, age, breed, species, house_type, house_size, owner_id
+_PET = struct.Struct("<Ii4Iq")
+_U32 = struct.Struct("<I")
+_SPAN = struct.Struct("<2I")
+
+
+class SnapshotReader:
+    """Доступ к бинарному снимку через mmap без загрузки всего файла.
+
+    Открытие читает только заголовок, а записи декодируются при обращении.
+    Поиск владельца по ID и питомца по имени — двоичный поиск по индексам
+    снимка, O(log n).
+
+    Декодированные строки кэшируются, а адреса берутся из пула interner,
+    чтобы записи полной загрузки делили одинаковые значения. С bounded=True
+    (ленивый реестр) строки декодируются при каждом обращении, а адрес
+    создается для каждого владельца: память читателя не растет с числом
+    прочитанных записей.
+    """
+
+    def __init__(self, filename: str, interner: Optional[ModelInterner] = None, bounded: bool = False) -> None:
+        self._interner = interner if interner is not None else ModelInterner()
+        self._strings: Optional[Dict[int, str]] = None if bounded else {}
+        with open(filename, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise InvalidFileFormatError(f"Файл '{filename}' не является снимком реестра: слишком короткий.")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, self.string_count, self.owner_count, self.pet_count, self.generation,
+             self._owners_offset, self._pets_offset, self._string_index_offset, self._string_data_offset,
+             self._owner_index_offset, self._pet_index_offset) = _HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise InvalidFileFormatError(f"Файл '{filename}' не является снимком реестра.")
+            if version != VERSION:
+                raise InvalidFileFormatError(f"Неподдерживаемая версия снимка {version} в файле '{filename}'.")
+            if self._pet_index_offset + 4 * self.pet_count > size:
+                raise InvalidFileFormatError(f"Снимок '{filename}' поврежден: секции выходят за конец файла.")
+        except Exception:
+            self._map.close()
+            raise
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> 'SnapshotReader':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def string(self, index: int) -> str:
+        if self._strings is None:
+            return self._string_bytes(index).decode('utf-8')
+        value = self._strings.get(index)
+        if value is None:
+            value = self._strings[index] = self._string_bytes(index).decode('utf-8')
+        return value
+
+    def _string_bytes(self, index: int) -> bytes:
+        start, end = _SPAN.unpack_from(self._map, self._string_index_offset + 4 * index)
+        return self._map[self._string_data_offset + start:self._string_data_offset + end]
+
+    def owner_at(self, record: int) -> Owner:
+        """Декодирует владельца с номером записи record."""
+        owner_id, name, phone, street, city, postal_code = _OWNER.unpack_from(self._map, self._owners_offset + record * _OWNER.size)
+        string = self.string
+        if self._strings is None:
+            address = Address(string(street), string(city), string(postal_code))
+        else:
+            address = self._interner.address(string(street), string(city), string(postal_code))
+        return Owner(owner_id, string(name), string(phone), address)
+
+    def owner_id_at(self, record: int) -> int:
+        return _OWNER.unpack_from(self._map, self._owners_offset + record * _OWNER.size)[0]
+
+    def pet_owner_id(self, record: int) -> int:
+        return _PET.unpack_from(self._map, self._pets_offset + record * _PET.size)[6]
+
+    def pet_at(self, record: int, owner: Owner) -> Pet:
+        """Декодирует питомца с номером записи record; владельца передает вызывающий."""
+        name, age, breed, species, house_type, house_size, _ = _PET.unpack_from(self._map, self._pets_offset + record * _PET.size)
+        string = self.string
+        return Pet(string(name), age, self._interner.breed(string(breed), string(species)),
+                   self._interner.house(string(house_type), string(house_size)), owner)
+
+    def pet_name(self, record: int) -> str:
+        return self.string(_PET.unpack_from(self._map, self._pets_offset + record * _PET.size)[0])
+
+    def find_owner(self, owner_id: int) -> Optional[int]:
+        """Номер записи владельца с данным ID или None."""
+        low, high = 0, self.owner_count
+        while low < high:
+            middle = (low + high) // 2
+            record = _U32.unpack_from(self._map, self._owner_index_offset + 4 * middle)[0]
+            current = _OWNER.unpack_from(self._map, self._owners_offset + record * _OWNER.size)[0]
+            if current == owner_id:
+                return record
+            if current < owner_id:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def find_pet(self, name: str) -> Optional[int]:
+        """Номер записи питомца с данным именем или None."""
+        # Имена в индексе упорядочены по байтам UTF-8
+        key = name.encode('utf-8')
+        low, high = 0, self.pet_count
+        while low < high:
+            middle = (low + high) // 2
+            record = _U32.unpack_from(self._map, self._pet_index_offset + 4 * middle)[0]
+            current = self._string_bytes(_PET.unpack_from(self._map, self._pets_offset + record * _PET.size)[0])
+            if current == key:
+                return record
+            if current < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def get_owner(self, owner_id: int) -> Optional[Owner]:
+        record = self.find_owner(owner_id)
+        return None if record is None else self.owner_at(record)
+
+    def get_pet(self, name: str) -> Optional[Pet]:
+        """Декодирует питомца вместе с его владельцем (новые объекты при каждом вызове)."""
+        record = self.find_pet(name)
+        if record is None:
+            return None
+        owner = self.get_owner(self.pet_owner_id(record))
+        if owner is None:
+            raise InvalidFileFormatError(f"Снимок поврежден: владелец питомца {name} отсутствует.")
+        return self.pet_at(record, owner)
+
+    def iter_owners(self) -> Iterator[Owner]:
+        for record in range(self.owner_count):
+            yield self.owner_at(record)
+
+
+def write_snapshot(registry: 'PetRegistry', f: BinaryIO, generation: int = 0) -> None:
+    """Записывает снимок реестра в открытый двоичный файл.
+
+    generation — поколение журнала изменений (см. journal.py), с которого
+    начинаются изменения, еще не вошедшие в снимок; для обычных снимков 0.
+    """
+    strings: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    f.write(bytes(_HEADER.size))
+    owners_offset = f.tell()
+    owner_ids: List[int] = []
+    for owner in registry.owners:
+        address = owner.address
+        f.write(_OWNER.pack(owner.owner_id, intern(owner.name), intern(owner.phone),
+                            intern(address.street), intern(address.city), intern(address.postal_code)))
+        owner_ids.append(owner.owner_id)
+
+    pets_offset = f.tell()
+    pet_names: List[bytes] = []
+    for pet in registry.pets:
+        f.write(_PET.pack(intern(pet.name), pet.age, intern(pet.breed.name), intern(pet.breed.species),
+                          intern(pet.house.house_type), intern(pet.house.house_size), pet.owner.owner_id))
+        pet_names.append(pet.name.encode('utf-8'))
+
+    # Таблица строк: смещения концов строк и общий блок данных
+    string_index_offset = f.tell()
+    offsets = array('I', [0])
+    encoded = [value.encode('utf-8') for value in strings]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    f.write(_little_endian(offsets))
+    string_data_offset = f.tell()
+    f.write(b"".join(encoded))
+
+    owner_index_offset = f.tell()
+    f.write(_little_endian(array('I', sorted(range(len(owner_ids)), key=owner_ids.__getitem__))))
+    pet_index_offset = f.tell()
+    f.write(_little_endian(array('I', sorted(range(len(pet_names)), key=pet_names.__getitem__))))
+
+    f.seek(0)
+    f.write(_HEADER.pack(MAGIC, VERSION, len(strings), len(owner_ids), len(pet_names), generation,
+                         owners_offset, pets_offset, string_index_offset, string_data_offset,
+                         owner_index_offset, pet_index_offset))
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tobytes()
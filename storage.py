@@ -1,108 +1,328 @@
 import json
+import os
+from json.encoder import encode_basestring
 import xml.etree.ElementTree as ET
-import xml.dom.minidom
-from typing import TYPE_CHECKING
-from models import Owner, Pet, Address, Breed, PetHouse
-from exceptions import FileProcessingError, OwnerNotFoundError, PetNotFoundError, InvalidFileFormatError
+from typing import TYPE_CHECKING, Callable, Container, Hashable, Iterable, List, Mapping, Optional, TextIO, Tuple, TypeVar
+from models import Owner, Pet, Address, PetEvent, VetVisit, PetServiceBooking, Prescription, Veterinarian, VISIT_DURATION
+from exceptions import FileProcessingError, OwnerNotFoundError, InvalidFileFormatError
+from json_stream import JSONStreamReader
+from interning import ModelInterner
+from snapshot import SnapshotReader, write_snapshot
+from database import PetDatabase, connect, write_database
+from metrics import instrumented, metrics
 
 if TYPE_CHECKING:
     from registry import PetRegistry
+    from events import EventRecord, EventStore
+
+R = TypeVar("R")
+
+
+class _ChunkedWriter:
+    """Копит фрагменты текста и пишет их в файл кусками не меньше chunk_size символов."""
+
+    def __init__(self, f: TextIO, chunk_size: int = 1 << 16) -> None:
+        self._file = f
+        self._chunk_size = chunk_size
+        self._parts: List[str] = []
+        self._size = 0
+
+    def write(self, text: str) -> None:
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self._chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._parts:
+            self._file.write(''.join(self._parts))
+            self._parts = []
+            self._size = 0
+
+
+def _json_number(value) -> str:
+    """Кодирует число для JSON (то же, что json.dumps, но быстрее для int)."""
+    return int.__repr__(value) if type(value) is int else json.dumps(value)
+
+
+def _json_string(value: Optional[str]) -> str:
+    """Кодирует строку для JSON; None (например, отсутствующий атрибут XML) — как null."""
+    return "null" if value is None else encode_basestring(value)
 
-def save_to_json(registry: 'PetRegistry', filename: str) -> None:
-    data = {
-        "owners": [
-            {
-                "owner_id": owner.owner_id,
-                "name": owner.name,
-                "phone": owner.phone,
-                "address": {
-                    "street": owner.address.street,
-                    "city": owner.address.city,
-                    "postal_code": owner.address.postal_code
-                }
-            } for owner in registry.owners
-        ],
-        "pets": [
-            {
-                "name": pet.name,
-                "age": pet.age,
-                "breed": {
-                    "name": pet.breed.name,
-                    "species": pet.breed.species
-                },
-                "house": {
-                    "house_type": pet.house.house_type,  # изменили 'type' на 'house_type'
-                    "house_size": pet.house.house_size   # изменили 'size' на 'house_size'
-                },
-                "owner_id": pet.owner.owner_id
-            } for pet in registry.pets
-        ]
-    }
+
+@instrumented
+def save_to_json(registry: 'PetRegistry', filename: str, indent: Optional[int] = 4, chunk_size: int = 1 << 16) -> None:
+    """Сохраняет реестр в JSON, сериализуя записи по одной прямо в файл.
+
+    Промежуточный словарь со всеми записями не строится. При indent=4
+    вывод совпадает с json.dump(..., indent=4); indent=None дает компактный
+    вывод без пробелов. Текст пишется в файл кусками по chunk_size символов.
+    """
+    s = _json_string
+    if indent is None:
+        kv = ":"
+        b1 = b2 = b3 = b4 = ""
+    else:
+        kv = ": "
+        # Перевод строки с отступом нужного уровня вложенности
+        b1, b2, b3, b4 = ("\n" + " " * (indent * level) for level in range(1, 5))
 
     try:
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+            out = _ChunkedWriter(f, chunk_size)
+
+            with metrics.phase("save_to_json", "owners"):
+                out.write(f'{{{b1}"owners"{kv}[')
+                separator = b2
+                for owner in registry.owners:
+                    address = owner.address
+                    out.write(
+                        f'{separator}{{'
+                        f'{b3}"owner_id"{kv}{_json_number(owner.owner_id)},'
+                        f'{b3}"name"{kv}{s(owner.name)},'
+                        f'{b3}"phone"{kv}{s(owner.phone)},'
+                        f'{b3}"address"{kv}{{'
+                        f'{b4}"street"{kv}{s(address.street)},'
+                        f'{b4}"city"{kv}{s(address.city)},'
+                        f'{b4}"postal_code"{kv}{s(address.postal_code)}'
+                        f'{b3}}}{b2}}}'
+                    )
+                    separator = "," + b2
+                out.write(f'{b1}],' if separator != b2 else "],")
+
+            with metrics.phase("save_to_json", "pets"):
+                out.write(f'{b1}"pets"{kv}[')
+                separator = b2
+                for pet in registry.pets:
+                    out.write(
+                        f'{separator}{{'
+                        f'{b3}"name"{kv}{s(pet.name)},'
+                        f'{b3}"age"{kv}{_json_number(pet.age)},'
+                        f'{b3}"breed"{kv}{{'
+                        f'{b4}"name"{kv}{s(pet.breed.name)},'
+                        f'{b4}"species"{kv}{s(pet.breed.species)}'
+                        f'{b3}}},'
+                        f'{b3}"house"{kv}{{'
+                        f'{b4}"house_type"{kv}{s(pet.house.house_type)},'
+                        f'{b4}"house_size"{kv}{s(pet.house.house_size)}'
+                        f'{b3}}},'
+                        f'{b3}"owner_id"{kv}{_json_number(pet.owner.owner_id)}'
+                        f'{b2}}}'
+                    )
+                    separator = "," + b2
+                out.write(f'{b1}]' if separator != b2 else "]")
+
+            out.write("}" if indent is None else "\n}")
+            with metrics.phase("save_to_json", "flush"):
+                out.flush()
     except Exception as e:
         raise FileProcessingError(f"Ошибка при сохранении в JSON: {e}")
 
 
+def _owner_to_json(owner: Owner) -> dict:
+    """Запись владельца в виде словаря, как в файле save_to_json."""
+    address = owner.address
+    return {
+        "owner_id": owner.owner_id,
+        "name": owner.name,
+        "phone": owner.phone,
+        "address": {"street": address.street, "city": address.city, "postal_code": address.postal_code},
+    }
+
+
+def _pet_to_json(pet: Pet) -> dict:
+    """Запись питомца в виде словаря, как в файле save_to_json."""
+    return {
+        "name": pet.name,
+        "age": pet.age,
+        "breed": {"name": pet.breed.name, "species": pet.breed.species},
+        "house": {"house_type": pet.house.house_type, "house_size": pet.house.house_size},
+        "owner_id": pet.owner.owner_id,
+    }
+
+
+def _owner_id_from_json(owner_data: dict) -> int:
+    try:
+        return int(owner_data['owner_id'])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidFileFormatError(f"Неверный формат ID владельца в JSON файле: '{owner_data.get('owner_id')}'. Нужно ввести цифры.")
+
+
+def _owner_from_json(owner_data: dict, interner: Optional[ModelInterner]) -> Owner:
+    """Создает владельца из записи JSON; без interner адрес не попадает в пул."""
+    owner_id = _owner_id_from_json(owner_data)
+    address_data = owner_data['address']
+    if interner is None:
+        address = Address(address_data['street'], address_data['city'], address_data['postal_code'])
+    else:
+        address = interner.address(address_data['street'], address_data['city'], address_data['postal_code'])
+    return Owner(owner_id, owner_data['name'], owner_data['phone'], address)
+
+
+def _pet_fields_from_json(pet_data: dict) -> Tuple[str, int, str, str, str, str, int]:
+    """Поля питомца из записи JSON: (имя, возраст, порода, вид, тип дома, размер дома, ID владельца)."""
+    try:
+        age = int(pet_data['age'])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidFileFormatError(f"Неверный формат возраста питомца в JSON файле: '{pet_data.get('age')}'. Нужно ввести цифры.")
+    try:
+        owner_id = int(pet_data['owner_id'])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidFileFormatError(f"Неверный формат ID владельца питомца в JSON файле: '{pet_data.get('owner_id')}'. Нужно ввести цифры.")
+    breed_data = pet_data['breed']
+    house_data = pet_data['house']
+    return (pet_data['name'], age, breed_data['name'], breed_data['species'],
+            house_data['house_type'], house_data['house_size'], owner_id)
+
+
+def _pet_name_from_json(pet_data: dict) -> str:
+    return pet_data['name']
+
+
+def _pet_from_fields(fields: Tuple[str, int, str, str, str, str, int], owners: Mapping[int, Owner], interner: ModelInterner) -> Pet:
+    """Создает питомца из кортежа полей, находя владельца по словарю ID -> владелец."""
+    name, age, breed_name, species, house_type, house_size, owner_id = fields
+    owner = owners.get(owner_id)
+    if owner is None:
+        raise OwnerNotFoundError(f"Владелец с ID {owner_id} не найден.")
+    return Pet(name, age, interner.breed(breed_name, species), interner.house(house_type, house_size), owner)
+
+
+def _pet_from_json(pet_data: dict, owners: Mapping[int, Owner], interner: ModelInterner) -> Pet:
+    """Создает питомца из записи JSON, находя владельца по словарю ID -> владелец."""
+    return _pet_from_fields(_pet_fields_from_json(pet_data), owners, interner)
+
+
+def _new_records(records: Iterable[R], key: Callable[[R], Hashable], known: Container) -> List[R]:
+    """Записи, ключ которых еще не встречался ни в known, ни раньше в records.
+
+    Дубликаты отсекаются до разбора остальных полей, как при добавлении
+    записей по одной: повтор имени питомца не проверяет ни возраст, ни
+    владельца и не может сорвать загрузку файла.
+    """
+    seen = set()
+    result = []
+    for record in records:
+        value = key(record)
+        if value not in known and value not in seen:
+            seen.add(value)
+            result.append(record)
+    return result
+
+
+@instrumented
 def load_from_json(registry: 'PetRegistry', filename: str) -> None:
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
+        with open(filename, 'r', encoding='utf-8') as f, metrics.phase("load_from_json", "parse"):
             try:
                 data = json.load(f)
             except json.JSONDecodeError as e:
                 raise InvalidFileFormatError(f"Файл '{filename}' не является корректным JSON файлом. Ошибка: {e}")
 
-        # Загружаем владельцев (проверяем на дубликаты по ID)
-        for owner_data in data.get('owners', []):
-            try:
-                owner_id = int(owner_data['owner_id'])
-            except (ValueError, TypeError, KeyError):
-                raise InvalidFileFormatError(f"Неверный формат ID владельца в JSON файле: '{owner_data.get('owner_id')}'. Нужно ввести цифры.")
-            # Проверяем, не существует ли уже владелец с таким ID
-            try:
-                existing_owner = registry.get_owner(owner_id)
-                # Если владелец существует, пропускаем его
-                continue
-            except OwnerNotFoundError:
-                # Владелец не найден, создаем нового
-                address_data = owner_data['address']
-                address = Address(address_data['street'], address_data['city'], address_data['postal_code'])
-                owner = Owner(owner_id, owner_data['name'], owner_data['phone'], address)
-                registry.add_owner(owner)
-
-        # Загружаем питомцев (проверяем на дубликаты по имени)
-        for pet_data in data.get('pets', []):
-            pet_name = pet_data['name']
-            # Проверяем, не существует ли уже питомец с таким именем
-            try:
-                existing_pet = registry.get_pet(pet_name)
-                # Если питомец существует, пропускаем его
-                continue
-            except PetNotFoundError:
-                # Питомец не найден, создаем нового
+        # Загружаем владельцев (дубликаты по ID пропускаются до разбора записи)
+        with metrics.phase("load_from_json", "owners"):
+            owner_records = _new_records(data.get('owners', []), _owner_id_from_json, registry.owner_map())
+            owner_list = [_owner_from_json(owner_data, registry.interner) for owner_data in owner_records]
+        with metrics.phase("load_from_json", "index"):
+            registry.add_owners_bulk(owner_list)
+
+        # Загружаем питомцев (дубликаты по имени пропускаются до поиска владельца)
+        owners = registry.owner_map()
+        with metrics.phase("load_from_json", "pets"):
+            pet_records = _new_records(data.get('pets', []), _pet_name_from_json, registry.pet_map())
+            pets = [_pet_from_json(pet_data, owners, registry.interner) for pet_data in pet_records]
+        with metrics.phase("load_from_json", "index"):
+            registry.add_pets_bulk(pets)
+
+    except Exception as e:
+        raise FileProcessingError(f"Ошибка при загрузке из JSON: {e}")
+
+
+def _add_batch(add_bulk: Callable[[List], int], key: str, batch: List[Tuple[int, object]]) -> None:
+    """Передает пачку (позиция, запись) в реестр; ошибка указывает позиции записей пачки."""
+    if not batch:
+        return
+    try:
+        add_bulk([record for _, record in batch])
+    except Exception as e:
+        raise InvalidFileFormatError(f"Ошибка в записях {key}[{batch[0][0]}..{batch[-1][0]}]: {e}")
+
+
+@instrumented
+def load_from_json_stream(registry: 'PetRegistry', filename: str, batch_size: int = 1000) -> None:
+    """Загружает JSON потоково, не разбирая документ целиком.
+
+    Записи массивов owners и pets читаются по одной и передаются в реестр
+    пачками по batch_size, поэтому пиковая память (кроме самого реестра)
+    ограничена размером пачки. Семантика пропуска дубликатов та же, что
+    у load_from_json. Каждая запись проверяется до попадания в пачку
+    (дубликаты, формат полей, владелец), поэтому ошибка в записи
+    сообщается с ее собственной позицией в массиве.
+    """
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            owners = registry.owner_map()
+            known_pets = registry.pet_map()
+            owner_batch: List[Tuple[int, Owner]] = []
+            pet_batch: List[Tuple[int, Pet]] = []
+            # ID и имена записей, прочитанных из файла, но еще не добавленных в реестр
+            batch_ids = set()
+            batch_names = set()
+            # Питомцы, встреченные раньше массива владельцев, ждут его окончания
+            pending_pets: List[Tuple[int, dict]] = []
+            owners_seen = False
+
+            def add_owners() -> None:
+                _add_batch(registry.add_owners_bulk, "owners", owner_batch)
+                owner_batch.clear()
+                batch_ids.clear()
+
+            def add_pets() -> None:
+                _add_batch(registry.add_pets_bulk, "pets", pet_batch)
+                batch_names.difference_update(pet.name for _, pet in pet_batch)
+                pet_batch.clear()
+
+            for key, position, record in JSONStreamReader(f).iter_arrays(("owners", "pets")):
+                if key == 'pets' and owner_batch:
+                    add_owners()
                 try:
-                    age = int(pet_data['age'])
-                except (ValueError, TypeError, KeyError):
-                    raise InvalidFileFormatError(f"Неверный формат возраста питомца в JSON файле: '{pet_data.get('age')}'. Нужно ввести цифры.")
+                    if key == 'owners':
+                        owners_seen = True
+                        owner_id = _owner_id_from_json(record)
+                        if owner_id in owners or owner_id in batch_ids:
+                            continue
+                        batch_ids.add(owner_id)
+                        owner_batch.append((position, _owner_from_json(record, registry.interner)))
+                    else:
+                        name = _pet_name_from_json(record)
+                        if name in known_pets or name in batch_names:
+                            continue
+                        batch_names.add(name)
+                        if not owners_seen:
+                            pending_pets.append((position, record))
+                            continue
+                        pet_batch.append((position, _pet_from_json(record, owners, registry.interner)))
+                except Exception as e:
+                    raise InvalidFileFormatError(f"Ошибка в записи {key}[{position}]: {e}")
+                if len(owner_batch) >= batch_size:
+                    add_owners()
+                if len(pet_batch) >= batch_size:
+                    add_pets()
+
+            add_owners()
+            for position, record in pending_pets:
                 try:
-                    owner_id = int(pet_data['owner_id'])
-                except (ValueError, TypeError, KeyError):
-                    raise InvalidFileFormatError(f"Неверный формат ID владельца питомца в JSON файле: '{pet_data.get('owner_id')}'. Нужно ввести цифры.")
-                breed_data = pet_data['breed']
-                breed = Breed(breed_data['name'], breed_data['species'])
-                house_data = pet_data['house']
-                house = PetHouse(house_data['house_type'], house_data['house_size'])
-                owner = registry.get_owner(owner_id)
-                pet = Pet(pet_name, age, breed, house, owner)
-                registry.add_pet(pet)
+                    pet_batch.append((position, _pet_from_json(record, owners, registry.interner)))
+                except Exception as e:
+                    raise InvalidFileFormatError(f"Ошибка в записи pets[{position}]: {e}")
+                if len(pet_batch) >= batch_size:
+                    add_pets()
+            add_pets()
 
     except Exception as e:
         raise FileProcessingError(f"Ошибка при загрузке из JSON: {e}")
 
 
-
 def indent(elem, level=0):
     """Правильно форматирует XML с отступами"""
     indent_str = "\n" + level * "  "
@@ -131,116 +351,504 @@ def indent(elem, level=0):
             if elem.tail is None or not elem.tail.strip():
                 elem.tail = indent_str
 
+def _xml_attr(value: str) -> str:
+    """Экранирует значение атрибута XML (включая переводы строк и табуляцию)."""
+    return (value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+            .replace("\n", "&#10;").replace("\r", "&#13;").replace("\t", "&#9;"))
+
+
 # Основная функция для сохранения в XML с отступами
-def save_to_xml(registry: 'PetRegistry', filename: str) -> None:
-    root = ET.Element("PetRegistry")
-
-    # Сохраняем владельцев
-    for owner in registry.owners:
-        owner_elem = ET.SubElement(root, "Owner")
-        owner_elem.set("id", str(owner.owner_id))
-        owner_elem.set("name", owner.name)
-        owner_elem.set("phone", owner.phone)
-        address_elem = ET.SubElement(owner_elem, "Address")
-        address_elem.set("street", owner.address.street)
-        address_elem.set("city", owner.address.city)
-        address_elem.set("postal_code", owner.address.postal_code)
-
-    # Сохраняем питомцев
-    for pet in registry.pets:
-        pet_elem = ET.SubElement(root, "Pet")
-        pet_elem.set("name", pet.name)
-        pet_elem.set("age", str(pet.age))
-        breed_elem = ET.SubElement(pet_elem, "Breed")
-        breed_elem.set("name", pet.breed.name)
-        breed_elem.set("species", pet.breed.species)
-        house_elem = ET.SubElement(pet_elem, "House")
-        house_elem.set("house_type", pet.house.house_type)
-        house_elem.set("house_size", pet.house.house_size)
-        owner_id_elem = ET.SubElement(pet_elem, "OwnerID")
-        owner_id_elem.text = str(pet.owner.owner_id)
-
-    try:
-        # Создаем дерево
-        tree = ET.ElementTree(root)
-        
-        # Используем minidom для красивого форматирования
-        rough_string = ET.tostring(root, encoding='utf-8')
-        reparsed = xml.dom.minidom.parseString(rough_string)
-        pretty_xml = reparsed.toprettyxml(indent="  ", encoding='utf-8')
-        
-        # Удаляем лишние пустые строки и сохраняем
-        lines = [line for line in pretty_xml.decode('utf-8').split('\n') if line.strip()]
-        formatted_xml = '\n'.join(lines)
-        
+@instrumented
+def save_to_xml(registry: 'PetRegistry', filename: str, pretty: bool = True) -> None:
+    """Сохраняет реестр в XML, записывая элементы в файл по одному.
+
+    Дерево документа целиком не строится, поэтому память не зависит от
+    числа записей. pretty=True дает отступы в два пробела, pretty=False —
+    компактный вывод без пробелов между элементами.
+    """
+    # Отступы: перед записью, перед вложенным элементом, перед закрывающим тегом записи
+    if pretty:
+        record, nested, closing = "\n  ", "\n    ", "\n  "
+    else:
+        record = nested = closing = ""
+
+    try:
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write(formatted_xml)
+            out = _ChunkedWriter(f)
+            out.write('<?xml version="1.0" encoding="utf-8"?>\n<PetRegistry')
+            empty = True
+
+            with metrics.phase("save_to_xml", "owners"):
+                # Сохраняем владельцев
+                for owner in registry.owners:
+                    if empty:
+                        out.write(">")
+                        empty = False
+                    address = owner.address
+                    out.write(
+                        f'{record}<Owner id="{owner.owner_id}" name="{_xml_attr(owner.name)}" phone="{_xml_attr(owner.phone)}">'
+                        f'{nested}<Address street="{_xml_attr(address.street)}" city="{_xml_attr(address.city)}" postal_code="{_xml_attr(address.postal_code)}"/>'
+                        f'{closing}</Owner>'
+                    )
+
+            with metrics.phase("save_to_xml", "pets"):
+                # Сохраняем питомцев
+                for pet in registry.pets:
+                    if empty:
+                        out.write(">")
+                        empty = False
+                    out.write(
+                        f'{record}<Pet name="{_xml_attr(pet.name)}" age="{pet.age}">'
+                        f'{nested}<Breed name="{_xml_attr(pet.breed.name)}" species="{_xml_attr(pet.breed.species)}"/>'
+                        f'{nested}<House house_type="{_xml_attr(pet.house.house_type)}" house_size="{_xml_attr(pet.house.house_size)}"/>'
+                        f'{nested}<OwnerID>{pet.owner.owner_id}</OwnerID>'
+                        f'{closing}</Pet>'
+                    )
+
+            out.write("/>" if empty else ("\n" if pretty else "") + "</PetRegistry>")
+            with metrics.phase("save_to_xml", "flush"):
+                out.flush()
 
     except Exception as e:
         raise FileProcessingError(f"Ошибка при сохранении в XML: {e}")
 
 
+def _owner_id_from_xml(owner_elem: ET.Element) -> int:
+    try:
+        return int(owner_elem.get("id"))
+    except (ValueError, TypeError):
+        raise InvalidFileFormatError(f"Неверный формат ID владельца в XML файле: '{owner_elem.get('id')}'. Нужно ввести цифры.")
+
+
+def _owner_from_xml(owner_elem: ET.Element, interner: ModelInterner) -> Owner:
+    """Создает владельца из элемента <Owner>."""
+    owner_id = _owner_id_from_xml(owner_elem)
+    address_elem = owner_elem.find("Address")
+    address = interner.address(address_elem.get("street"), address_elem.get("city"), address_elem.get("postal_code"))
+    return Owner(owner_id, owner_elem.get("name"), owner_elem.get("phone"), address)
+
+
+def _pet_fields_from_xml(pet_elem: ET.Element) -> Tuple[str, int, str, str, str, str, int]:
+    """Поля питомца из элемента <Pet>: (имя, возраст, порода, вид, тип дома, размер дома, ID владельца)."""
+    try:
+        age = int(pet_elem.get("age"))
+    except (ValueError, TypeError):
+        raise InvalidFileFormatError(f"Неверный формат возраста питомца в XML файле: '{pet_elem.get('age')}'. Нужно ввести цифры.")
+    breed_elem = pet_elem.find("Breed")
+    house_elem = pet_elem.find("House")
+    try:
+        owner_id = int(pet_elem.find("OwnerID").text)
+    except (ValueError, TypeError, AttributeError):
+        raise InvalidFileFormatError(f"Неверный формат ID владельца питомца в XML файле. Нужно ввести цифры.")
+    return (pet_elem.get("name"), age, breed_elem.get("name"), breed_elem.get("species"),
+            house_elem.get("house_type"), house_elem.get("house_size"), owner_id)
+
+
+def _pet_name_from_xml(pet_elem: ET.Element) -> Optional[str]:
+    return pet_elem.get("name")
+
+
+def _pet_from_xml(pet_elem: ET.Element, owners: Mapping[int, Owner], interner: ModelInterner) -> Pet:
+    """Создает питомца из элемента <Pet>, находя владельца по словарю ID -> владелец."""
+    return _pet_from_fields(_pet_fields_from_xml(pet_elem), owners, interner)
+
+
+@instrumented
 def load_from_xml(registry: 'PetRegistry', filename: str) -> None:
     try:
         try:
-            tree = ET.parse(filename)
-            root = tree.getroot()
+            with metrics.phase("load_from_xml", "parse"):
+                tree = ET.parse(filename)
+                root = tree.getroot()
         except ET.ParseError as e:
             raise InvalidFileFormatError(f"Файл '{filename}' не является корректным XML файлом. Ошибка: {e}")
 
-        # Загружаем владельцев (проверяем на дубликаты по ID)
-        for owner_elem in root.findall("Owner"):
-            try:
-                owner_id = int(owner_elem.get("id"))
-            except (ValueError, TypeError):
-                raise InvalidFileFormatError(f"Неверный формат ID владельца в XML файле: '{owner_elem.get('id')}'. Нужно ввести цифры.")
-            # Проверяем, не существует ли уже владелец с таким ID
-            try:
-                existing_owner = registry.get_owner(owner_id)
-                # Если владелец существует, пропускаем его
-                continue
-            except OwnerNotFoundError:
-                # Владелец не найден, создаем нового
-                name = owner_elem.get("name")
-                phone = owner_elem.get("phone")
-                address_elem = owner_elem.find("Address")
-                street = address_elem.get("street")
-                city = address_elem.get("city")
-                postal_code = address_elem.get("postal_code")
-                address = Address(street, city, postal_code)
-                owner = Owner(owner_id, name, phone, address)
-                registry.add_owner(owner)
-
-        # Загружаем питомцев (проверяем на дубликаты по имени)
-        for pet_elem in root.findall("Pet"):
-            name = pet_elem.get("name")
-            # Проверяем, не существует ли уже питомец с таким именем
-            try:
-                existing_pet = registry.get_pet(name)
-                # Если питомец существует, пропускаем его
-                continue
-            except PetNotFoundError:
-                # Питомец не найден, создаем нового
+        # Загружаем владельцев (дубликаты по ID пропускаются до разбора записи)
+        with metrics.phase("load_from_xml", "owners"):
+            owner_elems = _new_records(root.findall("Owner"), _owner_id_from_xml, registry.owner_map())
+            owner_list = [_owner_from_xml(owner_elem, registry.interner) for owner_elem in owner_elems]
+        with metrics.phase("load_from_xml", "index"):
+            registry.add_owners_bulk(owner_list)
+
+        # Загружаем питомцев (дубликаты по имени пропускаются до поиска владельца)
+        owners = registry.owner_map()
+        with metrics.phase("load_from_xml", "pets"):
+            pet_elems = _new_records(root.findall("Pet"), _pet_name_from_xml, registry.pet_map())
+            pets = [_pet_from_xml(pet_elem, owners, registry.interner) for pet_elem in pet_elems]
+        with metrics.phase("load_from_xml", "index"):
+            registry.add_pets_bulk(pets)
+
+    except Exception as e:
+        raise FileProcessingError(f"Ошибка при загрузке из XML: {e}")
+
+
+@instrumented
+def load_from_xml_stream(registry: 'PetRegistry', filename: str, batch_size: int = 1000) -> None:
+    """Загружает XML потоково через ET.iterparse.
+
+    Каждый <Owner>/<Pet> обрабатывается по событию end и сразу очищается,
+    поэтому память не зависит от размера файла. Записи передаются в реестр
+    пачками по batch_size; дубликаты пропускаются, как в load_from_xml.
+
+    Как и load_from_xml, владелец может идти в файле позже своего питомца:
+    такой питомец и все следующие за ним откладываются до конца файла,
+    чтобы сохранить порядок питомцев и правило «первый из дубликатов».
+    """
+    try:
+        owners = registry.owner_map()
+        owner_batch: List[Owner] = []
+        pet_batch: List[Pet] = []
+        # Поля питомцев, владелец которых еще не встретился, и всех следующих за ними
+        pending_pets: List[Tuple[str, int, str, str, str, str, int]] = []
+        root = None
+        depth = 0
+        try:
+            for event, elem in ET.iterparse(filename, events=("start", "end")):
+                if event == "start":
+                    if root is None:
+                        root = elem
+                    depth += 1
+                    continue
+                depth -= 1
+                # Записи — прямые потомки корня; вложенные элементы разбираем вместе с ними
+                if depth != 1:
+                    continue
+                if elem.tag == "Owner":
+                    owner_batch.append(_owner_from_xml(elem, registry.interner))
+                    if len(owner_batch) >= batch_size:
+                        registry.add_owners_bulk(owner_batch)
+                        owner_batch = []
+                elif elem.tag == "Pet":
+                    if owner_batch:
+                        registry.add_owners_bulk(owner_batch)
+                        owner_batch = []
+                    fields = _pet_fields_from_xml(elem)
+                    if pending_pets or fields[6] not in owners:
+                        pending_pets.append(fields)
+                    else:
+                        pet_batch.append(_pet_from_fields(fields, owners, registry.interner))
+                    if len(pet_batch) >= batch_size:
+                        registry.add_pets_bulk(pet_batch)
+                        pet_batch = []
+                # Освобождаем разобранный элемент и ссылку на него из корня
+                root.clear()
+        except ET.ParseError as e:
+            raise InvalidFileFormatError(f"Файл '{filename}' не является корректным XML файлом. Ошибка: {e}")
+
+        registry.add_owners_bulk(owner_batch)
+        pet_batch.extend(_pet_from_fields(fields, owners, registry.interner) for fields in pending_pets)
+        registry.add_pets_bulk(pet_batch)
+
+    except Exception as e:
+        raise FileProcessingError(f"Ошибка при загрузке из XML: {e}")
+
+
+@instrumented
+def save_to_snapshot(registry: 'PetRegistry', filename: str) -> None:
+    """Сохраняет реестр в бинарный снимок (формат описан в snapshot.py).
+
+    Снимок пишется во временный файл и затем атомарно заменяет filename.
+    """
+    temp_filename = filename + ".tmp"
+    try:
+        with open(temp_filename, 'wb') as f, metrics.phase("save_to_snapshot", "write"):
+            write_snapshot(registry, f)
+        with metrics.phase("save_to_snapshot", "replace"):
+            os.replace(temp_filename, filename)
+    except Exception as e:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise FileProcessingError(f"Ошибка при сохранении снимка: {e}")
+
+
+@instrumented
+def load_from_snapshot(registry: 'PetRegistry', filename: str) -> None:
+    """Загружает бинарный снимок в реестр, пропуская дубликаты, как load_from_json.
+
+    Для точечных запросов без загрузки всего файла используйте
+    snapshot.SnapshotReader.
+    """
+    try:
+        with SnapshotReader(filename, registry.interner) as reader:
+            with metrics.phase("load_from_snapshot", "owners"):
+                registry.add_owners_bulk(reader.iter_owners())
+            owners = registry.owner_map()
+            pets = []
+            with metrics.phase("load_from_snapshot", "pets"):
+                for record in range(reader.pet_count):
+                    owner_id = reader.pet_owner_id(record)
+                    owner = owners.get(owner_id)
+                    if owner is None:
+                        raise OwnerNotFoundError(f"Владелец с ID {owner_id} не найден.")
+                    pets.append(reader.pet_at(record, owner))
+            with metrics.phase("load_from_snapshot", "index"):
+                registry.add_pets_bulk(pets)
+    except Exception as e:
+        raise FileProcessingError(f"Ошибка при загрузке снимка: {e}")
+
+
+@instrumented
+def save_to_sqlite(registry: 'PetRegistry', filename: str) -> None:
+    """Сохраняет реестр в базу SQLite (схема описана в database.py).
+
+    Содержимое базы заменяется записями реестра в одной транзакции;
+    записи вставляются через executemany.
+    """
+    try:
+        with metrics.phase("save_to_sqlite", "connect"):
+            connection = connect(filename, create=True)
+        try:
+            with metrics.phase("save_to_sqlite", "write"):
+                write_database(registry, connection)
+        finally:
+            connection.close()
+    except Exception as e:
+        raise FileProcessingError(f"Ошибка при сохранении в SQLite: {e}")
+
+
+@instrumented
+def load_from_sqlite(registry: 'PetRegistry', filename: str, batch_size: int = 1000) -> None:
+    """Загружает базу SQLite в реестр, пропуская дубликаты, как load_from_json.
+
+    Питомцы читаются курсором пачками по batch_size. Для точечных
+    запросов без загрузки всей базы используйте database.PetDatabase.
+    """
+    try:
+        with PetDatabase(filename, registry.interner) as database:
+            with metrics.phase("load_from_sqlite", "owners"):
+                registry.add_owners_bulk(database.iter_owners())
+            owners = registry.owner_map()
+            rows = database.iter_pet_rows()
+            while True:
+                with metrics.phase("load_from_sqlite", "fetch"):
+                    batch = rows.fetchmany(batch_size)
+                if not batch:
+                    break
+                pets = []
+                with metrics.phase("load_from_sqlite", "pets"):
+                    for row in batch:
+                        owner = owners.get(row[6])
+                        if owner is None:
+                            raise OwnerNotFoundError(f"Владелец с ID {row[6]} не найден.")
+                        pets.append(database.pet_from_row(row, owner))
+                with metrics.phase("load_from_sqlite", "index"):
+                    registry.add_pets_bulk(pets)
+    except Exception as e:
+        raise FileProcessingError(f"Ошибка при загрузке из SQLite: {e}")
+
+
+# Разделы файла событий в порядке записи: ключ JSON, тег XML, вид записи
+_EVENT_SECTIONS = (
+    ("pet_events", "PetEvent", PetEvent),
+    ("vet_visits", "VetVisit", VetVisit),
+    ("service_bookings", "ServiceBooking", PetServiceBooking),
+    ("prescriptions", "Prescription", Prescription),
+)
+
+
+def _event_to_json(record: 'EventRecord') -> str:
+    """Запись хранилища событий в виде однострочного объекта JSON."""
+    s = _json_string
+    if type(record) is PetEvent:
+        return f'{{"pet": {s(record.pet.name)}, "event_type": {s(record.event_type)}, "date": {s(record.date)}}}'
+    if type(record) is VetVisit:
+        return (f'{{"pet": {s(record.pet.name)}, "vet_id": {_json_number(record.veterinarian.vet_id)}, '
+                f'"date": {s(record.date)}, "reason": {s(record.reason)}, "duration": {_json_number(record.duration)}}}')
+    if type(record) is PetServiceBooking:
+        return (f'{{"pet": {s(record.pet.name)}, "service": {{"service_name": {s(record.service.service_name)}, '
+                f'"price": {_json_number(record.service.price)}}}, "date": {s(record.date)}}}')
+    return (f'{{"pet": {s(record.pet.name)}, "medication": {s(record.medication)}, "dosage": {s(record.dosage)}, '
+            f'"date": {s(record.date)}}}')
+
+
+def _event_from_json(key: str, data: dict, store: 'EventStore') -> 'EventRecord':
+    """Создает запись раздела key, находя питомца в реестре хранилища, а ветеринара — в хранилище."""
+    pet = store.registry.get_pet(data['pet'])
+    if key == 'pet_events':
+        return PetEvent(pet, data['event_type'], data['date'])
+    if key == 'vet_visits':
+        return VetVisit(pet, store.get_veterinarian(int(data['vet_id'])), data['date'], data['reason'],
+                        int(data.get('duration', VISIT_DURATION)))
+    if key == 'service_bookings':
+        service = data['service']
+        return PetServiceBooking(pet, store.service(service['service_name'], float(service['price'])), data['date'])
+    return Prescription(pet, data['medication'], data['dosage'], data['date'])
+
+
+@instrumented
+def save_events_to_json(store: 'EventStore', filename: str) -> None:
+    """Сохраняет хранилище событий в JSON, записывая записи по одной прямо в файл.
+
+    Разделы: veterinarians, pet_events, vet_visits, service_bookings и
+    prescriptions; каждая запись — одна строка, записи идут по порядку
+    времени. Питомцы и ветеринары указываются по имени и ID, даты — в
+    исходном виде.
+    """
+    s = _json_string
+    try:
+        with open(filename, 'w', encoding='utf-8') as f:
+            out = _ChunkedWriter(f)
+            out.write('{\n"veterinarians": [')
+            separator = "\n"
+            for vet in store.veterinarians:
+                out.write(f'{separator}{{"vet_id": {_json_number(vet.vet_id)}, "name": {s(vet.name)}, "phone": {s(vet.phone)}}}')
+                separator = ",\n"
+            out.write("\n]" if separator != "\n" else "]")
+            for key, _, kind in _EVENT_SECTIONS:
+                out.write(f',\n"{key}": [')
+                separator = "\n"
+                for record in store.iter_records(kind):
+                    out.write(separator + _event_to_json(record))
+                    separator = ",\n"
+                out.write("\n]" if separator != "\n" else "]")
+            out.write("\n}\n")
+            out.flush()
+    except Exception as e:
+        raise FileProcessingError(f"Ошибка при сохранении событий в JSON: {e}")
+
+
+@instrumented
+def load_events_from_json(store: 'EventStore', filename: str, batch_size: int = 1000) -> None:
+    """Загружает события из JSON потоково, передавая записи в хранилище пачками по batch_size.
+
+    Питомцы должны быть уже загружены в реестр хранилища. Ветеринары с
+    занятым ID пропускаются; записи событий ключа не имеют, поэтому
+    повторная загрузка того же файла добавит их еще раз.
+    """
+    keys = ["veterinarians"] + [key for key, _, _ in _EVENT_SECTIONS]
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            batch: List['EventRecord'] = []
+            # Визиты, встреченные раньше массива ветеринаров, ждут его окончания
+            pending_visits: List[Tuple[int, dict]] = []
+            vets_seen = False
+            for key, position, record in JSONStreamReader(f).iter_arrays(keys):
                 try:
-                    age = int(pet_elem.get("age"))
-                except (ValueError, TypeError):
-                    raise InvalidFileFormatError(f"Неверный формат возраста питомца в XML файле: '{pet_elem.get('age')}'. Нужно ввести цифры.")
-                breed_elem = pet_elem.find("Breed")
-                breed_name = breed_elem.get("name")
-                breed_species = breed_elem.get("species")
-                breed = Breed(breed_name, breed_species)
-                house_elem = pet_elem.find("House")
-                house_type = house_elem.get("house_type")
-                house_size = house_elem.get("house_size")
-                house = PetHouse(house_type, house_size)
+                    if key == 'veterinarians':
+                        vets_seen = True
+                        store.add_veterinarians_bulk([Veterinarian(int(record['vet_id']), record['name'], record['phone'])])
+                        continue
+                    if key == 'vet_visits' and not vets_seen:
+                        pending_visits.append((position, record))
+                        continue
+                    batch.append(_event_from_json(key, record, store))
+                    if len(batch) >= batch_size:
+                        store.add_bulk(batch)
+                        batch = []
+                except Exception as e:
+                    raise InvalidFileFormatError(f"Ошибка в записи {key}[{position}]: {e}")
+            for position, record in pending_visits:
                 try:
-                    owner_id = int(pet_elem.find("OwnerID").text)
-                except (ValueError, TypeError, AttributeError):
-                    raise InvalidFileFormatError(f"Неверный формат ID владельца питомца в XML файле. Нужно ввести цифры.")
-                owner = registry.get_owner(owner_id)
-                pet = Pet(name, age, breed, house, owner)
-                registry.add_pet(pet)
+                    batch.append(_event_from_json('vet_visits', record, store))
+                except Exception as e:
+                    raise InvalidFileFormatError(f"Ошибка в записи vet_visits[{position}]: {e}")
+            store.add_bulk(batch)
+    except Exception as e:
+        raise FileProcessingError(f"Ошибка при загрузке событий из JSON: {e}")
+
+
+def _event_to_xml(record: 'EventRecord') -> str:
+    """Элемент XML записи хранилища событий."""
+    a = _xml_attr
+    if type(record) is PetEvent:
+        return f'<PetEvent pet="{a(record.pet.name)}" type="{a(record.event_type)}" date="{a(record.date)}"/>'
+    if type(record) is VetVisit:
+        return (f'<VetVisit pet="{a(record.pet.name)}" vet_id="{record.veterinarian.vet_id}" date="{a(record.date)}" '
+                f'reason="{a(record.reason)}" duration="{record.duration}"/>')
+    if type(record) is PetServiceBooking:
+        return (f'<ServiceBooking pet="{a(record.pet.name)}" service="{a(record.service.service_name)}" '
+                f'price="{_json_number(record.service.price)}" date="{a(record.date)}"/>')
+    return (f'<Prescription pet="{a(record.pet.name)}" medication="{a(record.medication)}" dosage="{a(record.dosage)}" '
+            f'date="{a(record.date)}"/>')
+
+
+def _event_from_xml(elem: ET.Element, store: 'EventStore') -> 'EventRecord':
+    """Создает запись из элемента <PetEvent>, <VetVisit>, <ServiceBooking> или <Prescription>."""
+    pet = store.registry.get_pet(elem.get("pet"))
+    if elem.tag == "PetEvent":
+        return PetEvent(pet, elem.get("type"), elem.get("date"))
+    if elem.tag == "VetVisit":
+        try:
+            vet_id = int(elem.get("vet_id"))
+        except (ValueError, TypeError):
+            raise InvalidFileFormatError(f"Неверный формат ID ветеринара в XML файле: '{elem.get('vet_id')}'. Нужно ввести цифры.")
+        try:
+            duration = int(elem.get("duration", VISIT_DURATION))
+        except ValueError:
+            raise InvalidFileFormatError(f"Неверный формат длительности визита в XML файле: '{elem.get('duration')}'. Нужно ввести цифры.")
+        return VetVisit(pet, store.get_veterinarian(vet_id), elem.get("date"), elem.get("reason"), duration)
+    if elem.tag == "ServiceBooking":
+        try:
+            price = float(elem.get("price"))
+        except (ValueError, TypeError):
+            raise InvalidFileFormatError(f"Неверный формат цены услуги в XML файле: '{elem.get('price')}'.")
+        return PetServiceBooking(pet, store.service(elem.get("service"), price), elem.get("date"))
+    return Prescription(pet, elem.get("medication"), elem.get("dosage"), elem.get("date"))
+
+
+@instrumented
+def save_events_to_xml(store: 'EventStore', filename: str, pretty: bool = True) -> None:
+    """Сохраняет хранилище событий в XML, записывая элементы в файл по одному.
 
+    Корень <EventStore> содержит элементы <Veterinarian>, затем записи
+    <PetEvent>, <VetVisit>, <ServiceBooking> и <Prescription> по порядку времени.
+    """
+    record = "\n  " if pretty else ""
+    try:
+        with open(filename, 'w', encoding='utf-8') as f:
+            out = _ChunkedWriter(f)
+            out.write('<?xml version="1.0" encoding="utf-8"?>\n<EventStore>')
+            for vet in store.veterinarians:
+                out.write(f'{record}<Veterinarian id="{vet.vet_id}" name="{_xml_attr(vet.name)}" phone="{_xml_attr(vet.phone)}"/>')
+            for _, _, kind in _EVENT_SECTIONS:
+                for event in store.iter_records(kind):
+                    out.write(record + _event_to_xml(event))
+            out.write(("\n" if pretty else "") + "</EventStore>")
+            out.flush()
     except Exception as e:
-        raise FileProcessingError(f"Ошибка при загрузке из XML: {e}")
+        raise FileProcessingError(f"Ошибка при сохранении событий в XML: {e}")
+
+
+@instrumented
+def load_events_from_xml(store: 'EventStore', filename: str, batch_size: int = 1000) -> None:
+    """Загружает события из XML потоково через ET.iterparse, как load_from_xml_stream.
 
+    Семантика та же, что у load_events_from_json.
+    """
+    tags = {tag for _, tag, _ in _EVENT_SECTIONS}
+    try:
+        batch: List['EventRecord'] = []
+        # Визиты, встреченные раньше ветеринаров, ждут конца файла
+        pending_visits: List[ET.Element] = []
+        vets_seen = False
+        root = None
+        try:
+            for event, elem in ET.iterparse(filename, events=("start", "end")):
+                if root is None:
+                    root = elem
+                    continue
+                if event == "start" or elem is root:
+                    continue
+                if elem.tag == "Veterinarian":
+                    vets_seen = True
+                    try:
+                        vet_id = int(elem.get("id"))
+                    except (ValueError, TypeError):
+                        raise InvalidFileFormatError(f"Неверный формат ID ветеринара в XML файле: '{elem.get('id')}'. Нужно ввести цифры.")
+                    store.add_veterinarians_bulk([Veterinarian(vet_id, elem.get("name"), elem.get("phone"))])
+                elif elem.tag == "VetVisit" and not vets_seen:
+                    pending_visits.append(elem)
+                    continue
+                elif elem.tag in tags:
+                    batch.append(_event_from_xml(elem, store))
+                    if len(batch) >= batch_size:
+                        store.add_bulk(batch)
+                        batch = []
+                # Освобождаем разобранный элемент и ссылку на него из корня
+                root.clear()
+        except ET.ParseError as e:
+            raise InvalidFileFormatError(f"Файл '{filename}' не является корректным XML файлом. Ошибка: {e}")
+        batch.extend(_event_from_xml(elem, store) for elem in pending_visits)
+        store.add_bulk(batch)
+    except Exception as e:
+        raise FileProcessingError(f"Ошибка при загрузке событий из XML: {e}")
@@ -0,0 +1,121 @@
+# tests/test_columnar.py
+import pytest
+import columnar
+from models import Owner, Pet, Breed, PetHouse, Address
+from columnar import ColumnarPetRegistry, PetRow
+from exceptions import PetNotFoundError, OwnerNotFoundError
+
+# Фикстура для колоночного реестра с двумя владельцами
+@pytest.fixture
+def pet_registry():
+    registry = ColumnarPetRegistry()
+    registry.add_owner(Owner(1, "Анна", "123", Address("Ленина, 10", "Москва", "101000")))
+    registry.add_owner(Owner(2, "Иван", "456", Address("Невский, 1", "Санкт-Петербург", "190000")))
+    return registry
+
+def add(registry, name, age, breed, species, owner_id, house=("Квартира", "Средний")):
+    registry.add_pet(Pet(name, age, Breed(breed, species), PetHouse(*house), registry.get_owner(owner_id)))
+
+# Тест: семантика add_pet/get_pet/update_pet сохраняется
+def test_columnar_registry_semantics(pet_registry):
+    add(pet_registry, "Бобик", 3, "Корги", "Собака", 1)
+    pet = pet_registry.get_pet("Бобик")
+    assert isinstance(pet, PetRow)
+    assert (pet.name, pet.age, pet.breed.name, pet.breed.species, pet.house.house_type) == ("Бобик", 3, "Корги", "Собака", "Квартира")
+    assert pet.owner is pet_registry.get_owner(1)
+
+    pet_registry.update_pet("Бобик", new_name="Шарик", new_age=4, new_breed=Breed("Хаски", "Собака"), new_house=PetHouse("Дом", "Большой"))
+    pet = pet_registry.get_pet("Шарик")
+    assert (pet.age, pet.breed.name, pet.house.house_size) == (4, "Хаски", "Большой")
+    pet_registry.update_pet_age("Шарик", 5)
+    assert pet_registry.find_pets(age_between=(5, 5)) == [pet]
+    with pytest.raises(PetNotFoundError):
+        pet_registry.get_pet("Бобик")
+
+    stranger = Owner(3, "Чужой", "000", Address("", "", ""))
+    with pytest.raises(OwnerNotFoundError):
+        pet_registry.add_pet(Pet("Тузик", 1, Breed("Корги", "Собака"), PetHouse("Дом", "Большой"), stranger))
+
+# Тест: строки удаленных питомцев переиспользуются и не попадают в агрегаты
+def test_columnar_delete_reuses_rows(pet_registry):
+    add(pet_registry, "Бобик", 3, "Корги", "Собака", 1)
+    add(pet_registry, "Мурка", 2, "Британская", "Кошка", 2)
+    pet_registry.delete_pet("Бобик")
+    assert pet_registry.count_by("species") == {"Кошка": 1}
+
+    add(pet_registry, "Рекс", 6, "Хаски", "Собака", 1)
+    assert len(pet_registry.columns.names) == 2
+    pet_registry.delete_owner(1)
+    assert [p.name for p in pet_registry.pets] == ["Мурка"]
+    assert len(pet_registry.columns) == 1
+    assert pet_registry.count_by("owner_id") == {2: 1}
+
+# Фикстура: агрегаты считаются через numpy или, без него, через array/Counter
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(columnar, "np", None)
+    return request.param
+
+# Тест для агрегатов по столбцам
+def test_columnar_aggregates(pet_registry, backend):
+    add(pet_registry, "Бобик", 3, "Корги", "Собака", 1)
+    add(pet_registry, "Рекс", 6, "Хаски", "Собака", 1)
+    add(pet_registry, "Мурка", 2, "Британская", "Кошка", 2)
+    add(pet_registry, "Барсик", 11, "Британская", "Кошка", 1, house=("Дом", "Большой"))
+    add(pet_registry, "Тузик", 4, "Корги", "Собака", 2)
+    pet_registry.delete_pet("Тузик")
+
+    assert pet_registry.count_by("species") == {"Собака": 2, "Кошка": 2}
+    assert pet_registry.count_by("breed") == {"Корги": 1, "Хаски": 1, "Британская": 2}
+    assert pet_registry.count_by("house_type") == {"Квартира": 3, "Дом": 1}
+    assert pet_registry.count_by("owner_id") == {1: 3, 2: 1}
+    assert pet_registry.count_by("age") == {2: 1, 3: 1, 6: 1, 11: 1}
+    assert pet_registry.mean_age_by("species") == {"Собака": 4.5, "Кошка": 6.5}
+    assert pet_registry.mean_age_by("owner_id") == pytest.approx({1: 20 / 3, 2: 2.0})
+    assert pet_registry.mean_age_by("house_size") == pytest.approx({"Средний": 11 / 3, "Большой": 11.0})
+    assert pet_registry.age_histogram(5) == {0: 2, 5: 1, 10: 1}
+    assert pet_registry.age_histogram() == {2: 1, 3: 1, 6: 1, 11: 1}
+    # Ключи и значения — обычные числа Python, а не скаляры numpy
+    assert all(type(key) is int and type(count) is int for key, count in pet_registry.count_by("age").items())
+    assert all(type(mean) is float for mean in pet_registry.mean_age_by("breed").values())
+
+# Тест: numpy и чистый Python дают одинаковые агрегаты
+def test_columnar_backends_agree(pet_registry, monkeypatch):
+    pytest.importorskip("numpy")
+    for i in range(200):
+        add(pet_registry, f"Питомец {i}", i % 17, ("Корги", "Хаски", "Мопс")[i % 3], ("Собака", "Кошка")[i % 2], 1 + i % 2)
+    for i in range(0, 200, 7):
+        pet_registry.delete_pet(f"Питомец {i}")
+    queries = [(name, args) for name in ("count_by", "mean_age_by") for args in [(field,) for field in columnar._CODED_FIELDS + columnar._NUMERIC_FIELDS]]
+    queries += [("age_histogram", (width,)) for width in (1, 3, 5)]
+    vectorized = [getattr(pet_registry, name)(*args) for name, args in queries]
+    monkeypatch.setattr(columnar, "np", None)
+    assert [getattr(pet_registry, name)(*args) for name, args in queries] == [pytest.approx(result) for result in vectorized]
+
+# Тест: пустой реестр дает пустые агрегаты
+def test_columnar_aggregates_empty(backend):
+    registry = ColumnarPetRegistry()
+    assert registry.count_by("species") == {}
+    assert registry.count_by("age") == {}
+    assert registry.mean_age_by("breed") == {}
+    assert registry.mean_age_by("owner_id") == {}
+    assert registry.age_histogram() == {}
+
+# Тест: представление удаленного питомца не читает и не меняет питомца, занявшего его строку
+def test_columnar_stale_row(pet_registry):
+    add(pet_registry, "Бобик", 3, "Корги", "Собака", 1)
+    stale = pet_registry.get_pet("Бобик")
+    pet_registry.delete_pet("Бобик")
+    add(pet_registry, "Мурка", 9, "Британская", "Кошка", 2)
+    assert pet_registry.get_pet("Мурка")._row == stale._row
+    with pytest.raises(PetNotFoundError):
+        stale.name
+    with pytest.raises(PetNotFoundError):
+        stale.age = 1
+    with pytest.raises(PetNotFoundError):
+        stale.breed = Breed("Хаски", "Собака")
+    murka = pet_registry.get_pet("Мурка")
+    assert (murka.name, murka.age, murka.breed.name, murka.owner.owner_id) == ("Мурка", 9, "Британская", 2)
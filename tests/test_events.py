@@ -0,0 +1,156 @@
+# tests/test_events.py
+import pytest
+from models import Owner, Pet, Breed, PetHouse, Address, PetEvent, VetVisit, PetServiceBooking, Prescription, Veterinarian
+from registry import PetRegistry
+from threadsafe import ThreadSafePetRegistry
+from events import EventStore, parse_date, format_timestamp, month_of, MIN_TIMESTAMP, MAX_TIMESTAMP
+from storage import save_events_to_json, load_events_from_json, save_events_to_xml, load_events_from_xml
+from exceptions import InvalidDataError, PetNotFoundError, VeterinarianNotFoundError, FileProcessingError
+
+# Фикстура: реестр из одного владельца и двух питомцев
+@pytest.fixture
+def pet_registry():
+    registry = PetRegistry()
+    owner = Owner(1, "Анна", "123", Address("Ленина, 10", "Москва", "101000"))
+    registry.add_owner(owner)
+    registry.add_pet(Pet("Бобик", 3, Breed("Корги", "Собака"), PetHouse("Квартира", "Средний"), owner))
+    registry.add_pet(Pet("Мурка", 2, Breed("Британская", "Кошка"), PetHouse("Дом", "Большой"), owner))
+    return registry
+
+# Фикстура: хранилище с записями всех видов, добавленными не по порядку дат
+@pytest.fixture
+def store(pet_registry):
+    store = EventStore(pet_registry)
+    vet = Veterinarian(7, "Доктор Айболит", "03")
+    store.add_veterinarian(vet)
+    store.add_veterinarian(Veterinarian(8, "Доктор Ватсон", "911"))
+    bobik, murka = pet_registry.get_pet("Бобик"), pet_registry.get_pet("Мурка")
+    store.add_bulk([
+        VetVisit(bobik, vet, "2024-08-15 10:00", "Прививка"),
+        VetVisit(bobik, vet, "2024-06-30", "Осмотр"),
+        VetVisit(murka, vet, "01.07.2024", "Осмотр"),
+        VetVisit(bobik, store.get_veterinarian(8), "2024-09-30T23:59", "Травма, лапа"),
+        VetVisit(bobik, vet, "2024-10-01", "Контроль"),
+        PetEvent(bobik, "Кормление", "2024-07-02"),
+        PetServiceBooking(murka, store.service("Стрижка", 1500.0), "2024-07-03"),
+        Prescription(bobik, "Амоксициллин", "2 раза в день", "2024-09-20"),
+        Prescription(murka, "Витамины", "1 раз в день", "2024-08-01"),
+    ])
+    return store
+
+def dump_events(store):
+    """Записи хранилища в виде простых значений для сравнения."""
+    return (
+        [(e.pet.name, e.event_type, e.date) for e in store.between(PetEvent)],
+        [(v.pet.name, v.veterinarian.vet_id, v.date, v.reason, v.duration) for v in store.between(VetVisit)],
+        [(b.pet.name, b.service.service_name, b.service.price, b.date) for b in store.between(PetServiceBooking)],
+        [(p.pet.name, p.medication, p.dosage, p.date) for p in store.between(Prescription)],
+    )
+
+# Тест: разбор дат в отметки времени
+def test_parse_date():
+    assert parse_date("2024-07-01") == parse_date("01.07.2024") == parse_date(" 2024-7-1 ")
+    assert parse_date("2024-07-01 09:30") - parse_date("2024-07-01") == 9 * 60 + 30
+    assert parse_date("2024-07-01T09:30:15") == parse_date("01.07.2024 09:30")
+    assert format_timestamp(parse_date("2024-02-29 23:05")) == "2024-02-29 23:05"
+    assert month_of(parse_date("2024-12-31 23:59")) + 1 == month_of(parse_date("2025-01-01"))
+    for text in ("вчера", "2023-02-29", "2024-07-01 25:00", ""):
+        with pytest.raises(InvalidDataError):
+            parse_date(text)
+
+# Тест: запросы по диапазону дат, питомцу и ветеринару
+def test_range_queries(store):
+    q3 = [visit.reason for visit in store.for_pet("Бобик", VetVisit, "2024-07-01", "2024-10-01")]
+    assert q3 == ["Прививка", "Травма, лапа"]
+    assert [visit.reason for visit in store.between(VetVisit, "2024-07-01", "2024-10-01")] == ["Осмотр", "Прививка", "Травма, лапа"]
+    assert len(store.between(VetVisit)) == 5
+    assert store.between(VetVisit, "2024-10-01", "2024-07-01") == []
+    assert [visit.reason for visit in store.for_veterinarian(8)] == ["Травма, лапа"]
+    assert [p.medication for p in store.last_days(Prescription, 30, now="2024-09-25")] == ["Амоксициллин"]
+    assert [p.medication for p in store.last_days(Prescription, 60, now="2024-09-25")] == ["Витамины", "Амоксициллин"]
+    assert store.for_pet("Мурка", PetEvent) == []
+    assert store.bounds("2024-07-01", parse_date("2024-08-01")) == (parse_date("2024-07-01"), parse_date("2024-08-01"))
+    assert store.bounds() == (MIN_TIMESTAMP, MAX_TIMESTAMP)
+    assert (len(store), store.count(VetVisit)) == (9, 5)
+    with pytest.raises(PetNotFoundError):
+        store.for_pet("Нет такого", VetVisit)
+    with pytest.raises(VeterinarianNotFoundError):
+        store.for_veterinarian(99)
+
+# Тест: проверки при добавлении; неверная пачка отклоняется целиком
+def test_add_validation(store, pet_registry):
+    bobik = pet_registry.get_pet("Бобик")
+    stranger = Pet("Чужой", 1, bobik.breed, bobik.house, bobik.owner)
+    with pytest.raises(PetNotFoundError):
+        store.add(PetEvent(stranger, "Прогулка", "2024-07-01"))
+    with pytest.raises(VeterinarianNotFoundError):
+        store.add(VetVisit(bobik, Veterinarian(99, "Никто", ""), "2024-07-01", "Осмотр"))
+    with pytest.raises(InvalidDataError):
+        store.add_bulk([PetEvent(bobik, "Прогулка", "2024-07-01"), PetEvent(bobik, "Прогулка", "не дата")])
+    with pytest.raises(InvalidDataError):
+        store.add_veterinarian(Veterinarian(7, "Дубликат", ""))
+    assert len(store) == 9
+    # Проверка и добавление по отдельности
+    with pytest.raises(PetNotFoundError):
+        store.validate(PetEvent(stranger, "Прогулка", "2024-07-01"))
+    walk = PetEvent(bobik, "Прогулка", "2024-07-01 08:00")
+    store.add_validated(walk, store.validate(walk))
+    assert store.for_pet("Бобик", PetEvent, "2024-07-01", "2024-07-02") == [walk] and len(store) == 10
+
+# Тест: удаление и переименование питомца отражаются в хранилище
+def test_registry_changes(store, pet_registry):
+    visit = store.for_pet("Бобик", VetVisit)[0]
+    store.remove(visit)
+    with pytest.raises(InvalidDataError):
+        store.remove(visit)
+    pet_registry.update_pet("Бобик", new_name="Шарик")
+    assert len(store.for_pet("Шарик", VetVisit)) == 3
+    pet_registry.delete_pet("Шарик")
+    assert [visit.reason for visit in store.between(VetVisit)] == ["Осмотр"]
+    assert store.count(Prescription) == 1 and store.for_veterinarian(8) == []
+    pet_registry.delete_owner(1)
+    assert len(store) == 0
+    store.close()
+
+# Тест: сохранение и загрузка в JSON и XML дают те же записи
+@pytest.mark.parametrize("save, load", [(save_events_to_json, load_events_from_json), (save_events_to_xml, load_events_from_xml)])
+def test_round_trip(store, pet_registry, tmp_path, save, load):
+    filename = str(tmp_path / "events")
+    save(store, filename)
+    loaded = EventStore(pet_registry)
+    load(loaded, filename, batch_size=2)
+    assert [(v.vet_id, v.name, v.phone) for v in loaded.veterinarians] == [(7, "Доктор Айболит", "03"), (8, "Доктор Ватсон", "911")]
+    assert dump_events(loaded) == dump_events(store)
+
+# Тест: ошибки загрузки оборачиваются в FileProcessingError
+def test_load_errors(pet_registry, tmp_path):
+    path = tmp_path / "events.json"
+    path.write_text('{"veterinarians": [], "pet_events": [{"pet": "Нет такого", "event_type": "x", "date": "2024-01-01"}]}', encoding="utf-8")
+    with pytest.raises(FileProcessingError):
+        load_events_from_json(EventStore(pet_registry), str(path))
+    path = tmp_path / "events.xml"
+    path.write_text('<EventStore><VetVisit pet="Бобик" vet_id="1" date="2024-01-01" reason=""/></EventStore>', encoding="utf-8")
+    with pytest.raises(FileProcessingError):
+        load_events_from_xml(EventStore(pet_registry), str(path))
+
+# Тест: на ThreadSafePetRegistry записи переходят на новый объект питомца после изменений
+def test_thread_safe_registry(tmp_path):
+    registry = ThreadSafePetRegistry()
+    registry.add_owner(Owner(1, "Анна", "123", Address("Ленина, 10", "Москва", "101000")))
+    registry.add_pet(Pet("Бобик", 3, Breed("Корги", "Собака"), PetHouse("Квартира", "Средний"), registry.get_owner(1)))
+    store = EventStore(registry)
+    store.add_veterinarian(Veterinarian(7, "Доктор Айболит", "03"))
+    store.add(VetVisit(registry.get_pet("Бобик"), store.get_veterinarian(7), "2024-07-01", "Осмотр"))
+    store.add(PetEvent(registry.get_pet("Бобик"), "Прогулка", "2024-07-02"))
+    registry.update_pet("Бобик", new_name="Шарик")
+    registry.update_pet_age("Шарик", 4)
+    registry.update_owner(1, new_name="Анна Петрова")
+    visit = store.for_pet("Шарик", VetVisit)[0]
+    assert visit.pet is registry.get_pet("Шарик") and visit.pet.owner.name == "Анна Петрова"
+    filename = str(tmp_path / "events.json")
+    save_events_to_json(store, filename)
+    loaded = EventStore(registry)
+    load_events_from_json(loaded, filename)
+    assert dump_events(loaded) == dump_events(store)
+    store.remove(visit)
+    assert store.for_pet("Шарик", VetVisit) == [] and len(store) == 1
@@ -0,0 +1,136 @@
+# tests/test_journal.py
+import os
+import shutil
+import pytest
+from models import Owner, Pet, Breed, PetHouse, Address
+from journal import Journal, JournaledRegistry
+from exceptions import FileProcessingError, InvalidFileFormatError
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "registry.snap"), str(tmp_path / "registry.journal")
+
+def state(registry):
+    return (
+        [(o.owner_id, o.name, o.phone, o.address.city) for o in registry.owners],
+        sorted((p.name, p.age, p.breed.name, p.house.house_type, p.owner.owner_id) for p in registry.pets),
+    )
+
+def mutate(registry):
+    registry.add_owner(Owner(1, "Анна", "123", Address("Ленина, 10", "Москва", "101000")))
+    registry.add_owner(Owner(2, "Иван", "456", Address("Невский, 1", "Санкт-Петербург", "190000")))
+    registry.add_pet(Pet("Бобик", 3, Breed("Корги", "Собака"), PetHouse("Квартира", "Средний"), registry.get_owner(1)))
+    registry.add_pet(Pet("Мурка", 2, Breed("Британская", "Кошка"), PetHouse("Дом", "Большой"), registry.get_owner(2)))
+    registry.add_pet(Pet("Рекс", 5, Breed("Хаски", "Собака"), PetHouse("Дом", "Большой"), registry.get_owner(2)))
+    registry.update_pet("Бобик", new_name="Шарик", new_breed=Breed("Бигль", "Собака"))
+    registry.update_pet_age("Мурка", 3)
+    registry.update_owner(1, new_phone="789", new_address=Address("Тверская, 1", "Москва", "125009"))
+    registry.delete_pet("Рекс")
+    registry.add_owner(Owner(3, "Петр", "000", Address("", "Казань", "")))
+    registry.add_pet(Pet("Тузик", 1, Breed("Корги", "Собака"), PetHouse("Будка", "Малый"), registry.get_owner(3)))
+    registry.delete_owner(3)
+
+# Тест: изменения переживают перезапуск через проигрывание журнала
+def test_journal_replay(paths):
+    store = JournaledRegistry(*paths)
+    registry = store.open()
+    mutate(registry)
+    expected = state(registry)
+    store.close()
+
+    with JournaledRegistry(*paths) as reopened:
+        assert state(reopened) == expected
+        reopened.update_pet_age("Шарик", 10)
+    with JournaledRegistry(*paths) as reopened:
+        assert reopened.get_pet("Шарик").age == 10
+
+# Тест: записи копятся группой и попадают в файл одним блоком
+def test_journal_group_commit(paths):
+    store = JournaledRegistry(*paths, group_size=100, fsync_every=0)
+    registry = store.open()
+    size_after_open = os.path.getsize(paths[1])
+    mutate(registry)
+    assert os.path.getsize(paths[1]) == size_after_open
+    store.journal.commit()
+    assert os.path.getsize(paths[1]) > size_after_open
+    store.close()
+
+# Тест: журнал сворачивается в снимок после порога
+def test_journal_compaction(paths):
+    store = JournaledRegistry(*paths, group_size=1, compact_threshold=300)
+    registry = store.open()
+    mutate(registry)
+    expected = state(registry)
+    assert os.path.exists(paths[0])
+    assert store.journal.generation > 0
+    assert os.path.getsize(paths[1]) <= 300
+    store.close()
+
+    with JournaledRegistry(*paths) as reopened:
+        assert state(reopened) == expected
+
+# Тест: сбой между заменой снимка и очисткой журнала не дублирует изменения
+def test_journal_stale_generation_discarded(paths, tmp_path):
+    store = JournaledRegistry(*paths, group_size=1)
+    mutate(store.open())
+    expected = state(store.registry)
+    store.journal.commit()
+    old_journal = str(tmp_path / "old.journal")
+    shutil.copy(paths[1], old_journal)
+    store.compact()
+    store.close()
+    # Возвращаем журнал прошлого поколения, как будто очистка не успела пройти
+    shutil.copy(old_journal, paths[1])
+
+    with JournaledRegistry(*paths) as reopened:
+        assert state(reopened) == expected
+
+# Тест: Journal.open начинает журнал другого поколения заново и дописывает журнал своего
+def test_journal_open_checks_generation(paths):
+    journal = Journal(paths[1])
+    journal.open(1)
+    journal.record("add_owner", Owner(1, "Анна", "123", Address("Ленина, 10", "Москва", "101000")))
+    journal.close()
+
+    journal.open(1)
+    journal.close()
+    generation, entries = journal.read()
+    assert generation == 1 and len(entries) == 1
+
+    journal.open(2)
+    journal.close()
+    assert journal.read() == (2, [])
+
+    with open(paths[1], 'w', encoding='utf-8') as f:
+        f.write("не журнал\n")
+    with pytest.raises(InvalidFileFormatError):
+        Journal(paths[1]).open(2)
+
+# Тест: оборванная последняя строка отбрасывается
+def test_journal_torn_tail(paths):
+    store = JournaledRegistry(*paths, group_size=1)
+    mutate(store.open())
+    expected = state(store.registry)
+    store.close()
+    with open(paths[1], 'ab') as f:
+        f.write('["ap","Полу'.encode('utf-8'))
+
+    with JournaledRegistry(*paths) as reopened:
+        assert state(reopened) == expected
+        reopened.update_pet_age("Шарик", 4)
+    with JournaledRegistry(*paths) as reopened:
+        assert reopened.get_pet("Шарик").age == 4
+
+# Тест: испорченная строка в середине журнала — ошибка
+def test_journal_corrupted(paths):
+    store = JournaledRegistry(*paths, group_size=1)
+    mutate(store.open())
+    store.close()
+    with open(paths[1], 'rb') as f:
+        lines = f.readlines()
+    lines[2] = b"{broken\n"
+    with open(paths[1], 'wb') as f:
+        f.writelines(lines)
+
+    with pytest.raises(FileProcessingError):
+        JournaledRegistry(*paths).open()
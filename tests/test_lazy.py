@@ -0,0 +1,125 @@
+# tests/test_lazy.py
+import json
+import pytest
+from models import Owner, Pet, Breed, PetHouse, Address
+from registry import PetRegistry
+from storage import save_to_json, save_to_snapshot
+from json_stream import JSONStreamReader
+from lazy import JSONIndex, open_lazy
+from exceptions import OwnerNotFoundError, PetNotFoundError, InvalidFileFormatError
+
+# Фикстура: реестр из 5 владельцев и 20 питомцев с кириллицей
+@pytest.fixture
+def pet_registry():
+    registry = PetRegistry()
+    for i in range(5):
+        registry.add_owner(Owner(i, f"Владелец «{i}»", "+7", Address("Ленина, 10", "Москва", "101000")))
+    for i in range(20):
+        registry.add_pet(Pet(f"Питомец {i}", i, Breed("Корги", "Собака"), PetHouse("Дом", "Большой"), registry.get_owner(i % 5)))
+    return registry
+
+def dump(registry):
+    """Состояние реестра в виде простых значений для сравнения."""
+    return (
+        [(o.owner_id, o.name, o.phone, o.address.street, o.address.city, o.address.postal_code) for o in registry.owners],
+        [(p.name, p.age, p.breed.name, p.breed.species, p.house.house_type, p.house.house_size, p.owner.owner_id) for p in registry.pets],
+    )
+
+# Фикстура: один и тот же реестр в JSON и в снимке
+@pytest.fixture(params=["json", "snapshot"])
+def filename(request, pet_registry, tmp_path):
+    path = str(tmp_path / f"pets.{request.param}")
+    (save_to_json if request.param == "json" else save_to_snapshot)(pet_registry, path)
+    return path
+
+# Тест: байтовые смещения JSONStreamReader указывают на записи, в том числе на границах кусков
+def test_stream_reader_byte_spans(tmp_path):
+    data = {"owners": [{"name": "Ёжик" * i, "id": i} for i in range(50)], "pets": []}
+    path = tmp_path / "spans.json"
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+    raw = path.read_bytes()
+    with open(path, encoding="utf-8", newline="") as f:
+        spans = list(JSONStreamReader(f, chunk_size=7, track_bytes=True).iter_array_spans(("owners", "pets")))
+    assert len(spans) == 50
+    for key, position, record, start, end in spans:
+        assert json.loads(raw[start:end]) == record == data["owners"][position]
+
+# Тест: ленивый реестр совпадает с обычным, а записи создаются только при обращении
+def test_lazy_registry_matches_registry(pet_registry, filename):
+    with open_lazy(filename) as lazy:
+        assert lazy.hydrated_owners == lazy.hydrated_pets == 0
+        pet = lazy.get_pet("Питомец 7")
+        assert (pet.age, pet.owner.owner_id, pet.owner.name) == (7, 2, "Владелец «2»")
+        assert lazy.hydrated_pets == 1 and lazy.hydrated_owners == 1
+        assert lazy.get_pet("Питомец 7") is pet
+        assert [p.name for p in lazy.pets_of(3)] == [p.name for p in pet_registry.pets_of(3)]
+        assert (lazy.owner_count, lazy.pet_count) == (5, 20)
+        assert dump(lazy) == dump(pet_registry)
+        with pytest.raises(PetNotFoundError):
+            lazy.get_pet("Нет такого")
+        with pytest.raises(OwnerNotFoundError):
+            lazy.get_owner(99)
+
+# Тест: JSON читается не дальше нужной записи
+def test_json_index_scans_incrementally(pet_registry, tmp_path):
+    path = str(tmp_path / "pets.json")
+    save_to_json(pet_registry, path)
+    with JSONIndex(path) as index:
+        assert index.find_owner(1) == 1
+        assert len(index._owner_records) == 2 and not index._pet_records
+        assert index.find_pet("Питомец 2") == 2
+        assert len(index._pet_records) == 3 and not index.complete
+        assert index.find_pet("Нет такого") is None
+        assert index.complete
+
+# Тест: LRU ограничивает число созданных записей
+def test_cache_is_bounded(pet_registry, filename):
+    with open_lazy(filename, cache_size=3) as lazy:
+        names = [pet.name for pet in lazy.iter_pets()]
+        assert names == [pet.name for pet in pet_registry.pets]
+        assert lazy.hydrated_pets == 3 and lazy.hydrated_owners == 3
+        misses = lazy.misses
+        lazy.get_pet("Питомец 19")
+        assert lazy.misses == misses
+        lazy.get_pet("Питомец 0")
+        assert lazy.misses > misses
+
+# Тест: полный проход по файлу не наполняет кэш строк и пул адресов
+def test_scan_memory_is_bounded(tmp_path, filename):
+    registry = PetRegistry()
+    for i in range(200):
+        registry.add_owner(Owner(i, f"Владелец {i}", f"+7 {i}", Address(f"Улица {i}", f"Город {i % 7}", str(i))))
+        registry.add_pet(Pet(f"Питомец {i}", i % 15, Breed("Корги", "Собака"), PetHouse("Дом", "Большой"), registry.get_owner(i)))
+    (save_to_json if filename.endswith(".json") else save_to_snapshot)(registry, filename)
+    with open_lazy(filename, cache_size=4) as lazy:
+        assert dump(lazy) == dump(registry)
+        assert lazy.hydrated_owners == lazy.hydrated_pets == 4
+        # В пуле остаются только общие порода и дом, адреса владельцев не копятся
+        assert len(lazy._source._interner) == 2
+        assert getattr(lazy._source, "_strings", None) is None
+
+# Тест: materialize переносит записи в обычный реестр, дубликаты в JSON пропускаются
+def test_materialize_and_duplicates(pet_registry, tmp_path):
+    data = {
+        "owners": [{"owner_id": 1, "name": "Иван", "phone": "1", "address": {"street": "a", "city": "b", "postal_code": "c"}},
+                   {"owner_id": 1, "name": "Дубликат", "phone": "2", "address": {"street": "a", "city": "b", "postal_code": "c"}}],
+        "pets": [{"name": "Бобик", "age": 3, "breed": {"name": "Корги", "species": "Собака"},
+                  "house": {"house_type": "Дом", "house_size": "Большой"}, "owner_id": 1}] * 2,
+    }
+    path = tmp_path / "dups.json"
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    with open_lazy(str(path)) as lazy:
+        registry = lazy.materialize()
+    assert [o.name for o in registry.owners] == ["Иван"]
+    assert registry.get_pet("Бобик").owner is registry.get_owner(1)
+
+# Тест: ошибки формата
+def test_invalid_json(tmp_path):
+    path = tmp_path / "bad.json"
+    path.write_text('{"owners": [{"owner_id": "x"}]}', encoding="utf-8")
+    with open_lazy(str(path)) as lazy:
+        with pytest.raises(InvalidFileFormatError):
+            lazy.get_owner(1)
+    (tmp_path / "empty.json").write_bytes(b"")
+    with pytest.raises(InvalidFileFormatError):
+        open_lazy(str(tmp_path / "empty.json"))
@@ -0,0 +1,144 @@
+# tests/test_metrics.py
+import json
+import threading
+import pytest
+from models import Owner, Pet, Breed, PetHouse, Address
+from registry import PetRegistry
+from threadsafe import ThreadSafePetRegistry
+from storage import save_to_json, load_from_json, load_from_xml, save_to_sqlite, load_from_sqlite
+from exceptions import PetNotFoundError, FileProcessingError
+from metrics import Histogram, metrics
+
+# Фикстура: включенные метрики, после теста — выключенные и пустые
+@pytest.fixture
+def enabled_metrics():
+    metrics.reset()
+    metrics.enable()
+    yield metrics
+    metrics.disable()
+    metrics.reset()
+
+# Фикстура: реестр из 2 владельцев и 3 питомцев
+@pytest.fixture
+def pet_registry():
+    registry = PetRegistry()
+    for i in range(2):
+        registry.add_owner(Owner(i, f"Владелец {i}", "+7", Address("Ленина, 10", "Москва", "101000")))
+    for i in range(3):
+        registry.add_pet(Pet(f"Питомец {i}", i, Breed("Корги", "Собака"), PetHouse("Дом", "Большой"), registry.get_owner(i % 2)))
+    return registry
+
+# Тест: выключенные метрики ничего не собирают и не подменяют методы
+def test_disabled_metrics_leave_registry_untouched(pet_registry, tmp_path):
+    original = PetRegistry.get_pet
+    metrics.reset()
+    pet_registry.get_pet("Питомец 0")
+    save_to_json(pet_registry, str(tmp_path / "registry.json"))
+    assert PetRegistry.get_pet is original
+    assert metrics.to_dict() == {"counters": {}, "latency": {}, "bytes": {}}
+
+# Тест: вызовы методов реестра считаются, ошибки — отдельно
+def test_registry_methods_are_counted(enabled_metrics, pet_registry):
+    pet_registry.get_pet("Питомец 1")
+    pet_registry.get_pet("Питомец 2")
+    with pytest.raises(PetNotFoundError):
+        pet_registry.get_pet("Нет такого")
+    pet_registry.pets
+    latency = enabled_metrics.to_dict()["latency"]
+    assert latency["PetRegistry.get_pet"]["count"] == 3
+    assert latency["PetRegistry.pets"]["count"] == 1
+    assert enabled_metrics.counters["PetRegistry.get_pet.errors"] == 1
+
+# Тест: disable возвращает исходные методы и свойства
+def test_disable_restores_methods():
+    originals = dict(vars(PetRegistry))
+    metrics.enable(ThreadSafePetRegistry)
+    assert PetRegistry.get_pet is not originals["get_pet"]
+    metrics.disable()
+    metrics.reset()
+    assert dict(vars(PetRegistry)) == originals
+    registry = ThreadSafePetRegistry()
+    registry.add_owner(Owner(1, "Иван", "+7", Address("Ленина, 1", "Москва", "101000")))
+    assert registry.owners[0].name == "Иван"
+    assert metrics.to_dict()["latency"] == {}
+
+# Тест: функции хранения записывают время, фазы и размер файла
+def test_storage_phases_and_bytes(enabled_metrics, pet_registry, tmp_path):
+    filename = str(tmp_path / "registry.json")
+    save_to_json(pet_registry, filename)
+    load_from_json(PetRegistry(), filename)
+    latency = enabled_metrics.histograms
+    for name in ("save_to_json", "save_to_json.owners", "save_to_json.pets", "load_from_json",
+                 "load_from_json.parse", "load_from_json.owners", "load_from_json.pets"):
+        assert latency[name].count == 1, name
+    assert latency["load_from_json.index"].count == 2
+    size = (tmp_path / "registry.json").stat().st_size
+    assert enabled_metrics.bytes == {"save_to_json": size, "load_from_json": size}
+
+    database = str(tmp_path / "registry.db")
+    save_to_sqlite(pet_registry, database)
+    load_from_sqlite(PetRegistry(), database)
+    assert latency["save_to_sqlite.write"].count == 1
+    assert latency["load_from_sqlite.pets"].count == 1
+
+# Тест: ошибка загрузки считается, а исключение пробрасывается без изменений
+def test_storage_error_is_counted(enabled_metrics, tmp_path):
+    broken = tmp_path / "broken.xml"
+    broken.write_text("<PetRegistry>", encoding="utf-8")
+    with pytest.raises(FileProcessingError):
+        load_from_xml(PetRegistry(), str(broken))
+    assert enabled_metrics.counters["load_from_xml.errors"] == 1
+    assert enabled_metrics.histograms["load_from_xml"].count == 1
+
+# Тест: гистограмма раскладывает задержки по интервалам и оценивает перцентили
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for _ in range(99):
+        histogram.record(1.5e-6)
+    histogram.record(0.3)
+    assert histogram.count == 100
+    assert histogram.percentile(0.5) == 2e-6
+    assert histogram.percentile(0.99) == 2e-6
+    assert histogram.percentile(1.0) == 0.3
+    assert histogram.to_dict()["buckets"] == {"2e-06": 99, "0.5": 1}
+
+# Тест: дампы в тексте и JSON
+def test_dumps(pet_registry, enabled_metrics, tmp_path):
+    pet_registry.get_owner(0)
+    text = enabled_metrics.dump_text()
+    assert any(line.startswith("PetRegistry.get_owner ") for line in text.splitlines()[1:])
+    filename = tmp_path / "metrics.json"
+    enabled_metrics.dump_json(str(filename))
+    data = json.loads(filename.read_text(encoding="utf-8"))
+    assert data["latency"]["PetRegistry.get_owner"]["count"] == 1
+
+# Тест: методы ThreadSafePetRegistry замеряются, вложенные вызовы считаются один раз
+def test_thread_safe_and_nested_calls(enabled_metrics):
+    registry = ThreadSafePetRegistry()
+    registry.add_owners_bulk([Owner(i, f"Владелец {i}", "+7", Address("Ленина, 10", "Москва", "101000")) for i in range(3)])
+    registry.get_owner(1)
+    registry.update_owner(1, new_name="Иван")
+    latency = enabled_metrics.histograms
+    assert latency["ThreadSafePetRegistry.get_owner"].count == 1
+    assert latency["ThreadSafePetRegistry.add_owners_bulk"].count == 1
+    assert latency["ThreadSafePetRegistry.update_owner"].count == 1
+    # add_owners_bulk и update_owner вызывают add_owner/get_owner внутри — они не замеряются
+    assert "PetRegistry.add_owner" not in latency and "PetRegistry.get_owner" not in latency
+
+    plain = PetRegistry()
+    plain.add_owner(Owner(1, "Анна", "+7", Address("Ленина, 10", "Москва", "101000")))
+    plain.add_pets_bulk([Pet(f"Питомец {i}", i, Breed("Корги", "Собака"), PetHouse("Дом", "Большой"), plain.get_owner(1)) for i in range(5)])
+    assert latency["PetRegistry.add_pets_bulk"].count == 1 and "PetRegistry.add_pet" not in latency
+
+# Тест: вызовы из нескольких потоков не теряются
+def test_concurrent_counting(enabled_metrics, pet_registry):
+    def work():
+        for _ in range(2000):
+            pet_registry.get_pet("Питомец 0")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert enabled_metrics.histograms["PetRegistry.get_pet"].count == 16000
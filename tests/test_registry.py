@@ -1,8 +1,9 @@
 # tests/test_registry.py
+import random
 import pytest
 from models import Owner, Pet, Breed, PetHouse, Address
-from registry import PetRegistry
-from exceptions import PetNotFoundError
+from registry import PetRegistry, check_stats
+from exceptions import PetNotFoundError, OwnerNotFoundError, InvalidDataError
 
 # Фикстура для создания реестра питомцев
 @pytest.fixture
@@ -89,3 +90,165 @@ def test_delete_owner(pet_registry, owner):
     assert len(pet_registry.owners) == 0
     assert len(pet_registry.pets) == 0  # Питомцы тоже должны удалиться
 
+
+# Тест: после переименования питомец доступен только по новому имени
+def test_update_pet_name_reindexes(pet_registry, owner):
+    pet_registry.add_owner(owner)
+    pet = Pet(name="Max", age=5, breed=Breed("Bulldog", "Dog"), house=PetHouse("Apartment", "Medium"), owner=owner)
+    pet_registry.add_pet(pet)
+
+    pet_registry.update_pet("Max", new_name="Buddy")
+    assert pet_registry.get_pet("Buddy") is pet
+    with pytest.raises(PetNotFoundError):
+        pet_registry.get_pet("Max")
+
+# Тест: повторная регистрация владельца или питомца с тем же ключом запрещена
+def test_duplicate_keys_rejected(pet_registry, owner):
+    pet_registry.add_owner(owner)
+    with pytest.raises(InvalidDataError):
+        pet_registry.add_owner(Owner(1, "Someone", "000", owner.address))
+    pet_registry.add_pet(Pet("Max", 5, Breed("Bulldog", "Dog"), PetHouse("Apartment", "Medium"), owner))
+    with pytest.raises(InvalidDataError):
+        pet_registry.add_pet(Pet("Max", 2, Breed("Pug", "Dog"), PetHouse("House", "Small"), owner))
+    assert len(pet_registry.pets) == 1
+
+# Тест: питомец чужого (незарегистрированного) владельца с тем же ID не добавляется
+def test_add_pet_requires_registered_owner_object(pet_registry, owner):
+    pet_registry.add_owner(owner)
+    impostor = Owner(1, "Impostor", "000", owner.address)
+    with pytest.raises(OwnerNotFoundError):
+        pet_registry.add_pet(Pet("Max", 5, Breed("Bulldog", "Dog"), PetHouse("Apartment", "Medium"), impostor))
+
+# Тест для списка питомцев владельца
+def test_pets_of(pet_registry, owner):
+    pet_registry.add_owner(owner)
+    other = Owner(2, "Jane Roe", "555", owner.address)
+    pet_registry.add_owner(other)
+    breed = Breed("Bulldog", "Dog")
+    house = PetHouse("Apartment", "Medium")
+    pet_registry.add_pet(Pet("Max", 5, breed, house, owner))
+    pet_registry.add_pet(Pet("Rex", 2, breed, house, other))
+    pet_registry.add_pet(Pet("Bim", 1, breed, house, owner))
+
+    assert [p.name for p in pet_registry.pets_of(1)] == ["Max", "Bim"]
+    pet_registry.update_pet("Max", new_name="Buddy")
+    pet_registry.delete_pet("Bim")
+    assert [p.name for p in pet_registry.pets_of(1)] == ["Buddy"]
+
+    pet_registry.delete_owner(1)
+    assert [p.name for p in pet_registry.pets] == ["Rex"]
+    with pytest.raises(OwnerNotFoundError):
+        pet_registry.pets_of(1)
+
+# Тест для поиска питомцев по вторичным индексам
+def test_find_pets(pet_registry, owner):
+    spb = Owner(2, "Jane Roe", "555", Address("Nevsky 1", "Saint Petersburg", "190000"))
+    pet_registry.add_owner(owner)
+    pet_registry.add_owner(spb)
+    house = PetHouse("Apartment", "Medium")
+    pet_registry.add_pet(Pet("Max", 5, Breed("Bulldog", "Dog"), house, owner))
+    pet_registry.add_pet(Pet("Tom", 3, Breed("Siamese", "Cat"), house, owner))
+    pet_registry.add_pet(Pet("Kitty", 7, Breed("Persian", "Cat"), house, owner))
+    pet_registry.add_pet(Pet("Luna", 2, Breed("Siamese", "Cat"), house, spb))
+
+    assert [p.name for p in pet_registry.find_pets(species="Cat", city="New York", age_between=(2, 5))] == ["Tom"]
+    assert [p.name for p in pet_registry.find_pets(breed="Siamese")] == ["Luna", "Tom"]
+    assert [p.name for p in pet_registry.find_pets(age_between=(5, 10))] == ["Kitty", "Max"]
+    assert pet_registry.find_pets(species="Parrot") == []
+
+    # Индексы следуют за изменениями записей
+    pet_registry.update_pet_age("Tom", 9)
+    pet_registry.update_owner(1, new_address=Address("Nevsky 2", "Saint Petersburg", "190000"))
+    assert [p.name for p in pet_registry.find_pets(city="Saint Petersburg", species="Cat")] == ["Kitty", "Luna", "Tom"]
+    assert [p.name for p in pet_registry.find_pets(age_between=(8, 9))] == ["Tom"]
+    pet_registry.update_pet("Kitty", new_breed=Breed("Beagle", "Dog"))
+    assert [p.name for p in pet_registry.find_pets(species="Dog")] == ["Kitty", "Max"]
+    pet_registry.delete_owner(1)
+    assert [p.name for p in pet_registry.find_pets(species="Cat")] == ["Luna"]
+
+# Тест для пакетного добавления с пропуском дубликатов
+def test_bulk_add(pet_registry, owner):
+    other = Owner(2, "Jane Roe", "555", owner.address)
+    assert pet_registry.add_owners_bulk([owner, other, Owner(1, "Dup", "000", owner.address)]) == 2
+    assert pet_registry.get_owner(1) is owner
+
+    breed = Breed("Bulldog", "Dog")
+    house = PetHouse("Apartment", "Medium")
+    pets = [Pet("Max", 5, breed, house, owner), Pet("Rex", 2, breed, house, other), Pet("Max", 1, breed, house, other)]
+    assert pet_registry.add_pets_bulk(pets) == 2
+    assert pet_registry.get_pet("Max").age == 5
+    assert [p.name for p in pet_registry.pets_of(2)] == ["Rex"]
+
+    # Пачка с незарегистрированным владельцем отклоняется целиком
+    stranger = Owner(3, "Stranger", "111", owner.address)
+    with pytest.raises(OwnerNotFoundError):
+        pet_registry.add_pets_bulk([Pet("Bim", 1, breed, house, owner), Pet("Tuzik", 1, breed, house, stranger)])
+    with pytest.raises(PetNotFoundError):
+        pet_registry.get_pet("Bim")
+
+# Тест: update_pet и update_owner используют общие экземпляры из пула
+def test_updates_use_interned_values(pet_registry, owner):
+    pet_registry.add_owner(owner)
+    house = PetHouse("Apartment", "Medium")
+    pet_registry.add_pet(Pet("Max", 5, Breed("Bulldog", "Dog"), house, owner))
+    pet_registry.add_pet(Pet("Rex", 2, Breed("Pug", "Dog"), house, owner))
+
+    pet_registry.update_pet("Max", new_breed=Breed("Beagle", "Dog"), new_house=PetHouse("House", "Big"))
+    pet_registry.update_pet("Rex", new_breed=Breed("Beagle", "Dog"), new_house=PetHouse("House", "Big"))
+    max_pet, rex = pet_registry.get_pet("Max"), pet_registry.get_pet("Rex")
+    assert max_pet.breed is rex.breed
+    assert max_pet.house is rex.house
+    assert max_pet.breed is pet_registry.interner.breed("Beagle", "Dog")
+
+    pet_registry.update_owner(1, new_address=Address("5th Ave", "Boston", "02101"))
+    assert owner.address is pet_registry.interner.address("5th Ave", "Boston", "02101")
+
+# Тест: у моделей нет __dict__, значит используются __slots__
+def test_models_use_slots(owner):
+    assert not hasattr(owner, "__dict__")
+    assert not hasattr(owner.address, "__dict__")
+    assert not hasattr(Pet("Max", 5, Breed("Bulldog", "Dog"), PetHouse("Apartment", "Medium"), owner), "__dict__")
+
+# Тест: stats() отражает изменения сразу и совпадает с полным пересчетом
+def test_stats(pet_registry, owner):
+    pet_registry.add_owner(owner)
+    pet_registry.add_owner(Owner(2, "Jane", "1", Address("Elm St", "Boston", "02101")))
+    pet_registry.add_pet(Pet("Max", 5, Breed("Bulldog", "Dog"), PetHouse("Apartment", "Medium"), owner))
+    pet_registry.add_pet(Pet("Tom", 3, Breed("Siamese", "Cat"), PetHouse("Apartment", "Medium"), owner))
+    stats = pet_registry.stats()
+    assert (stats.owner_count, stats.pet_count, stats.mean_age) == (2, 2, 4.0)
+    assert dict(stats.by_species) == {"Dog": 1, "Cat": 1}
+    assert dict(stats.by_owner) == {1: 2, 2: 0}
+
+    pet_registry.update_owner(1, new_address=Address("Oak St", "Boston", "02102"))
+    assert dict(stats.by_city) == {"Boston": 2}
+    pet_registry.delete_owner(1)
+    assert dict(stats.by_city) == {} and dict(stats.by_owner) == {2: 0}
+    assert pet_registry.stats().to_dict()["mean_age"] == 0.0
+    assert check_stats(pet_registry) == []
+
+# Тест: после случайной последовательности изменений статистика согласована с пересчетом
+def test_stats_consistent_after_random_mutations(pet_registry):
+    rng = random.Random(7)
+    breeds = [Breed("Корги", "Собака"), Breed("Сиамская", "Кошка"), Breed("Хаски", "Собака")]
+    cities = ["Москва", "Казань", "Омск"]
+    for step in range(600):
+        owner_ids = list(pet_registry.owner_map())
+        names = [pet.name for pet in pet_registry.iter_pets()]
+        action = rng.randrange(7)
+        if action == 0 or not owner_ids:
+            pet_registry.add_owner(Owner(step, f"Владелец {step}", "", Address("Ленина, 1", rng.choice(cities), "101000")))
+        elif action in (1, 2):
+            pet_registry.add_pet(Pet(f"Питомец {step}", rng.randrange(15), rng.choice(breeds), PetHouse("Дом", "Большой"),
+                                     pet_registry.get_owner(rng.choice(owner_ids))))
+        elif action == 3 and names:
+            pet_registry.update_pet(rng.choice(names), new_name=f"Питомец {step}", new_age=rng.randrange(15), new_breed=rng.choice(breeds))
+        elif action == 4 and names:
+            pet_registry.update_pet_age(rng.choice(names), rng.randrange(15))
+        elif action == 5:
+            pet_registry.update_owner(rng.choice(owner_ids), new_address=Address("Мира, 2", rng.choice(cities), "101000"))
+        elif names and rng.random() < 0.7:
+            pet_registry.delete_pet(rng.choice(names))
+        else:
+            pet_registry.delete_owner(rng.choice(owner_ids))
+        assert check_stats(pet_registry) == [], step
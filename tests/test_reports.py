@@ -0,0 +1,104 @@
+# tests/test_reports.py
+import pytest
+import reports
+from models import Owner, Pet, Breed, PetHouse, Address, PetServiceBooking, PetEvent
+from registry import PetRegistry
+from events import EventStore
+from reports import RevenueReports
+from exceptions import InvalidDataError
+
+# Фикстура: реестр из двух владельцев в разных городах и трех питомцев
+@pytest.fixture
+def pet_registry():
+    registry = PetRegistry()
+    registry.add_owner(Owner(1, "Анна", "123", Address("Ленина, 10", "Москва", "101000")))
+    registry.add_owner(Owner(2, "Иван", "456", Address("Невский, 1", "Санкт-Петербург", "190000")))
+    for name, owner_id in (("Бобик", 1), ("Мурка", 1), ("Рекс", 2)):
+        registry.add_pet(Pet(name, 3, Breed("Корги", "Собака"), PetHouse("Дом", "Большой"), registry.get_owner(owner_id)))
+    return registry
+
+# Фикстура: записи на услуги за два года, добавленные не по порядку дат
+@pytest.fixture
+def store(pet_registry):
+    store = EventStore(pet_registry)
+    bobik, murka, rex = (pet_registry.get_pet(name) for name in ("Бобик", "Мурка", "Рекс"))
+    grooming, bath = store.service("Стрижка", 1500.0), store.service("Купание", 700.0)
+    store.add_bulk([
+        PetServiceBooking(bobik, grooming, "2024-07-03 10:00"),
+        PetServiceBooking(murka, bath, "2024-06-30"),
+        PetServiceBooking(rex, grooming, "2024-07-31 23:59"),
+        PetServiceBooking(rex, store.service("Стрижка", 1800.0), "2025-01-15"),
+        PetServiceBooking(bobik, bath, "2024-08-01"),
+        PetEvent(bobik, "Прогулка", "2024-07-05"),
+    ])
+    return store
+
+# Фикстура: отчеты с numpy и без него
+@pytest.fixture(params=["numpy", "python"])
+def revenue(request, store, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(reports, "np", None)
+    revenue = RevenueReports(store)
+    yield revenue
+    revenue.close()
+
+def naive_report(store, group_by, start="0001-01-01", end="9999-12-31"):
+    """Тот же отчет простым проходом по записям хранилища."""
+    keys = {
+        "service": lambda b: b.service.service_name,
+        "owner": lambda b: b.pet.owner.owner_id,
+        "city": lambda b: b.pet.owner.address.city,
+        "month": lambda b: b.date[:7],
+    }[group_by]
+    result = {}
+    for booking in store.between(PetServiceBooking, start, end):
+        revenue, count = result.get(keys(booking), (0.0, 0))
+        result[keys(booking)] = (revenue + booking.service.price, count + 1)
+    return result
+
+# Тест: выручка и число записей по всем полям группировки
+def test_reports_match_bookings(revenue, store):
+    assert revenue.revenue_by("service") == {"Стрижка": 4800.0, "Купание": 1400.0}
+    assert revenue.usage_by("owner") == {1: 3, 2: 2}
+    assert revenue.revenue_by("city", "2024-07-01", "2024-08-01") == {"Москва": 1500.0, "Санкт-Петербург": 1500.0}
+    assert list(revenue.report("month")) == ["2024-06", "2024-07", "2024-08", "2025-01"]
+    assert revenue.total_revenue(end="2025-01-01") == 4400.0
+    for group_by in reports.GROUPS:
+        assert revenue.report(group_by) == naive_report(store, group_by)
+        assert revenue.report(group_by, "2024-07-01", "2024-08-01") == naive_report(store, group_by, "2024-07-01", "2024-08-01")
+    assert revenue.report("service", "2025-01-01", "2024-01-01") == {}
+    with pytest.raises(InvalidDataError):
+        revenue.report("breed")
+
+# Тест: результаты кэшируются и сбрасываются при изменении записей
+def test_cache_invalidation(revenue, store, pet_registry):
+    assert revenue.usage_by("service") == {"Стрижка": 3, "Купание": 2}
+    revenue.revenue_by("service")
+    assert (revenue.hits, revenue.misses) == (1, 1)
+    store.add(PetServiceBooking(pet_registry.get_pet("Мурка"), store.service("Когти", 300.0), "2024-09-01"))
+    assert revenue.usage_by("service") == {"Стрижка": 3, "Купание": 2, "Когти": 1}
+    assert revenue.misses == 2
+    store.remove(store.between(PetServiceBooking, "2024-06-30", "2024-07-01")[0])
+    assert revenue.usage_by("service") == {"Стрижка": 3, "Купание": 1, "Когти": 1}
+    # Удаление питомца удаляет его записи, переезд владельца меняет город в отчете
+    pet_registry.delete_pet("Бобик")
+    pet_registry.update_owner(2, new_address=Address("Тверская, 1", "Москва", "125009"))
+    assert revenue.report("city") == {"Москва": (3600.0, 3)}
+    assert revenue.report("city") == naive_report(store, "city")
+    pet_registry.delete_owner(1)
+    pet_registry.delete_owner(2)
+    assert revenue.report("owner") == {} and len(revenue.columns) == 0
+
+# Тест: освобожденные строки переиспользуются, повторно добавленная запись учитывается дважды
+def test_rows_are_reused(revenue, store, pet_registry):
+    booking = store.between(PetServiceBooking)[0]
+    store.remove(booking)
+    rows = len(revenue.columns.alive)
+    store.add(booking)
+    store.add(booking)
+    assert len(revenue.columns.alive) == rows + 1
+    assert revenue.usage_by("owner") == {1: 4, 2: 2}
+    store.remove(booking)
+    assert revenue.report("month") == naive_report(store, "month")
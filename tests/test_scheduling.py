@@ -0,0 +1,98 @@
+# tests/test_scheduling.py
+import pytest
+from models import Owner, Pet, Breed, PetHouse, Address, VetVisit, Veterinarian
+from registry import PetRegistry
+from events import EventStore, parse_date
+from scheduling import Scheduler, Conflict
+from storage import save_events_to_json, load_events_from_json, save_events_to_xml, load_events_from_xml
+from exceptions import InvalidDataError, ScheduleConflictError, VeterinarianNotFoundError, PetNotFoundError
+
+# Фикстура: хранилище с двумя ветеринарами и утренними визитами к первому
+@pytest.fixture
+def store():
+    registry = PetRegistry()
+    owner = Owner(1, "Анна", "123", Address("Ленина, 10", "Москва", "101000"))
+    registry.add_owner(owner)
+    registry.add_pet(Pet("Бобик", 3, Breed("Корги", "Собака"), PetHouse("Квартира", "Средний"), owner))
+    registry.add_pet(Pet("Мурка", 2, Breed("Британская", "Кошка"), PetHouse("Дом", "Большой"), owner))
+    store = EventStore(registry)
+    store.add_veterinarian(Veterinarian(7, "Доктор Айболит", "03"))
+    store.add_veterinarian(Veterinarian(8, "Доктор Ватсон", "911"))
+    bobik = registry.get_pet("Бобик")
+    store.add(VetVisit(bobik, store.get_veterinarian(7), "2024-07-01 09:00", "Осмотр", 60))
+    store.add(VetVisit(bobik, store.get_veterinarian(7), "2024-07-01 10:30", "Прививка"))
+    return store
+
+@pytest.fixture
+def scheduler(store):
+    scheduler = Scheduler(store)
+    yield scheduler
+    scheduler.close()
+
+def visit(store, date, vet_id=7, duration=30, pet="Мурка"):
+    return VetVisit(store.registry.get_pet(pet), store.get_veterinarian(vet_id), date, "Осмотр", duration)
+
+# Тест: проверка занятости на границах интервалов
+def test_conflicts(scheduler):
+    assert scheduler.is_free(7, "2024-07-01 10:00", "2024-07-01 10:30")
+    assert not scheduler.is_free(7, "2024-07-01 09:59", "2024-07-01 10:01")
+    assert [v.reason for v in scheduler.conflicts(7, "2024-07-01 08:00", "2024-07-01 12:00")] == ["Осмотр", "Прививка"]
+    assert scheduler.is_free(8, "2024-07-01 09:00", "2024-07-01 10:00")
+    with pytest.raises(VeterinarianNotFoundError):
+        scheduler.is_free(99, "2024-07-01 09:00", "2024-07-01 10:00")
+
+# Тест: запись визитов по одному и пачкой с отчетом о конфликтах
+def test_booking(scheduler, store):
+    with pytest.raises(ScheduleConflictError):
+        scheduler.book(visit(store, "2024-07-01 09:30"))
+    scheduler.book(visit(store, "2024-07-01 10:00"))
+    first, second = visit(store, "2024-07-01 11:00", duration=45), visit(store, "2024-07-01 11:30")
+    third = visit(store, "2024-07-01 10:45")
+    report = scheduler.book_bulk([first, visit(store, "2024-07-01 09:00", vet_id=8), second, third])
+    assert [(c.visit, [v.reason for v in c.existing]) for c in report] == [(second, ["Осмотр"]), (third, ["Прививка", "Осмотр"])]
+    assert report[1].existing[1] is first
+    assert isinstance(report[0], Conflict) and report[0].visit.date == "2024-07-01 11:30"
+    report = scheduler.book_bulk([visit(store, "2024-07-02 09:00"), visit(store, "2024-07-02 09:15")])
+    assert len(report) == 1 and store.count(VetVisit) == 6
+    # Неверная пачка отклоняется целиком
+    for bad in (visit(store, "2024-07-03 09:00", duration=0), visit(store, "не дата")):
+        with pytest.raises(InvalidDataError):
+            scheduler.book_bulk([visit(store, "2024-07-04 09:00"), bad])
+    stranger = Pet("Чужой", 1, Breed("Корги", "Собака"), PetHouse("Дом", "Большой"), store.registry.get_owner(1))
+    with pytest.raises(PetNotFoundError):
+        scheduler.book(VetVisit(stranger, store.get_veterinarian(7), "2024-07-04 09:00", "Осмотр"))
+    assert store.count(VetVisit) == 6
+
+# Тест: поиск ближайшего свободного окна с учетом часов приема
+def test_next_free_slot(scheduler, store):
+    assert scheduler.next_free_slot(7, 30, "2024-07-01 08:00") == parse_date("2024-07-01 10:00")
+    assert scheduler.next_free_slot(7, 45, "2024-07-01 08:00") == parse_date("2024-07-01 11:00")
+    assert scheduler.next_free_slot(7, 60, "2024-07-01 20:30") == parse_date("2024-07-02 09:00")
+    assert scheduler.next_free_slot_any(60, "2024-07-01 09:00") == (parse_date("2024-07-01 09:00"), 8)
+    assert scheduler.next_free_slot_any(30, "2024-07-01 09:00", vet_ids=[7]) == (parse_date("2024-07-01 10:00"), 7)
+    scheduler.book(visit(store, "2024-07-01 09:00", vet_id=8, duration=90))
+    assert scheduler.next_free_slot_any(60, "2024-07-01 09:00") == (parse_date("2024-07-01 10:30"), 8)
+    assert Scheduler(EventStore(PetRegistry())).next_free_slot_any() is None
+    with pytest.raises(InvalidDataError):
+        scheduler.next_free_slot(7, 13 * 60)
+
+# Тест: расписание следует за изменениями хранилища и реестра
+def test_follows_store(scheduler, store):
+    free = ("2024-07-01 09:00", "2024-07-01 09:30")
+    extra = visit(store, "2024-07-01 09:00", vet_id=8)
+    store.add(extra)
+    assert not scheduler.is_free(8, *free)
+    store.remove(extra)
+    assert scheduler.is_free(8, *free)
+    store.registry.delete_pet("Бобик")
+    assert scheduler.is_free(7, "2024-07-01 00:00", "2024-07-02 00:00")
+
+# Тест: длительность визита сохраняется в JSON и XML, а расписание строится по загруженным визитам
+@pytest.mark.parametrize("save, load", [(save_events_to_json, load_events_from_json), (save_events_to_xml, load_events_from_xml)])
+def test_duration_round_trip(store, tmp_path, save, load):
+    filename = str(tmp_path / "events")
+    save(store, filename)
+    loaded = EventStore(store.registry)
+    load(loaded, filename)
+    assert [v.duration for v in loaded.between(VetVisit)] == [60, 30]
+    assert not Scheduler(loaded).is_free(7, "2024-07-01 09:45", "2024-07-01 10:00")
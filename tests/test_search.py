@@ -0,0 +1,78 @@
+# tests/test_search.py
+import pytest
+from models import Owner, Pet, Breed, PetHouse, Address
+from registry import PetRegistry
+from search import SearchIndex, RegistrySearch, normalize, normalize_phone
+
+# Фикстура: реестр с похожими кириллическими именами
+@pytest.fixture
+def pet_registry():
+    registry = PetRegistry()
+    registry.add_owner(Owner(1, "Анна Петрова", "+7 (912) 345-67-89", Address("Ленина, 10", "Москва", "101000")))
+    registry.add_owner(Owner(2, "Иван Иванов", "8-903-111-22-33", Address("Невский, 1", "Санкт-Петербург", "190000")))
+    for name, owner_id in (("Бобик", 1), ("Бобби", 1), ("Барсик", 2), ("Мурка", 2), ("Ёжик", 1), ("Мурзик", 2)):
+        registry.add_pet(Pet(name, 3, Breed("Корги", "Собака"), PetHouse("Дом", "Большой"), registry.get_owner(owner_id)))
+    return registry
+
+@pytest.fixture
+def search(pet_registry):
+    search = RegistrySearch(pet_registry)
+    yield search
+    search.close()
+
+# Тест: нормализация ключей
+def test_normalize():
+    assert normalize("  ЁЖИК   Колючий ") == "ежик колючий"
+    assert normalize_phone("+7 (912) 345-67-89") == normalize_phone("89123456789") == "9123456789"
+    assert normalize_phone("+7 912") == "912" and normalize_phone("345-67") == "34567"
+    # Неполный номер с кодом страны тоже без кода; чужой код страны не отрезается
+    assert normalize_phone("8916") == normalize_phone("+7 916") == normalize_phone("7-916") == "916"
+    assert normalize_phone("8") == "8" and normalize_phone("+44 20 7946") == "44207946"
+
+# Тест: поиск по префиксу без учета регистра и буквы ё
+def test_prefix_search(search):
+    assert search.pets.prefix("бо") == ["Бобби", "Бобик"]
+    assert search.pets.prefix("МУР", limit=1) == ["Мурзик"]
+    assert search.pets.prefix("еж") == ["Ёжик"]
+    assert search.pets.prefix("") == [] and search.pets.prefix("Шарик") == []
+    assert [o.owner_id for o in search.find_owners("иван")] == [2]
+    assert [o.owner_id for o in search.find_owners("+7 912")] == [o.owner_id for o in search.find_owners("912")] == [1]
+    assert search.phones.prefix("8912") == [1] and search.phones.prefix("8-903") == [2]
+
+# Тест: нечеткий поиск находит имена с опечатками и ранжирует их по сходству
+def test_fuzzy_search(search):
+    assert {name for name, _ in search.pets.fuzzy("Бобек")[:2]} == {"Бобик", "Бобби"}
+    assert [name for name, _ in search.pets.fuzzy("Мурзек")][:1] == ["Мурзик"]
+    scores = [score for _, score in search.pets.fuzzy("Бобик")]
+    assert scores[0] == 1.0 and scores == sorted(scores, reverse=True)
+    assert search.pets.fuzzy("Шарик", threshold=0.9) == []
+    assert [o.name for o in search.find_owners("Ивнов")] == ["Иван Иванов"]
+    assert [p.name for p in search.find_pets("Бар")] == ["Барсик"]
+    assert search.suggest_pets("Барсек")[0] == "Барсик"
+
+# Тест: индексы следуют за добавлением, переименованием и удалением
+def test_incremental_updates(search, pet_registry):
+    owner = pet_registry.get_owner(1)
+    pet_registry.add_pet(Pet("Боня", 1, Breed("Корги", "Собака"), PetHouse("Дом", "Большой"), owner))
+    assert search.pets.prefix("бон") == ["Боня"]
+    pet_registry.update_pet("Бобик", new_name="Шарик")
+    assert search.pets.prefix("боб") == ["Бобби"] and search.pets.prefix("шар") == ["Шарик"]
+    pet_registry.update_owner(2, new_name="Иван Сидоров", new_phone="8-999-000-00-00")
+    assert search.find_owners("сидор")[0].owner_id == 2 and search.find_owners("903") == []
+    pet_registry.delete_owner(1)
+    assert search.pets.prefix("б") == ["Барсик"] and search.find_owners("анна") == []
+    assert len(search.pets) == 3 and len(search.owner_names) == len(search.phones) == 1
+
+# Тест: сжатие индекса после массового удаления и одинаковые ключи у разных значений
+def test_index_compaction():
+    index = SearchIndex()
+    for i in range(100):
+        index.set(i, f"Кличка {i % 10}")
+    assert index.prefix("кличка 3", limit=20) == [3, 13, 23, 33, 43, 53, 63, 73, 83, 93]
+    for i in range(90):
+        index.remove(i)
+    assert len(index) == 10 and index._dead < len(index)
+    assert index.prefix("кличка") == list(range(90, 100))
+    assert [value for value, _ in index.fuzzy("Кличко 5")][:1] == [95]
+    index.set(95, "Другая")
+    assert index.prefix("друг") == [95] and 95 not in index.prefix("кличка")
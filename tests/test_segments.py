@@ -0,0 +1,114 @@
+# tests/test_segments.py
+import json
+import os
+import pytest
+from models import Owner, Pet, Breed, PetHouse, Address
+from registry import PetRegistry, ChangeTracker, ADDED, MODIFIED, DELETED
+from segments import SegmentedStore
+from exceptions import FileProcessingError
+
+# Фикстура: реестр из 10 владельцев и 10 питомцев
+@pytest.fixture
+def pet_registry():
+    registry = PetRegistry()
+    for i in range(10):
+        owner = Owner(i, f"Владелец {i}", "+7", Address("Ленина, 10", "Москва" if i % 2 else "Казань", "101000"))
+        registry.add_owner(owner)
+        registry.add_pet(Pet(f"Питомец {i}", i, Breed("Корги", "Собака"), PetHouse("Квартира", "Средний"), owner))
+    return registry
+
+def dump(registry):
+    return (
+        sorted((o.owner_id, o.name, o.phone, o.address.city) for o in registry.owners),
+        sorted((p.name, p.age, p.breed.name, p.owner.owner_id) for p in registry.pets),
+    )
+
+# Тест: изменения схлопываются по записи
+def test_change_tracker(pet_registry):
+    tracker = ChangeTracker(pet_registry)
+    owner = Owner(100, "Новый", "1", Address("", "Омск", ""))
+    pet_registry.add_owner(owner)
+    pet_registry.add_pet(Pet("Временный", 1, Breed("Корги", "Собака"), PetHouse("Дом", "Большой"), owner))
+    pet_registry.delete_pet("Временный")
+    pet_registry.update_owner(1, new_phone="999")
+    pet_registry.update_pet_age("Питомец 2", 20)
+    pet_registry.update_pet("Питомец 3", new_name="Шарик")
+    pet_registry.delete_pet("Питомец 4")
+    pet_registry.add_pet(Pet("Питомец 4", 5, Breed("Корги", "Собака"), PetHouse("Дом", "Большой"), owner))
+    pet_registry.delete_owner(5)
+
+    assert tracker.owners == {100: ADDED, 1: MODIFIED, 5: DELETED}
+    assert tracker.pets == {"Питомец 2": MODIFIED, "Питомец 3": DELETED, "Шарик": ADDED,
+                            "Питомец 4": MODIFIED, "Питомец 5": DELETED}
+    tracker.clear()
+    assert not tracker
+    tracker.close()
+    pet_registry.delete_pet("Шарик")
+    assert not tracker
+
+# Тест: сохранение и загрузка сегментов
+def test_segments_round_trip(pet_registry, tmp_path):
+    directory = str(tmp_path / "store")
+    store = SegmentedStore(directory, segment_size=3, registry=pet_registry)
+    store.open()
+    assert store.save() == 8
+    store.close()
+
+    with SegmentedStore(directory) as loaded:
+        assert dump(loaded) == dump(pet_registry)
+        assert loaded.get_pet("Питомец 7").owner is loaded.get_owner(7)
+
+# Тест: сохраняются только сегменты с изменениями
+def test_segments_incremental_save(pet_registry, tmp_path):
+    directory = str(tmp_path / "store")
+    store = SegmentedStore(directory, segment_size=3, registry=pet_registry)
+    store.open()
+    store.save()
+    assert store.save() == 0
+
+    pet_registry.update_owner(4, new_phone="555")
+    assert store.save() == 1
+    with open(os.path.join(directory, "owners-000001.json"), encoding='utf-8') as f:
+        assert json.load(f)[1]["phone"] == "555"
+
+    # Удаление освобождает слот, новая запись занимает его
+    pet_registry.delete_pet("Питомец 0")
+    pet_registry.add_pet(Pet("Новый", 3, Breed("Бигль", "Собака"), PetHouse("Дом", "Большой"), pet_registry.get_owner(9)))
+    assert store.save() == 1
+    pet_registry.add_pet(Pet("Еще один", 4, Breed("Бигль", "Собака"), PetHouse("Дом", "Большой"), pet_registry.get_owner(9)))
+    assert store.save() == 1
+    store.close()
+
+    with SegmentedStore(directory) as loaded:
+        assert dump(loaded) == dump(pet_registry)
+        assert loaded.get_owner(4).phone == "555"
+
+# Тест: реестр, загруженный из сегментов, продолжает сохраняться инкрементально
+def test_segments_reopen_and_delete(pet_registry, tmp_path):
+    directory = str(tmp_path / "store")
+    with SegmentedStore(directory, segment_size=4, registry=pet_registry):
+        pass
+    store = SegmentedStore(directory, segment_size=4, registry=pet_registry)
+    store.open()
+    assert store.save() == 6
+    store.close()
+
+    store = SegmentedStore(directory)
+    registry = store.open()
+    registry.delete_owner(0)
+    assert store.save() == 2
+    store.close()
+    pet_registry.delete_owner(0)
+    with SegmentedStore(directory) as loaded:
+        assert dump(loaded) == dump(pet_registry)
+
+# Тест: испорченный сегмент — ошибка обработки файла
+def test_segments_corrupted(pet_registry, tmp_path):
+    directory = str(tmp_path / "store")
+    store = SegmentedStore(directory, segment_size=3, registry=pet_registry)
+    store.open()
+    store.save()
+    with open(os.path.join(directory, "pets-000001.json"), 'w', encoding='utf-8') as f:
+        f.write("[{")
+    with pytest.raises(FileProcessingError):
+        SegmentedStore(directory).open()
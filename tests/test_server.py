@@ -0,0 +1,225 @@
+# tests/test_server.py
+import asyncio
+import json
+import threading
+import pytest
+import server
+from models import Owner, Pet, Breed, PetHouse, Address
+from registry import PetRegistry
+from storage import save_to_json
+from server import RegistryServer
+
+# Фикстура: реестр с двумя владельцами и тремя питомцами
+@pytest.fixture
+def pet_registry():
+    registry = PetRegistry()
+    owner1 = Owner(1, "Анна", "123", Address("Ленина, 10", "Москва", "101000"))
+    owner2 = Owner(2, "Иван", "456", Address("Невский, 1", "Санкт-Петербург", "190000"))
+    registry.add_owner(owner1)
+    registry.add_owner(owner2)
+    registry.add_pet(Pet("Бобик", 3, Breed("Корги", "Собака"), PetHouse("Квартира", "Средний"), owner1))
+    registry.add_pet(Pet("Мурка", 2, Breed("Британская", "Кошка"), PetHouse("Дом", "Большой"), owner2))
+    registry.add_pet(Pet("Рекс", 5, Breed("Хаски", "Собака"), PetHouse("Дом", "Большой"), owner2))
+    return registry
+
+async def request(reader, writer, method, path, body=None):
+    """Отправляет запрос по открытому соединению и читает ответ."""
+    data = b"" if body is None else json.dumps(body).encode("utf-8")
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode().partition(":")
+        headers[name.lower()] = value.strip()
+    return status, json.loads(await reader.readexactly(int(headers["content-length"])))
+
+def run_with_server(registry, scenario, data_dir="."):
+    async def main():
+        server = RegistryServer(registry, port=0, data_dir=data_dir)
+        await server.start()
+        try:
+            return await scenario(server.port)
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+# Тест: добавление, чтение, изменение и удаление через HTTP
+def test_server_crud(pet_registry):
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        # Все запросы идут по одному соединению (keep-alive)
+        status, owner = await request(reader, writer, "POST", "/owners", {
+            "owner_id": 3, "name": "Петр", "phone": "789",
+            "address": {"street": "Тверская, 1", "city": "Москва", "postal_code": "125009"}})
+        assert status == 201 and owner["owner_id"] == 3
+        status, pet = await request(reader, writer, "POST", "/pets", {
+            "name": "Шарик", "age": 1, "breed": {"name": "Корги", "species": "Собака"},
+            "house": {"house_type": "Будка", "house_size": "Малый"}, "owner_id": 3})
+        assert status == 201 and pet["owner_id"] == 3
+
+        assert (await request(reader, writer, "GET", "/pets/%D0%A8%D0%B0%D1%80%D0%B8%D0%BA"))[1]["age"] == 1
+        status, pet = await request(reader, writer, "PATCH", "/pets/Шарик", {"name": "Тузик", "age": 2})
+        assert status == 200 and (pet["name"], pet["age"]) == ("Тузик", 2)
+        status, owner = await request(reader, writer, "PATCH", "/owners/3", {"phone": "000"})
+        assert owner["phone"] == "000"
+        assert [p["name"] for p in (await request(reader, writer, "GET", "/owners/3/pets"))[1]] == ["Тузик"]
+
+        assert (await request(reader, writer, "DELETE", "/owners/3"))[0] == 200
+        status, error = await request(reader, writer, "GET", "/pets/Тузик")
+        assert status == 404 and "не найден" in error["error"]
+        writer.close()
+    run_with_server(pet_registry, scenario)
+    assert pet_registry.owner_count == 2 and pet_registry.pet_count == 3
+
+# Тест: пагинация и фильтры списка питомцев
+def test_server_list(pet_registry):
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        status, page = await request(reader, writer, "GET", "/pets?offset=1&limit=1")
+        assert (page["total"], [p["name"] for p in page["items"]]) == (3, ["Мурка"])
+        _, page = await request(reader, writer, "GET", "/pets?species=Собака&age_from=4")
+        assert [p["name"] for p in page["items"]] == ["Рекс"]
+        _, page = await request(reader, writer, "GET", "/owners?limit=10")
+        assert [o["owner_id"] for o in page["items"]] == [1, 2]
+        _, stats = await request(reader, writer, "GET", "/stats")
+        assert (stats["pet_count"], stats["by_species"], stats["by_owner"]) == (3, {"Собака": 2, "Кошка": 1}, {"1": 1, "2": 2})
+        writer.close()
+    run_with_server(pet_registry, scenario)
+
+# Тест: ошибки превращаются в коды ответа
+def test_server_errors(pet_registry, tmp_path):
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        assert (await request(reader, writer, "GET", "/owners/abc"))[0] == 400
+        assert (await request(reader, writer, "GET", "/owners/99"))[0] == 404
+        assert (await request(reader, writer, "POST", "/owners", {"owner_id": 1, "name": "Дубль", "phone": "",
+                "address": {"street": "", "city": "", "postal_code": ""}}))[0] == 400
+        assert (await request(reader, writer, "POST", "/pets", {"name": "X"}))[0] == 400
+        # Вложенные поля — только объекты
+        owner = {"owner_id": 7, "name": "Петр", "phone": "", "address": "Москва"}
+        pet = {"name": "X", "age": 1, "owner_id": 1, "breed": ["Корги"], "house": {"house_type": "Дом", "house_size": "Большой"}}
+        for method, path, body in (("POST", "/owners", owner), ("POST", "/pets", pet),
+                                   ("PATCH", "/owners/1", {"address": "Москва"}), ("PATCH", "/pets/Бобик", {"house": "Дом"})):
+            status, error = await request(reader, writer, method, path, body)
+            assert status == 400 and "объектом" in error["error"], path
+        assert (await request(reader, writer, "PUT", "/pets/Бобик"))[0] == 405
+        assert (await request(reader, writer, "GET", "/unknown"))[0] == 404
+        assert (await request(reader, writer, "POST", "/load", {"format": "json", "filename": "nonexistent.json"}))[0] == 500
+        writer.close()
+    run_with_server(pet_registry, scenario, str(tmp_path))
+
+# Тест: /save и /load не выходят за пределы каталога данных
+def test_server_data_dir(pet_registry, tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "link").symlink_to(tmp_path, target_is_directory=True)
+
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for filename in (str(tmp_path / "pets.json"), "../pets.json", "a/../../pets.json", "a\\..\\..\\pets.json", "link/pets.json", "."):
+            status, error = await request(reader, writer, "POST", "/save", {"format": "json", "filename": filename})
+            assert status == 400, filename
+        status, result = await request(reader, writer, "POST", "/save", {"format": "json", "filename": "pets.json"})
+        assert (status, result["saved"]) == (200, "pets.json")
+        assert (await request(reader, writer, "POST", "/load", {"format": "json", "filename": "pets.json"}))[0] == 200
+        writer.close()
+    run_with_server(pet_registry, scenario, str(data_dir))
+    assert (data_dir / "pets.json").exists() and not (tmp_path / "pets.json").exists()
+
+# Тест: неверный Content-Length дает 400 и закрывает соединение, а не обрывает его без ответа
+@pytest.mark.parametrize("length", ["abc", "-5", "+5", "1_0", str(2 ** 40)])
+def test_server_bad_content_length(pet_registry, length):
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"POST /owners HTTP/1.1\r\nHost: test\r\nContent-Length: {length}\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+    response = run_with_server(pet_registry, scenario)
+    expected = b"413" if length == str(2 ** 40) else b"400"
+    assert response.split()[1] == expected and b"Connection: close" in response
+
+# Тест: сохранение и загрузка через сервис и параллельные клиенты
+def test_server_save_load_concurrent(pet_registry, tmp_path):
+    filename = "pets.json"
+
+    async def client(port, number):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for i in range(20):
+            status, _ = await request(reader, writer, "GET", "/pets/Бобик")
+            assert status == 200
+        status, _ = await request(reader, writer, "POST", "/owners", {
+            "owner_id": 100 + number, "name": f"Клиент {number}", "phone": "",
+            "address": {"street": "", "city": "Казань", "postal_code": ""}})
+        assert status == 201
+        writer.close()
+
+    async def scenario(port):
+        await asyncio.gather(*(client(port, number) for number in range(10)))
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        status, result = await request(reader, writer, "POST", "/save", {"format": "json", "filename": filename})
+        assert status == 200 and result["owners"] == 12
+        assert (await request(reader, writer, "DELETE", "/owners/2"))[0] == 200
+        status, result = await request(reader, writer, "POST", "/load", {"format": "json", "filename": filename})
+        assert (status, result["owners_added"], result["pets_added"]) == (200, 1, 2)
+        writer.close()
+
+    run_with_server(pet_registry, scenario, str(tmp_path))
+    assert pet_registry.get_pet("Мурка").owner is pet_registry.get_owner(2)
+    assert pet_registry.owner_count == 12
+
+# Тест: /load готовит записи вне цикла событий и добавляет их пачками
+def test_server_load_off_loop(pet_registry, tmp_path, monkeypatch):
+    source = PetRegistry()
+    owner = Owner(1, "Анна", "123", Address("Ленина, 10", "Москва", "101000"))
+    source.add_owner(owner)
+    source.add_owner(Owner(3, "Петр", "789", Address("Ленина, 10", "Москва", "101000")))
+    for i in range(10):
+        source.add_pet(Pet(f"Питомец {i}", i, Breed("Корги", "Собака"), PetHouse("Квартира", "Средний"), source.get_owner(1 + 2 * (i % 2))))
+    save_to_json(source, str(tmp_path / "pets.json"))
+
+    threads, batches = [], []
+    merge_records = server._merge_records
+
+    def recording_merge(registry, loaded):
+        threads.append(threading.current_thread())
+        return merge_records(registry, loaded)
+
+    add_pets_bulk = pet_registry.add_pets_bulk
+    monkeypatch.setattr(server, "_merge_records", recording_merge)
+    monkeypatch.setattr(server, "MERGE_BATCH", 3)
+    monkeypatch.setattr(pet_registry, "add_pets_bulk", lambda pets: batches.append(len(pets)) or add_pets_bulk(pets))
+
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        status, result = await request(reader, writer, "POST", "/load", {"format": "json", "filename": "pets.json"})
+        assert (status, result["owners_added"], result["pets_added"]) == (200, 1, 10)
+        writer.close()
+
+    run_with_server(pet_registry, scenario, str(tmp_path))
+    assert threads and threads[0] is not threading.main_thread()
+    assert batches == [3, 3, 3, 1]
+    assert pet_registry.get_pet("Питомец 0").owner is pet_registry.get_owner(1)
+    assert pet_registry.get_pet("Питомец 1").owner is pet_registry.get_owner(3)
+    assert pet_registry.get_pet("Питомец 1").breed is pet_registry.get_pet("Питомец 8").breed
+
+# Тест: строка запроса или заголовок длиннее буфера дают ответ и закрывают соединение
+@pytest.mark.parametrize("head, expected", [
+    ("GET /" + "a" * 70000 + " HTTP/1.1\r\n\r\n", b"400"),
+    ("GET /stats HTTP/1.1\r\nX-Long: " + "a" * 70000 + "\r\n\r\n", b"431"),
+])
+def test_server_line_too_long(pet_registry, head, expected):
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(head.encode())
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+    response = run_with_server(pet_registry, scenario)
+    assert response.split()[1] == expected and b"Connection: close" in response
@@ -0,0 +1,123 @@
+# tests/test_sharding.py
+import json
+import os
+import pytest
+import sharding
+from models import Owner, Pet, Breed, PetHouse, Address
+from registry import PetRegistry
+from storage import load_from_json
+from sharding import save_sharded, load_sharded
+from exceptions import FileProcessingError, InvalidDataError
+
+# Фикстура: реестр из 12 владельцев (в том числе с отрицательными ID) и их питомцев
+@pytest.fixture
+def pet_registry():
+    registry = PetRegistry()
+    for i in range(-2, 10):
+        owner = Owner(i, f"Владелец {i}", "+7", Address("Ленина, 10", "Москва" if i % 2 else "Казань", "101000"))
+        registry.add_owner(owner)
+        for j in range(2):
+            registry.add_pet(Pet(f"Питомец {i}-{j}", j, Breed("Корги", "Собака"), PetHouse("Квартира", "Средний"), owner))
+    return registry
+
+def shard_files(directory):
+    with open(os.path.join(directory, "manifest.json"), encoding='utf-8') as f:
+        return [os.path.join(directory, name) for name in json.load(f)["files"]]
+
+def dump(registry):
+    return (
+        sorted((o.owner_id, o.name, o.phone, o.address.city) for o in registry.owners),
+        sorted((p.name, p.age, p.breed.name, p.house.house_type, p.owner.owner_id) for p in registry.pets),
+    )
+
+# Тест: шарды JSON и XML загружаются в тот же реестр, параллельно и без пула
+@pytest.mark.parametrize("fmt", ["json", "xml"])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sharded_round_trip(pet_registry, tmp_path, fmt, workers):
+    directory = str(tmp_path / "shards")
+    save_sharded(pet_registry, directory, shards=4, fmt=fmt, workers=workers)
+    assert sorted(os.listdir(directory)) == ["manifest.json"] + [f"shard-1-{i:03d}.{fmt}" for i in range(4)]
+
+    loaded = PetRegistry()
+    load_sharded(loaded, directory, workers=workers)
+    assert dump(loaded) == dump(pet_registry)
+    assert loaded.get_pet("Питомец -2-1").owner is loaded.get_owner(-2)
+
+    # Повторная загрузка пропускает дубликаты
+    load_sharded(loaded, directory, workers=workers)
+    assert dump(loaded) == dump(pet_registry)
+
+# Тест: каждый шард — обычный файл save_to_json
+def test_shard_is_plain_json(pet_registry, tmp_path):
+    directory = str(tmp_path / "shards")
+    save_sharded(pet_registry, directory, shards=3, workers=1)
+    merged = PetRegistry()
+    for filename in shard_files(directory):
+        load_from_json(merged, filename)
+    assert dump(merged) == dump(pet_registry)
+
+# Тест: питомец может ссылаться на владельца из другого шарда
+def test_sharded_cross_shard_owner(pet_registry, tmp_path):
+    directory = str(tmp_path / "shards")
+    save_sharded(pet_registry, directory, shards=2, workers=1)
+    first, second = shard_files(directory)
+    with open(first, encoding='utf-8') as f:
+        data = json.load(f)
+    with open(second, encoding='utf-8') as f:
+        other = json.load(f)
+    # Переносим всех питомцев первого шарда во второй
+    other["pets"].extend(data["pets"])
+    data["pets"] = []
+    for filename, content in ((first, data), (second, other)):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(content, f, ensure_ascii=False)
+
+    loaded = PetRegistry()
+    load_sharded(loaded, directory, workers=2)
+    assert dump(loaded) == dump(pet_registry)
+
+# Тест: ошибки параметров и поврежденные шарды
+def test_sharded_errors(pet_registry, tmp_path):
+    directory = str(tmp_path / "shards")
+    with pytest.raises(InvalidDataError):
+        save_sharded(pet_registry, directory, fmt="csv")
+    with pytest.raises(FileProcessingError):
+        load_sharded(PetRegistry(), directory)
+
+    save_sharded(pet_registry, directory, shards=2, workers=1)
+    with open(shard_files(directory)[1], 'w', encoding='utf-8') as f:
+        f.write("{")
+    with pytest.raises(FileProcessingError):
+        load_sharded(PetRegistry(), directory, workers=2)
+
+# Тест: новое поколение шардов заменяет прежнее, а прерванное сохранение его не портит
+def test_sharded_generations(pet_registry, tmp_path, monkeypatch):
+    directory = str(tmp_path / "shards")
+    save_sharded(pet_registry, directory, shards=2, workers=1)
+    pet_registry.delete_pet("Питомец 3-0")
+    save_sharded(pet_registry, directory, shards=3, workers=1)
+    assert sorted(os.listdir(directory)) == ["manifest.json"] + [f"shard-2-{i:03d}.json" for i in range(3)]
+
+    saved = dump(pet_registry)
+    pet_registry.delete_pet("Питомец 4-0")
+    written = []
+    original = sharding._write_shard
+
+    def crash(filename, *args):
+        if written:
+            raise OSError("Диск отключен")
+        written.append(filename)
+        original(filename, *args)
+
+    monkeypatch.setattr(sharding, "_write_shard", crash)
+    with pytest.raises(FileProcessingError):
+        save_sharded(pet_registry, directory, shards=3, workers=1)
+    assert written == [os.path.join(directory, "shard-3-000.json")]
+    loaded = PetRegistry()
+    load_sharded(loaded, directory, workers=1)
+    assert dump(loaded) == saved
+
+    # Следующее сохранение убирает остатки прерванного
+    monkeypatch.setattr(sharding, "_write_shard", original)
+    save_sharded(pet_registry, directory, shards=1, workers=1)
+    assert sorted(os.listdir(directory)) == ["manifest.json", "shard-3-000.json"]
@@ -4,7 +4,7 @@ import os
 import json
 from models import Owner, Pet, Breed, PetHouse, Address
 from registry import PetRegistry
-from storage import save_to_json, load_from_json
+from storage import save_to_json, load_from_json, load_from_xml
 
 # Фикстура для создания реестра питомцев
 @pytest.fixture
@@ -92,3 +92,105 @@ def test_load_from_json(pet_registry):
     
     # Удаляем тестовый файл
     os.remove(filename)
+
+# Тест: повторная загрузка того же файла не создает дубликатов
+def test_load_from_json_skips_duplicates(pet_registry, tmp_path):
+    address = Address("123 Main St", "New York", "10001")
+    owner = Owner(owner_id=1, name="John Doe", phone="123-456-7890", address=address)
+    pet_registry.add_owner(owner)
+    pet_registry.add_pet(Pet("Max", 5, Breed("Bulldog", "Dog"), PetHouse("Apartment", "Medium"), owner))
+    filename = str(tmp_path / "pets.json")
+    save_to_json(pet_registry, filename)
+
+    load_from_json(pet_registry, filename)
+    assert len(pet_registry.owners) == 1
+    assert len(pet_registry.pets) == 1
+
+    other = PetRegistry()
+    load_from_json(other, filename)
+    load_from_json(other, filename)
+    assert len(other.owners) == 1
+    assert other.get_pet("Max").owner is other.get_owner(1)
+
+# Тест: потоковый писатель дает тот же текст, что json.dump с indent=4
+def test_save_to_json_matches_json_dump(pet_registry, tmp_path):
+    address = Address('Ленина "10"', "Москва", "101000")
+    owner = Owner(owner_id=1, name="Иван\\Петров", phone="+7-999", address=address)
+    pet_registry.add_owner(owner)
+    pet_registry.add_owner(Owner(owner_id=2, name="Мария", phone="+7-998", address=address))
+    pet_registry.add_pet(Pet("Бобик", 3, Breed("Корги", "Собака"), PetHouse("Квартира", "Средний"), owner))
+    filename = str(tmp_path / "pets.json")
+    save_to_json(pet_registry, filename)
+
+    with open(filename, encoding='utf-8') as f:
+        text = f.read()
+    assert text == json.dumps(json.loads(text), ensure_ascii=False, indent=4)
+
+# Тест: компактный вывод читается обратно загрузчиком
+def test_save_to_json_compact(pet_registry, tmp_path):
+    address = Address("123 Main St", "New York", "10001")
+    owner = Owner(owner_id=1, name="John Doe", phone="123-456-7890", address=address)
+    pet_registry.add_owner(owner)
+    pet_registry.add_pet(Pet("Max", 5, Breed("Bulldog", "Dog"), PetHouse("Apartment", "Medium"), owner))
+    filename = str(tmp_path / "pets.json")
+    save_to_json(pet_registry, filename, indent=None, chunk_size=16)
+
+    with open(filename, encoding='utf-8') as f:
+        text = f.read()
+    assert "\n" not in text and ": " not in text
+    loaded = PetRegistry()
+    load_from_json(loaded, filename)
+    assert loaded.get_pet("Max").owner.address.city == "New York"
+
+# Тест: загрузчик разделяет одинаковые породы и дома между питомцами
+def test_load_from_json_interns_values(pet_registry, tmp_path):
+    source = PetRegistry()
+    owner = Owner(owner_id=1, name="John Doe", phone="123-456-7890", address=Address("123 Main St", "New York", "10001"))
+    source.add_owner(owner)
+    for name in ("Max", "Rex"):
+        source.add_pet(Pet(name, 5, Breed("Bulldog", "Dog"), PetHouse("Apartment", "Medium"), owner))
+    filename = str(tmp_path / "pets.json")
+    save_to_json(source, filename)
+
+    load_from_json(pet_registry, filename)
+    max_pet, rex = pet_registry.get_pet("Max"), pet_registry.get_pet("Rex")
+    assert max_pet.breed is rex.breed
+    assert max_pet.house is rex.house
+
+# Тест: дубликат имени пропускается, не проверяя своего владельца и возраст
+def test_load_from_json_duplicate_before_owner_check(pet_registry, tmp_path):
+    pet = {"name": "Rex", "age": 3, "breed": {"name": "Bulldog", "species": "Dog"},
+           "house": {"house_type": "Apartment", "house_size": "Medium"}, "owner_id": 1}
+    owner = {"owner_id": 1, "name": "John Doe", "phone": "123", "address": {"street": "123 Main St", "city": "New York", "postal_code": "10001"}}
+    data = {"owners": [owner, {"owner_id": 1}], "pets": [pet, dict(pet, owner_id=99, age="много")]}
+    filename = tmp_path / "pets.json"
+    filename.write_text(json.dumps(data), encoding='utf-8')
+
+    load_from_json(pet_registry, str(filename))
+    assert pet_registry.get_pet("Rex").owner is pet_registry.get_owner(1)
+    assert len(pet_registry.pets) == 1
+
+    # Питомец, уже загруженный в реестр, тоже не проверяется повторно
+    filename.write_text(json.dumps({"pets": [dict(pet, owner_id=99)]}), encoding='utf-8')
+    load_from_json(pet_registry, str(filename))
+    assert pet_registry.get_pet("Rex").owner.owner_id == 1
+
+# Тест: пустые поля записей из XML сохраняются как null, как делал json.dump
+def test_save_to_json_none_fields(pet_registry, tmp_path):
+    source = tmp_path / "pets.xml"
+    source.write_text("""<?xml version='1.0' encoding='utf-8'?>
+<PetRegistry>
+  <Owner id="1" name="John Doe"><Address street="123 Main St" city="New York" /></Owner>
+  <Pet name="Max" age="5"><Breed name="Bulldog" /><House house_type="Apartment" /><OwnerID>1</OwnerID></Pet>
+</PetRegistry>""", encoding='utf-8')
+    load_from_xml(pet_registry, str(source))
+    filename = str(tmp_path / "pets.json")
+    save_to_json(pet_registry, filename)
+
+    with open(filename, encoding='utf-8') as f:
+        text = f.read()
+    data = json.loads(text)
+    assert text == json.dumps(data, ensure_ascii=False, indent=4)
+    assert data["owners"][0]["phone"] is None
+    assert data["owners"][0]["address"]["postal_code"] is None
+    assert data["pets"][0]["breed"]["species"] is None
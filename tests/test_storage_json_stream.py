@@ -0,0 +1,105 @@
+# tests/test_storage_json_stream.py
+import io
+import json
+import pytest
+from registry import PetRegistry
+from storage import load_from_json_stream
+from json_stream import JSONStreamReader
+from exceptions import FileProcessingError
+
+# Фикстура для создания реестра питомцев
+@pytest.fixture
+def pet_registry():
+    return PetRegistry()
+
+def make_data(owners_count, pets_count):
+    return {
+        "owners": [
+            {"owner_id": i, "name": f"Владелец {i}", "phone": "123", "address": {"street": "Ленина, 10", "city": "Москва", "postal_code": "101000"}}
+            for i in range(owners_count)
+        ],
+        "pets": [
+            {"name": f"Питомец {i}", "age": i % 15, "breed": {"name": "Корги", "species": "Собака"},
+             "house": {"house_type": "Квартира", "house_size": "Средний"}, "owner_id": i % owners_count}
+            for i in range(pets_count)
+        ]
+    }
+
+# Тест: маленькие куски чтения не ломают разбор записей на границах
+def test_reader_small_chunks():
+    data = {"version": {"a": [1, 2]}, "owners": [{"id": 12345}, {"id": 6}], "pets": [], "tail": 1.5}
+    reader = JSONStreamReader(io.StringIO(json.dumps(data, ensure_ascii=False)), chunk_size=3)
+    records = list(reader.iter_arrays(("owners", "pets")))
+    assert records == [("owners", 0, {"id": 12345}), ("owners", 1, {"id": 6})]
+
+# Тест для потоковой загрузки, в том числе с пачками меньше числа записей
+def test_load_from_json_stream(pet_registry, tmp_path):
+    filename = str(tmp_path / "pets.json")
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(make_data(7, 20), f, ensure_ascii=False, indent=4)
+
+    load_from_json_stream(pet_registry, filename, batch_size=3)
+    assert len(pet_registry.owners) == 7
+    assert len(pet_registry.pets) == 20
+    assert pet_registry.get_pet("Питомец 9").owner is pet_registry.get_owner(2)
+
+    # Повторная загрузка пропускает дубликаты, как load_from_json
+    load_from_json_stream(pet_registry, filename)
+    assert len(pet_registry.pets) == 20
+
+# Тест: питомцы могут идти в файле раньше владельцев
+def test_load_from_json_stream_pets_first(pet_registry, tmp_path):
+    data = make_data(2, 3)
+    filename = str(tmp_path / "pets.json")
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump({"pets": data["pets"], "owners": data["owners"]}, f, ensure_ascii=False)
+
+    load_from_json_stream(pet_registry, filename)
+    assert len(pet_registry.pets) == 3
+
+# Тест: ошибка указывает номер испорченной записи
+def test_load_from_json_stream_reports_position(pet_registry, tmp_path):
+    data = make_data(2, 5)
+    data["pets"][3]["age"] = "много"
+    filename = str(tmp_path / "pets.json")
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+    with pytest.raises(FileProcessingError, match=r"pets\[3\]"):
+        load_from_json_stream(pet_registry, filename)
+
+# Тест: ошибка при добавлении пачки указывает записи этой пачки, а не текущую запись
+def test_load_from_json_stream_reports_batch(pet_registry, tmp_path):
+    filename = str(tmp_path / "pets.json")
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(make_data(2, 7), f, ensure_ascii=False)
+
+    def listener(operation, record, old_name):
+        if record.name == "Питомец 4":
+            raise ValueError("отказ подписчика")
+
+    pet_registry.subscribe(listener)
+    with pytest.raises(FileProcessingError, match=r"pets\[3\.\.5\]: отказ подписчика"):
+        load_from_json_stream(pet_registry, filename, batch_size=3)
+
+# Тест: дубликат имени пропускается до проверки своих полей и владельца
+def test_load_from_json_stream_duplicate_before_owner_check(pet_registry, tmp_path):
+    data = make_data(2, 3)
+    data["pets"].append(dict(data["pets"][1], owner_id=99, age="много"))
+    data["owners"].append({"owner_id": 1})
+    filename = str(tmp_path / "pets.json")
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump({"pets": data["pets"], "owners": data["owners"]}, f, ensure_ascii=False)
+
+    load_from_json_stream(pet_registry, filename, batch_size=1)
+    assert len(pet_registry.pets) == 3
+    assert pet_registry.get_pet("Питомец 1").owner is pet_registry.get_owner(1)
+
+# Тест: синтаксическая ошибка приводит к FileProcessingError
+def test_load_from_json_stream_invalid(pet_registry, tmp_path):
+    filename = str(tmp_path / "broken.json")
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('{"owners": [{"owner_id": 1,}]}')
+
+    with pytest.raises(FileProcessingError):
+        load_from_json_stream(pet_registry, filename)
@@ -0,0 +1,88 @@
+# tests/test_storage_snapshot.py
+import json
+import pytest
+from models import Owner, Pet, Breed, PetHouse, Address
+from registry import PetRegistry
+from storage import save_to_json, load_from_json, save_to_snapshot, load_from_snapshot
+from snapshot import SnapshotReader
+from exceptions import FileProcessingError, InvalidFileFormatError
+
+# Фикстура: реестр с кириллицей, общими значениями и пустыми строками
+@pytest.fixture
+def pet_registry():
+    registry = PetRegistry()
+    owners = [
+        Owner(42, "Иван Петров", "+7-999-123-45-67", Address("Ленина, 10", "Москва", "101000")),
+        Owner(-3, "Мария", "", Address("", "Санкт-Петербург", "190000")),
+        Owner(7, "John Doe", "123", Address("Main St", "Москва", "10001")),
+    ]
+    for owner in owners:
+        registry.add_owner(owner)
+    breeds = [Breed("Корги", "Собака"), Breed("Британская", "Кошка")]
+    for i, name in enumerate(["Бобик", "Мурка", "Max", "Ёжик", "Альфа", ""]):
+        registry.add_pet(Pet(name, i, breeds[i % 2], PetHouse("Квартира", "Средний"), owners[i % 3]))
+    return registry
+
+def dump(registry):
+    """Состояние реестра в виде простых значений для сравнения."""
+    return (
+        [(o.owner_id, o.name, o.phone, o.address.street, o.address.city, o.address.postal_code) for o in registry.owners],
+        [(p.name, p.age, p.breed.name, p.breed.species, p.house.house_type, p.house.house_size, p.owner.owner_id) for p in registry.pets],
+    )
+
+# Тест: снимок и JSON дают одинаковый реестр после загрузки
+def test_snapshot_round_trip_matches_json(pet_registry, tmp_path):
+    json_file = str(tmp_path / "pets.json")
+    snapshot_file = str(tmp_path / "pets.snap")
+    save_to_json(pet_registry, json_file)
+    save_to_snapshot(pet_registry, snapshot_file)
+
+    from_json, from_snapshot = PetRegistry(), PetRegistry()
+    load_from_json(from_json, json_file)
+    load_from_snapshot(from_snapshot, snapshot_file)
+    assert dump(from_snapshot) == dump(from_json) == dump(pet_registry)
+    assert from_snapshot.get_pet("Мурка").owner is from_snapshot.get_owner(-3)
+
+    # Повторная загрузка пропускает дубликаты
+    load_from_snapshot(from_snapshot, snapshot_file)
+    assert dump(from_snapshot) == dump(pet_registry)
+
+# Тест: точечный поиск по снимку без загрузки
+def test_snapshot_reader_lookup(pet_registry, tmp_path):
+    filename = str(tmp_path / "pets.snap")
+    save_to_snapshot(pet_registry, filename)
+
+    with SnapshotReader(filename) as reader:
+        assert (reader.owner_count, reader.pet_count) == (3, 6)
+        assert reader.get_owner(-3).name == "Мария"
+        assert reader.get_owner(8) is None
+        for pet in pet_registry.pets:
+            found = reader.get_pet(pet.name)
+            assert (found.name, found.age, found.breed.name, found.owner.owner_id) == (pet.name, pet.age, pet.breed.name, pet.owner.owner_id)
+        assert reader.get_pet("Шарик") is None
+
+# Тест: пустой реестр сохраняется и читается
+def test_snapshot_empty(tmp_path):
+    filename = str(tmp_path / "empty.snap")
+    save_to_snapshot(PetRegistry(), filename)
+    registry = PetRegistry()
+    load_from_snapshot(registry, filename)
+    assert registry.owners == [] and registry.pets == []
+    with SnapshotReader(filename) as reader:
+        assert reader.get_pet("Бобик") is None
+
+# Тест: чужой или обрезанный файл отклоняется
+def test_snapshot_invalid_file(pet_registry, tmp_path):
+    filename = str(tmp_path / "pets.json")
+    save_to_json(pet_registry, filename)
+    with pytest.raises(FileProcessingError):
+        load_from_snapshot(PetRegistry(), filename)
+
+    snapshot_file = str(tmp_path / "pets.snap")
+    save_to_snapshot(pet_registry, snapshot_file)
+    with open(snapshot_file, 'rb') as f:
+        data = f.read()
+    with open(snapshot_file, 'wb') as f:
+        f.write(data[:len(data) // 2])
+    with pytest.raises(InvalidFileFormatError):
+        SnapshotReader(snapshot_file)
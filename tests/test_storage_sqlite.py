@@ -0,0 +1,94 @@
+# tests/test_storage_sqlite.py
+import sqlite3
+import pytest
+from models import Owner, Pet, Breed, PetHouse, Address
+from registry import PetRegistry
+from storage import save_to_json, save_to_sqlite, load_from_sqlite
+from database import PetDatabase
+from exceptions import FileProcessingError, InvalidFileFormatError
+
+# Фикстура: реестр с кириллицей, общими значениями и пустыми строками
+@pytest.fixture
+def pet_registry():
+    registry = PetRegistry()
+    owners = [
+        Owner(42, "Иван Петров", "+7-999-123-45-67", Address("Ленина, 10", "Москва", "101000")),
+        Owner(-3, "Мария", "", Address("", "Санкт-Петербург", "190000")),
+        Owner(7, "John Doe", "123", Address("Main St", "Москва", "10001")),
+    ]
+    for owner in owners:
+        registry.add_owner(owner)
+    breeds = [Breed("Корги", "Собака"), Breed("Британская", "Кошка")]
+    for i, name in enumerate(["Бобик", "Мурка", "Max", "Ёжик", "Альфа", ""]):
+        registry.add_pet(Pet(name, i, breeds[i % 2], PetHouse("Квартира", "Средний"), owners[i % 3]))
+    return registry
+
+def dump(registry):
+    """Состояние реестра в виде простых значений для сравнения."""
+    return (
+        [(o.owner_id, o.name, o.phone, o.address.street, o.address.city, o.address.postal_code) for o in registry.owners],
+        [(p.name, p.age, p.breed.name, p.breed.species, p.house.house_type, p.house.house_size, p.owner.owner_id) for p in registry.pets],
+    )
+
+# Тест: сохранение и загрузка сохраняют записи и порядок
+def test_sqlite_round_trip(pet_registry, tmp_path):
+    filename = str(tmp_path / "pets.db")
+    save_to_sqlite(pet_registry, filename)
+    loaded = PetRegistry()
+    load_from_sqlite(loaded, filename, batch_size=4)
+    assert dump(loaded) == dump(pet_registry)
+    assert loaded.get_pet("Мурка").owner is loaded.get_owner(-3)
+
+    # Повторная загрузка пропускает дубликаты
+    load_from_sqlite(loaded, filename)
+    assert dump(loaded) == dump(pet_registry)
+
+    # Повторное сохранение заменяет содержимое базы
+    pet_registry.delete_owner(7)
+    save_to_sqlite(pet_registry, filename)
+    reloaded = PetRegistry()
+    load_from_sqlite(reloaded, filename)
+    assert dump(reloaded) == dump(pet_registry)
+
+# Тест: нормализованные таблицы и режим WAL
+def test_sqlite_schema(pet_registry, tmp_path):
+    filename = str(tmp_path / "pets.db")
+    save_to_sqlite(pet_registry, filename)
+    connection = sqlite3.connect(filename)
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert connection.execute("SELECT COUNT(*) FROM breeds").fetchone()[0] == 2
+    assert connection.execute("SELECT COUNT(*) FROM houses").fetchone()[0] == 1
+    plan = " ".join(str(row) for row in connection.execute("EXPLAIN QUERY PLAN SELECT * FROM owners WHERE city = 'Москва'"))
+    assert "owners_city" in plan
+    connection.close()
+
+# Тест: запросы к базе без загрузки реестра
+def test_sqlite_database_lookup(pet_registry, tmp_path):
+    filename = str(tmp_path / "pets.db")
+    save_to_sqlite(pet_registry, filename)
+    with PetDatabase(filename) as database:
+        assert (database.owner_count, database.pet_count) == (3, 6)
+        assert database.get_owner(-3).name == "Мария"
+        assert database.get_owner(8) is None
+        assert database.get_pet("Ёжик").owner.owner_id == 42
+        assert database.get_pet("Шарик") is None
+        assert [p.name for p in database.pets_of(42)] == ["Бобик", "Ёжик"]
+        assert database.pets_of(8) == []
+        for query in ({"species": "Собака"}, {"city": "Москва"}, {"breed": "Британская", "age_between": (2, 5)},
+                      {"species": "Кошка", "city": "Москва"}, {}):
+            expected = [p.name for p in pet_registry.find_pets(**query)]
+            assert [p.name for p in database.find_pets(**query)] == expected
+
+# Тест: чужой или отсутствующий файл
+def test_sqlite_invalid_file(pet_registry, tmp_path):
+    json_file = str(tmp_path / "pets.json")
+    save_to_json(pet_registry, json_file)
+    with pytest.raises(FileProcessingError):
+        load_from_sqlite(PetRegistry(), json_file)
+    with pytest.raises(FileProcessingError):
+        load_from_sqlite(PetRegistry(), str(tmp_path / "missing.db"))
+
+    other = str(tmp_path / "other.db")
+    sqlite3.connect(other).execute("CREATE TABLE t (x)").connection.close()
+    with pytest.raises(InvalidFileFormatError):
+        PetDatabase(other)
@@ -75,3 +75,64 @@ def test_load_from_xml(pet_registry):
     
     # Удаляем тестовый файл
     os.remove(filename)
+
+# Тест: формат вывода потокового писателя (с отступами и компактный)
+def test_save_to_xml_format(pet_registry, tmp_path):
+    owner = Owner(1, 'Анна "А" & Co', "+7-999", Address("Ленина <10>", "Москва", "101000"))
+    pet_registry.add_owner(owner)
+    pet_registry.add_pet(Pet("Бобик", 3, Breed("Корги", "Собака"), PetHouse("Квартира", "Средний"), owner))
+    filename = str(tmp_path / "pets.xml")
+
+    save_to_xml(pet_registry, filename)
+    with open(filename, encoding='utf-8') as f:
+        assert f.read() == """<?xml version="1.0" encoding="utf-8"?>
+<PetRegistry>
+  <Owner id="1" name="Анна &quot;А&quot; &amp; Co" phone="+7-999">
+    <Address street="Ленина &lt;10&gt;" city="Москва" postal_code="101000"/>
+  </Owner>
+  <Pet name="Бобик" age="3">
+    <Breed name="Корги" species="Собака"/>
+    <House house_type="Квартира" house_size="Средний"/>
+    <OwnerID>1</OwnerID>
+  </Pet>
+</PetRegistry>"""
+
+    save_to_xml(pet_registry, filename, pretty=False)
+    with open(filename, encoding='utf-8') as f:
+        compact = f.read()
+    assert "\n  " not in compact
+    assert ET.fromstring(compact.split("\n", 1)[1]).find("Pet/OwnerID").text == "1"
+
+    save_to_xml(PetRegistry(), filename)
+    with open(filename, encoding='utf-8') as f:
+        assert f.read() == '<?xml version="1.0" encoding="utf-8"?>\n<PetRegistry/>'
+
+# Тест: значения со спецсимволами переживают сохранение и загрузку
+def test_save_to_xml_round_trip_escaping(pet_registry, tmp_path):
+    owner = Owner(7, "<Иван> & 'Ко'", "tab\there", Address("строка1\nстрока2", "Москва", ""))
+    pet_registry.add_owner(owner)
+    pet_registry.add_pet(Pet('Рекс "Большой"', 4, Breed("Хаски", "Собака"), PetHouse("Дом", "Большой"), owner))
+    filename = str(tmp_path / "pets.xml")
+    save_to_xml(pet_registry, filename)
+
+    loaded = PetRegistry()
+    load_from_xml(loaded, filename)
+    assert loaded.get_owner(7).name == owner.name
+    assert loaded.get_owner(7).phone == owner.phone
+    assert loaded.get_owner(7).address.street == owner.address.street
+    assert loaded.get_pet('Рекс "Большой"').owner is loaded.get_owner(7)
+
+# Тест: дубликат имени пропускается, не проверяя своего владельца и возраст
+def test_load_from_xml_duplicate_before_owner_check(pet_registry, tmp_path):
+    filename = tmp_path / "pets.xml"
+    filename.write_text("""<?xml version='1.0' encoding='utf-8'?>
+<PetRegistry>
+  <Owner id="1" name="John Doe" phone="123"><Address street="123 Main St" city="New York" postal_code="10001" /></Owner>
+  <Owner id="1" name="John Doe" phone="123" />
+  <Pet name="Rex" age="3"><Breed name="Bulldog" species="Dog" /><House house_type="Apartment" house_size="Medium" /><OwnerID>1</OwnerID></Pet>
+  <Pet name="Rex" age="много"><Breed name="Bulldog" species="Dog" /><House house_type="Apartment" house_size="Medium" /><OwnerID>99</OwnerID></Pet>
+</PetRegistry>""", encoding='utf-8')
+
+    load_from_xml(pet_registry, str(filename))
+    assert pet_registry.get_pet("Rex").owner is pet_registry.get_owner(1)
+    assert len(pet_registry.pets) == 1
@@ -0,0 +1,96 @@
+# tests/test_storage_xml_stream.py
+import pytest
+from registry import PetRegistry
+from storage import load_from_xml, load_from_xml_stream
+from exceptions import FileProcessingError
+
+# Фикстура для создания реестра питомцев
+@pytest.fixture
+def pet_registry():
+    return PetRegistry()
+
+def write_xml(path, owners_count, pets_count, pets_first=False):
+    owners = "".join(
+        f'<Owner id="{i}" name="Владелец {i}" phone="123"><Address street="Ленина, 10" city="Москва" postal_code="101000" /></Owner>'
+        for i in range(owners_count)
+    )
+    pets = "".join(
+        f'<Pet name="Питомец {i}" age="{i % 15}"><Breed name="Корги" species="Собака" />'
+        f'<House house_type="Квартира" house_size="Средний" /><OwnerID>{i % owners_count}</OwnerID></Pet>'
+        for i in range(pets_count)
+    )
+    body = pets + owners if pets_first else owners + pets
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"<?xml version='1.0' encoding='utf-8'?>\n<PetRegistry>{body}</PetRegistry>")
+
+# Тест для потоковой загрузки XML с пачками меньше числа записей
+def test_load_from_xml_stream(pet_registry, tmp_path):
+    filename = str(tmp_path / "pets.xml")
+    write_xml(filename, 5, 12)
+
+    load_from_xml_stream(pet_registry, filename, batch_size=4)
+    assert len(pet_registry.owners) == 5
+    assert len(pet_registry.pets) == 12
+    pet = pet_registry.get_pet("Питомец 7")
+    assert pet.owner is pet_registry.get_owner(2)
+    assert pet.breed.name == "Корги"
+    assert pet.owner.address.city == "Москва"
+
+    # Результат совпадает с обычным загрузчиком
+    expected = PetRegistry()
+    load_from_xml(expected, filename)
+    assert [p.name for p in expected.pets] == [p.name for p in pet_registry.pets]
+
+    # Повторная загрузка пропускает дубликаты
+    load_from_xml_stream(pet_registry, filename)
+    assert len(pet_registry.pets) == 12
+
+# Тест: питомцы могут идти в файле раньше владельцев
+def test_load_from_xml_stream_pets_first(pet_registry, tmp_path):
+    filename = str(tmp_path / "pets.xml")
+    write_xml(filename, 2, 4, pets_first=True)
+
+    load_from_xml_stream(pet_registry, filename, batch_size=1)
+    assert len(pet_registry.pets) == 4
+
+# Тест: некорректный XML приводит к FileProcessingError
+def test_load_from_xml_stream_invalid(pet_registry, tmp_path):
+    filename = str(tmp_path / "broken.xml")
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('<PetRegistry><Owner id="1"></PetRegistry>')
+
+    with pytest.raises(FileProcessingError):
+        load_from_xml_stream(pet_registry, filename)
+
+# Тест: неверный возраст сообщается как ошибка формата
+def test_load_from_xml_stream_bad_age(pet_registry, tmp_path):
+    filename = str(tmp_path / "pets.xml")
+    write_xml(filename, 1, 1)
+    with open(filename, encoding='utf-8') as f:
+        content = f.read().replace('age="0"', 'age="много"')
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+    with pytest.raises(FileProcessingError, match="возраста"):
+        load_from_xml_stream(pet_registry, filename)
+
+# Тест: владелец может идти после своих питомцев и в середине файла, как в load_from_xml
+def test_load_from_xml_stream_owner_after_pets(pet_registry, tmp_path):
+    def owner(i):
+        return f'<Owner id="{i}" name="Владелец {i}" phone="123"><Address street="Ленина, 10" city="Москва" postal_code="101000" /></Owner>'
+
+    def pet(name, owner_id):
+        return (f'<Pet name="{name}" age="3"><Breed name="Корги" species="Собака" />'
+                f'<House house_type="Квартира" house_size="Средний" /><OwnerID>{owner_id}</OwnerID></Pet>')
+
+    body = owner(0) + pet("Бобик", 0) + pet("Рекс", 1) + pet("Мурка", 0) + pet("Бобик", 1) + owner(1) + pet("Тузик", 1)
+    filename = str(tmp_path / "pets.xml")
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(f"<?xml version='1.0' encoding='utf-8'?>\n<PetRegistry>{body}</PetRegistry>")
+
+    load_from_xml_stream(pet_registry, filename, batch_size=1)
+    expected = PetRegistry()
+    load_from_xml(expected, filename)
+    assert [(p.name, p.owner.owner_id) for p in pet_registry.pets] == [(p.name, p.owner.owner_id) for p in expected.pets]
+    assert [p.name for p in pet_registry.pets_of(1)] == ["Рекс", "Тузик"]
+    assert pet_registry.get_pet("Бобик").owner is pet_registry.get_owner(0)
@@ -0,0 +1,148 @@
+# tests/test_threadsafe.py
+import random
+import threading
+import pytest
+from models import Owner, Pet, Breed, PetHouse, Address
+from threadsafe import ReadWriteLock, ThreadSafePetRegistry
+from storage import save_to_json, load_from_json
+from registry import PetRegistry, check_stats
+
+BREEDS = [Breed("Корги", "Собака"), Breed("Британская", "Кошка"), Breed("Хаски", "Собака")]
+CITIES = ["Москва", "Казань", "Омск"]
+
+# Фикстура: потокобезопасный реестр из 20 владельцев и 100 питомцев
+@pytest.fixture
+def pet_registry():
+    registry = ThreadSafePetRegistry()
+    for i in range(20):
+        registry.add_owner(Owner(i, f"Владелец {i}", "+7", Address("Ленина, 10", CITIES[i % 3], "101000")))
+    for i in range(100):
+        registry.add_pet(Pet(f"Питомец {i}", i % 15, BREEDS[i % 3], PetHouse("Дом", "Большой"), registry.get_owner(i % 20)))
+    return registry
+
+def check_consistent(registry):
+    """Индексы реестра согласованы с его записями."""
+    pets = registry.pets
+    assert len(pets) == registry.pet_count
+    for pet in pets:
+        assert registry.get_owner(pet.owner.owner_id) is pet.owner
+    for species in ("Собака", "Кошка"):
+        for city in CITIES:
+            expected = sorted(p.name for p in pets if p.breed.species == species and p.owner.address.city == city)
+            assert [p.name for p in registry.find_pets(species=species, city=city)] == expected
+    expected = sorted(p.name for p in pets if 3 <= p.age <= 7)
+    assert [p.name for p in registry.find_pets(age_between=(3, 7))] == expected
+    assert check_stats(registry) == []
+
+# Тест: несколько читателей одновременно, писатель — один
+def test_rw_lock_readers_share_writer_excludes():
+    lock = ReadWriteLock()
+    readers_inside = threading.Barrier(3, timeout=5)
+    def reader():
+        with lock.read_locked():
+            # Все три читателя должны оказаться внутри одновременно
+            readers_inside.wait()
+    threads = [threading.Thread(target=reader) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    events = []
+    lock.acquire_write()
+    thread = threading.Thread(target=lambda: (lock.acquire_read(), events.append("read"), lock.release_read()))
+    thread.start()
+    thread.join(0.1)
+    assert events == []
+    events.append("write done")
+    lock.release_write()
+    thread.join()
+    assert events == ["write done", "read"]
+
+# Тест: повторный захват и запрет повышения чтения до записи
+def test_rw_lock_reentrancy():
+    lock = ReadWriteLock()
+    with lock.write_locked():
+        with lock.read_locked():
+            with lock.write_locked():
+                pass
+    with lock.read_locked():
+        with lock.read_locked():
+            pass
+        with pytest.raises(RuntimeError):
+            lock.acquire_write()
+    # После всех выходов блокировка свободна
+    with lock.write_locked():
+        pass
+
+# Тест: срез не меняется после изменений реестра
+def test_snapshot_is_point_in_time(pet_registry, tmp_path):
+    bobik = pet_registry.get_pet("Питомец 1")
+    snapshot = pet_registry.snapshot()
+    pet_registry.update_pet_age("Питомец 1", 99)
+    pet_registry.update_owner(1, new_phone="000", new_address=Address("", "Сочи", ""))
+    pet_registry.update_pet("Питомец 2", new_name="Шарик")
+    pet_registry.delete_owner(3)
+
+    assert bobik.age == 1 and snapshot.get_pet("Питомец 1") is bobik
+    assert snapshot.get_owner(1).phone == "+7" and snapshot.get_pet("Питомец 21").owner.address.city == "Казань"
+    assert snapshot.pet_count == 100 and snapshot.owner_count == 20
+    assert pet_registry.get_pet("Питомец 21").owner is pet_registry.get_owner(1)
+    assert [p.name for p in pet_registry.find_pets(city="Сочи")] == sorted(p.name for p in pet_registry.pets_of(1))
+    check_consistent(pet_registry)
+
+    # Срез сохраняется обычными функциями
+    filename = str(tmp_path / "snapshot.json")
+    save_to_json(snapshot, filename)
+    loaded = PetRegistry()
+    load_from_json(loaded, filename)
+    assert loaded.get_pet("Питомец 1").age == 1 and len(loaded.pets) == 100
+
+# Тест: нагрузка из многих потоков — читатели, писатели и срезы
+def test_stress_many_threads(pet_registry):
+    errors = []
+    stop = threading.Event()
+
+    def writer(seed):
+        rng = random.Random(seed)
+        try:
+            for step in range(300):
+                name = f"Поток {seed}-{step}"
+                # update_owner заменяет объект владельца, поэтому поиск и добавление — одна операция
+                with pet_registry.lock.write_locked():
+                    owner = pet_registry.get_owner(rng.randrange(20))
+                    pet_registry.add_pet(Pet(name, rng.randrange(15), rng.choice(BREEDS), PetHouse("Дом", "Большой"), owner))
+                pet_registry.update_pet_age(name, rng.randrange(15))
+                pet_registry.update_owner(owner.owner_id, new_address=Address("", rng.choice(CITIES), ""))
+                if rng.random() < 0.5:
+                    pet_registry.update_pet(name, new_name=name + " *", new_breed=rng.choice(BREEDS))
+                    pet_registry.delete_pet(name + " *")
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            while not stop.is_set():
+                for pet in pet_registry.pets:
+                    pet.owner.address.city
+                pet_registry.find_pets(species="Собака", city="Москва", age_between=(2, 9))
+                snapshot = pet_registry.snapshot()
+                for pet in snapshot.iter_pets():
+                    # В срезе каждый питомец ссылается на владельца того же среза
+                    assert snapshot.get_owner(pet.owner.owner_id) is pet.owner
+        except Exception as e:
+            errors.append(e)
+
+    writers = [threading.Thread(target=writer, args=(seed,)) for seed in range(8)]
+    readers = [threading.Thread(target=reader) for _ in range(8)]
+    for thread in writers + readers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert pet_registry.pet_count == 100 + sum(1 for p in pet_registry.pets if p.name.startswith("Поток"))
+    check_consistent(pet_registry)
@@ -0,0 +1,269 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Iterator, List, Optional
+from models import Pet, Owner, Address, Breed, PetHouse
+from registry import PetRegistry, RegistryStats, _add_to_index, _remove_from_index
+from exceptions import InvalidDataError, OwnerNotFoundError, PetNotFoundError
+
+
+class ReadWriteLock:
+    """Блокировка «читатели–писатель» с приоритетом писателей.
+
+    Читать могут сразу несколько потоков, писатель работает один. Пока
+    писатель ждет, новые читатели не входят, поэтому поток чтений не
+    может заморить писателя голодом. Поток может повторно захватить
+    блокировку, которую уже держит, а писатель может и читать под ней.
+    Повысить чтение до записи нельзя — это ведет к взаимной блокировке.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._waiting_writers = 0
+        self._writer: Optional[int] = None
+        self._writer_depth = 0
+        self._local = threading.local()
+
+    def acquire_read(self) -> None:
+        if self._writer == threading.get_ident():
+            self._writer_depth += 1
+            return
+        depth = getattr(self._local, "depth", 0)
+        if depth:
+            # Повторное чтение не ждет писателей, иначе поток заблокирует сам себя
+            self._local.depth = depth + 1
+            return
+        with self._condition:
+            while self._writer is not None or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        self._local.depth = 1
+
+    def release_read(self) -> None:
+        if self._writer == threading.get_ident():
+            self.release_write()
+            return
+        self._local.depth -= 1
+        if not self._local.depth:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        if self._writer == me:
+            self._writer_depth += 1
+            return
+        if getattr(self._local, "depth", 0):
+            raise RuntimeError("Нельзя захватить запись, удерживая чтение.")
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = me
+        self._writer_depth = 1
+
+    def release_write(self) -> None:
+        self._writer_depth -= 1
+        if not self._writer_depth:
+            with self._condition:
+                self._writer = None
+                self._condition.notify_all()
+
+    @contextmanager
+    def read_locked(self) -> Iterator[None]:
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self) -> Iterator[None]:
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class RegistrySnapshot:
+    """Неизменяемый срез реестра на момент ThreadSafePetRegistry.snapshot().
+
+    Поддерживает чтение в том же виде, что и реестр (owners, pets,
+    get_owner, get_pet, ...), поэтому его можно передать в save_to_json,
+    save_to_xml и другие функции сохранения.
+    """
+
+    def __init__(self, owners: Dict[int, Owner], pets: Dict[str, Pet]) -> None:
+        self._owners = owners
+        self._pets = pets
+
+    @property
+    def owners(self) -> List[Owner]:
+        return list(self._owners.values())
+
+    @property
+    def pets(self) -> List[Pet]:
+        return list(self._pets.values())
+
+    @property
+    def owner_count(self) -> int:
+        return len(self._owners)
+
+    @property
+    def pet_count(self) -> int:
+        return len(self._pets)
+
+    def iter_owners(self) -> Iterator[Owner]:
+        return iter(self._owners.values())
+
+    def iter_pets(self) -> Iterator[Pet]:
+        return iter(self._pets.values())
+
+    def get_owner(self, owner_id: int) -> Owner:
+        owner = self._owners.get(owner_id)
+        if owner is None:
+            raise OwnerNotFoundError(f"Владелец с ID {owner_id} не найден.")
+        return owner
+
+    def get_pet(self, pet_name: str) -> Pet:
+        pet = self._pets.get(pet_name)
+        if pet is None:
+            raise PetNotFoundError(f"Питомец с именем {pet_name} не найден.")
+        return pet
+
+
+def _reading(method):
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        self.lock.acquire_read()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.lock.release_read()
+    return locked
+
+
+def _writing(method):
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        self.lock.acquire_write()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.lock.release_write()
+    return locked
+
+
+class ThreadSafePetRegistry(PetRegistry):
+    """PetRegistry для работы из нескольких потоков.
+
+    Чтения выполняются параллельно под блокировкой чтения, изменения —
+    под блокировкой записи (lock, ReadWriteLock). Несколько операций
+    можно объединить, захватив lock.write_locked() или lock.read_locked().
+
+    Записи реестра не изменяются на месте: update_* заменяют владельца
+    или питомца новым объектом. Поэтому snapshot() копирует только
+    словари ссылок (без копирования записей) и дальше не зависит от
+    изменений реестра, а долгое сохранение среза не блокирует писателей.
+    Объекты, полученные до изменения, сохраняют прежние значения; сами
+    записи менять напрямую (pet.age = ...) нельзя. add_pet принимает
+    только текущий объект владельца, поэтому get_owner и add_pet из
+    разных потоков стоит выполнять под одной lock.write_locked().
+
+    owner_map() и pet_map() возвращают живые представления без блокировки
+    и предназначены для загрузчиков, которые наполняют реестр сами.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.lock = ReadWriteLock()
+
+    owners = property(_reading(PetRegistry.owners.fget))
+    pets = property(_reading(PetRegistry.pets.fget))
+    get_owner = _reading(PetRegistry.get_owner)
+    get_pet = _reading(PetRegistry.get_pet)
+    pets_of = _reading(PetRegistry.pets_of)
+    find_pets = _reading(PetRegistry.find_pets)
+
+    add_owner = _writing(PetRegistry.add_owner)
+    add_pet = _writing(PetRegistry.add_pet)
+    add_owners_bulk = _writing(PetRegistry.add_owners_bulk)
+    add_pets_bulk = _writing(PetRegistry.add_pets_bulk)
+    delete_owner = _writing(PetRegistry.delete_owner)
+    delete_pet = _writing(PetRegistry.delete_pet)
+    subscribe = _writing(PetRegistry.subscribe)
+    unsubscribe = _writing(PetRegistry.unsubscribe)
+
+    def iter_owners(self) -> Iterator[Owner]:
+        """Итератор по владельцам на момент вызова."""
+        return iter(self.owners)
+
+    def iter_pets(self) -> Iterator[Pet]:
+        """Итератор по питомцам на момент вызова."""
+        return iter(self.pets)
+
+    def stats(self) -> RegistryStats:
+        """Статистика с копиями словарей: живые представления нельзя читать без блокировки."""
+        with self.lock.read_locked():
+            return super().stats().frozen()
+
+    def snapshot(self) -> RegistrySnapshot:
+        """Неизменяемый срез реестра; стоит O(n) копирования ссылок под блокировкой чтения."""
+        with self.lock.read_locked():
+            return RegistrySnapshot(dict(self._owners), dict(self._pets))
+
+    @_writing
+    def update_owner(self, owner_id: int, new_name: Optional[str] = None, new_phone: Optional[str] = None, new_address: Optional[Address] = None) -> None:
+        owner = self.get_owner(owner_id)
+        address = owner.address
+        if new_address:
+            address = self.interner.address(new_address.street, new_address.city, new_address.postal_code)
+        updated = Owner(owner_id, new_name or owner.name, new_phone or owner.phone, address)
+        self._owners[owner_id] = updated
+        # Питомцы ссылаются на владельца, поэтому тоже заменяются
+        for pet in list(self._pets_by_owner[owner_id].values()):
+            self._replace_pet(pet, Pet(pet.name, pet.age, pet.breed, pet.house, updated))
+        if self._listeners:
+            self._notify("update_owner", updated)
+
+    @_writing
+    def update_pet(self, pet_name: str, new_name: Optional[str] = None, new_age: Optional[int] = None, new_breed: Optional[Breed] = None, new_house: Optional[PetHouse] = None) -> None:
+        pet = self.get_pet(pet_name)
+        if new_name and new_name != pet.name and new_name in self._pets:
+            raise InvalidDataError(f"Питомец с именем {new_name} уже зарегистрирован.")
+        updated = Pet(
+            new_name or pet.name,
+            pet.age if new_age is None else new_age,
+            self.interner.breed(new_breed.name, new_breed.species) if new_breed else pet.breed,
+            self.interner.house(new_house.house_type, new_house.house_size) if new_house else pet.house,
+            pet.owner,
+        )
+        self._unindex_pet(pet)
+        self._index_pet(updated)
+        if self._listeners:
+            self._notify("update_pet", updated, pet.name)
+
+    @_writing
+    def update_pet_age(self, pet_name: str, new_age: int) -> None:
+        pet = self.get_pet(pet_name)
+        updated = Pet(pet.name, new_age, pet.breed, pet.house, pet.owner)
+        self._replace_pet(pet, updated)
+        if self._listeners:
+            self._notify("update_pet", updated, pet.name)
+
+    def _replace_pet(self, old: Pet, new: Pet) -> None:
+        """Заменяет питомца объектом с тем же именем, сохраняя его место в порядке добавления."""
+        self._pets[new.name] = new
+        self._pets_by_owner[new.owner.owner_id][new.name] = new
+        for index, old_key, new_key in ((self._pets_by_species, old.breed.species, new.breed.species),
+                                        (self._pets_by_breed, old.breed.name, new.breed.name),
+                                        (self._pets_by_city, old.owner.address.city, new.owner.address.city)):
+            _remove_from_index(index, old_key, old)
+            _add_to_index(index, new_key, new)
+        self._remove_age(old)
+        self._add_age(new)